@@ -0,0 +1,214 @@
+"""
+Throughput of the processing of BLE advertisements by the Bluetooth
+plugin's ``EventHandler``, replayed from a recorded trace.
+
+A trace is a JSON list of advertisements in the format produced by
+``--record``. Without ``--trace``, a synthetic trace is generated: a few
+hundred beacons that keep broadcasting the same payload with a jittery RSSI,
+plus a few sensors whose readings change every few packets.
+
+The same trace is replayed through the handler with and without the
+advertisement pre-filter.
+
+Usage::
+
+    # Record the advertisements received in 60 seconds (requires a
+    # Bluetooth adapter)
+    python -m benchmarks.ble_adverts --record trace.json --duration 60
+
+    python -m benchmarks.ble_adverts [--trace trace.json] [--repeat N]
+
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from queue import Queue
+from types import SimpleNamespace
+from typing import List
+
+from platypush.bus import Bus
+from platypush.context import get_context
+from platypush.plugins.bluetooth._ble._cache import DeviceCache
+from platypush.plugins.bluetooth._ble._event_handler import EventHandler
+from platypush.plugins.bluetooth._ble._filter import AdvertisementFilter
+from platypush.plugins.bluetooth._cache import EntityCache
+from platypush.plugins.bluetooth._types import DevicesBlacklist
+
+
+def serialize(device, data) -> dict:
+    details = device.details if isinstance(device.details, dict) else {}
+    return {
+        'address': device.address,
+        'name': device.name,
+        'connected': bool((details.get('props') or {}).get('Connected')),
+        'local_name': data.local_name,
+        'rssi': data.rssi,
+        'tx_power': data.tx_power,
+        'manufacturer_data': {
+            str(k): v.hex() for k, v in (data.manufacturer_data or {}).items()
+        },
+        'service_data': {k: v.hex() for k, v in (data.service_data or {}).items()},
+        'service_uuids': list(data.service_uuids or []),
+    }
+
+
+def deserialize(adv: dict):
+    device = SimpleNamespace(
+        address=adv['address'],
+        name=adv['name'],
+        details={'props': {'Connected': adv['connected']}},
+    )
+
+    data = SimpleNamespace(
+        local_name=adv['local_name'],
+        rssi=adv['rssi'],
+        tx_power=adv['tx_power'],
+        manufacturer_data={
+            int(k): bytes.fromhex(v) for k, v in adv['manufacturer_data'].items()
+        },
+        service_data={k: bytes.fromhex(v) for k, v in adv['service_data'].items()},
+        service_uuids=adv['service_uuids'],
+        platform_data=(),
+    )
+
+    return device, data
+
+
+def synthetic_trace(n_beacons: int = 300, n_sensors: int = 10, n: int = 20000):
+    rnd = random.Random(0)
+    beacons = [
+        {
+            'address': ':'.join(f'{rnd.randrange(256):02X}' for _ in range(6)),
+            'name': None,
+            'connected': False,
+            'local_name': None,
+            'rssi': rnd.randrange(-90, -40),
+            'tx_power': None,
+            'manufacturer_data': {'76': '0215' + rnd.randbytes(21).hex()},
+            'service_data': {},
+            'service_uuids': [],
+        }
+        for _ in range(n_beacons)
+    ]
+
+    sensors = [
+        {
+            'address': f'A4:C1:38:00:00:{i:02X}',
+            'name': f'LYWSD03MMC-{i}',
+            'connected': False,
+            'local_name': f'LYWSD03MMC-{i}',
+            'rssi': rnd.randrange(-90, -40),
+            'tx_power': None,
+            'manufacturer_data': {},
+            'service_data': {
+                '0000181a-0000-1000-8000-00805f9b34fb': rnd.randbytes(13).hex()
+            },
+            'service_uuids': ['0000181a-0000-1000-8000-00805f9b34fb'],
+        }
+        for i in range(n_sensors)
+    ]
+
+    trace = []
+    for _ in range(n):
+        if rnd.random() < 0.05:
+            adv = dict(rnd.choice(sensors))
+            if rnd.random() < 0.2:
+                adv['service_data'] = {
+                    k: rnd.randbytes(13).hex() for k in adv['service_data']
+                }
+        else:
+            adv = dict(rnd.choice(beacons))
+
+        adv['rssi'] += rnd.randrange(-3, 4)
+        trace.append(adv)
+
+    return trace
+
+
+async def record(path: str, duration: float):
+    # pylint: disable=import-outside-toplevel
+    from bleak import BleakScanner
+
+    trace: List[dict] = []
+    async with BleakScanner(
+        detection_callback=lambda device, data: trace.append(serialize(device, data))
+    ):
+        await asyncio.sleep(duration)
+
+    with open(path, 'w') as f:
+        json.dump(trace, f)
+
+    print(f'Recorded {len(trace)} advertisements to {path}')
+
+
+class _UnfilteredAdvertisementFilter(AdvertisementFilter):
+    def check(self, *_, **__):
+        return None
+
+
+def replay(name: str, trace, repeat: int, filtered: bool):
+    entity_cache = EntityCache()
+    device_queue: Queue = Queue()
+    handler = EventHandler(
+        device_queue=device_queue,
+        device_cache=DeviceCache(),
+        entity_cache=entity_cache,
+        plugins=[],
+        exclude_known_noisy_beacons=True,
+        blacklist=DevicesBlacklist(),
+    )
+
+    if not filtered:
+        # pylint: disable=protected-access
+        handler._filter = _UnfilteredAdvertisementFilter()
+
+    published = 0
+    t_start = time.perf_counter()
+    cpu_start = time.process_time()
+    for _ in range(repeat):
+        for device, data in trace:
+            handler(device, data)
+
+            # Emulate the plugin's consumer of the device queue
+            while not device_queue.empty():
+                entity_cache.add(device_queue.get_nowait())
+                published += 1
+
+    elapsed = time.perf_counter() - t_start
+    cpu = time.process_time() - cpu_start
+    n = len(trace) * repeat
+    print(
+        f'{name:<16} {n / elapsed:>12,.0f} adverts/s '
+        f'{cpu * 1e6 / n:>8.1f} us CPU/advert {published:>8} published'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--trace', help='Recorded trace to replay')
+    parser.add_argument('--record', help='Record a trace to this file')
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.duration))
+        return
+
+    if args.trace:
+        with open(args.trace) as f:
+            trace = json.load(f)
+    else:
+        trace = synthetic_trace()
+
+    trace = [deserialize(adv) for adv in trace]
+    get_context().bus = Bus()
+    replay('unfiltered', trace, args.repeat, filtered=False)
+    replay('filtered', trace, args.repeat, filtered=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""
+Concurrent requests per second served by a single HTTP worker on the
+``/execute`` endpoint, through the Flask/WSGI route and through the native
+asyncio route, and on the ``/execute/batch`` endpoint.
+
+The actions are emulated by a responder that replies to each request on the
+bus after a fixed latency, so the benchmark measures how many in-flight
+requests a worker can handle. It starts a temporary ``redis-server``.
+
+Usage::
+
+    python -m benchmarks.http_execute [--requests N] [--concurrency C] [--latency S]
+
+"""
+
+import argparse
+import asyncio
+import heapq
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import Flask, Response, request
+from redis import Redis
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application, FallbackHandler
+from tornado.wsgi import WSGIContainer
+
+from platypush.backend.http.app.api.execute import ExecuteBatchRoute, ExecuteRoute
+from platypush.backend.http.app.utils import bus, send_message
+from platypush.config import Config
+
+
+class BenchExecuteRoute(ExecuteRoute):
+    @property
+    def auth_required(self) -> bool:
+        return False
+
+
+class BenchExecuteBatchRoute(ExecuteBatchRoute):
+    @classmethod
+    def path(cls) -> str:
+        return '/native/execute/batch'
+
+    @property
+    def auth_required(self) -> bool:
+        return False
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def responder(redis_port: int, queue: str, latency: float, stop: threading.Event):
+    """
+    Replies to the requests posted on the bus after ``latency`` seconds.
+    """
+    redis = Redis(port=redis_port)
+    pubsub = redis.pubsub()
+    pubsub.subscribe(queue)
+    pending: list = []
+
+    while not stop.is_set():
+        timeout = max(0, pending[0][0] - time.time()) if pending else 0.1
+        msg = pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if msg:
+            req = json.loads(msg['data'])
+            heapq.heappush(pending, (time.time() + latency, req['id']))
+
+        while pending and pending[0][0] <= time.time():
+            _, msg_id = heapq.heappop(pending)
+            queue_name = f'platypush/responses/{msg_id}'
+            redis.rpush(
+                queue_name,
+                json.dumps(
+                    {
+                        'type': 'response',
+                        'id': msg_id,
+                        'target': 'http',
+                        'origin': 'bench',
+                        'response': {'output': 'ok', 'errors': []},
+                    }
+                ),
+            )
+            redis.expire(queue_name, 60)
+
+
+def serve(port: int, ready: threading.Event):
+    flask_app = Flask(__name__)
+
+    @flask_app.route('/execute', methods=['POST'])
+    def legacy_execute():
+        response = send_message(json.loads(request.data))
+        return Response(str(response or {}), mimetype='application/json')
+
+    async def main():
+        app = Application(
+            [
+                ('/native/execute', BenchExecuteRoute),
+                (BenchExecuteBatchRoute.path(), BenchExecuteBatchRoute),
+                (r'.*', FallbackHandler, {'fallback': WSGIContainer(flask_app)}),
+            ]
+        )
+
+        server = HTTPServer(app)
+        server.add_sockets(bind_sockets(port, address='127.0.0.1'))
+        ready.set()
+        await asyncio.Event().wait()
+
+    asyncio.run(main())
+
+
+def run(name: str, url: str, payload, n: int, concurrency: int, per_call: int = 1):
+    local = threading.local()
+
+    def call(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        local.session.post(url, json=payload, timeout=120).raise_for_status()
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(call, range(n // per_call)))
+    elapsed = time.perf_counter() - t_start
+    print(f'{name:<32} {n / elapsed:>10,.0f} requests/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05)
+    args = parser.parse_args()
+
+    if not shutil.which('redis-server'):
+        raise SystemExit('redis-server is required to run this benchmark')
+
+    redis_port, http_port = free_port(), free_port()
+    stop = threading.Event()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cfgfile = os.path.join(workdir, 'config.yaml')
+        with open(cfgfile, 'w') as f:
+            f.write(
+                f'device_id: bench\nworkdir: {workdir}\n'
+                f'redis:\n  port: {redis_port}\n'
+            )
+
+        redis_proc = subprocess.Popen(
+            ['redis-server', '--port', str(redis_port), '--save', ''],
+            stdout=subprocess.DEVNULL,
+        )
+
+        try:
+            Config.init(cfgfile)
+            logging.getLogger('tornado.access').setLevel(logging.WARNING)
+            redis = Redis(port=redis_port)
+            while True:
+                try:
+                    redis.ping()
+                    break
+                except Exception:
+                    time.sleep(0.1)
+
+            threading.Thread(
+                target=responder,
+                args=(redis_port, bus().redis_queue, args.latency, stop),
+                daemon=True,
+            ).start()
+
+            ready = threading.Event()
+            threading.Thread(target=serve, args=(http_port, ready), daemon=True).start()
+            ready.wait()
+
+            base_url = f'http://127.0.0.1:{http_port}'
+            req = {'type': 'request', 'action': 'bench.noop'}
+            print(
+                f'{args.requests} requests, concurrency {args.concurrency}, '
+                f'action latency {args.latency * 1000:.0f} ms'
+            )
+
+            run(
+                '/execute (WSGI)',
+                f'{base_url}/execute',
+                req,
+                args.requests,
+                args.concurrency,
+            )
+            run(
+                '/execute (asyncio)',
+                f'{base_url}/native/execute',
+                req,
+                args.requests,
+                args.concurrency,
+            )
+            run(
+                '/execute/batch (10/batch)',
+                f'{base_url}/native/execute/batch',
+                [req] * 10,
+                args.requests,
+                args.concurrency,
+                per_call=10,
+            )
+        finally:
+            stop.set()
+            redis_proc.terminate()
+            redis_proc.wait()
+
+
+if __name__ == '__main__':
+    main()
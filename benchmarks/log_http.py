@@ -0,0 +1,81 @@
+"""
+Throughput of the ``log.http`` parser and tailer, in lines per second.
+
+Usage::
+
+    python -m benchmarks.log_http [--lines N]
+
+"""
+
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from platypush.plugins.log.http._parser import (
+    http_line_regex,
+    parse_line,
+    parse_timestamp,
+)
+from platypush.plugins.log.http._tailer import FileTailer
+
+line_template = (
+    '10.0.0.{} - - [{} +0000] "GET /api/v1/items/{} HTTP/1.1" {} {} '
+    '"https://example.com/" "Mozilla/5.0 (X11; Linux x86_64)"\n'
+)
+
+
+def generate_lines(n: int):
+    start = datetime.datetime(2024, 1, 1)
+    return [
+        line_template.format(
+            i % 256,
+            (start + datetime.timedelta(seconds=i // 50)).strftime('%d/%b/%Y:%H:%M:%S'),
+            i,
+            (200, 200, 304, 404)[i % 4],
+            i % 10000,
+        )
+        for i in range(n)
+    ]
+
+
+def parse_strptime(line: str):
+    m = http_line_regex.match(line.strip())
+    return m and datetime.datetime.strptime(m.group(4), '%d/%b/%Y:%H:%M:%S %z')
+
+
+def run(name: str, n: int, fn):
+    t_start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - t_start
+    print(f'{name:<32} {n / elapsed:>12,.0f} lines/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=200_000)
+    args = parser.parse_args()
+    lines = generate_lines(args.lines)
+
+    run('regex + strptime', len(lines), lambda: [parse_strptime(x) for x in lines])
+    parse_timestamp.cache_clear()
+    run('parse_line', len(lines), lambda: [parse_line(x) for x in lines])
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'access.log')
+        open(path, 'w').close()
+        tailer = FileTailer(path)
+        with open(path, 'w') as f:
+            f.writelines(lines)
+
+        run(
+            'tail + parse_line',
+            len(lines),
+            lambda: [parse_line(x) for x in tailer.read_lines()],
+        )
+        tailer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Throughput of the local media indexer (``media.search.local``), in files
+per second, on a synthetic media library.
+
+It measures the first full index of the library, a rescan of the unchanged
+library, and a rescan after new files are added to a few directories, both
+on the SQLite full-text index and on the token index fallback.
+
+Usage::
+
+    python -m benchmarks.media_index [--files N] [--files-per-dir N]
+        [--changed-dirs N]
+
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from platypush.common.fts import FtsIndex
+from platypush.plugins.media._search.local import LocalMediaSearcher
+from platypush.plugins.media._search.local.db import Base
+from platypush.plugins.media._search.local.indexer import MediaIndexer
+
+extensions = ('mkv', 'mp4', 'mp3', 'flac', 'jpg', 'nfo')
+
+
+def generate_library(root: str, n_files: int, files_per_dir: int):
+    """
+    Create a tree of ``<artist>/<album>/<track>`` empty files, with a few
+    non-media files.
+    """
+    dirs = []
+    for i in range(0, n_files, files_per_dir):
+        path = os.path.join(root, f'Artist {i // 1000}', f'Album {i}')
+        os.makedirs(path)
+        dirs.append(path)
+
+        for j in range(i, min(n_files, i + files_per_dir)):
+            ext = extensions[j % len(extensions)]
+            open(os.path.join(path, f'{j:06d} - Track title {j}.{ext}'), 'w').close()
+
+    # Make sure that the changes made after the first scan are detected
+    t = time.time() - 60
+    for path, _, _ in os.walk(root):
+        os.utime(path, (t, t))
+
+    return dirs
+
+
+def run(name: str, indexer: MediaIndexer, session, media_dir: str):
+    t_start = time.perf_counter()
+    stats, _ = indexer.scan(session, 1, media_dir)
+    session.commit()
+    elapsed = time.perf_counter() - t_start
+
+    print(
+        f'{name:<24} {elapsed:>8.3f} s {stats.files / elapsed:>12,.0f} files/s '
+        f'{stats.changed_dirs:>6}/{stats.dirs} dirs changed {stats.added:>8} added'
+    )
+
+
+def benchmark(name: str, media_dir: str, changed_dirs, use_fts: bool):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f'sqlite:///{os.path.join(tmpdir, "media.db")}')
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        fts = None
+        if use_fts:
+            fts = FtsIndex('MediaFileFts', columns=['filename'])
+            if not fts.is_available(session):
+                print(f'{name}: SQLite FTS5 is not available')
+                return
+
+            fts.init(session)
+            session.commit()
+
+        # pylint: disable=protected-access
+        indexer = MediaIndexer(
+            is_media_file=LocalMediaSearcher._is_media_file,
+            tokenize=LocalMediaSearcher._tokenize,
+            fts=fts,
+        )
+
+        print(f'--- {name}')
+        run('full index', indexer, session, media_dir)
+        run('unchanged rescan', indexer, session, media_dir)
+
+        for i, path in enumerate(changed_dirs):
+            open(os.path.join(path, f'New track {i}.mp3'), 'w').close()
+
+        run(f'{len(changed_dirs)} dirs changed', indexer, session, media_dir)
+
+        for i, path in enumerate(changed_dirs):
+            os.remove(os.path.join(path, f'New track {i}.mp3'))
+
+        session.close()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=200_000)
+    parser.add_argument('--files-per-dir', type=int, default=20)
+    parser.add_argument('--changed-dirs', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as media_dir:
+        dirs = generate_library(media_dir, args.files, args.files_per_dir)
+        changed_dirs = dirs[:: max(1, len(dirs) // args.changed_dirs)][
+            : args.changed_dirs
+        ]
+
+        benchmark('full-text index', media_dir, changed_dirs, use_fts=True)
+        benchmark('token index', media_dir, changed_dirs, use_fts=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput of the dispatch of a no-op action through ``Request.execute``.
+
+Usage::
+
+    python -m benchmarks.request_dispatch [--iterations N]
+
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from platypush.config import Config
+from platypush.context import get_action, get_context, get_plugin
+from platypush.message.request import Request
+from platypush.plugins import Plugin, action
+from platypush.utils import get_hash, get_module_and_method_from_action
+
+
+class BenchPlugin(Plugin):
+    """
+    Plugin with a no-op action.
+    """
+
+    @action
+    def noop(self):
+        pass
+
+
+class BenchRequest(Request):
+    """
+    Request that doesn't deliver its response, so only the dispatch is timed.
+    """
+
+    def _send_response(self, response):
+        pass
+
+
+def legacy_dispatch(action_name: str, token: str):
+    # Lookup performed before the dispatch table was introduced
+    stored_token_hash = Config.get('token_hash')
+    if stored_token_hash and get_hash(token) != stored_token_hash:
+        raise PermissionError()
+
+    module_name, method_name = get_module_and_method_from_action(action_name)
+    return get_plugin(module_name).run(method_name)
+
+
+def dispatch(action_name: str, _: str):
+    return get_action(action_name).method()
+
+
+def run(name: str, n: int, fn):
+    t_start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - t_start
+    print(f'{name:<32} {n / elapsed:>12,.0f} actions/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=100_000)
+    args = parser.parse_args()
+    n = args.iterations
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cfgfile = os.path.join(workdir, 'config.yaml')
+        with open(cfgfile, 'w') as f:
+            f.write(f'device_id: bench\nworkdir: {workdir}\n')
+
+        Config.init(cfgfile)
+        Config.set('token_hash', get_hash('secret'))
+        get_context().plugins['bench'] = BenchPlugin()
+
+        run('legacy lookup', n, lambda: legacy_dispatch('bench.noop', 'secret'))
+        run('dispatch table', n, lambda: dispatch('bench.noop', 'secret'))
+
+        request = BenchRequest(target='bench', action='bench.noop', token='secret')
+        run('Request.execute', n, lambda: request.execute(_async=False))
+
+
+if __name__ == '__main__':
+    main()
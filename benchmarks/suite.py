@@ -0,0 +1,610 @@
+"""
+Benchmark suite for the core message pipeline.
+
+It starts a temporary ``redis-server`` and runs the following benchmarks:
+
+- ``message_serialization``: messages/s serialized and parsed back through
+  ``Message.build``.
+- ``event_matching``: events/s matched against 100 event hooks.
+- ``request_dispatch``: actions/s dispatched through ``Request.execute``.
+- ``procedure_expansion``: requests/s executed by a procedure with loops,
+  conditions and context expansion.
+- ``entity_upserts``: entities/s inserted and updated by the
+  ``EntitiesEngine`` on SQLite.
+- ``startup_time``: seconds from the launch of a Platypush process to its
+  first served HTTP request.
+- ``bus_events``: events/s posted on the bus and processed by an event hook
+  of a running instance.
+- ``http_execute``: requests/s through the ``/execute`` endpoint of a running
+  instance.
+- ``ws_requests``: requests/s through the ``/ws/requests`` websocket of a
+  running instance.
+
+The results are compared with a stored baseline (by default
+``benchmarks/baseline.json``), and the command fails if any benchmark is
+slower than the baseline by more than ``--tolerance``. Baselines depend on
+the machine they were recorded on: record a new one with ``--save`` before
+comparing the results of different revisions.
+
+Usage::
+
+    python -m benchmarks.suite [--only NAME [NAME ...]] [--scale SCALE]
+        [--baseline FILE] [--save] [--tolerance 0.2]
+
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+import requests
+from redis import Redis
+
+from platypush.bus import Bus
+from platypush.config import Config
+from platypush.context import get_context
+from platypush.event.processor import EventProcessor
+from platypush.message import Message
+from platypush.message.event.custom import CustomEvent
+from platypush.message.request import Request
+from platypush.procedure import Procedure
+
+from .request_dispatch import BenchPlugin, BenchRequest
+
+default_baseline_file = os.path.join(os.path.dirname(__file__), 'baseline.json')
+redis_queue = 'platypush-bench/bus'
+api_token = 'platypush-bench-token'
+
+
+@dataclass
+class Result:
+    """
+    Result of a benchmark.
+    """
+
+    value: float
+    unit: str
+    higher_is_better: bool = True
+
+
+@dataclass
+class Context:
+    """
+    Context shared by the benchmarks.
+    """
+
+    workdir: str
+    redis_port: int
+    scale: float
+    app: Optional['AppProcess'] = None
+
+    def n(self, count: int) -> int:
+        """
+        :return: The number of iterations of a benchmark, scaled.
+        """
+        return max(1, int(count * self.scale))
+
+
+benchmarks: Dict[str, Callable[[Context], Result]] = {}
+
+
+def benchmark(f: Callable[[Context], Result]):
+    benchmarks[f.__name__] = f
+    return f
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, what: str):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() >= deadline:
+            raise TimeoutError(f'Timeout while waiting for {what}')
+        time.sleep(0.05)
+
+
+class AppProcess:
+    """
+    A Platypush instance running in a separate process, with the HTTP backend
+    enabled and a hook on ``CustomEvent(subtype='bench')`` events.
+    """
+
+    def __init__(self, ctx: Context):
+        self.http_port = free_port()
+        self.workdir = os.path.join(ctx.workdir, 'app')
+        self.base_url = f'http://127.0.0.1:{self.http_port}'
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {api_token}'
+        self._proc: Optional[subprocess.Popen] = None
+        os.makedirs(self.workdir, exist_ok=True)
+
+        self.config_file = os.path.join(self.workdir, 'config.yaml')
+        with open(self.config_file, 'w') as f:
+            f.write(f'''
+device_id: bench-app
+workdir: {self.workdir}
+
+main.db:
+  engine: sqlite:///{self.workdir}/main.db
+
+redis:
+  port: {ctx.redis_port}
+
+metrics:
+  enabled: True
+
+backend.http:
+  port: {self.http_port}
+  num_workers: 1
+  zeroconf_enabled: False
+
+event.hook.BenchHook:
+  if:
+    type: platypush.message.event.custom.CustomEvent
+    subtype: bench
+  then:
+    - action: utils.sleep
+      args:
+        seconds: 0
+''')
+
+    def start(self) -> float:
+        """
+        Start the process and wait until it serves HTTP requests.
+
+        :return: The startup time, in seconds.
+        """
+        t_start = time.perf_counter()
+        with open(os.path.join(self.workdir, 'platypush.log'), 'w') as log:
+            self._proc = subprocess.Popen(
+                [
+                    sys.executable,
+                    '-m',
+                    'platypush',
+                    '--config',
+                    self.config_file,
+                    '--redis-queue',
+                    redis_queue,
+                    '--ctrl-sock',
+                    os.path.join(self.workdir, 'ctrl.sock'),
+                ],
+                env={**os.environ, 'PLATYPUSH_API_TOKEN': api_token},
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+
+        def ready() -> bool:
+            if self._proc and self._proc.poll() is not None:
+                raise RuntimeError(
+                    f'Platypush exited with code {self._proc.returncode}, '
+                    f'see {self.workdir}/platypush.log'
+                )
+
+            try:
+                # Short timeout: requests sent on the bus before the
+                # application subscribes to it are lost
+                self.execute('utils.sleep', timeout=1, seconds=0)
+                return True
+            except requests.RequestException:
+                return False
+
+        wait_until(ready, 120, 'Platypush to start')
+        return time.perf_counter() - t_start
+
+    def stop(self):
+        if self._proc and self._proc.poll() is None:
+            os.killpg(self._proc.pid, signal.SIGTERM)
+            try:
+                self._proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                os.killpg(self._proc.pid, signal.SIGKILL)
+                self._proc.wait()
+
+    def execute(self, action: str, session=None, timeout: float = 60, **args):
+        response = (session or self.session).post(
+            f'{self.base_url}/execute',
+            json={'type': 'request', 'action': action, 'args': args},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        result = response.json()
+        if result.get('response', {}).get('errors'):
+            raise RuntimeError(result['response']['errors'])
+        return result['response']['output']
+
+    def hook_calls(self) -> int:
+        metrics = self.execute('application.metrics')
+        return metrics['hook'].get('BenchHook', {}).get('calls', 0)
+
+
+def _throughput(n: int, elapsed: float, unit: str) -> Result:
+    return Result(value=n / elapsed, unit=unit)
+
+
+def _measure(
+    n: int, step: Callable[[int], object], unit: str, ops_per_step: int = 1
+) -> Result:
+    """
+    Time ``n`` calls to ``step``, after a few warm-up calls (that also take
+    care of any lazy imports and initializations).
+    """
+    for i in range(min(n, 10)):
+        step(i)
+
+    t_start = time.perf_counter()
+    for i in range(n):
+        step(i)
+    return _throughput(n * ops_per_step, time.perf_counter() - t_start, unit)
+
+
+@benchmark
+def message_serialization(ctx: Context) -> Result:
+    messages = [
+        Request.build(
+            {
+                'type': 'request',
+                'target': 'bench',
+                'action': 'light.hue.on',
+                'args': {'groups': ['Living Room'], 'brightness': 200},
+            }
+        ),
+        CustomEvent(subtype='bench', value=42, payload={'items': list(range(10))}),
+    ]
+
+    return _measure(
+        ctx.n(20000),
+        lambda i: Message.build(str(messages[i % len(messages)])),
+        'messages/s',
+    )
+
+
+@benchmark
+def event_matching(ctx: Context) -> Result:
+    processor = EventProcessor(
+        hooks={
+            f'hook_{i}': {
+                'if': {
+                    'type': 'platypush.message.event.custom.CustomEvent',
+                    'subtype': f'bench_{i % 10}',
+                    'value': i,
+                },
+                'then': [{'action': 'bench.noop'}],
+            }
+            for i in range(100)
+        }
+    )
+
+    hooks = processor.hooks
+    events = [CustomEvent(subtype=f'bench_{i % 10}', value=-1) for i in range(10)]
+
+    def step(i: int):
+        event = events[i % len(events)]
+        for hook in hooks:
+            hook.matches_event(event)
+
+    return _measure(ctx.n(2000), step, 'events/s')
+
+
+@benchmark
+def request_dispatch(ctx: Context) -> Result:
+    request = BenchRequest(target='bench', action='bench.noop')
+    return _measure(ctx.n(50000), lambda _: request.execute(_async=False), 'actions/s')
+
+
+@benchmark
+def procedure_expansion(ctx: Context) -> Result:
+    iterations = 100
+    procedure = Procedure.build(
+        name='bench',
+        _async=False,
+        requests=[
+            {
+                f'for i in ${{range({iterations})}}': [
+                    {
+                        'if ${i % 2 == 0}': [
+                            {'action': 'bench.noop'},
+                        ],
+                        'else': [
+                            {'action': 'bench.noop'},
+                        ],
+                    },
+                    {'action': 'bench.noop'},
+                ]
+            },
+        ],
+    )
+
+    return _measure(
+        ctx.n(50),
+        lambda _: procedure.execute(),
+        'requests/s',
+        ops_per_step=iterations * 2,
+    )
+
+
+@benchmark
+def entity_upserts(ctx: Context) -> Result:
+    # pylint: disable=import-outside-toplevel
+    from platypush.entities import init_entities_engine
+    from platypush.entities.sensors import NumericSensor
+
+    engine = init_entities_engine()
+    engine.wait_start(30)
+    n = ctx.n(500)
+    batch_size = 50
+    elapsed = 0.0
+
+    try:
+        # One round of inserts and one of updates
+        for value in range(2):
+            saved = threading.Semaphore(0)
+            entities = [
+                NumericSensor(
+                    external_id=f'sensor-{i}',
+                    name=f'Sensor {i}',
+                    value=value,
+                    plugin='bench',
+                )
+                for i in range(n)
+            ]
+
+            t_start = time.perf_counter()
+            for i in range(0, n, batch_size):
+                engine.post(
+                    *entities[i : i + batch_size],
+                    callback=lambda *_: saved.release(),
+                )
+
+            for _ in range(n):
+                if not saved.acquire(timeout=120):
+                    raise TimeoutError('Timeout while waiting for the entities')
+            elapsed += time.perf_counter() - t_start
+    finally:
+        engine.stop()
+        engine.wait_stop(10)
+
+    return _throughput(2 * n, elapsed, 'entities/s')
+
+
+@benchmark
+def startup_time(ctx: Context) -> Result:
+    app = AppProcess(ctx)
+    try:
+        # The first launch also initializes the database
+        app.start()
+        app.stop()
+        elapsed = app.start()
+    except Exception:
+        app.stop()
+        raise
+
+    ctx.app = app
+    return Result(value=elapsed, unit='s', higher_is_better=False)
+
+
+def _get_app(ctx: Context) -> AppProcess:
+    if not ctx.app:
+        ctx.app = AppProcess(ctx)
+        ctx.app.start()
+    return ctx.app
+
+
+@benchmark
+def bus_events(ctx: Context) -> Result:
+    app = _get_app(ctx)
+    redis = Redis(port=ctx.redis_port)
+    calls = app.hook_calls()
+    n = ctx.n(500)
+    events = [str(CustomEvent(subtype='bench', value=i)) for i in range(n)]
+
+    t_start = time.perf_counter()
+    with redis.pipeline(transaction=False) as pipe:
+        for event in events:
+            pipe.publish(redis_queue, event)
+        pipe.execute()
+
+    wait_until(lambda: app.hook_calls() >= calls + n, 120, 'the event hooks')
+    return _throughput(n, time.perf_counter() - t_start, 'events/s')
+
+
+@benchmark
+def http_execute(ctx: Context) -> Result:
+    app = _get_app(ctx)
+    n = ctx.n(1000)
+    local = threading.local()
+
+    def call(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            local.session.headers.update(app.session.headers)
+        app.execute('utils.sleep', session=local.session, seconds=0)
+
+    t_start = time.perf_counter()
+    with ThreadPoolExecutor(20) as pool:
+        list(pool.map(call, range(n)))
+    return _throughput(n, time.perf_counter() - t_start, 'requests/s')
+
+
+@benchmark
+def ws_requests(ctx: Context) -> Result:
+    # pylint: disable=import-outside-toplevel
+    from tornado.httpclient import HTTPRequest
+    from tornado.websocket import websocket_connect
+
+    app = _get_app(ctx)
+    n = ctx.n(1000)
+
+    async def run() -> float:
+        conn = await websocket_connect(
+            HTTPRequest(
+                f'ws://127.0.0.1:{app.http_port}/ws/requests',
+                headers=dict(app.session.headers),
+            )
+        )
+
+        t_start = time.perf_counter()
+        for i in range(n):
+            await conn.write_message(
+                json.dumps(
+                    {
+                        'type': 'request',
+                        'id': f'bench-{i}',
+                        'action': 'utils.sleep',
+                        'args': {'seconds': 0},
+                    }
+                )
+            )
+
+        for _ in range(n):
+            msg = await asyncio.wait_for(conn.read_message(), 60)
+            if msg is None:
+                raise RuntimeError('The websocket connection was closed')
+
+        elapsed = time.perf_counter() - t_start
+        conn.close()
+        return elapsed
+
+    return _throughput(n, asyncio.run(run()), 'requests/s')
+
+
+def compare(
+    results: Dict[str, Result], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    """
+    Print the results and compare them with the baseline.
+
+    :return: The names of the benchmarks that regressed.
+    """
+    regressions = []
+    print(f'{"benchmark":<24} {"result":>20} {"baseline":>14} {"change":>9}')
+    for name, result in results.items():
+        line = f'{name:<24} {result.value:>12,.2f} {result.unit:<7}'
+        base = baseline.get(name)
+        if base:
+            change = result.value / base['value'] - 1
+            if not result.higher_is_better:
+                change = -change
+            line += f' {base["value"]:>14,.2f} {change:>+8.1%}'
+            if change < -tolerance:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+
+    return regressions
+
+
+def run_benchmarks(names: List[str], scale: float) -> Dict[str, Result]:
+    if not shutil.which('redis-server'):
+        raise SystemExit('redis-server is required to run the benchmarks')
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='platypush-bench-') as workdir:
+        ctx = Context(workdir=workdir, redis_port=free_port(), scale=scale)
+        cfgfile = os.path.join(workdir, 'config.yaml')
+        with open(cfgfile, 'w') as f:
+            f.write(
+                f'device_id: bench\nworkdir: {workdir}\n'
+                f'main.db:\n  engine: sqlite:///{workdir}/main.db\n'
+                f'redis:\n  port: {ctx.redis_port}\n'
+            )
+
+        redis_proc = subprocess.Popen(
+            ['redis-server', '--port', str(ctx.redis_port), '--save', ''],
+            stdout=subprocess.DEVNULL,
+        )
+
+        try:
+            Config.init(cfgfile)
+            get_context().bus = Bus()
+            get_context().plugins['bench'] = BenchPlugin()
+            wait_until(
+                lambda: bool(Redis(port=ctx.redis_port).ping()), 10, 'redis-server'
+            )
+
+            for name in names:
+                print(f'Running {name}...', file=sys.stderr)
+                results[name] = benchmarks[name](ctx)
+        finally:
+            if ctx.app:
+                ctx.app.stop()
+            redis_proc.terminate()
+            redis_proc.wait()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--only', nargs='+', choices=list(benchmarks))
+    parser.add_argument(
+        '--scale',
+        type=float,
+        default=1,
+        help='Multiplier for the number of iterations of each benchmark',
+    )
+    parser.add_argument('--baseline', default=default_baseline_file)
+    parser.add_argument(
+        '--save', action='store_true', help='Store the results as the new baseline'
+    )
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.2,
+        help='Maximum accepted slowdown compared to the baseline',
+    )
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.only or list(benchmarks), args.scale)
+    baseline = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get('results', {})
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(
+                {
+                    'machine': {
+                        'python': platform.python_version(),
+                        'platform': platform.platform(),
+                        'processor': platform.processor() or platform.machine(),
+                        'cpus': os.cpu_count(),
+                    },
+                    'results': {
+                        **baseline,
+                        **{name: asdict(result) for name, result in results.items()},
+                    },
+                },
+                f,
+                indent=2,
+            )
+            f.write('\n')
+        print(f'Baseline saved to {args.baseline}')
+    elif regressions:
+        raise SystemExit(f'Regressions: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
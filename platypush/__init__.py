@@ -5,24 +5,53 @@ Platypush
 .. license: MIT
 """
 
-from .app import Application, app
-from .config import Config
-from .context import Variable, get_backend, get_bus, get_plugin
-from .cron import cron
-from .event.hook import hook
-from .message.event import Event
-from .message.request import Request
-from .message.response import Response
-from .procedure import procedure
-from .runner import main
-from .utils import run
-
-# Alias for platypush.event.hook.hook,
-# see https://git.platypush.tech/platypush/platypush/issues/399
-when = hook
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .app import Application, app
+    from .config import Config
+    from .context import Variable, get_backend, get_bus, get_plugin
+    from .cron import cron
+    from .event.hook import hook
+    from .message.event import Event
+    from .message.request import Request
+    from .message.response import Response
+    from .procedure import procedure
+    from .runner import main
+    from .utils import run
+
+    when = hook
 
 __version__ = '1.3.35'
 __author__ = 'Fabio Manganiello <fabio@manganiello.tech>'
+
+# The public API is imported lazily (PEP 562), so scripts and short-lived
+# processes that only need e.g. ``Request`` or ``Event`` don't pay for the
+# import of the whole application.
+#
+# Map: attribute -> (module, name)
+_lazy_attrs = {
+    'Application': ('.app._app', 'Application'),
+    'Config': ('.config', 'Config'),
+    'Event': ('.message.event', 'Event'),
+    'Request': ('.message.request', 'Request'),
+    'Response': ('.message.response', 'Response'),
+    'Variable': ('.context', 'Variable'),
+    'app': ('.app._app', 'app'),
+    'cron': ('.cron', 'cron'),
+    'get_backend': ('.context', 'get_backend'),
+    'get_bus': ('.context', 'get_bus'),
+    'get_plugin': ('.context', 'get_plugin'),
+    'hook': ('.event.hook', 'hook'),
+    'main': ('.runner', 'main'),
+    'procedure': ('.procedure', 'procedure'),
+    'run': ('.utils', 'run'),
+    # Alias for platypush.event.hook.hook,
+    # see https://git.platypush.tech/platypush/platypush/issues/399
+    'when': ('.event.hook', 'hook'),
+}
+
 __all__ = [
     'Application',
     'Variable',
@@ -44,4 +73,22 @@ __all__ = [
 ]
 
 
+def __getattr__(name: str):
+    if name not in _lazy_attrs:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    module_name, attr = _lazy_attrs[name]
+    value = getattr(importlib.import_module(module_name, __name__), attr)
+
+    # ``app`` is rebound when the application starts, so it's not cached
+    if name != 'app':
+        globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attrs))
+
+
 # vim:sw=4:ts=4:et:
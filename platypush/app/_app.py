@@ -23,6 +23,12 @@ from platypush.message.event import Event
 from platypush.message.request import Request
 from platypush.message.response import Response
 from platypush.utils import get_enabled_plugins, get_redis_conf
+from platypush.utils.metrics import enable_metrics, get_metrics
+from platypush.utils.startup import (
+    enable_startup_profiler,
+    get_startup_profiler,
+    startup_phase,
+)
 
 log = logging.getLogger('platypush')
 
@@ -62,6 +68,7 @@ class Application:
         redis_bin: Optional[str] = None,
         ctrl_sock: Optional[str] = None,
         debug_sql: bool = False,
+        profile_startup: bool = False,
     ):
         """
         :param config_file: Configuration file. The order of precedence is:
@@ -189,7 +196,12 @@ class Application:
             that the application can use to send control messages (e.g. STOP
             and RESTART) to its parent.
         :param debug_sql: Enable SQLAlchemy debug logging (default: False).
+        :param profile_startup: Log the time spent in each phase of the
+            startup, and the time spent importing and initializing each plugin
+            and backend (default: False).
         """
+        if profile_startup:
+            enable_startup_profiler()
 
         self.pidfile = pidfile or os.environ.get('PLATYPUSH_PIDFILE')
         self.bus: Optional[Bus] = None
@@ -210,14 +222,18 @@ class Application:
         self.cachedir = self.expand_path(
             cachedir or os.environ.get('PLATYPUSH_CACHEDIR')
         )
-        Config.init(
-            self.config_file,
-            device_id=self.device_id,
-            workdir=self.workdir,
-            db=self.db_engine,
-            cachedir=self.cachedir,
-            ctrl_sock=self.expand_path(ctrl_sock),
-        )
+        with startup_phase('config'):
+            Config.init(
+                self.config_file,
+                device_id=self.device_id,
+                workdir=self.workdir,
+                db=self.db_engine,
+                cachedir=self.cachedir,
+                ctrl_sock=self.expand_path(ctrl_sock),
+            )
+
+        if (Config.get('metrics') or {}).get('enabled'):
+            enable_metrics()
 
         self.no_capture_stdout = no_capture_stdout
         self.no_capture_stderr = no_capture_stderr
@@ -243,7 +259,9 @@ class Application:
         self.cmd_stream = CommandStream(ctrl_sock)
         self.debug_sql = debug_sql
 
-        self._init_bus()
+        with startup_phase('bus'):
+            self._init_bus()
+
         self._init_logging()
 
     @staticmethod
@@ -352,6 +370,7 @@ class Application:
             redis_bin=opts.redis_bin,
             ctrl_sock=opts.ctrl_sock,
             debug_sql=opts.debug_sql,
+            profile_startup=opts.profile_startup,
         )
 
     def on_message(self):
@@ -366,6 +385,17 @@ class Application:
                 msg -- platypush.message.Message instance
             """
 
+            metrics = get_metrics()
+            if metrics:
+                if isinstance(msg, Request):
+                    msg_type = 'request'
+                elif isinstance(msg, Response):
+                    msg_type = 'response'
+                else:
+                    msg_type = 'event'
+
+                metrics.observe_message(msg_type, msg.timestamp)
+
             if isinstance(msg, Request):
                 try:
                     msg.execute(n_tries=self.n_tries)
@@ -492,25 +522,34 @@ class Application:
 
         # Start the local Redis service if required
         if self.start_redis:
-            self._start_redis()
+            with startup_phase('redis'):
+                self._start_redis()
 
-        # Initialize the backends and link them to the bus
-        self.backends = register_backends(bus=self.bus, global_scope=True)
+        with startup_phase('backends'):
+            # Initialize the backends and link them to the bus
+            self.backends = register_backends(bus=self.bus, global_scope=True)
 
-        # Start the backend threads
-        for backend in self.backends.values():
-            backend.start()
+            # Start the backend threads
+            for backend in self.backends.values():
+                backend.start()
 
         # Initialize the plugins
-        register_plugins(bus=self.bus)
+        with startup_phase('plugins'):
+            register_plugins(bus=self.bus)
 
         # Initialize the entities engine
-        self.entities_engine = init_entities_engine()
+        with startup_phase('entities engine'):
+            self.entities_engine = init_entities_engine()
 
         # Start the cron scheduler
-        if Config.get_cronjobs():
-            self.cron_scheduler = CronScheduler(jobs=Config.get_cronjobs())
-            self.cron_scheduler.start()
+        with startup_phase('cron scheduler'):
+            if Config.get_cronjobs():
+                self.cron_scheduler = CronScheduler(jobs=Config.get_cronjobs())
+                self.cron_scheduler.start()
+
+        profiler = get_startup_profiler()
+        if profiler:
+            log.info('Startup profile:\n%s', profiler.report())
 
         if not (self.bus):
             raise AssertionError('The bus is not running')
@@ -11,6 +11,7 @@ from multiprocessing import Process
 from time import time
 from typing import Mapping, Optional, Union
 
+from sqlalchemy.orm import configure_mappers
 from tornado.httpserver import HTTPServer
 from tornado.netutil import bind_sockets, bind_unix_socket
 from tornado.process import cpu_count, fork_processes
@@ -19,7 +20,11 @@ from tornado.web import Application, FallbackHandler
 
 from platypush.backend import Backend
 from platypush.backend.http.app import application
-from platypush.backend.http.app.utils import get_streaming_routes, get_ws_routes
+from platypush.backend.http.app.utils import (
+    get_api_routes,
+    get_streaming_routes,
+    get_ws_routes,
+)
 from platypush.backend.http.app.ws.events import WSEventProxy
 from platypush.bus.redis import RedisBus
 from platypush.config import Config
@@ -74,6 +79,22 @@ class HttpBackend(Backend):
                         }
                       }' http://host:8008/execute
 
+            * Execute multiple actions concurrently through the
+              ``/execute/batch`` endpoint. The responses are returned in the
+              same order as the requests, and each request can have its own
+              ``timeout``:
+
+                .. code-block:: shell
+
+                    curl -XPOST -H 'Content-Type: application/json' -H "Authorization: Bearer $YOUR_TOKEN" -d '
+                      {
+                        "timeout": 30,
+                        "requests": [
+                          {"type": "request", "action": "shell.exec", "args": {"cmd": "uptime"}},
+                          {"type": "request", "action": "tts.say", "args": {"text": "Hi"}, "timeout": 5}
+                        ]
+                      }' http://host:8008/execute/batch
+
             * Alternatively, for headless or containerized deployments, you can
               authenticate requests through the ``PLATYPUSH_API_TOKEN`` environment
               variable. If set, its value will be accepted as a valid token on
@@ -221,6 +242,8 @@ class HttpBackend(Backend):
         num_workers: Optional[int] = None,
         use_werkzeug_server: bool = False,
         zeroconf_enabled: bool = True,
+        hls_cache_dir: Optional[str] = None,
+        hls_cache_size: int = 2 * 1024**3,
         **kwargs,
     ):
         """
@@ -257,6 +280,12 @@ class HttpBackend(Backend):
             may want to disable it if you don't want the service to be
             advertised on the network, or to avoid name conflicts with other
             running Platypush instances (e.g. when running tests).
+        :param hls_cache_dir: Directory where the segments of the adaptive
+            (HLS) media streams are cached (default:
+            ``<cachedir>/media/hls``).
+        :param hls_cache_size: Maximum size of the HLS segments cache, in
+            bytes (default: 2 GiB). The least recently used segments are
+            evicted when the cache grows beyond this size.
         """
         super().__init__(**kwargs)
         if not (bind_address or bind_socket):
@@ -293,6 +322,8 @@ class HttpBackend(Backend):
         self.num_workers = num_workers or (cpu_count() * 2) + 1
         self.use_werkzeug_server = use_werkzeug_server
         self.zeroconf_enabled = zeroconf_enabled
+        self.hls_cache_dir = hls_cache_dir
+        self.hls_cache_size = hls_cache_size
 
     def send_message(self, *_, **__):
         self.logger.warning('Use cURL or any HTTP client to query the HTTP backend')
@@ -406,7 +437,11 @@ class HttpBackend(Backend):
             [
                 *[
                     (route.path(), route)
-                    for route in [*get_ws_routes(), *get_streaming_routes()]
+                    for route in [
+                        *get_api_routes(),
+                        *get_ws_routes(),
+                        *get_streaming_routes(),
+                    ]
                 ],
                 (r'.*', FallbackHandler, {'fallback': container}),
             ]
@@ -541,6 +576,13 @@ class HttpBackend(Backend):
         # Backend threads carry a contextvars.Context which isn't picklable.
         # Force fork for this process on POSIX to avoid the pickle requirement.
         ctx = multiprocessing.get_context('fork')
+
+        # Configure the pending ORM mappers before forking. Otherwise the
+        # child may inherit SQLAlchemy's configure mutex while it's held by
+        # another thread (e.g. the entities engine), and it would deadlock on
+        # its first database query.
+        configure_mappers()
+
         self._server_proc = ctx.Process(target=self._web_server_proc)
         self._server_proc.start()
         self._server_proc.join()
@@ -0,0 +1,3 @@
+from ._base import ApiRoute, logger
+
+__all__ = ['ApiRoute', 'logger']
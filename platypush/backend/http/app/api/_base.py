@@ -0,0 +1,91 @@
+import json
+from abc import ABC, abstractmethod
+from http.client import responses
+from logging import getLogger
+from typing import Optional
+
+from tornado.ioloop import IOLoop
+from tornado.web import HTTPError, RequestHandler
+
+from platypush.backend.http.app.utils.auth import UserAuthStatus, get_auth_status
+
+logger = getLogger(__name__)
+
+
+class ApiRoute(RequestHandler, ABC):
+    """
+    Base class for native Tornado API routes.
+
+    Unlike the Flask routes, which are served through a WSGI container on the
+    Tornado event loop, these routes are coroutines and they don't block the
+    loop while waiting for I/O.
+    """
+
+    async def prepare(self):
+        """
+        Performs user authentication if ``auth_required`` returns True. The
+        authentication is checked on a worker thread, since it may query the
+        database.
+        """
+        if not self.auth_required:
+            return
+
+        auth_status = await IOLoop.current().run_in_executor(
+            None, get_auth_status, self.request
+        )
+
+        if auth_status != UserAuthStatus.OK:
+            self.set_status(auth_status.value.code)
+            self.finish(auth_status.to_dict())
+
+    def write_error(self, status_code: int, **kwargs):
+        """
+        Make sure that errors are always returned in JSON format.
+        """
+        error: Optional[str] = None
+        exc_info = kwargs.get('exc_info')
+        if exc_info and isinstance(exc_info[1], HTTPError):
+            error = exc_info[1].log_message
+
+        self.set_header('Content-Type', 'application/json')
+        self.finish(
+            json.dumps(
+                {'status': status_code, 'error': error or responses.get(status_code)}
+            )
+        )
+
+    def get_json(self):
+        """
+        :return: The JSON payload of the request.
+        :raise HTTPError: With status 400 if the payload is not valid JSON.
+        """
+        try:
+            return json.loads(self.request.body.decode('utf-8'))
+        except Exception as e:
+            logger.error(
+                'Unable to parse JSON from request %s: %s', self.request.body, e
+            )
+            raise HTTPError(400, str(e)) from e
+
+    def write_json(self, data: str):
+        self.set_header('Content-Type', 'application/json')
+        self.finish(data)
+
+    @classmethod
+    @abstractmethod
+    def path(cls) -> str:
+        """
+        Path/URL pattern for this route.
+        """
+        raise NotImplementedError()
+
+    @property
+    def auth_required(self) -> bool:
+        """
+        If set to True (default) then this route will require user
+        authentication and return 401 if authentication fails.
+        """
+        return True
+
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,72 @@
+from tornado.web import HTTPError
+
+from platypush.backend.http.app.utils.bus import (
+    parse_batch,
+    send_message_async,
+    send_messages_async,
+)
+
+from . import ApiRoute, logger
+
+
+class ExecuteRoute(ApiRoute):
+    """
+    Native asyncio version of the ``/execute`` endpoint.
+    """
+
+    @classmethod
+    def path(cls) -> str:
+        return '/execute'
+
+    async def post(self):
+        msg = self.get_json()
+        logger.debug(
+            'Received message on the HTTP backend from %s: %s',
+            self.request.remote_ip,
+            msg,
+        )
+
+        try:
+            response = await send_message_async(msg)
+        except Exception as e:
+            logger.error('Error while running HTTP action: %s. Request: %s', e, msg)
+            raise HTTPError(500, str(e)) from e
+
+        self.write_json(str(response or {}))
+
+
+class ExecuteBatchRoute(ApiRoute):
+    """
+    Runs a batch of requests concurrently, and returns their responses in the
+    same order. The payload is either a list of requests or an object in the
+    format:
+
+        .. code-block:: json
+
+            {
+                "timeout": 30,
+                "requests": [
+                    {"type": "request", "action": "shell.exec", "args": {"cmd": "uptime"}},
+                    {"type": "request", "action": "light.hue.on", "timeout": 5}
+                ]
+            }
+
+    ``timeout`` is optional at both the batch and the request level. Invalid
+    requests and requests that time out get a response with an error.
+    """
+
+    @classmethod
+    def path(cls) -> str:
+        return '/execute/batch'
+
+    async def post(self):
+        try:
+            msgs, timeout = parse_batch(self.get_json())
+        except AssertionError as e:
+            raise HTTPError(400, str(e)) from e
+
+        responses = await send_messages_async(msgs, timeout=timeout)
+        self.write_json('[' + ','.join(str(rs) for rs in responses) + ']')
+
+
+# vim:sw=4:ts=4:et:
@@ -4,7 +4,13 @@ from flask import Blueprint, abort, request
 from flask.wrappers import Response
 
 from platypush.backend.http.app import template_folder
-from platypush.backend.http.app.utils import authenticate, logger, send_message
+from platypush.backend.http.app.utils import (
+    authenticate,
+    logger,
+    parse_batch,
+    send_message,
+    send_messages,
+)
 
 execute = Blueprint('execute', __name__, template_folder=template_folder)
 
@@ -36,4 +42,25 @@ def execute_route():
         abort(500, str(e))
 
 
+@execute.route('/execute/batch', methods=['POST'])
+@authenticate(json=True)
+def execute_batch_route():
+    """
+    Endpoint to execute a batch of commands concurrently. See
+    :class:`platypush.backend.http.app.api.execute.ExecuteBatchRoute` for the
+    format of the payload.
+    """
+    try:
+        msgs, timeout = parse_batch(json.loads(request.data.decode('utf-8')))
+    except Exception as e:
+        logger().error('Invalid batch request %s: %s', request.data, e)
+        abort(400, str(e))
+
+    responses = send_messages(msgs, timeout=timeout)
+    return Response(
+        '[' + ','.join(str(rs) for rs in responses) + ']',
+        mimetype='application/json',
+    )
+
+
 # vim:sw=4:ts=4:et:
@@ -0,0 +1,39 @@
+from flask import Blueprint, abort
+from flask.wrappers import Response
+
+from platypush.backend.http.app import template_folder
+from platypush.backend.http.app.utils import authenticate, send_message
+from platypush.utils.metrics import to_prometheus
+
+metrics = Blueprint('metrics', __name__, template_folder=template_folder)
+
+# Declare routes list
+__routes__ = [
+    metrics,
+]
+
+
+@metrics.route('/metrics', methods=['GET'])
+@authenticate(json=True)
+def metrics_route():
+    """
+    Endpoint that exposes the metrics collected by the application (see
+    :meth:`platypush.plugins.application.ApplicationPlugin.metrics`) in the
+    Prometheus text format.
+    """
+    response = send_message(
+        {'type': 'request', 'action': 'application.metrics'}, timeout=10
+    )
+
+    if response is None:
+        abort(504, 'Timeout while waiting for the metrics')
+    if response.errors:
+        abort(503, response.errors[0])
+
+    return Response(
+        to_prometheus(response.output),
+        mimetype='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+# vim:sw=4:ts=4:et:
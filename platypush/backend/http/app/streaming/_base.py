@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from http.client import responses
 import json
 from logging import getLogger
-from typing import Optional
+from typing import IO, Optional, Tuple
 
+from tornado.ioloop import IOLoop
+from tornado.iostream import StreamClosedError
 from tornado.web import RequestHandler, stream_request_body
 
 from platypush.backend.http.app.utils import logger
@@ -11,6 +14,11 @@ from platypush.backend.http.app.utils.auth import UserAuthStatus, get_auth_statu
 
 from ..mixins import PubSubMixin
 
+# Thread pool used to read the streamed files without blocking the event loop.
+# Its threads are only started on the first read, so the pool can be safely
+# created before the web server workers are forked.
+_file_io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='http-file-io')
+
 
 @stream_request_body
 class StreamingRoute(RequestHandler, PubSubMixin, ABC):
@@ -111,6 +119,82 @@ class StreamingRoute(RequestHandler, PubSubMixin, ABC):
             if redis_queue:
                 self.unsubscribe(redis_queue)
 
+    @staticmethod
+    def parse_range(range_hdr: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+        """
+        Parse a single-range ``Range`` header.
+
+        :param range_hdr: Value of the header.
+        :param size: Size of the resource.
+        :return: The first and last byte of the range (both inclusive), or
+            None if no range is requested.
+        :raise ValueError: If the range is invalid or not satisfiable.
+        """
+        if not range_hdr:
+            return None
+
+        unit, _, byte_range = range_hdr.partition('=')
+        if unit.strip() != 'bytes' or ',' in byte_range:
+            raise ValueError(f'Unsupported range: {range_hdr}')
+
+        start, _, end = byte_range.strip().partition('-')
+        if not start:
+            # Suffix range: the last N bytes
+            length = int(end)
+            if length <= 0:
+                raise ValueError(f'Invalid range: {range_hdr}')
+            return max(0, size - length), size - 1
+
+        first, last = int(start), int(end) if end else size - 1
+        last = min(last, size - 1)
+        if first > last:
+            raise ValueError(f'Range not satisfiable: {range_hdr}')
+
+        return first, last
+
+    async def stream_file(
+        self, f: IO[bytes], start: int, end: int, chunk_size: int = 65536
+    ) -> bool:
+        """
+        Stream a range of a file to the client.
+
+        The file is read on a worker thread, and each chunk is only read once
+        the previous one has been written to the socket, so slow clients
+        don't make the whole file pile up in memory and the event loop is
+        never blocked on disk I/O.
+
+        :param f: The file to stream, opened in binary mode.
+        :param start: First byte to stream.
+        :param end: Last byte to stream (inclusive).
+        :param chunk_size: Size of the chunks read from the file.
+        :return: False if the client closed the connection before the end.
+        """
+        loop = IOLoop.current()
+        await loop.run_in_executor(_file_io_executor, f.seek, start)
+        remaining = end - start + 1
+
+        while remaining > 0:
+            chunk = await loop.run_in_executor(
+                _file_io_executor, f.read, min(chunk_size, remaining)
+            )
+            if not chunk:
+                break
+
+            remaining -= len(chunk)
+            self.write(chunk)
+
+            try:
+                await self.flush()
+            except StreamClosedError:
+                self.logger.debug(
+                    'Client %s disconnected from %s',
+                    self.request.remote_ip,
+                    self.request.path,
+                )
+                return False
+
+        return True
+
     def _should_stop(self):
         """
         Utility method used by :meth:`._forward_stream` to automatically
@@ -118,20 +118,36 @@ class CameraRoute(StreamingRoute):
 
         stream_class = StreamWriter.get_class_by_name(self._extension)
         camera = self._get_camera(plugin)
-        redis_queue = self._get_redis_queue(camera)
         self.set_header('Content-Type', stream_class.mimetype)
 
-        with camera.open(
-            stream=True,
-            stream_format=self._extension,
-            frames_dir=None,
-            redis_queue=redis_queue,
-            **self._get_args(self.request.arguments),
-        ) as session:
-            camera.start_camera(session)
-            if self._request_type == RequestType.PHOTO:
+        if self._request_type == RequestType.VIDEO:
+            self.forward_frames(camera)
+        else:
+            with camera.open(
+                stream=True,
+                stream_format=self._extension,
+                frames_dir=None,
+                redis_queue=self._get_redis_queue(camera),
+                **self._get_args(self.request.arguments),
+            ) as session:
+                camera.start_camera(session)
                 self.send_frame(session)
-            elif self._request_type == RequestType.VIDEO:
-                self.forward_stream(camera)
 
         self.finish()
+
+    def forward_frames(self, camera: CameraPlugin):
+        """
+        Forward the frames of a camera stream to the client. Concurrent
+        clients on the same stream share the same capture session.
+        """
+        with camera.subscribe_stream(
+            stream_format=self._extension,
+            name=self.request.remote_ip,
+            **self._get_args(self.request.arguments),
+        ) as consumer:
+            for frame in consumer:
+                if self._should_stop():
+                    break
+
+                self.write(frame)
+                self.flush()
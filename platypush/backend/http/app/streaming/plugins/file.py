@@ -17,7 +17,7 @@ class FileRoute(StreamingRoute):
     Generic route to read the content of a file on the server.
     """
 
-    BUFSIZE = 1024
+    BUFSIZE = 65536
     _bytes_written = 0
     _out_f: Optional[IO[bytes]] = None
 
@@ -48,17 +48,11 @@ class FileRoute(StreamingRoute):
 
     @property
     def range(self) -> Tuple[Optional[int], Optional[int]]:
-        range_hdr = self.request.headers.get('Range')
-        if not range_hdr:
-            return None, None
-
-        start, end = range_hdr.split('=')[-1].split('-')
-        start = int(start) if start else 0
-        end = int(end) if end else self.file_size - 1
-        return start, end
+        byte_range = self.parse_range(self.request.headers.get('Range'), self.file_size)
+        return byte_range or (None, None)
 
     def set_headers(self):
-        self.set_header('Content-Length', str(os.path.getsize(self.file_path)))
+        start, end = self.range
         self.set_header(
             'Content-Type', get_mime_type(self.file_path) or 'application/octet-stream'
         )
@@ -76,13 +70,15 @@ class FileRoute(StreamingRoute):
                 f'attachment; filename="{os.path.basename(self.file_path)}"',
             )
 
-        if self.range[0] is not None:
-            start, end = self.range
+        if start is not None and end is not None:
+            self.set_header('Content-Length', str(end - start + 1))
             self.set_header(
                 'Content-Range',
                 f'bytes {start}-{end}/{self.file_size}',
             )
             self.set_status(206)
+        else:
+            self.set_header('Content-Length', str(self.file_size))
 
     @contextmanager
     def _serve(self):
@@ -105,6 +101,11 @@ class FileRoute(StreamingRoute):
             self.write_error(403, 'Permission denied')
             yield
             return
+        except ValueError as e:
+            self.set_header('Content-Range', f'bytes */{self.file_size}')
+            self.write_error(416, str(e))
+            yield
+            return
         except Exception as e:
             self.write_error(500, str(e))
             yield
@@ -184,16 +185,16 @@ class FileRoute(StreamingRoute):
 
         self.flush()
 
-    def get(self) -> None:
+    async def get(self) -> None:
         with self._serve() as f:
             if f:
-                while True:
-                    chunk = f.read(self.BUFSIZE)
-                    if not chunk:
-                        break
-
-                    self.write(chunk)
-                    self.flush()
+                start, end = self.range
+                await self.stream_file(
+                    f,
+                    start or 0,
+                    self.file_size - 1 if end is None else end,
+                    chunk_size=self.BUFSIZE,
+                )
 
     def head(self) -> None:
         with self._serve():
@@ -1,5 +1,6 @@
+from ._hls_stream import MediaHlsRoute
 from ._stream import MediaStreamRoute
 from ._subtitles import MediaSubtitlesRoute
 
 
-__all__ = ["MediaStreamRoute", "MediaSubtitlesRoute"]
+__all__ = ["MediaHlsRoute", "MediaStreamRoute", "MediaSubtitlesRoute"]
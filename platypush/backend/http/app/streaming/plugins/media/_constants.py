@@ -2,16 +2,11 @@ from typing import Dict
 
 from platypush.backend.http.media.handlers import MediaHandler
 
-
 # Size for the bytes chunk sent over the media streaming infra
-STREAMING_CHUNK_SIZE = 4096
-
-# Maximum range size to be sent through the media streamer if Range header
-# is not set
-STREAMING_BLOCK_SIZE = 3145728
+STREAMING_CHUNK_SIZE = 65536
 
-# Name of the Redis variable used to store the media map across several
-# Web processes
-MEDIA_MAP_VAR = 'platypush__stream_media_map'
+# Name of the Redis hash used to store the media map across several Web
+# processes, indexed by media ID
+MEDIA_MAP_VAR = 'platypush__stream_media'
 
 MediaMap = Dict[str, MediaHandler]
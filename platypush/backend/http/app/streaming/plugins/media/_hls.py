@@ -0,0 +1,312 @@
+import asyncio
+import json
+import math
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from platypush.config import Config
+
+# Duration of the HLS segments, in seconds
+HLS_SEGMENT_DURATION = 6.0
+
+# Default maximum size of the on-disk HLS segments cache (2 GiB)
+HLS_DEFAULT_CACHE_SIZE = 2 * 1024**3
+
+# Maximum number of segments transcoded in parallel by each web server process
+HLS_MAX_TRANSCODING_JOBS = 2
+
+# Maximum number of probed media files kept in memory
+HLS_MAX_PROBED_MEDIA = 256
+
+
+@dataclass(frozen=True)
+class HlsProfile:
+    """
+    HLS rendition profile.
+    """
+
+    name: str
+    audio_bitrate: int
+    """Audio bitrate, in kbps."""
+    video_bitrate: int = 0
+    """Video bitrate, in kbps (0 for audio-only renditions)."""
+    height: int = 0
+    """Maximum height of the video (0 for audio-only renditions)."""
+
+    @property
+    def bandwidth(self) -> int:
+        """
+        Peak bandwidth advertised in the master playlist, in bits per second.
+        """
+        return int((self.video_bitrate * 1.5 + self.audio_bitrate) * 1000)
+
+    @property
+    def codecs(self) -> str:
+        return 'avc1.4d401f,mp4a.40.2' if self.video_bitrate else 'mp4a.40.2'
+
+
+video_profiles = (
+    HlsProfile('360p', height=360, video_bitrate=800, audio_bitrate=96),
+    HlsProfile('720p', height=720, video_bitrate=2800, audio_bitrate=128),
+)
+
+audio_profiles = (HlsProfile('audio', audio_bitrate=128),)
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    """
+    Properties of a media file relevant for the HLS segmenting.
+    """
+
+    duration: float
+    width: int = 0
+    height: int = 0
+
+    @property
+    def has_video(self) -> bool:
+        return self.width > 0 and self.height > 0
+
+    def get_profiles(self) -> List[HlsProfile]:
+        """
+        :return: The profiles suitable for the media. Video profiles with a
+            higher resolution than the source are skipped, except the
+            smallest one.
+        """
+        if not self.has_video:
+            return list(audio_profiles)
+
+        return [
+            profile
+            for i, profile in enumerate(video_profiles)
+            if i == 0 or profile.height <= self.height
+        ]
+
+    def get_resolution(self, profile: HlsProfile) -> Tuple[int, int]:
+        """
+        :return: The resolution of the video transcoded with the given
+            profile, which keeps the aspect ratio of the source.
+        """
+        height = min(profile.height, self.height)
+        width = int(round(self.width * height / self.height / 2)) * 2
+        return width, height
+
+    @property
+    def segments(self) -> int:
+        return max(1, math.ceil(self.duration / HLS_SEGMENT_DURATION))
+
+
+def get_ffmpeg_cmds() -> Tuple[str, str]:
+    """
+    :return: The ffmpeg and ffprobe executables, as configured on the
+        ``ffmpeg`` plugin.
+    """
+    conf = Config.get('ffmpeg') or {}
+    return conf.get('ffmpeg_cmd', 'ffmpeg'), conf.get('ffprobe_cmd', 'ffprobe')
+
+
+async def _run(*args: str) -> bytes:
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    try:
+        out, err = await proc.communicate()
+    except asyncio.CancelledError:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+
+    if proc.returncode != 0:
+        raise RuntimeError(
+            f'{os.path.basename(args[0])} exited with code {proc.returncode}: '
+            + err.decode(errors='replace').strip()
+        )
+
+    return out
+
+
+# LRU of the probed media, by (path, mtime)
+_media_info: 'OrderedDict[Tuple[str, int], MediaInfo]' = OrderedDict()
+
+
+async def probe_media(path: str) -> MediaInfo:
+    """
+    Probe the duration and the video resolution of a media file.
+    """
+    key = (path, os.stat(path).st_mtime_ns)
+    info = _media_info.get(key)
+    if info:
+        _media_info.move_to_end(key)
+        return info
+
+    _, ffprobe = get_ffmpeg_cmds()
+    out = await _run(
+        ffprobe,
+        '-v',
+        'error',
+        '-show_entries',
+        'format=duration:stream=codec_type,width,height',
+        '-of',
+        'json',
+        path,
+    )
+
+    data = json.loads(out)
+    video = next(
+        (
+            stream
+            for stream in data.get('streams', [])
+            if stream.get('codec_type') == 'video' and stream.get('height')
+        ),
+        {},
+    )
+
+    info = MediaInfo(
+        duration=float(data.get('format', {}).get('duration') or 0),
+        width=int(video.get('width') or 0),
+        height=int(video.get('height') or 0),
+    )
+
+    if info.duration <= 0:
+        raise NotImplementedError(f'Could not detect the duration of {path}')
+
+    _media_info[key] = info
+    while len(_media_info) > HLS_MAX_PROBED_MEDIA:
+        _media_info.popitem(last=False)
+
+    return info
+
+
+def build_master_playlist(info: MediaInfo) -> str:
+    """
+    :return: The HLS master playlist of a media, which lists its renditions.
+    """
+    lines = ['#EXTM3U', '#EXT-X-VERSION:3']
+    for profile in info.get_profiles():
+        attrs = f'BANDWIDTH={profile.bandwidth},CODECS="{profile.codecs}"'
+        if profile.video_bitrate:
+            attrs += ',RESOLUTION={}x{}'.format(*info.get_resolution(profile))
+
+        lines += [f'#EXT-X-STREAM-INF:{attrs}', f'{profile.name}/index.m3u8']
+
+    return '\n'.join(lines) + '\n'
+
+
+def build_media_playlist(info: MediaInfo) -> str:
+    """
+    :return: The HLS playlist of a rendition, which lists its segments.
+    """
+    lines = [
+        '#EXTM3U',
+        '#EXT-X-VERSION:3',
+        '#EXT-X-PLAYLIST-TYPE:VOD',
+        f'#EXT-X-TARGETDURATION:{math.ceil(HLS_SEGMENT_DURATION)}',
+        '#EXT-X-MEDIA-SEQUENCE:0',
+    ]
+
+    for i in range(info.segments):
+        duration = min(HLS_SEGMENT_DURATION, info.duration - i * HLS_SEGMENT_DURATION)
+        lines += [f'#EXTINF:{duration:.3f},', f'{i}.ts']
+
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines) + '\n'
+
+
+def get_segment_args(
+    path: str, info: MediaInfo, profile: HlsProfile, index: int, output: str
+) -> List[str]:
+    """
+    :return: The ffmpeg arguments to transcode a segment of a media.
+    """
+    start = index * HLS_SEGMENT_DURATION
+    ffmpeg, _ = get_ffmpeg_cmds()
+    args = [
+        ffmpeg,
+        '-hide_banner',
+        '-loglevel',
+        'error',
+        '-nostdin',
+        '-y',
+        # Seeking before the input is fast, and it's still frame-accurate
+        # since the stream is re-encoded
+        '-ss',
+        f'{start:.3f}',
+        '-i',
+        path,
+        '-t',
+        f'{HLS_SEGMENT_DURATION:.3f}',
+    ]
+
+    if profile.video_bitrate:
+        width, height = info.get_resolution(profile)
+        args += [
+            '-map',
+            '0:v:0',
+            '-map',
+            '0:a:0?',
+            '-c:v',
+            'libx264',
+            '-preset',
+            'veryfast',
+            '-profile:v',
+            'main',
+            '-pix_fmt',
+            'yuv420p',
+            '-vf',
+            f'scale={width}:{height}',
+            '-b:v',
+            f'{profile.video_bitrate}k',
+            '-maxrate',
+            f'{int(profile.video_bitrate * 1.5)}k',
+            '-bufsize',
+            f'{profile.video_bitrate * 2}k',
+        ]
+    else:
+        args += ['-map', '0:a:0', '-vn']
+
+    args += [
+        '-c:a',
+        'aac',
+        '-ac',
+        '2',
+        '-b:a',
+        f'{profile.audio_bitrate}k',
+        # Keep the timestamps continuous across independently encoded segments
+        '-output_ts_offset',
+        f'{start:.3f}',
+        '-muxdelay',
+        '0',
+        '-f',
+        'mpegts',
+        output,
+    ]
+
+    return args
+
+
+_transcoding_jobs: Optional[asyncio.Semaphore] = None
+
+
+async def transcode_segment(
+    path: str, info: MediaInfo, profile: HlsProfile, index: int, output: str
+):
+    """
+    Transcode a segment of a media to an MPEG-TS file.
+    """
+    global _transcoding_jobs
+
+    if _transcoding_jobs is None:
+        _transcoding_jobs = asyncio.Semaphore(HLS_MAX_TRANSCODING_JOBS)
+
+    async with _transcoding_jobs:
+        await _run(*get_segment_args(path, info, profile, index, output))
+
+
+# vim:sw=4:ts=4:et:
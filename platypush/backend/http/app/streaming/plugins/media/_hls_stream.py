@@ -0,0 +1,187 @@
+import asyncio
+import os
+import re
+from typing import Optional, Set
+
+from platypush.backend.http.app.streaming import StreamingRoute
+from platypush.backend.http.media.handlers import MediaHandler
+from platypush.config import Config
+
+from ._constants import STREAMING_CHUNK_SIZE
+from ._hls import (
+    HLS_DEFAULT_CACHE_SIZE,
+    HlsProfile,
+    MediaInfo,
+    build_master_playlist,
+    build_media_playlist,
+    probe_media,
+    transcode_segment,
+)
+from ._registry import get_media
+from ._segments import SegmentCache
+
+_rendition_regex = re.compile(r'^([a-z0-9]+)/(?:index\.m3u8|(\d+)\.ts)$')
+_segment_cache: Optional[SegmentCache] = None
+# Keep a reference to the prefetch tasks until they are done
+_prefetch_tasks: Set[asyncio.Task] = set()
+
+
+def get_hls_url(media_id: str) -> str:
+    """
+    :returns: The URL of the HLS master playlist of a media file given its ID
+    """
+    return f'/media/hls/{media_id}/master.m3u8'
+
+
+def get_segment_cache() -> SegmentCache:
+    """
+    :return: The HLS segments cache, as configured on the HTTP backend.
+    """
+    global _segment_cache
+
+    if _segment_cache is None:
+        conf = Config.get('backend.http') or {}
+        _segment_cache = SegmentCache(
+            conf.get('hls_cache_dir')
+            or os.path.join(Config.get_cachedir(), 'media', 'hls'),
+            max_size=int(conf.get('hls_cache_size') or HLS_DEFAULT_CACHE_SIZE),
+        )
+
+    return _segment_cache
+
+
+class MediaHlsRoute(StreamingRoute):
+    """
+    Route for the adaptive (HLS) streams of the registered media.
+
+    The playlists are generated from the duration of the media, and each
+    segment is only transcoded the first time that a client requests it.
+    Transcoded segments are stored in a size-bounded on-disk cache shared by
+    all the clients.
+    """
+
+    SUPPORTED_METHODS = ['GET', 'HEAD']
+
+    @classmethod
+    def path(cls) -> str:
+        return r"^/media/hls/([a-zA-Z0-9_]+)/([a-z0-9_./]+)$"
+
+    @property
+    def auth_required(self) -> bool:
+        return False
+
+    def set_default_headers(self):
+        # Cast receivers and web players fetch HLS streams through CORS
+        self.set_header('Access-Control-Allow-Origin', '*')
+
+    async def get(self, media_id: str, resource: str):
+        try:
+            await self.stream_hls(media_id, resource)
+        except Exception as e:
+            self._on_error(e)
+
+    async def head(self, media_id: str, resource: str):
+        try:
+            await self.stream_hls(media_id, resource, head=True)
+        except Exception as e:
+            self._on_error(e)
+
+    async def stream_hls(self, media_id: str, resource: str, head: bool = False):
+        """
+        Serve the master playlist, a rendition playlist or a segment of a
+        media.
+        """
+        media_hndl = get_media(media_id)
+        if not media_hndl:
+            raise FileNotFoundError(f'{media_id} is not a registered media_id')
+        if not media_hndl.path:
+            raise NotImplementedError(f'{media_id} is not a local media file')
+        if media_hndl.mime_type.startswith('image/'):
+            raise NotImplementedError(f'{media_id} is not an audio or video file')
+
+        info = await probe_media(media_hndl.path)
+        if resource == 'master.m3u8':
+            self._write_playlist(build_master_playlist(info), head=head)
+            return
+
+        m = _rendition_regex.match(resource)
+        profile = next(
+            (p for p in info.get_profiles() if m and p.name == m.group(1)), None
+        )
+        if not profile:
+            raise FileNotFoundError(f'{resource} not found for {media_id}')
+
+        if m.group(2) is None:  # type: ignore
+            self._write_playlist(build_media_playlist(info), head=head)
+            return
+
+        index = int(m.group(2))  # type: ignore
+        if index >= info.segments:
+            raise FileNotFoundError(f'{resource} not found for {media_id}')
+
+        path, size = await self._get_segment(media_hndl, info, profile, index)
+        if index + 1 < info.segments:
+            self._prefetch(media_hndl, info, profile, index + 1)
+
+        self.set_header('Content-Type', 'video/mp2t')
+        self.set_header('Content-Length', str(size))
+        self.set_header('Cache-Control', 'max-age=86400')
+        if head:
+            self.finish()
+            return
+
+        with open(path, 'rb') as f:
+            if not await self.stream_file(
+                f, 0, size - 1, chunk_size=STREAMING_CHUNK_SIZE
+            ):
+                return
+
+        self.finish()
+
+    def _write_playlist(self, playlist: str, head: bool = False):
+        data = playlist.encode()
+        self.set_header('Content-Type', 'application/vnd.apple.mpegurl')
+        self.set_header('Content-Length', str(len(data)))
+        self.finish(b'' if head else data)
+
+    @staticmethod
+    async def _get_segment(
+        media_hndl: MediaHandler, info: MediaInfo, profile: HlsProfile, index: int
+    ):
+        # The modification time of the media is part of the key, so segments
+        # of files that have changed are never served
+        version = os.stat(media_hndl.path).st_mtime_ns  # type: ignore
+        key = f'{media_hndl.media_id}/{version:x}/{profile.name}/{index}.ts'
+
+        return await get_segment_cache().get(
+            key,
+            lambda output: transcode_segment(
+                media_hndl.path, info, profile, index, output  # type: ignore
+            ),
+        )
+
+    def _prefetch(
+        self, media_hndl: MediaHandler, info: MediaInfo, profile: HlsProfile, index: int
+    ):
+        """
+        Transcode the next segment in the background, so it's likely to be
+        ready by the time the client requests it.
+        """
+
+        async def prefetch():
+            try:
+                await self._get_segment(media_hndl, info, profile, index)
+            except Exception as e:
+                self.logger.warning(
+                    'Could not prefetch segment %d of %s: %s',
+                    index,
+                    media_hndl.media_id,
+                    e,
+                )
+
+        task = asyncio.ensure_future(prefetch())
+        _prefetch_tasks.add(task)
+        task.add_done_callback(_prefetch_tasks.discard)
+
+
+# vim:sw=4:ts=4:et:
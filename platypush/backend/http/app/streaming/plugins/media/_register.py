@@ -3,7 +3,7 @@ from typing import Optional
 from platypush.backend.http.app.utils import logger, send_request
 from platypush.backend.http.media.handlers import MediaHandler
 
-from ._registry import clear_media_map, load_media_map, save_media_map
+from ._registry import clear_media_map, save_media
 
 _init = False
 
@@ -27,7 +27,6 @@ def register_media(source: str, subtitles: Optional[str] = None) -> MediaHandler
 
     media_id = MediaHandler.get_media_id(source)
     media_url = get_media_url(media_id)
-    media_map = load_media_map()
     subfile = None
 
     if subtitles:
@@ -46,7 +45,6 @@ def register_media(source: str, subtitles: Optional[str] = None) -> MediaHandler
             logger().warning('Unable to load subtitle %s: %s', subtitles, e)
 
     media_hndl = MediaHandler.build(source, url=media_url, subtitles=subfile)
-    media_map[media_id] = media_hndl
-    save_media_map(media_map)
+    save_media(media_hndl)
     logger().info('Streaming "%s" on %s', source, media_url)
     return media_hndl
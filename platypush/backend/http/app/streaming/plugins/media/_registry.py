@@ -1,5 +1,6 @@
 import json
-import multiprocessing
+from threading import RLock
+from typing import Dict, Optional, Tuple
 
 from platypush.backend.http.app.utils import logger
 from platypush.backend.http.media.handlers import MediaHandler
@@ -8,47 +9,106 @@ from platypush.utils import get_redis
 
 from ._constants import MEDIA_MAP_VAR, MediaMap
 
-media_map_lock = multiprocessing.RLock()
+# Handlers already parsed by this process, by media ID, together with the
+# serialized handler they were parsed from. Building a handler may require
+# some I/O (e.g. to detect the MIME type of a file), so handlers are only
+# rebuilt when their stored version changes.
+_parsed_media: Dict[str, Tuple[bytes, MediaHandler]] = {}
+_parsed_media_lock = RLock()
+
+
+def _parse_media(media_id: str, data: bytes) -> Optional[MediaHandler]:
+    with _parsed_media_lock:
+        cached = _parsed_media.get(media_id)
+        if cached and cached[0] == data:
+            return cached[1]
+
+    try:
+        media_hndl = MediaHandler.build(**json.loads(data.decode()))
+    except Exception as e:
+        logger().debug('Could not load media %s: %s', media_id, e)
+        return None
+
+    with _parsed_media_lock:
+        _parsed_media[media_id] = (data, media_hndl)
+
+    return media_hndl
+
+
+def _forget_media(*media_ids: str):
+    with _parsed_media_lock:
+        for media_id in media_ids:
+            _parsed_media.pop(media_id, None)
+
+
+def get_media(media_id: str) -> Optional[MediaHandler]:
+    """
+    Get a registered media handler by ID.
+    """
+    try:
+        data = get_redis().hget(MEDIA_MAP_VAR, media_id)
+    except Exception as e:
+        logger().warning('Could not load media %s: %s', media_id, e)
+        return None
+
+    if not data:
+        _forget_media(media_id)
+        return None
+
+    return _parse_media(media_id, data)  # type: ignore
 
 
 def load_media_map() -> MediaMap:
     """
     Load the media map from the server.
     """
-    with media_map_lock:
-        redis = get_redis()
-        try:
-            media_map = json.loads(
-                ((redis.mget(MEDIA_MAP_VAR) or [None])[0] or b'{}').decode()  # type: ignore
-            )
-        except Exception as e:
-            logger().warning('Could not load media map: %s', e)
-            return {}
+    try:
+        media_map = get_redis().hgetall(MEDIA_MAP_VAR)
+    except Exception as e:
+        logger().warning('Could not load media map: %s', e)
+        return {}
 
     parsed_map = {}
-    for media_id, media_info in media_map.items():
-        try:
-            parsed_map[media_id] = MediaHandler.build(**media_info)
-        except Exception as e:
-            logger().debug('Could not load media %s: %s', media_id, e)
-            continue
+    for media_id, data in media_map.items():  # type: ignore
+        media_id = media_id.decode()
+        media_hndl = _parse_media(media_id, data)
+        if media_hndl:
+            parsed_map[media_id] = media_hndl
 
     return parsed_map
 
 
-def save_media_map(new_map: MediaMap):
+def save_media(media_hndl: MediaHandler):
     """
-    Updates the stored media map on the server.
+    Add or update a media handler on the server.
     """
-    with media_map_lock:
-        redis = get_redis()
-        redis.mset({MEDIA_MAP_VAR: json.dumps(new_map, cls=Message.Encoder)})
+    get_redis().hset(
+        MEDIA_MAP_VAR,
+        media_hndl.media_id,
+        json.dumps(media_hndl, cls=Message.Encoder),
+    )
+
+
+def remove_media(media_id: str) -> Optional[MediaHandler]:
+    """
+    Remove a media handler from the server.
+
+    :return: The removed handler, or None if the media ID wasn't registered.
+    """
+    with get_redis().pipeline() as pipe:
+        pipe.hget(MEDIA_MAP_VAR, media_id)
+        pipe.hdel(MEDIA_MAP_VAR, media_id)
+        data, removed = pipe.execute()
+
+    media_hndl = _parse_media(media_id, data) if removed and data else None
+    _forget_media(media_id)
+    return media_hndl
 
 
 def clear_media_map():
     """
     Clears the media map from the server.
     """
-    with media_map_lock:
-        redis = get_redis()
-        redis.delete(MEDIA_MAP_VAR)
+    get_redis().delete(MEDIA_MAP_VAR)
+    with _parsed_media_lock:
+        _parsed_media.clear()
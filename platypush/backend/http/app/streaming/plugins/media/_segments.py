@@ -0,0 +1,197 @@
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tornado.ioloop import IOLoop
+
+from platypush.backend.http.app.utils import logger
+
+from platypush.backend.http.app.streaming._base import _file_io_executor
+
+
+class SegmentCache:
+    """
+    Size-bounded on-disk LRU cache for the generated media segments.
+
+    Segments are stored as ``<directory>/<key>``, and the modification time of
+    each file is bumped whenever it is served, so the least recently used
+    segments are the first ones to be evicted once the total size of the cache
+    exceeds ``max_size``.
+
+    The cache directory may be shared by several web server processes: files
+    are created atomically, and each process keeps an estimate of the total
+    size that is refreshed from the disk whenever an eviction is due.
+    """
+
+    # Fraction of ``max_size`` that the cache is brought back to on eviction,
+    # so evictions don't run on every new segment once the cache is full
+    low_watermark = 0.9
+
+    def __init__(self, directory: str, max_size: int):
+        """
+        :param directory: Directory where the segments are stored.
+        :param max_size: Maximum total size of the cached segments, in bytes.
+        """
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_size = max_size
+        self._size: Optional[int] = None
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._evicting = False
+
+    def path(self, key: str) -> str:
+        """
+        :return: The path of the file associated with a cache key.
+        """
+        return os.path.join(self.directory, key)
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        :return: The path of the cached segment, or None if it's not cached.
+        """
+        path = self.path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    async def get(
+        self, key: str, create: Callable[[str], Awaitable[None]]
+    ) -> Tuple[str, int]:
+        """
+        Get a segment from the cache, creating it if it's not cached yet.
+
+        Concurrent requests for the same missing segment share a single call
+        to ``create``.
+
+        :param key: Cache key of the segment.
+        :param create: Coroutine function that writes the segment to the path
+            that it receives.
+        :return: The path and the size of the segment.
+        """
+        loop = IOLoop.current()
+        path = await loop.run_in_executor(_file_io_executor, self.lookup, key)
+        if path:
+            return path, os.path.getsize(path)
+
+        pending = self._pending.get(key)
+        if pending:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+
+        try:
+            ret = await self._create(key, create)
+            future.set_result(ret)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved if nobody else is waiting for it
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+
+        return ret
+
+    async def _create(
+        self, key: str, create: Callable[[str], Awaitable[None]]
+    ) -> Tuple[str, int]:
+        path = self.path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        try:
+            await create(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        await self._add_size(size)
+        return path, size
+
+    async def _add_size(self, size: int):
+        loop = IOLoop.current()
+        if self._size is None:
+            self._size = sum(
+                s for _, s, _ in await loop.run_in_executor(None, self._scan)
+            )
+        else:
+            self._size += size
+
+        if self._size > self.max_size and not self._evicting:
+            self._evicting = True
+            try:
+                self._size = await loop.run_in_executor(None, self.evict)
+            finally:
+                self._evicting = False
+
+    def _scan(self) -> List[Tuple[float, int, str]]:
+        """
+        :return: ``(mtime, size, path)`` of the cached segments.
+        """
+        files = []
+        for root, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+                files.append((st.st_mtime, st.st_size, path))
+
+        return files
+
+    def evict(self) -> int:
+        """
+        Remove the least recently used segments until the cache is below its
+        low watermark.
+
+        :return: The new total size of the cache.
+        """
+        files = sorted(self._scan())
+        size = sum(s for _, s, _ in files)
+        target_size = self.max_size * self.low_watermark
+        removed = 0
+
+        for _, file_size, path in files:
+            if size <= target_size:
+                break
+
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+            size -= file_size
+            removed += 1
+
+        # Clean up the directories that have been emptied
+        for root, _, _ in os.walk(self.directory, topdown=False):
+            if root != self.directory:
+                try:
+                    os.rmdir(root)
+                except OSError:
+                    pass
+
+        logger().info(
+            'Evicted %d segments from %s, current size: %d bytes',
+            removed,
+            self.directory,
+            size,
+        )
+
+        return size
+
+
+# vim:sw=4:ts=4:et:
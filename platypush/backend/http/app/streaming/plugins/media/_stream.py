@@ -1,13 +1,15 @@
 import json
+import os
 from typing import Optional
 
 from tornado.web import stream_request_body
 
 from platypush.backend.http.app.streaming import StreamingRoute
 
-from ._constants import STREAMING_BLOCK_SIZE, STREAMING_CHUNK_SIZE
+from ._constants import STREAMING_CHUNK_SIZE
+from ._hls_stream import get_hls_url
 from ._register import register_media
-from ._registry import load_media_map
+from ._registry import get_media, load_media_map
 from ._unregister import unregister_media
 
 
@@ -31,7 +33,7 @@ class MediaStreamRoute(StreamingRoute):
     def auth_required(self) -> bool:
         return False
 
-    def get(self, media_id: Optional[str] = None):
+    async def get(self, media_id: Optional[str] = None):
         """
         Streams a media resource by ID.
         """
@@ -46,11 +48,11 @@ class MediaStreamRoute(StreamingRoute):
         media_id = '.'.join(media_id.split('.')[:-1])
 
         try:
-            self.stream_media(media_id)
+            await self.stream_media(media_id)
         except Exception as e:
             self._on_error(e)
 
-    def head(self, media_id: Optional[str] = None):
+    async def head(self, media_id: Optional[str] = None):
         """
         Streams a media resource by ID.
         """
@@ -63,7 +65,7 @@ class MediaStreamRoute(StreamingRoute):
         media_id = '.'.join(media_id.split('.')[:-1])
 
         try:
-            self.stream_media(media_id, head=True)
+            await self.stream_media(media_id, head=True)
         except Exception as e:
             self._on_error(e)
 
@@ -80,8 +82,13 @@ class MediaStreamRoute(StreamingRoute):
         """
         Removes the given media_id from the map of streaming media.
         """
-        media_info = unregister_media(media_id)
-        self.write(json.dumps(media_info))
+        try:
+            media_info = unregister_media(media_id)
+        except Exception as e:
+            self._on_error(e)
+            return
+
+        self.write(json.dumps(media_info.to_json()))
 
     def data_received(self, chunk: bytes):
         self._body += chunk
@@ -104,6 +111,8 @@ class MediaStreamRoute(StreamingRoute):
         ret = media_hndl.to_json()
         if media_hndl.subtitles:
             ret['subtitles_url'] = f'/media/subtitles/{media_hndl.media_id}.vtt'
+        if args.get('hls'):
+            ret['hls_url'] = get_hls_url(media_hndl.media_id)
 
         self.write(json.dumps(ret))
 
@@ -114,17 +123,17 @@ class MediaStreamRoute(StreamingRoute):
         self.set_header('Content-Type', 'application/json')
         self.finish(json.dumps([dict(media) for media in load_media_map().values()]))
 
-    def stream_media(self, media_id: str, head: bool = False):
+    async def stream_media(self, media_id: str, head: bool = False):
         """
         Route to stream a media file given its ID.
         """
-        media_hndl = load_media_map().get(media_id)
+        media_hndl = get_media(media_id)
         if not media_hndl:
             raise FileNotFoundError(f'{media_id} is not a registered media_id')
+        if not media_hndl.path:
+            raise NotImplementedError(f'{media_id} is not a local media file')
 
-        range_hdr = self.request.headers.get('Range')
-        content_length = media_hndl.content_length
-
+        size = os.path.getsize(media_hndl.path)
         self.set_header('Accept-Ranges', 'bytes')
         self.set_header('Content-Type', media_hndl.mime_type)
 
@@ -132,42 +141,37 @@ class MediaStreamRoute(StreamingRoute):
             self.set_header(
                 'Content-Disposition',
                 'attachment'
-                + ('; filename="{media_hndl.filename}"' if media_hndl.filename else ''),
+                + (
+                    f'; filename="{media_hndl.filename}"' if media_hndl.filename else ''
+                ),
             )
 
-        if range_hdr:
-            from_bytes, to_bytes = range_hdr.replace('bytes=', '').split('-')
-            from_bytes = int(from_bytes)
-
-            if not to_bytes:
-                to_bytes = content_length - 1
-                content_length -= from_bytes
-            else:
-                to_bytes = int(to_bytes)
-                content_length = to_bytes - from_bytes
+        try:
+            byte_range = self.parse_range(self.request.headers.get('Range'), size)
+        except ValueError as e:
+            self.logger.info('Invalid range for %s: %s', media_id, e)
+            self.set_status(416)
+            self.set_header('Content-Range', f'bytes */{size}')
+            self.finish()
+            return
 
+        if byte_range:
+            from_bytes, to_bytes = byte_range
             self.set_status(206)
-            self.set_header(
-                'Content-Range',
-                f'bytes {from_bytes}-{to_bytes}/{media_hndl.content_length}',
-            )
+            self.set_header('Content-Range', f'bytes {from_bytes}-{to_bytes}/{size}')
         else:
-            from_bytes = 0
-            to_bytes = STREAMING_BLOCK_SIZE
+            from_bytes, to_bytes = 0, size - 1
 
-        self.set_header('Content-Length', str(content_length))
+        self.set_header('Content-Length', str(to_bytes - from_bytes + 1))
 
         if head:
-            self.flush()
             self.finish()
             return
 
-        for chunk in media_hndl.get_data(
-            from_bytes=from_bytes,
-            to_bytes=to_bytes,
-            chunk_size=STREAMING_CHUNK_SIZE,
-        ):
-            self.write(chunk)
-            self.flush()
+        with open(media_hndl.path, 'rb') as f:
+            if not await self.stream_file(
+                f, from_bytes, to_bytes, chunk_size=STREAMING_CHUNK_SIZE
+            ):
+                return
 
         self.finish()
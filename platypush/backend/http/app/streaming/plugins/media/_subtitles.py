@@ -5,7 +5,7 @@ from tornado.web import stream_request_body
 from platypush.backend.http.app.streaming import StreamingRoute
 from platypush.backend.http.app.utils.bus import send_request
 
-from ._registry import load_media_map
+from ._registry import get_media, save_media
 
 
 @stream_request_body
@@ -56,7 +56,7 @@ class MediaSubtitlesRoute(StreamingRoute):
         Retrieves the subtitles for the given media_id.
         """
 
-        media_hndl = load_media_map().get(media_id)
+        media_hndl = get_media(media_id)
         if not media_hndl:
             raise FileNotFoundError(f'{media_id} is not a registered media_id')
 
@@ -72,7 +72,7 @@ class MediaSubtitlesRoute(StreamingRoute):
         """
         Remove the current subtitle track from a streamed from a media file.
         """
-        media_hndl = load_media_map().get(media_id)
+        media_hndl = get_media(media_id)
         if not media_hndl:
             raise FileNotFoundError(f'{media_id} is not a registered media_id')
 
@@ -80,6 +80,7 @@ class MediaSubtitlesRoute(StreamingRoute):
             raise FileNotFoundError(f'{media_id} has no subtitles attached')
 
         media_hndl.remove_subtitles()
+        save_media(media_hndl)
         return {}
 
     def add_subtitles(self, media_id: str):
@@ -88,7 +89,7 @@ class MediaSubtitlesRoute(StreamingRoute):
         associated to a media file
         """
 
-        media_hndl = load_media_map().get(media_id)
+        media_hndl = get_media(media_id)
         if not media_hndl:
             raise FileNotFoundError(f'{media_id} is not a registered media_id')
 
@@ -135,6 +136,7 @@ class MediaSubtitlesRoute(StreamingRoute):
             subfile = (send_request(req) or {}).get('filename')
 
         media_hndl.set_subtitles(subfile)
+        save_media(media_hndl)
         return {
             'filename': subfile,
             'url': f'/media/subtitles/{media_id}.vtt',
@@ -6,7 +6,15 @@ from .auth import (
     current_user,
     get_auth_status,
 )
-from .bus import bus, send_message, send_request
+from .bus import (
+    bus,
+    parse_batch,
+    send_message,
+    send_message_async,
+    send_messages,
+    send_messages_async,
+    send_request,
+)
 from .logger import logger
 from .routes import (
     get_http_port,
@@ -15,6 +23,7 @@ from .routes import (
     get_remote_base_url,
     get_routes,
 )
+from .api import get_api_routes
 from .streaming import get_streaming_routes
 from .ws import get_ws_routes
 
@@ -25,6 +34,7 @@ __all__ = [
     'authenticate_user_pass',
     'bus',
     'current_user',
+    'get_api_routes',
     'get_auth_status',
     'get_http_port',
     'get_ip_or_hostname',
@@ -34,7 +44,11 @@ __all__ = [
     'get_streaming_routes',
     'get_ws_routes',
     'logger',
+    'parse_batch',
     'send_message',
+    'send_message_async',
+    'send_messages',
+    'send_messages_async',
     'send_request',
 ]
 
@@ -0,0 +1,37 @@
+import os
+import importlib
+import inspect
+from typing import List, Type
+
+import pkgutil
+
+from ..api import ApiRoute, logger
+
+
+def get_api_routes() -> List[Type[ApiRoute]]:
+    """
+    Scans for native Tornado API routes.
+    """
+    from platypush.backend.http import HttpBackend
+
+    base_pkg = '.'.join([HttpBackend.__module__, 'app', 'api'])
+    base_dir = os.path.join(os.path.dirname(inspect.getfile(HttpBackend)), 'app', 'api')
+    routes = []
+
+    for _, mod_name, _ in pkgutil.walk_packages([base_dir], prefix=base_pkg + '.'):
+        try:
+            module = importlib.import_module(mod_name)
+        except Exception as e:
+            logger.warning('Could not import module %s', mod_name)
+            logger.exception(e)
+            continue
+
+        for _, obj in inspect.getmembers(module):
+            if (
+                inspect.isclass(obj)
+                and not inspect.isabstract(obj)
+                and issubclass(obj, ApiRoute)
+            ):
+                routes.append(obj)
+
+    return routes
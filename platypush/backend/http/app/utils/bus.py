@@ -1,13 +1,18 @@
+import asyncio
+import time
 from threading import Lock
+from typing import Iterable, List, Optional, Tuple, Union
 
 from platypush.bus.redis import RedisBus
 from platypush.context import get_bus
 from platypush.config import Config
 from platypush.message import Message
 from platypush.message.request import Request
-from platypush.utils import get_message_response
+from platypush.message.response import Response
+from platypush.utils import get_async_redis, get_message_response
 
 from .logger import logger
+from .responses import get_response_multiplexer
 
 
 class BusWrapper:  # pylint: disable=too-few-public-methods
@@ -54,28 +59,61 @@ def bus():
     return _bus.bus
 
 
-def send_message(msg, wait_for_response=True):
+def _prepare_message(msg) -> Optional[Message]:
+    msg = Message.build(msg)
+    if msg is None:
+        return None
+
+    if isinstance(msg, Request):
+        msg.origin = 'http'
+
+    if Config.get('token'):
+        msg.token = Config.get('token')
+
+    return msg
+
+
+def send_message(msg, wait_for_response=True, timeout: float = 60):
     """
     Send a message to the bus.
 
     :param msg: The message to send.
     :param wait_for_response: If ``True``, wait for the response to be received
         before returning, otherwise return immediately.
+    :param timeout: How long to wait for the response, in seconds.
     """
-    msg = Message.build(msg)
+    msg = _prepare_message(msg)
     if msg is None:
         return None
 
-    if isinstance(msg, Request):
-        msg.origin = 'http'
+    bus().post(msg)
 
-    if Config.get('token'):
-        msg.token = Config.get('token')
+    if isinstance(msg, Request) and wait_for_response:
+        response = get_message_response(msg, timeout=timeout)
+        logger().debug('Processing response on the HTTP backend: %s', response)
 
-    bus().post(msg)
+        return response
+
+    return None
+
+
+async def send_message_async(msg, wait_for_response=True, timeout: float = 60):
+    """
+    Asyncio version of :func:`send_message`, which doesn't block the event
+    loop while waiting for the response.
+
+    The responses are collected by the :class:`ResponseMultiplexer` of the
+    event loop, so any number of requests can wait for their responses
+    without holding a Redis connection each.
+    """
+    msg = _prepare_message(msg)
+    if msg is None:
+        return None
+
+    await get_async_redis().publish(bus().redis_queue, str(msg))
 
     if isinstance(msg, Request) and wait_for_response:
-        response = get_message_response(msg)
+        response = await get_response_multiplexer().get_response(msg, timeout=timeout)
         logger().debug('Processing response on the HTTP backend: %s', response)
 
         return response
@@ -83,6 +121,139 @@ def send_message(msg, wait_for_response=True):
     return None
 
 
+def _error_response(error: str, msg_id: Optional[str] = None) -> Response:
+    return Response(
+        id=msg_id,
+        origin=Config.get('device_id'),
+        target='http',
+        errors=[error],
+    )
+
+
+max_batch_size = 100
+"""Maximum number of requests in a batch."""
+
+_BatchItem = Union[Tuple[Request, float], Response]
+
+
+def _prepare_batch(msgs: Iterable, timeout: float) -> List[_BatchItem]:
+    """
+    Build the requests of a batch.
+
+    :return: For each item, either the request and the deadline of its
+        response, or an error response if the request is invalid.
+    """
+    items: List[_BatchItem] = []
+    for msg in msgs:
+        try:
+            if not isinstance(msg, dict):
+                raise AssertionError(f'Expected a request object, got {msg!r}')
+
+            msg = dict(msg)
+            item_timeout = float(msg.pop('timeout', timeout))
+            request = _prepare_message(msg)
+            if not isinstance(request, Request):
+                raise AssertionError(f'Expected a request, got {type(request)}')
+        except Exception as e:
+            items.append(_error_response(f'Invalid request: {e}'))
+            continue
+
+        items.append((request, time.time() + item_timeout))
+
+    return items
+
+
+def parse_batch(data) -> Tuple[list, float]:
+    """
+    Parse the payload of a batch of requests, either a list of requests or an
+    object in the format ``{"requests": [...], "timeout": 30}``.
+
+    :return: The requests and the default timeout of the batch.
+    """
+    timeout = 60.0
+    if isinstance(data, dict):
+        try:
+            timeout = float(data.get('timeout', timeout))
+        except (TypeError, ValueError) as e:
+            raise AssertionError(f'Invalid timeout: {data.get("timeout")!r}') from e
+        data = data.get('requests')
+
+    if not isinstance(data, list):
+        raise AssertionError('Expected a list of requests')
+    if len(data) > max_batch_size:
+        raise AssertionError(
+            f'Too many requests in the batch ({len(data)} > {max_batch_size})'
+        )
+
+    return data, timeout
+
+
+def _batch_response(request: Request, response) -> Response:
+    if response is None:
+        return _error_response(
+            f'Timeout while waiting for the response to {request.action}', request.id
+        )
+    return response
+
+
+def send_messages(msgs: Iterable, timeout: float = 60) -> List[Response]:
+    """
+    Send a batch of requests to the bus, and wait for their responses.
+
+    All the requests are posted before waiting for the first response, so
+    they are executed concurrently, and the whole batch takes as long as its
+    slowest request.
+
+    :param msgs: The requests to send. Each request can specify its own
+        ``timeout``.
+    :param timeout: Default timeout of the requests, in seconds.
+    :return: The responses, in the same order as the requests. Invalid
+        requests and requests that time out get a response with an error.
+    """
+    items = _prepare_batch(msgs, timeout)
+    for item in items:
+        if isinstance(item, tuple):
+            bus().post(item[0])
+
+    return [
+        (
+            _batch_response(
+                item[0], get_message_response(item[0], timeout=item[1] - time.time())
+            )
+            if isinstance(item, tuple)
+            else item
+        )
+        for item in items
+    ]
+
+
+async def send_messages_async(msgs: Iterable, timeout: float = 60) -> List[Response]:
+    """
+    Asyncio version of :func:`send_messages`.
+    """
+    items = _prepare_batch(msgs, timeout)
+    requests = [item[0] for item in items if isinstance(item, tuple)]
+    if requests:
+        async with get_async_redis().pipeline(transaction=False) as pipe:
+            for request in requests:
+                pipe.publish(bus().redis_queue, str(request))
+            await pipe.execute()
+
+    mux = get_response_multiplexer()
+
+    async def get_response(item: _BatchItem) -> Response:
+        if isinstance(item, Response):
+            return item
+
+        request, deadline = item
+        return _batch_response(
+            request,
+            await mux.get_response(request, timeout=deadline - time.time()),
+        )
+
+    return list(await asyncio.gather(*[get_response(item) for item in items]))
+
+
 def send_request(action, wait_for_response=True, **kwargs):
     """
     Send a request to the bus.
@@ -0,0 +1,169 @@
+import asyncio
+from typing import Dict, List, Optional
+from uuid import uuid4
+from weakref import WeakKeyDictionary
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from platypush.message import Message
+from platypush.message.request import Request
+from platypush.utils import get_async_redis, get_redis_queue_name_by_message
+
+from .logger import logger
+
+
+class ResponseMultiplexer:
+    """
+    Waits for the responses to any number of requests over a single Redis
+    connection.
+
+    The responses to the requests are pushed to a different Redis list for
+    each request. Instead of a blocking ``BLPOP`` per pending request, the
+    multiplexer runs a single ``BLPOP`` over the lists of all the pending
+    requests, and it dispatches the responses to their waiters. When a new
+    request is registered, a token is pushed to a wakeup list that is also
+    watched by the ``BLPOP``, so the command is re-issued with the new list
+    of keys.
+
+    A multiplexer is bound to an event loop, see :func:`get_response_multiplexer`.
+    """
+
+    # Timeout of each BLPOP call, in seconds
+    _poll_timeout = 30
+    # How long to wait before retrying after a Redis error, in seconds
+    _retry_interval = 1
+
+    def __init__(self):
+        self._wakeup_key = f'platypush/responses/_mux/{uuid4().hex}'
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._woken_up = False
+
+    @property
+    def pending(self) -> int:
+        """
+        :return: Number of requests waiting for a response.
+        """
+        return len(self._waiters)
+
+    async def get_response(self, msg: Request, timeout: float = 60):
+        """
+        Wait for the response to a request.
+
+        :param msg: The request.
+        :param timeout: How long to wait for the response, in seconds.
+        :return: The response, or None on timeout.
+        """
+        queue = get_redis_queue_name_by_message(msg)
+        if not queue:
+            return None
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(queue, []).append(future)
+
+        try:
+            if self._task is None or self._task.done():
+                self._task = asyncio.ensure_future(self._run())
+            else:
+                await self._wakeup()
+
+            return await asyncio.wait_for(future, timeout=max(timeout, 0.01))
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            waiters = self._waiters.get(queue, [])
+            if future in waiters:
+                waiters.remove(future)
+            if not waiters:
+                self._waiters.pop(queue, None)
+
+    async def _wakeup(self):
+        """
+        Make the poll loop re-issue its ``BLPOP`` with the current keys.
+        """
+        if self._woken_up:
+            return
+
+        self._woken_up = True
+        try:
+            async with get_async_redis().pipeline(transaction=False) as pipe:
+                pipe.rpush(self._wakeup_key, 1)
+                pipe.expire(self._wakeup_key, 60)
+                await pipe.execute()
+        except (RedisConnectionError, RedisTimeoutError) as e:
+            self._woken_up = False
+            logger().warning('Could not wake up the response multiplexer: %s', e)
+
+    async def _run(self):
+        redis = get_async_redis()
+
+        while self._waiters:
+            # Any request registered from now on will push a new wakeup token
+            self._woken_up = False
+            try:
+                result = await redis.blpop(
+                    [self._wakeup_key, *self._waiters],
+                    timeout=self._poll_timeout,
+                )
+            except (RedisConnectionError, RedisTimeoutError) as e:
+                logger().warning('Redis error while waiting for responses: %s', e)
+                await asyncio.sleep(self._retry_interval)
+                continue
+
+            if not result:
+                continue
+
+            key = result[0].decode() if isinstance(result[0], bytes) else result[0]
+            if key != self._wakeup_key:
+                self._dispatch(key, result[1])
+
+            # Other responses are likely to be ready too: fetch them all in
+            # one round-trip instead of one BLPOP each
+            keys = list(self._waiters)
+            if not keys:
+                continue
+
+            try:
+                async with redis.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.lpop(key)
+                    values = await pipe.execute()
+            except (RedisConnectionError, RedisTimeoutError) as e:
+                logger().warning('Redis error while fetching responses: %s', e)
+                continue
+
+            for key, value in zip(keys, values):
+                if value is not None:
+                    self._dispatch(key, value)
+
+    def _dispatch(self, key: str, value):
+        try:
+            response = Message.build(value)
+        except Exception as e:
+            logger().warning('Could not parse the response on %s: %s', key, e)
+            response = None
+
+        for future in self._waiters.pop(key, []):
+            if not future.done():
+                future.set_result(response)
+
+
+_multiplexers: 'WeakKeyDictionary[asyncio.AbstractEventLoop, ResponseMultiplexer]' = (
+    WeakKeyDictionary()
+)
+
+
+def get_response_multiplexer() -> ResponseMultiplexer:
+    """
+    :return: The response multiplexer bound to the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    mux = _multiplexers.get(loop)
+    if mux is None:
+        mux = _multiplexers[loop] = ResponseMultiplexer()
+
+    return mux
+
+
+# vim:sw=4:ts=4:et:
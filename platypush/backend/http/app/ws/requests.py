@@ -1,48 +1,123 @@
-from threading import Thread, current_thread
-from typing import Set
+import asyncio
+import json
+from typing import Optional, Set, Tuple
 
-from platypush.backend.http.app.utils import send_message
+from tornado.websocket import WebSocketClosedError
+
+from platypush.backend.http.app.utils import send_message_async
+from platypush.config import Config
 from platypush.message.request import Request
+from platypush.message.response import Response
 
 from . import WSRoute, logger
 
 
 class WSRequestsProxy(WSRoute):
     """
-    Websocket event proxy mapped to ``/ws/requests``.
+    Websocket requests proxy mapped to ``/ws/requests``.
+
+    Clients can send any number of requests on the same connection without
+    waiting for the previous responses. Each response carries the ``id`` of
+    its request, and it's delivered as soon as it's ready, regardless of the
+    order of the requests. A request can also specify how long to wait for
+    its response (in seconds) through a ``timeout`` field.
+
+    At most ``_max_concurrent_requests`` requests per connection are
+    dispatched at the same time, and the others are queued until a slot is
+    free. Requests that exceed the queue size get an error response.
     """
 
-    _max_concurrent_requests: int = 10
-    """ Maximum number of concurrent requests allowed on the same connection. """
+    _max_concurrent_requests: int = 25
+    """ Maximum number of requests dispatched at the same time on a connection. """
+
+    _max_queued_requests: int = 1000
+    """ Maximum number of requests waiting to be dispatched on a connection. """
+
+    _default_timeout: float = 60
+    """ Default timeout of the requests, in seconds. """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._requests: Set[Thread] = set()
+        self._requests: Set[asyncio.Task] = set()
+        self._slots = asyncio.Semaphore(self._max_concurrent_requests)
 
     @classmethod
     def app_name(cls) -> str:
         return 'requests'
 
-    def _handle_request(self, request: Request):
-        self._requests.add(current_thread())
+    def _reply(self, response: Response):
         try:
-            response = send_message(request, wait_for_response=True)
-            self.send(str(response))
-        finally:
-            self._requests.remove(current_thread())
+            self.write_message(self._serialize(response))
+        except WebSocketClosedError:
+            logger.debug('Client disconnected before response %s', response.id)
+
+    def _reply_error(self, error: str, msg_id: Optional[str] = None):
+        self._reply(
+            Response(
+                id=msg_id,
+                origin=Config.get('device_id'),
+                target='http',
+                errors=[error],
+            )
+        )
+
+    async def _handle_request(self, request: Request, timeout: float):
+        async with self._slots:
+            try:
+                response = await send_message_async(request, timeout=timeout)
+            except Exception as e:
+                logger.warning('Could not send request %s: %s', request.id, e)
+                self._reply_error(str(e), request.id)
+                return
+
+        if response is None:
+            self._reply_error(
+                f'Timeout while waiting for the response to {request.action}',
+                request.id,
+            )
+            return
+
+        self._reply(response)
+
+    def _parse_request(self, data) -> Tuple[Request, float]:
+        if not isinstance(data, dict):
+            raise AssertionError(f'Expected a request object, got {data!r}')
+
+        timeout = float(data.pop('timeout', self._default_timeout))
+        msg = Request.build(data)
+        if not isinstance(msg, Request):
+            raise AssertionError(f'Expected {Request}, got {type(msg)}')
+
+        return msg, timeout
 
     def on_message(self, message):
-        if len(self._requests) > self._max_concurrent_requests:
-            logger.info('Too many concurrent requests on %s', self)
+        data, msg_id = None, None
+        try:
+            data = json.loads(message)
+            if isinstance(data, dict):
+                msg_id = data.get('id')
+        except ValueError:
+            pass
+
+        max_requests = self._max_concurrent_requests + self._max_queued_requests
+        if len(self._requests) >= max_requests:
+            logger.info('Too many pending requests on %s', self)
+            self._reply_error('Too many pending requests', msg_id)
             return
 
         try:
-            msg = Request.build(message)
-            if not (isinstance(msg, Request)):
-                raise AssertionError(f'Expected {Request}, got {type(msg)}')
+            msg, timeout = self._parse_request(data)
         except Exception as e:
             logger.info('Could not build request from %s: %s', message, e)
-            logger.exception(e)
+            self._reply_error(f'Invalid request: {e}', msg_id)
             return
 
-        Thread(target=self._handle_request, args=(msg,)).start()
+        task = asyncio.ensure_future(self._handle_request(msg, timeout))
+        self._requests.add(task)
+        task.add_done_callback(self._requests.discard)
+
+    def on_close(self):
+        for task in self._requests.copy():
+            task.cancel()
+
+        super().on_close()
@@ -186,5 +186,13 @@ def parse_cmdline(args: Sequence[str]) -> argparse.Namespace:
         help='Enable SQLAlchemy debug logging.',
     )
 
+    parser.add_argument(
+        '--profile-startup',
+        dest='profile_startup',
+        action='store_true',
+        help='Log the time spent in each phase of the startup, and the time '
+        'spent importing and initializing each plugin and backend.',
+    )
+
     opts, _ = parser.parse_known_args(args)
     return opts
@@ -0,0 +1,521 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_redis_prefix = 'platypush/cache'
+_invalidation_channel = f'{_redis_prefix}/invalidate'
+_missing: Any = object()
+
+# Compare-and-delete, so a loader only releases the lock it acquired
+_release_lock_script = '''
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+'''
+
+_caches: Dict[str, 'SharedCache'] = {}
+_caches_lock = threading.RLock()
+
+
+@dataclass
+class SharedCacheMetrics:
+    """
+    Counters of a :class:`SharedCache`.
+    """
+
+    hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    coalesced_loads: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    redis_errors: int = 0
+
+
+class _Entry:
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value: Any, expires_at: Optional[float]):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class _Flight:
+    """
+    A value being loaded, shared by all the callers that requested it in the
+    meantime.
+    """
+
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SharedCache(Generic[T]):
+    """
+    Key-value cache shared by the Platypush processes (e.g. the main
+    application and the HTTP workers), and persisted across restarts.
+
+    It has two levels:
+
+        - L1: a size-bounded, in-process LRU of deserialized values.
+        - L2: the Redis server used by the application. The values are
+          stored under ``platypush/cache/<namespace>/<key>``, and any change
+          is broadcast over ``platypush/cache/invalidate``, so the other
+          processes drop their stale L1 entries.
+
+    If Redis isn't reachable, the cache falls back to L1 only.
+
+    The values are serialized to JSON by default. Namespaces that store other
+    types should provide their own ``dumps``/``loads`` pair. Cached values are
+    shared by all the callers in the process, and they should be treated as
+    read-only.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[float] = None,
+        max_size: int = 1024,
+        shared: bool = True,
+        dumps: Callable[[T], str] = json.dumps,
+        loads: Callable[[str], T] = json.loads,
+        load_timeout: float = 60,
+    ):
+        """
+        :param namespace: Namespace of the cache (usually prefixed by the
+            name of the plugin that owns it).
+        :param ttl: Default time-to-live of the entries, in seconds (default:
+            no expiry).
+        :param max_size: Maximum number of entries kept in memory.
+        :param shared: If False, then the entries won't be stored on Redis.
+        :param dumps: Serializer of the values stored on Redis.
+        :param loads: Deserializer of the values stored on Redis.
+        :param load_timeout: How long :meth:`.get_or_load` waits for a value
+            that is being loaded by another caller or process, in seconds.
+        """
+        if not namespace or '/' in namespace:
+            raise AssertionError(f'Invalid cache namespace: {namespace!r}')
+
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_size = max(1, max_size)
+        self.shared = shared
+        self.load_timeout = load_timeout
+        self.metrics = SharedCacheMetrics()
+        self._dumps = dumps
+        self._loads = loads
+        self._entries: 'OrderedDict[str, _Entry]' = OrderedDict()
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.RLock()
+        self._redis_failing = False
+
+    def _redis_key(self, key: str) -> str:
+        return f'{_redis_prefix}/{self.namespace}/{key}'
+
+    def _redis(self):
+        """
+        :return: The Redis client, or None if the cache isn't shared.
+        """
+        if not self.shared:
+            return None
+
+        from platypush.utils import get_redis
+
+        _ensure_listener()
+        return get_redis()
+
+    def _on_redis_error(self, e: Exception):
+        self.metrics.redis_errors += 1
+        if not self._redis_failing:
+            logger.warning(
+                'Redis unavailable for the cache %s, falling back to memory: %s',
+                self.namespace,
+                e,
+            )
+        self._redis_failing = True
+
+    def _redis_call(self, f: Callable[[Any], Any], default: Any = None) -> Any:
+        """
+        Run a Redis operation, and return ``default`` if Redis isn't
+        available.
+        """
+        from redis.exceptions import RedisError
+
+        try:
+            redis = self._redis()
+            if redis is None:
+                return default
+
+            ret = f(redis)
+            self._redis_failing = False
+            return ret
+        except RedisError as e:
+            self._on_redis_error(e)
+            return default
+
+    def _get_local(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _missing
+
+            if entry.expires_at is not None and entry.expires_at <= time.time():
+                del self._entries[key]
+                return _missing
+
+            self._entries.move_to_end(key)
+            self.metrics.hits += 1
+            return entry.value
+
+    def _set_local(self, key: str, value: T, ttl: Optional[float]):
+        with self._lock:
+            self._entries[key] = _Entry(
+                value, time.time() + ttl if ttl is not None else None
+            )
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.metrics.evictions += 1
+
+    def _get_shared(self, key: str) -> Any:
+        def get(redis):
+            with redis.pipeline(transaction=False) as pipe:
+                pipe.get(self._redis_key(key))
+                pipe.pttl(self._redis_key(key))
+                return pipe.execute()
+
+        data, pttl = self._redis_call(get, (None, -2))
+        if data is None:
+            return _missing
+
+        try:
+            value = self._loads(data.decode() if isinstance(data, bytes) else data)
+        except Exception as e:
+            logger.warning('Invalid cached value for %s: %s', self._redis_key(key), e)
+            return _missing
+
+        self.metrics.shared_hits += 1
+        self._set_local(key, value, pttl / 1000 if pttl and pttl > 0 else None)
+        return value
+
+    def _get(self, key: str) -> Any:
+        value = self._get_local(key)
+        if value is _missing:
+            value = self._get_shared(key)
+        return value
+
+    def _invalidate(self, redis, key: Optional[str]):
+        """
+        Notify the other processes that an entry (or all the entries, if
+        ``key`` is None) has changed.
+        """
+        redis.publish(
+            _invalidation_channel,
+            json.dumps(
+                {'origin': _listener.origin, 'namespace': self.namespace, 'key': key}
+            ),
+        )
+
+    def _drop_local(self, key: Optional[str]):
+        """
+        Drop an entry (or all the entries, if ``key`` is None) from the
+        in-process cache, after it was changed by another process.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self.metrics.invalidations += 1
+
+    def get(self, key: str, default: Optional[T] = None) -> Optional[T]:
+        """
+        :return: The cached value of ``key``, or ``default`` if it isn't
+            cached.
+        """
+        value = self._get(key)
+        if value is _missing:
+            self.metrics.misses += 1
+            return default
+        return value
+
+    def set(self, key: str, value: T, ttl: Optional[float] = None):
+        """
+        Cache a value, and notify the other processes.
+
+        :param ttl: Time-to-live of the entry, in seconds (default: the
+            ``ttl`` of the cache).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self._set_local(key, value, ttl)
+
+        if self.shared:
+            data = self._dumps(value)
+
+            def set_shared(redis):
+                redis.set(
+                    self._redis_key(key), data, px=int(ttl * 1000) if ttl else None
+                )
+                self._invalidate(redis, key)
+
+            self._redis_call(set_shared)
+
+    def delete(self, key: str):
+        """
+        Remove an entry from the cache of all the processes.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+        def delete_shared(redis):
+            redis.delete(self._redis_key(key))
+            self._invalidate(redis, key)
+
+        self._redis_call(delete_shared)
+
+    def clear(self):
+        """
+        Remove all the entries of the namespace from the cache of all the
+        processes.
+        """
+        with self._lock:
+            self._entries.clear()
+
+        def clear_shared(redis):
+            keys = list(redis.scan_iter(match=self._redis_key('*'), count=1000))
+            if keys:
+                redis.delete(*keys)
+            self._invalidate(redis, None)
+
+        self._redis_call(clear_shared)
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], T], ttl: Optional[float] = None
+    ) -> T:
+        """
+        Get a value from the cache, or load it through ``loader`` and cache it
+        if it's missing.
+
+        Concurrent requests for the same missing key are coalesced: only one
+        caller runs ``loader``, and the others wait for its result - within
+        the process, and, through a lock on Redis, across processes.
+        Exceptions raised by ``loader`` are propagated to all the waiting
+        callers, and they aren't cached.
+
+        :param key: Cache key.
+        :param loader: Function that returns the value of ``key``.
+        :param ttl: Time-to-live of the loaded value, in seconds (default: the
+            ``ttl`` of the cache).
+        """
+        value = self._get(key)
+        if value is not _missing:
+            return value
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self.metrics.coalesced_loads += 1
+            if not flight.done.wait(self.load_timeout):
+                raise TimeoutError(
+                    f'Timeout while waiting for {self.namespace}/{key} to load'
+                )
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = self._load(key, loader, ttl)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _load(self, key: str, loader: Callable[[], T], ttl: Optional[float]) -> T:
+        # The value may have been loaded while we were waiting for the lock
+        value = self._get(key)
+        if value is not _missing:
+            return value
+
+        lock_key = self._redis_key(key) + ':lock'
+        token = uuid.uuid4().hex
+        locked = self._redis_call(
+            lambda redis: redis.set(
+                lock_key, token, nx=True, px=int(self.load_timeout * 1000)
+            ),
+            default=True,
+        )
+
+        if not locked:
+            # Another process is loading the value: wait for it to be stored,
+            # or for the lock to be released/expire
+            self.metrics.coalesced_loads += 1
+            deadline = time.time() + self.load_timeout
+            while time.time() < deadline:
+                value = self._get_shared(key)
+                if value is not _missing:
+                    return value
+                if not self._redis_call(lambda redis: redis.exists(lock_key)):
+                    break
+                time.sleep(0.05)
+
+        self.metrics.misses += 1
+        self.metrics.loads += 1
+
+        try:
+            value = loader()
+            self.set(key, value, ttl=ttl)
+            return value
+        finally:
+            if locked:
+                self._redis_call(
+                    lambda redis: redis.eval(_release_lock_script, 1, lock_key, token)
+                )
+
+    @property
+    def size(self) -> int:
+        """
+        :return: Number of entries in the in-process cache.
+        """
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        :return: The metrics of the cache, together with its in-process size.
+        """
+        return {**asdict(self.metrics), 'size': self.size}
+
+
+class _InvalidationListener:
+    """
+    Listens for the changes made by the other processes, and drops the
+    affected entries from the in-process caches.
+
+    There is one listener per process. It's (re-)started lazily, so forked
+    processes get their own.
+    """
+
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.origin = ''
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    def ensure_started(self):
+        if self.pid == os.getpid():
+            return
+
+        with self._lock:
+            if self.pid == os.getpid():
+                return
+
+            if self.pid is not None:
+                # We have been forked: the values inherited from the parent
+                # may be stale, as nobody was listening for changes
+                with _caches_lock:
+                    for cache in _caches.values():
+                        cache._drop_local(None)  # pylint: disable=protected-access
+
+            self.pid = os.getpid()
+            self.origin = uuid.uuid4().hex
+            self._thread = threading.Thread(
+                target=self._run, args=(self.pid,), name='SharedCache', daemon=True
+            )
+            self._thread.start()
+
+    def _run(self, pid: int):
+        from redis.exceptions import RedisError
+
+        from platypush.utils import get_redis
+
+        while self.pid == pid:
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub()
+                pubsub.subscribe(_invalidation_channel)
+                while self.pid == pid:
+                    msg = pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+                    if msg:
+                        self._on_message(msg.get('data'))
+            except RedisError as e:
+                logger.debug('Shared cache invalidation listener error: %s', e)
+                time.sleep(5)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except RedisError:
+                        pass
+
+    def _on_message(self, data):
+        try:
+            msg = json.loads(data)
+        except (TypeError, ValueError):
+            return
+
+        if msg.get('origin') == self.origin:
+            return
+
+        with _caches_lock:
+            cache = _caches.get(msg.get('namespace'))
+        if cache:
+            cache._drop_local(msg.get('key'))  # pylint: disable=protected-access
+
+
+_listener = _InvalidationListener()
+
+
+def _ensure_listener():
+    _listener.ensure_started()
+
+
+def get_cache(namespace: str, **kwargs) -> SharedCache:
+    """
+    Get (or create) the shared cache registered under a namespace.
+
+    :param namespace: Namespace of the cache (e.g. ``youtube.channels``).
+    :param kwargs: :class:`SharedCache` arguments, used when the cache is
+        created.
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = SharedCache(namespace, **kwargs)
+        return cache
+
+
+def get_cache_metrics() -> Dict[str, dict]:
+    """
+    :return: The metrics of all the registered caches, by namespace.
+    """
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.namespace: cache.stats() for cache in caches}
+
+
+# vim:sw=4:ts=4:et:
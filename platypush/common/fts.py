@@ -0,0 +1,285 @@
+import logging
+from threading import RLock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Float, String, column, select, text
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+_fts5_support: Dict[str, bool] = {}
+_fts5_support_lock = RLock()
+
+
+def supports_fts5(session) -> bool:
+    """
+    :return: True if the database bound to the session is a SQLite database
+        with FTS5 support.
+    """
+    bind = session.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return False
+
+    key = str(bind.url)
+    with _fts5_support_lock:
+        if key not in _fts5_support:
+            try:
+                session.execute(
+                    text(
+                        'CREATE VIRTUAL TABLE IF NOT EXISTS temp._fts5_probe USING fts5(x)'
+                    )
+                )
+                session.execute(text('DROP TABLE IF EXISTS temp._fts5_probe'))
+                _fts5_support[key] = True
+            except OperationalError:
+                logger.info('SQLite FTS5 extension not available on %s', key)
+                _fts5_support[key] = False
+
+        return _fts5_support[key]
+
+
+class FtsIndex:
+    """
+    A full-text search index backed by SQLite's FTS5 extension, with prefix
+    indexes and BM25 ranking.
+
+    Documents are identified by arbitrary string IDs, which are mapped to the
+    rowids of the FTS table through an auxiliary ``<name>_docs`` table.
+
+    Callers should check :meth:`.is_available` and fall back to their own
+    search logic if FTS5 isn't supported by the underlying database.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[str],
+        weights: Optional[Sequence[float]] = None,
+        prefix: Sequence[int] = (2, 3, 4),
+        tokenize: str = 'unicode61 remove_diacritics 2',
+    ):
+        """
+        :param name: Name of the FTS table.
+        :param columns: Names of the indexed columns.
+        :param weights: BM25 weights for each of the columns (default: 1 for
+            each column).
+        :param prefix: Lengths of the prefix indexes.
+        :param tokenize: FTS5 tokenizer configuration.
+        """
+        if weights and len(weights) != len(columns):
+            raise AssertionError('The number of weights must match the columns')
+
+        self.name = name
+        self.columns = list(columns)
+        self.weights = list(weights or [1.0] * len(columns))
+        self.prefix = list(prefix)
+        self.tokenize = tokenize
+        self._initialized = set()
+        self._init_lock = RLock()
+
+    @property
+    def _docs_table(self) -> str:
+        return f'{self.name}_docs'
+
+    def is_available(self, session) -> bool:
+        """
+        :return: True if FTS5 is supported by the database bound to the
+            session.
+        """
+        return supports_fts5(session)
+
+    def init(self, session) -> bool:
+        """
+        Create the index tables if they don't exist.
+
+        :return: True if the index has just been created, and therefore it
+            should be populated by the caller.
+        """
+        key = str(session.get_bind().url)
+        with self._init_lock:
+            if key in self._initialized:
+                return False
+
+            exists = session.execute(
+                text('SELECT 1 FROM sqlite_master WHERE type = :type AND name = :name'),
+                {'type': 'table', 'name': self.name},
+            ).first()
+
+            if not exists:
+                prefix = ' '.join(str(p) for p in self.prefix)
+                session.execute(
+                    text(
+                        f'CREATE TABLE IF NOT EXISTS {self._docs_table} ('
+                        'rowid INTEGER PRIMARY KEY, doc_id TEXT NOT NULL UNIQUE)'
+                    )
+                )
+                session.execute(
+                    text(
+                        f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.name} USING fts5('
+                        f'{", ".join(self.columns)}, '
+                        f"prefix='{prefix}', tokenize='{self.tokenize}')"
+                    )
+                )
+
+            self._initialized.add(key)
+            return not exists
+
+    def index(
+        self, session, docs: Iterable[Tuple[Any, Sequence[Optional[str]]]]
+    ) -> None:
+        """
+        Add or replace documents in the index.
+
+        :param docs: Iterable of ``(doc_id, [column_value, ...])`` tuples.
+        """
+        rows = []
+        for doc_id, values in docs:
+            row: Dict[str, Any] = {'doc_id': str(doc_id)}
+            row.update(
+                {f'c{i}': value or '' for i, value in enumerate(values)},
+            )
+            rows.append(row)
+
+        if not rows:
+            return
+
+        columns = ', '.join(self.columns)
+        params = ', '.join(f':c{i}' for i in range(len(self.columns)))
+        session.execute(
+            text(f'INSERT OR IGNORE INTO {self._docs_table} (doc_id) VALUES (:doc_id)'),
+            [{'doc_id': row['doc_id']} for row in rows],
+        )
+        session.execute(
+            text(
+                f'DELETE FROM {self.name} WHERE rowid = '
+                f'(SELECT rowid FROM {self._docs_table} WHERE doc_id = :doc_id)'
+            ),
+            [{'doc_id': row['doc_id']} for row in rows],
+        )
+        session.execute(
+            text(
+                f'INSERT INTO {self.name} (rowid, {columns}) '
+                f'SELECT rowid, {params} FROM {self._docs_table} '
+                'WHERE doc_id = :doc_id'
+            ),
+            rows,
+        )
+
+    def delete(self, session, doc_ids: Iterable[Any]) -> None:
+        """
+        Remove documents from the index.
+        """
+        ids = [{'doc_id': str(doc_id)} for doc_id in doc_ids]
+        if not ids:
+            return
+
+        session.execute(
+            text(
+                f'DELETE FROM {self.name} WHERE rowid = '
+                f'(SELECT rowid FROM {self._docs_table} WHERE doc_id = :doc_id)'
+            ),
+            ids,
+        )
+        session.execute(
+            text(f'DELETE FROM {self._docs_table} WHERE doc_id = :doc_id'),
+            ids,
+        )
+
+    def clear(self, session) -> None:
+        """
+        Remove all the documents from the index.
+        """
+        session.execute(text(f'DELETE FROM {self.name}'))
+        session.execute(text(f'DELETE FROM {self._docs_table}'))
+
+    @staticmethod
+    def build_match_query(terms: Iterable[str], prefix: bool = False) -> str:
+        """
+        Build an FTS5 ``MATCH`` expression that matches all the given terms.
+
+        Terms that contain spaces are matched as phrases, and ``*`` wildcards
+        are translated into prefix queries (FTS5 only supports trailing
+        wildcards).
+
+        :param terms: Search terms.
+        :param prefix: If True, all the terms are matched as prefixes.
+        """
+        expr = []
+        for term in terms:
+            term = term.strip()
+            is_prefix = prefix or '*' in term
+            term = term.replace('*', ' ').strip().replace('"', '""')
+            if not term:
+                continue
+
+            expr.append(f'"{term}"' + ('*' if is_prefix else ''))
+
+        return ' AND '.join(expr)
+
+    def match(self, terms: Iterable[str], *, prefix: bool = False):
+        """
+        Build a subquery that returns the documents matching the given terms,
+        so it can be joined with the tables of the indexed documents and
+        filtered, ranked and paginated in the same query.
+
+        :param terms: Search terms. All the terms must match.
+        :param prefix: If True, all the terms are matched as prefixes.
+        :return: A subquery with the ``doc_id`` and ``score`` columns (``score``
+            is the BM25 rank, lower values for better matches), or None if
+            there are no valid search terms.
+        """
+        query = self.build_match_query(terms, prefix=prefix)
+        if not query:
+            return None
+
+        weights = ', '.join(str(float(w)) for w in self.weights)
+        return (
+            text(
+                f'SELECT d.doc_id AS doc_id, bm25({self.name}, {weights}) AS score '
+                f'FROM {self.name} JOIN {self._docs_table} d '
+                f'ON d.rowid = {self.name}.rowid '
+                f'WHERE {self.name} MATCH :query'
+            )
+            .bindparams(query=query)
+            .columns(column('doc_id', String), column('score', Float))
+            .subquery(self.name + '_match')
+        )
+
+    def search(
+        self,
+        session,
+        terms: Iterable[str],
+        *,
+        prefix: bool = False,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Tuple[str, float]]:
+        """
+        Search the index.
+
+        :param terms: Search terms. All the terms must match.
+        :param prefix: If True, all the terms are matched as prefixes.
+        :param limit: Maximum number of results.
+        :param offset: Results offset.
+        :return: A list of ``(doc_id, score)`` tuples, sorted by descending
+            BM25 score.
+        """
+        matches = self.match(terms, prefix=prefix)
+        if matches is None:
+            return []
+
+        query = select(matches.c.doc_id, matches.c.score).order_by(matches.c.score)
+        if limit is not None:
+            query = query.limit(limit).offset(offset or 0)
+
+        try:
+            rows = session.execute(query).all()
+        except OperationalError as e:
+            logger.warning('Invalid full-text search query %r: %s', terms, e)
+            return []
+
+        # bm25() returns lower values for better matches
+        return [(doc_id, -score) for doc_id, score in rows]
+
+
+__all__ = ['FtsIndex', 'supports_fts5']
@@ -0,0 +1,466 @@
+import copy
+import email.utils
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from http.cookiejar import DefaultCookiePolicy
+from typing import Collection, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+_idempotent_methods = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+_cacheable_methods = frozenset({'GET', 'HEAD'})
+
+# Request headers that make a response specific to the caller
+_cache_key_headers = ('Accept', 'Accept-Encoding', 'Accept-Language', 'Authorization')
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.RLock()
+_clients: Dict[str, 'HttpClient'] = {}
+_clients_lock = threading.RLock()
+
+
+def _get_session() -> requests.Session:
+    """
+    :return: The session shared by all the clients. It holds the per-host
+        connection pools, and it doesn't persist cookies, so no state leaks
+        between clients.
+    """
+    global _session  # pylint: disable=global-statement
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = HTTPAdapter(pool_connections=32, pool_maxsize=16, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+
+        return _session
+
+
+def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for directive in value.split(','):
+        name, _, arg = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class HttpClientMetrics:
+    """
+    Counters of an :class:`HttpClient`.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    cache_hits: int = 0
+    cache_revalidations: int = 0
+    bytes_received: int = 0
+    total_time: float = 0
+
+
+@dataclass
+class _CacheEntry:
+    response: requests.Response
+    expires_at: float
+    must_revalidate: bool
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.response.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.response.headers.get('Last-Modified')
+
+    @property
+    def size(self) -> int:
+        return len(self.response.content or b'')
+
+
+class HttpResponseCache:
+    """
+    In-memory LRU cache of HTTP responses that honours the ``Cache-Control``,
+    ``Expires``, ``ETag`` and ``Last-Modified`` headers.
+    """
+
+    def __init__(self, max_entries: int = 256, max_size: int = 16 * 1024 * 1024):
+        """
+        :param max_entries: Maximum number of cached responses.
+        :param max_size: Maximum size of the cached bodies, in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._entries: 'OrderedDict[Tuple, _CacheEntry]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(request: requests.PreparedRequest) -> Tuple:
+        return (
+            request.method,
+            request.url,
+            *(request.headers.get(header) for header in _cache_key_headers),
+        )
+
+    def get(self, key: Tuple) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Tuple, response: requests.Response) -> bool:
+        """
+        Store a response, if its headers allow it.
+
+        :return: True if the response has been cached.
+        """
+        if response.status_code != 200 or response.headers.get('Vary') == '*':
+            return False
+
+        cache_control = _parse_cache_control(response.headers.get('Cache-Control', ''))
+        if 'no-store' in cache_control:
+            return False
+
+        now = time.time()
+        expires_at = None
+        max_age = cache_control.get('max-age')
+        if max_age is not None:
+            try:
+                expires_at = now + max(0, int(max_age))
+            except ValueError:
+                expires_at = now
+        else:
+            expires = _parse_http_date(response.headers.get('Expires'))
+            if expires is not None:
+                date = _parse_http_date(response.headers.get('Date')) or now
+                expires_at = now + max(0.0, expires - date)
+
+        has_validators = bool(
+            response.headers.get('ETag') or response.headers.get('Last-Modified')
+        )
+
+        if expires_at is None and not has_validators:
+            return False
+
+        entry = _CacheEntry(
+            response=response,
+            expires_at=expires_at or now,
+            must_revalidate='no-cache' in cache_control,
+        )
+
+        if entry.size > self.max_size:
+            return False
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += entry.size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._size > self.max_size
+            ):
+                self._remove(next(iter(self._entries)))
+
+        return True
+
+    def refresh(self, key: Tuple, response: requests.Response):
+        """
+        Refresh the freshness of an entry after a ``304 Not Modified``.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return
+
+            for header in ('Cache-Control', 'Expires', 'Date', 'ETag', 'Last-Modified'):
+                if header in response.headers:
+                    entry.response.headers[header] = response.headers[header]
+
+            self._remove(key)
+            self.put(key, entry.response)
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._size -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client.
+
+    All the clients share the same per-host connection pools, so connections
+    are kept alive and reused across requests and plugins. Each client has its
+    own retry policy, an optional response cache and its own metrics.
+
+    The methods accept the same arguments as the ``requests`` API, and return
+    :class:`requests.Response` objects.
+    """
+
+    def __init__(
+        self,
+        name: str = 'platypush',
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30,
+        retry_on_status: Collection[int] = (429, 502, 503, 504),
+        timeout: Optional[float] = None,
+        cache: bool = False,
+        cache_max_entries: int = 256,
+        cache_max_size: int = 16 * 1024 * 1024,
+    ):
+        """
+        :param name: Name of the client (usually the name of the plugin that
+            owns it).
+        :param retries: Number of retries for idempotent requests that fail
+            with a connection error or with one of ``retry_on_status``.
+        :param backoff_factor: The n-th retry waits ``backoff_factor * 2^n``
+            seconds, or the time specified in the ``Retry-After`` header.
+        :param max_backoff: Maximum wait between retries, in seconds.
+        :param retry_on_status: HTTP statuses that trigger a retry.
+        :param timeout: Default timeout of the requests, in seconds.
+        :param cache: Whether to cache the responses to GET and HEAD requests,
+            according to their caching headers.
+        :param cache_max_entries: Maximum number of cached responses.
+        :param cache_max_size: Maximum size of the cache, in bytes.
+        """
+        self.name = name
+        self.retries = max(0, retries)
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_on_status = set(retry_on_status)
+        self.timeout = timeout
+        self.cache = (
+            HttpResponseCache(max_entries=cache_max_entries, max_size=cache_max_size)
+            if cache
+            else None
+        )
+        self._metrics = HttpClientMetrics()
+        self._metrics_lock = threading.Lock()
+
+    @property
+    def metrics(self) -> dict:
+        with self._metrics_lock:
+            return asdict(self._metrics)
+
+    def _count(self, **counters):
+        with self._metrics_lock:
+            for counter, value in counters.items():
+                setattr(self._metrics, counter, getattr(self._metrics, counter) + value)
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        retry_after = response.headers.get('Retry-After') if response else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                date = _parse_http_date(retry_after)
+                delay = (date - time.time()) if date else 0
+        else:
+            delay = self.backoff_factor * (2**attempt)
+
+        return min(max(0, delay), self.max_backoff)
+
+    def _send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        session = _get_session()
+        retries = (
+            self.retries
+            # Streamed bodies can't be sent again
+            if request.method in _idempotent_methods
+            and isinstance(request.body, (bytes, str, type(None)))
+            else 0
+        )
+        attempt = 0
+
+        while True:
+            response = None
+            try:
+                response = session.send(request, **kwargs)
+                if (
+                    response.status_code not in self.retry_on_status
+                    or attempt >= retries
+                ):
+                    return response
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise e
+                logger.debug('%s %s failed: %s', request.method, request.url, e)
+
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                response.close()
+
+            attempt += 1
+            self._count(retries=1)
+            logger.debug(
+                'Retrying %s %s in %.1f seconds (attempt %d/%d)',
+                request.method,
+                urlsplit(request.url or '').netloc,
+                delay,
+                attempt,
+                retries,
+            )
+            time.sleep(delay)
+
+    def request(
+        self, method: str, url: str, *, cache: Optional[bool] = None, **kwargs
+    ) -> requests.Response:
+        """
+        Perform an HTTP request.
+
+        :param method: HTTP method.
+        :param url: Request URL.
+        :param cache: Set to False to bypass the response cache of the
+            client for this request.
+        :param kwargs: Extra arguments for ``requests``.
+        """
+        send_kwargs = {
+            arg: kwargs.pop(arg)
+            for arg in ('stream', 'verify', 'cert', 'proxies')
+            if arg in kwargs
+        }
+        send_kwargs['timeout'] = kwargs.pop('timeout', self.timeout)
+        allow_redirects = kwargs.pop('allow_redirects', method.upper() != 'HEAD')
+
+        session = _get_session()
+        request = session.prepare_request(
+            requests.Request(method.upper(), url, **kwargs)
+        )
+        send_kwargs = {
+            **session.merge_environment_settings(
+                request.url,
+                send_kwargs.pop('proxies', {}),
+                send_kwargs.pop('stream', None),
+                send_kwargs.pop('verify', None),
+                send_kwargs.pop('cert', None),
+            ),
+            **send_kwargs,
+            'allow_redirects': allow_redirects,
+        }
+
+        use_cache = (
+            (self.cache is not None if cache is None else cache)
+            and self.cache is not None
+            and request.method in _cacheable_methods
+            and not send_kwargs.get('stream')
+        )
+
+        cache_key = self.cache.key(request) if use_cache else None  # type: ignore
+        entry = self.cache.get(cache_key) if cache_key else None  # type: ignore
+        if entry:
+            if not entry.must_revalidate and entry.expires_at > time.time():
+                self._count(requests=1, cache_hits=1)
+                return copy.copy(entry.response)
+
+            if entry.etag:
+                request.headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                request.headers['If-Modified-Since'] = entry.last_modified
+
+        start_time = time.time()
+        try:
+            response = self._send(request, **send_kwargs)
+        except Exception:
+            self._count(requests=1, errors=1, total_time=time.time() - start_time)
+            raise
+
+        if entry and response.status_code == 304:
+            self.cache.refresh(cache_key, response)  # type: ignore
+            self._count(
+                requests=1,
+                cache_revalidations=1,
+                total_time=time.time() - start_time,
+            )
+            return copy.copy(entry.response)
+
+        received = (
+            len(response.content)
+            if not send_kwargs.get('stream')
+            else int(response.headers.get('Content-Length') or 0)
+        )
+
+        self._count(
+            requests=1,
+            errors=int(response.status_code >= 400),
+            bytes_received=received,
+            total_time=time.time() - start_time,
+        )
+
+        if cache_key:
+            self.cache.put(cache_key, response)  # type: ignore
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request('HEAD', url, **kwargs)
+
+    def options(self, url: str, **kwargs) -> requests.Response:
+        return self.request('OPTIONS', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+
+def get_http_client(name: str = 'platypush', **kwargs) -> HttpClient:
+    """
+    Get (or create) the HTTP client registered under a name.
+
+    :param name: Name of the client (usually the name of the plugin).
+    :param kwargs: :class:`HttpClient` arguments, used when the client is
+        created.
+    """
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = HttpClient(name=name, **kwargs)
+        return client
+
+
+def get_http_metrics() -> Dict[str, dict]:
+    """
+    :return: The metrics of all the registered HTTP clients, by name.
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.name: client.metrics for client in clients}
+
+
+# vim:sw=4:ts=4:et:
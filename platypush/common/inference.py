@@ -0,0 +1,402 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict, dataclass
+from queue import Empty, Queue
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class ModelCache:
+    """
+    Thread-safe LRU cache of machine learning models with a memory budget.
+
+    Each model is stored with an estimate of its memory footprint. When the
+    total exceeds the budget, the least recently used models are evicted.
+    Concurrent requests for a model that is still being loaded wait for the
+    first load, instead of loading it again.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512 * 1024 * 1024,
+        on_evict: Optional[Callable[[Hashable, Any], None]] = None,
+    ):
+        """
+        :param max_size: Memory budget, in bytes. The most recently used
+            model is always kept, even if it exceeds the budget on its own.
+        :param on_evict: Callback invoked with ``(key, model)`` when a model
+            is evicted.
+        """
+        self.max_size = max_size
+        self.on_evict = on_evict
+        self._models: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._size
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._models
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._models)
+
+    def touch(self, key: Hashable) -> bool:
+        """
+        Mark a model as recently used.
+
+        :return: True if the model is in the cache.
+        """
+        return self._lookup(key)[0]
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return True, self._models[key][0]
+            return False, None
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        size: Callable[[Any], int] = lambda _: 0,
+    ) -> Any:
+        """
+        Get a model from the cache, loading it if required.
+
+        :param key: Model key.
+        :param loader: Callable that loads the model.
+        :param size: Callable that estimates the memory footprint of a model,
+            in bytes.
+        """
+        found, model = self._lookup(key)
+        if found:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            found, model = self._lookup(key)
+            if found:
+                return model
+
+            model = loader()
+            try:
+                model_size = int(size(model))
+            except Exception as e:
+                logger.debug('Could not estimate the size of model %s: %s', key, e)
+                model_size = 0
+
+            self.put(key, model, model_size)
+
+        with self._lock:
+            self._load_locks.pop(key, None)
+
+        return model
+
+    def put(self, key: Hashable, model: Any, size: int = 0):
+        """
+        Add a model to the cache.
+        """
+        evicted = []
+        with self._lock:
+            if key in self._models:
+                self._size -= self._models.pop(key)[1]
+
+            self._models[key] = (model, size)
+            self._size += size
+            while self._size > self.max_size and len(self._models) > 1:
+                old_key, (old_model, old_size) = self._models.popitem(last=False)
+                self._size -= old_size
+                evicted.append((old_key, old_model))
+
+        for old_key, old_model in evicted:
+            logger.info('Evicting model %s from the cache', old_key)
+            if self.on_evict:
+                self.on_evict(old_key, old_model)
+
+    def pop(self, key: Hashable) -> Any:
+        """
+        Remove a model from the cache.
+        """
+        with self._lock:
+            entry = self._models.pop(key, None)
+            if not entry:
+                return None
+
+            self._size -= entry[1]
+            return entry[0]
+
+
+@dataclass
+class BatcherMetrics:
+    """
+    Throughput metrics of a :class:`MicroBatcher`.
+    """
+
+    requests: int = 0
+    batches: int = 0
+    errors: int = 0
+    avg_batch_size: float = 0
+    avg_latency: float = 0
+    throughput: float = 0
+
+
+@dataclass
+class _Request(Generic[T]):
+    item: T
+    future: Future
+    enqueued_at: float
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Micro-batching queue for inference requests.
+
+    Concurrent requests are grouped into batches of at most
+    ``max_batch_size`` items, waiting at most ``max_latency`` seconds after
+    the first request of a batch, and each batch is processed through a
+    single call to ``process``. A pool of ``workers`` threads processes the
+    batches.
+    """
+
+    _throughput_window = 10.0
+
+    def __init__(
+        self,
+        process: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 16,
+        max_latency: float = 0.01,
+        workers: int = 1,
+        name: str = 'batcher',
+    ):
+        """
+        :param process: Callable that takes a list of items and returns the
+            list of results, in the same order.
+        :param max_batch_size: Maximum number of items in a batch.
+        :param max_latency: How long to wait for more requests after the first
+            request of a batch, in seconds.
+        :param workers: Number of worker threads.
+        :param name: Name of the batcher, used in the metrics and in the
+            names of the threads.
+        """
+        self.process = process
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency)
+        self.name = name
+        self._queue: Queue = Queue()
+        self._stopped = threading.Event()
+        self._metrics_lock = threading.Lock()
+        self._requests = 0
+        self._batches = 0
+        self._errors = 0
+        self._total_latency = 0.0
+        self._recent: List[Tuple[float, int]] = []
+        self._workers = [
+            threading.Thread(
+                target=self._worker, name=f'{name}:worker-{i}', daemon=True
+            )
+            for i in range(max(1, workers))
+        ]
+
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, item: T) -> Future:
+        """
+        Queue an item for processing.
+
+        :return: A future resolved with the result of the item.
+        """
+        if self._stopped.is_set():
+            raise AssertionError(f'The batcher {self.name} has been stopped')
+
+        future: Future = Future()
+        self._queue.put(_Request(item=item, future=future, enqueued_at=time.time()))
+        return future
+
+    def __call__(self, item: T, timeout: Optional[float] = None) -> R:
+        """
+        Process an item and wait for its result.
+        """
+        return self.submit(item).result(timeout=timeout)
+
+    def _next_batch(self) -> List[_Request]:
+        try:
+            first = self._queue.get(timeout=1)
+        except Empty:
+            return []
+
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = first.enqueued_at + self.max_latency
+        while len(batch) < self.max_batch_size:
+            try:
+                timeout = deadline - time.time()
+                request = (
+                    self._queue.get(timeout=timeout)
+                    if timeout > 0
+                    else self._queue.get_nowait()
+                )
+            except Empty:
+                break
+
+            if request is None:
+                # Stop signal: let the other workers see it too
+                self._queue.put(None)
+                break
+
+            batch.append(request)
+
+        return batch
+
+    def _worker(self):
+        while not self._stopped.is_set():
+            batch = [
+                request
+                for request in self._next_batch()
+                if request.future.set_running_or_notify_cancel()
+            ]
+
+            if not batch:
+                continue
+
+            try:
+                results = self.process([request.item for request in batch])
+                if len(results) != len(batch):
+                    raise AssertionError(
+                        f'Expected {len(batch)} results, got {len(results)}'
+                    )
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                self._record(batch, error=True)
+                continue
+
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+            self._record(batch)
+
+    def _record(self, batch: List[_Request], error: bool = False):
+        now = time.time()
+        with self._metrics_lock:
+            self._requests += len(batch)
+            self._batches += 1
+            self._errors += len(batch) if error else 0
+            self._total_latency += sum(now - request.enqueued_at for request in batch)
+            self._recent.append((now, len(batch)))
+            while self._recent and now - self._recent[0][0] > self._throughput_window:
+                self._recent.pop(0)
+
+    @property
+    def metrics(self) -> dict:
+        now = time.time()
+        with self._metrics_lock:
+            recent = [n for t, n in self._recent if now - t <= self._throughput_window]
+            return asdict(
+                BatcherMetrics(
+                    requests=self._requests,
+                    batches=self._batches,
+                    errors=self._errors,
+                    avg_batch_size=(
+                        self._requests / self._batches if self._batches else 0
+                    ),
+                    avg_latency=(
+                        self._total_latency / self._requests if self._requests else 0
+                    ),
+                    throughput=sum(recent) / self._throughput_window,
+                )
+            )
+
+    def stop(self):
+        self._stopped.set()
+        for _ in self._workers:
+            self._queue.put(None)
+
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except Empty:
+                break
+
+            if request is not None:
+                request.future.cancel()
+
+
+_batchers: Dict[Hashable, MicroBatcher] = {}
+_batchers_lock = threading.RLock()
+
+
+def get_batcher(
+    key: Hashable, process: Callable[[List[Any]], Sequence[Any]], **kwargs
+) -> MicroBatcher:
+    """
+    Get (or create) the shared :class:`MicroBatcher` registered under a key.
+
+    :param key: Batcher key. Requests that can be batched together (e.g.
+        same model and same input shape) should share the same key.
+    :param process: Batch processing function, used if the batcher is
+        created.
+    :param kwargs: Extra :class:`MicroBatcher` arguments.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(key)
+        if batcher is None:
+            batcher = _batchers[key] = MicroBatcher(
+                process, name=kwargs.pop('name', str(key)), **kwargs
+            )
+        return batcher
+
+
+def stop_batchers(match: Callable[[Hashable], bool] = lambda _: True):
+    """
+    Stop and unregister the batchers whose keys match a condition.
+    """
+    with _batchers_lock:
+        keys = [key for key in _batchers if match(key)]
+        batchers = [_batchers.pop(key) for key in keys]
+
+    for batcher in batchers:
+        batcher.stop()
+
+
+def get_batcher_metrics(
+    match: Callable[[Hashable], bool] = lambda _: True,
+) -> Dict[str, dict]:
+    """
+    :return: The metrics of the registered batchers, by name.
+    """
+    with _batchers_lock:
+        batchers = [batcher for key, batcher in _batchers.items() if match(key)]
+    return {batcher.name: batcher.metrics for batcher in batchers}
+
+
+# vim:sw=4:ts=4:et:
@@ -2,7 +2,6 @@ import datetime
 import glob
 import importlib
 import inspect
-import json
 import logging
 import os
 import pathlib
@@ -11,6 +10,7 @@ import re
 import shutil
 import socket
 import sys
+from threading import RLock
 from urllib.parse import quote
 from typing import Any, Dict, Optional, Set
 
@@ -23,6 +23,9 @@ from platypush.utils import (
     is_functional_cron,
     is_root,
 )
+from platypush.utils.startup import startup_phase
+
+from ._manifests import load_manifests
 
 
 class Config:
@@ -120,10 +123,13 @@ class Config:
         self.dashboards = {}
         self._plugin_manifests = {}
         self._backend_manifests = {}
+        self._scripts_loaded = False
+        self._scripts_lock = RLock()
         self.config_file = ''
 
-        self._init_cfgfile(cfgfile)
-        self._config = self._read_config_file(self.config_file)
+        with startup_phase('config.file'):
+            self._init_cfgfile(cfgfile)
+            self._config = self._read_config_file(self.config_file)
 
         self._init_secrets()
         self._init_dirs(workdir=workdir, cachedir=cachedir)
@@ -131,11 +137,15 @@ class Config:
         self._init_logging()
         self._init_device_id()
         self._init_environment()
-        self._init_manifests()
+
+        with startup_phase('config.manifests'):
+            self._init_manifests()
+
         self._init_constants()
-        self._load_scripts()
         self._init_components()
-        self._init_dashboards(self._config['dashboards_dir'])
+
+        with startup_phase('config.dashboards'):
+            self._init_dashboards(self._config['dashboards_dir'])
 
     def _init_cfgfile(self, cfgfile: Optional[str] = None):
         if cfgfile is None:
@@ -373,6 +383,33 @@ class Config:
                     self.cronjobs[cron_name] = obj
 
     def _load_scripts(self):
+        """
+        Import the modules under ``scripts_dir`` and register the procedures,
+        hooks and cronjobs that they define.
+
+        This is done lazily, the first time that the procedures, hooks or
+        cronjobs are requested, so processes that only need the
+        configuration don't import all the user scripts.
+        """
+        with self._scripts_lock:
+            if self._scripts_loaded:
+                return
+
+            self._scripts_loaded = True
+            # The components defined in the configuration file take
+            # precedence over those defined in the scripts
+            config_components = [
+                (components, components.copy())
+                for components in (self.procedures, self.event_hooks, self.cronjobs)
+            ]
+
+            with startup_phase('config.scripts'):
+                self._import_scripts()
+
+            for components, config_defined in config_components:
+                components.update(config_defined)
+
+    def _import_scripts(self):
         scripts_dir = self._config['scripts_dir']
         sys_path = sys.path.copy()
         sys.path = [scripts_dir] + sys.path
@@ -424,28 +461,15 @@ class Config:
             elif key in self._plugin_manifests:
                 self.plugins[key] = component
 
-    def _init_manifests(self, base_dir: Optional[str] = None):
-        if not base_dir:
-            base_dir = os.path.abspath(os.path.join(__file__, '..', '..'))
-            plugins_dir = os.path.join(base_dir, 'plugins')
-            backends_dir = os.path.join(base_dir, 'backend')
-            self._init_manifests(plugins_dir)
-            self._init_manifests(backends_dir)
-        else:
-            manifests_map = (
-                self._plugin_manifests
-                if base_dir.endswith('plugins')
-                else self._backend_manifests
-            )
+    def _init_manifests(self):
+        from platypush import __version__
 
-            for mf in pathlib.Path(base_dir).rglob('manifest.json'):
-                with open(mf, 'r') as f:
-                    manifest = json.load(f).get('manifest')
-                    if not manifest:
-                        continue
+        manifests = load_manifests(
+            os.path.abspath(os.path.join(__file__, '..', '..')), __version__
+        )
 
-                    comp_name = '.'.join(manifest['package'].split('.')[2:])
-                    manifests_map[comp_name] = manifest
+        self._plugin_manifests = manifests['plugins']
+        self._backend_manifests = manifests['backends']
 
     def _init_constants(self):
         if 'constants' in self._config:
@@ -525,11 +549,15 @@ class Config:
 
     @classmethod
     def get_event_hooks(cls):
-        return cls._get_instance().event_hooks
+        instance = cls._get_instance()
+        instance._load_scripts()  # pylint: disable=protected-access
+        return instance.event_hooks
 
     @classmethod
     def get_procedures(cls):
-        return cls._get_instance().procedures
+        instance = cls._get_instance()
+        instance._load_scripts()  # pylint: disable=protected-access
+        return instance.procedures
 
     @classmethod
     def get_constants(cls):
@@ -546,7 +574,9 @@ class Config:
 
     @classmethod
     def get_cronjobs(cls):
-        return cls._get_instance().cronjobs
+        instance = cls._get_instance()
+        instance._load_scripts()  # pylint: disable=protected-access
+        return instance.cronjobs
 
     @classmethod
     def _get_default_cfgfile(cls) -> Optional[str]:
@@ -631,10 +661,10 @@ class Config:
         :param default: Default value to return if the key is missing.
         """
         # pylint: disable=protected-access
-        config = cls._get_instance()._config.copy()
+        config = cls._get_instance()._config
         if key:
             return config.get(key, default)
-        return config
+        return config.copy()
 
     @classmethod
     def set(cls, key: str, value: Any):
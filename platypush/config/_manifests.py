@@ -0,0 +1,81 @@
+"""
+Index of the integration manifests.
+
+Scanning the source tree for the ``manifest.json`` files of all the plugins
+and backends is one of the most expensive steps of the configuration
+initialization, so the packaging step stores all the manifests in a single
+index file (``<src_root>/manifests.json``) that is loaded instead.
+
+This module only depends on the standard library, so it can also be loaded by
+``setup.py`` when the dependencies of the application aren't installed yet.
+"""
+
+import json
+import os
+import pathlib
+from typing import Dict, Optional
+
+MANIFESTS_INDEX_FILE = 'manifests.json'
+
+# Map: integration type -> integration name -> manifest
+ManifestsIndex = Dict[str, Dict[str, dict]]
+
+
+def scan_manifests(src_root: str) -> ManifestsIndex:
+    """
+    Scan the source tree for the manifests of the plugins and backends.
+
+    :param src_root: Root folder of the ``platypush`` package.
+    :return: ``{"plugins": {name: manifest}, "backends": {name: manifest}}``.
+    """
+    index: ManifestsIndex = {}
+
+    for integration_type, subdir in (('plugins', 'plugins'), ('backends', 'backend')):
+        manifests = index[integration_type] = {}
+        for mf in sorted(pathlib.Path(src_root, subdir).rglob('manifest.json')):
+            with open(mf, 'r') as f:
+                manifest = json.load(f).get('manifest')
+
+            if manifest:
+                name = '.'.join(manifest['package'].split('.')[2:])
+                manifests[name] = manifest
+
+    return index
+
+
+def build_manifests_index(
+    src_root: str, version: str, index_file: Optional[str] = None
+) -> str:
+    """
+    Build the manifests index of a source tree.
+
+    :param src_root: Root folder of the ``platypush`` package.
+    :param version: Version of the package the index is built for.
+    :param index_file: Output file (default: ``<src_root>/manifests.json``).
+    :return: The path of the index file.
+    """
+    index_file = index_file or os.path.join(src_root, MANIFESTS_INDEX_FILE)
+    with open(index_file, 'w') as f:
+        json.dump({'version': version, **scan_manifests(src_root)}, f)
+
+    return index_file
+
+
+def load_manifests(src_root: str, version: str) -> ManifestsIndex:
+    """
+    Load the manifests from the index file, if it exists and it was built for
+    the given version, or scan the source tree otherwise.
+    """
+    try:
+        with open(os.path.join(src_root, MANIFESTS_INDEX_FILE), 'r') as f:
+            index = json.load(f)
+
+        if index.get('version') == version:
+            return {'plugins': index['plugins'], 'backends': index['backends']}
+    except (OSError, ValueError, KeyError):
+        pass
+
+    return scan_manifests(src_root)
+
+
+# vim:sw=4:ts=4:et:
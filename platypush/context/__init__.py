@@ -5,11 +5,16 @@ import os
 
 from dataclasses import dataclass, field
 from threading import RLock
-from typing import Optional, Any
+from typing import Any, Callable, Dict, Optional
 
 from ..bus import Bus
 from ..config import Config
-from ..utils import get_enabled_plugins, get_plugin_name_by_class
+from ..utils import (
+    get_enabled_plugins,
+    get_module_and_method_from_action,
+    get_plugin_name_by_class,
+)
+from ..utils.startup import startup_step
 
 logger = logging.getLogger('platypush:context')
 
@@ -28,8 +33,25 @@ class Context:
     bus: Optional[Bus] = None
 
 
+@dataclass
+class PluginAction:
+    """
+    Entry of the actions dispatch table.
+    """
+
+    plugin_name: str
+    plugin: Any
+    name: str
+    method: Callable[..., Any]
+
+
 _ctx = Context()
 
+# Map: action (e.g. ``music.mpd.play``) -> PluginAction. It's populated when
+# the plugins are initialized, and refreshed when they are reloaded
+_actions: Dict[str, PluginAction] = {}
+_actions_lock = RLock()
+
 # # Map: backend_name -> backend_instance
 # backends = {}
 
@@ -73,7 +95,8 @@ def register_backends(bus=None, global_scope=False, **kwargs):
         backends = {}
 
     for name, cfg in Config.get_backends().items():
-        module = importlib.import_module('platypush.backend.' + name)
+        with startup_step('backend', name, 'import'):
+            module = importlib.import_module('platypush.backend.' + name)
 
         # e.g. backend.http main class: HttpBackend
         cls_name = ''
@@ -82,7 +105,8 @@ def register_backends(bus=None, global_scope=False, **kwargs):
         cls_name += 'Backend'
 
         try:
-            b = getattr(module, cls_name)(bus=bus, **cfg, **kwargs)
+            with startup_step('backend', name, 'init'):
+                b = getattr(module, cls_name)(bus=bus, **cfg, **kwargs)
             backends[name] = b
         except AttributeError as e:
             logger.warning('No such class in %s: %s', module.__name__, cls_name)
@@ -97,12 +121,71 @@ def register_plugins(bus=None):
     """
     from ..plugins import RunnablePlugin
 
-    for plugin in get_enabled_plugins().values():
+    for name, plugin in get_enabled_plugins().items():
+        _register_actions(name, plugin)
         if isinstance(plugin, RunnablePlugin):
             plugin.bus = bus
             plugin.start()
 
 
+def _register_actions(plugin_name: str, plugin):
+    """
+    Add the actions of a plugin to the dispatch table, replacing those of any
+    previous instance of the plugin.
+    """
+    with _actions_lock:
+        for action, entry in list(_actions.items()):
+            if entry.plugin_name == plugin_name:
+                del _actions[action]
+
+        if plugin is None:
+            return
+
+        for method_name in plugin.registered_actions:
+            method = getattr(plugin, method_name, None)
+            if callable(method):
+                _actions[f'{plugin_name}.{method_name}'] = PluginAction(
+                    plugin_name=plugin_name,
+                    plugin=plugin,
+                    name=method_name,
+                    method=method,
+                )
+
+
+def get_action(action: str) -> PluginAction:
+    """
+    Resolve an action name (e.g. ``music.mpd.play``) to the plugin and the
+    bound method that implement it. The plugin is initialized if it hasn't
+    been yet.
+
+    :raises AssertionError: If the plugin or the action doesn't exist.
+    """
+    entry = _actions.get(action)
+    if entry:
+        return entry
+
+    plugin_name, method_name = get_module_and_method_from_action(action)
+    plugin = get_plugin(plugin_name)
+    if not plugin:
+        raise AssertionError(f'No such plugin: {plugin_name}')
+
+    with _actions_lock:
+        entry = _actions.get(action)
+        if entry and entry.plugin is plugin:
+            return entry
+
+        if method_name in plugin.registered_actions:
+            _register_actions(plugin_name, plugin)
+            entry = _actions.get(action)
+
+        if not entry:
+            raise AssertionError(
+                f'{method_name} is not a registered action on {plugin.__class__.__name__}'
+            )
+
+        return entry
+
+
 def get_backend(name):
     """Returns the backend instance identified by name if it exists"""
 
@@ -148,7 +231,8 @@ def get_plugin(plugin, plugin_name=None, reload=False):
         raise RuntimeError(f'Invalid plugin type/name: {plugin}')
 
     try:
-        plugin = importlib.import_module(module_name)
+        with startup_step('plugin', name, 'import'):
+            plugin = importlib.import_module(module_name)
     except ImportError as e:
         logger.warning('No such plugin: %s', name)
         raise RuntimeError(e) from e
@@ -186,7 +270,9 @@ def get_plugin(plugin, plugin_name=None, reload=False):
             if isinstance(plugin, RunnablePlugin):
                 plugin.stop()
 
-        _ctx.plugins[name] = plugin_class(**plugin_conf)
+        with startup_step('plugin', name, 'init'):
+            _ctx.plugins[name] = plugin_class(**plugin_conf)
+        _register_actions(name, _ctx.plugins[name])
 
     return _ctx.plugins[name]
 
@@ -8,8 +8,10 @@ from typing import Dict, Optional
 import croniter
 from dateutil.tz import gettz
 
+from platypush.message.response import Response
 from platypush.procedure import Procedure
 from platypush.utils import get_remaining_timeout, is_functional_cron
+from platypush.utils.metrics import get_metrics
 
 logger = logging.getLogger('platypush:cron')
 
@@ -89,6 +91,9 @@ class Cronjob(threading.Thread):
             return
 
         self.state = CronjobState.RUNNING
+        metrics = get_metrics()
+        started_at = metrics.start('cronjob', self.name) if metrics else 0
+        error = True
 
         try:
             logger.info('Running cronjob {}'.format(self.name))
@@ -103,9 +108,13 @@ class Cronjob(threading.Thread):
 
             logger.info('Response from cronjob {}: {}'.format(self.name, response))
             self.state = CronjobState.DONE
+            error = isinstance(response, Response) and bool(response.errors)
         except Exception as e:
             logger.exception(e)
             self.state = CronjobState.ERROR
+        finally:
+            if metrics:
+                metrics.stop('cronjob', self.name, started_at, error=error)
 
     def wait(self):
         """
@@ -10,8 +10,10 @@ from platypush.common import exec_wrapper
 from platypush.config import Config
 from platypush.message.event import Event
 from platypush.message.request import Request
+from platypush.message.response import Response
 from platypush.procedure import Procedure
 from platypush.utils import get_event_class_by_type, is_functional_hook
+from platypush.utils.metrics import get_metrics
 
 logger = logging.getLogger('platypush')
 
@@ -193,8 +195,21 @@ class EventHook:
 
         def _thread_func(result):
             executor = getattr(self.actions, 'execute', None)
-            if executor and callable(executor):
+            if not (executor and callable(executor)):
+                return
+
+            metrics = get_metrics()
+            if not metrics:
                 executor(event=event, **result.parsed_args)
+                return
+
+            error = True
+            started_at = metrics.start('hook', self.name)
+            try:
+                response = executor(event=event, **result.parsed_args)
+                error = isinstance(response, Response) and bool(response.errors)
+            finally:
+                metrics.stop('hook', self.name, started_at, error=error)
 
         result = self.matches_event(event)
 
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
 from platypush.message.event import Event
 
@@ -40,3 +40,57 @@ class HttpLogEvent(Event):
             user_agent=user_agent,
             **kwargs,
         )
+
+
+class HttpLogBatchEvent(Event):
+    """
+    Event triggered when new HTTP log entries are read from a log file, if
+    ``batch_events`` is enabled on the :class:`platypush.plugins.log.http.LogHttpPlugin`.
+    """
+
+    def __init__(self, logfile: str, entries: List[dict], **kwargs):
+        """
+        :param logfile: Path of the log file.
+        :param entries: The new log entries, with the same attributes as
+            :class:`HttpLogEvent`.
+        """
+        super().__init__(logfile=logfile, entries=entries, **kwargs)
+
+
+class HttpLogStatsEvent(Event):
+    """
+    Event triggered periodically with the aggregated statistics of an HTTP
+    log file, if ``stats_interval`` is set on the
+    :class:`platypush.plugins.log.http.LogHttpPlugin`.
+    """
+
+    def __init__(
+        self,
+        logfile: str,
+        start: datetime,
+        end: datetime,
+        requests: int,
+        size: int,
+        statuses: Dict[str, int],
+        methods: Dict[str, int],
+        **kwargs,
+    ):
+        """
+        :param logfile: Path of the log file.
+        :param start: Start of the interval.
+        :param end: End of the interval.
+        :param requests: Number of requests logged in the interval.
+        :param size: Total size of the responses, in bytes.
+        :param statuses: Number of responses by status code.
+        :param methods: Number of requests by HTTP method.
+        """
+        super().__init__(
+            logfile=logfile,
+            start=start,
+            end=end,
+            requests=requests,
+            size=size,
+            statuses=statuses,
+            methods=methods,
+            **kwargs,
+        )
@@ -1,5 +1,6 @@
 import copy
 import datetime
+import hmac
 import json
 import logging
 import random
@@ -9,12 +10,11 @@ import time
 from threading import Thread
 
 from platypush.config import Config
-from platypush.context import get_plugin
+from platypush.context import get_action, get_plugin
 from platypush.message import Message
 from platypush.message.response import Response
 from platypush.utils import (
     get_hash,
-    get_module_and_method_from_action,
     get_redis,
     get_redis_queue_name_by_message,
     is_functional_procedure,
@@ -81,7 +81,7 @@ class Request(Message):
 
     @staticmethod
     def _generate_id():
-        return ''.join(f'{random.randint(0, 255):02x}' for _ in range(0, 16))
+        return f'{random.getrandbits(128):032x}'
 
     def _execute_procedure(self, *args, **kwargs):
         from platypush.procedure import Procedure
@@ -265,11 +265,15 @@ class Request(Message):
                     self._send_response(response)
                     return response
 
-                action = self.expand_value_from_context(self.action, **context)
-                (module_name, method_name) = get_module_and_method_from_action(action)
-                plugin = get_plugin(module_name)
-                if not (plugin):
-                    raise AssertionError(f'No such plugin: {module_name}')
+                action = (
+                    self.expand_value_from_context(self.action, **context)
+                    if '${' in self.action
+                    else self.action
+                )
+
+                plugin_action = get_action(action)
+                module_name = plugin_action.plugin_name
+                plugin = plugin_action.plugin
             except Exception as e:
                 logger.exception(e)
                 response = Response(output=None, errors=[str(e)])
@@ -281,11 +285,11 @@ class Request(Message):
                 args = self._expand_context(**context)
                 args = self.expand_value_from_context(args, **context)
                 if isinstance(args, dict):
-                    response = plugin.run(method_name, **args)
+                    response = plugin_action.method(**args)
                 elif isinstance(args, list):
-                    response = plugin.run(method_name, *args)
+                    response = plugin_action.method(*args)
                 else:
-                    response = plugin.run(method_name, args)
+                    response = plugin_action.method(args)
 
                 if response is None:
                     response = Response()
@@ -321,7 +325,9 @@ class Request(Message):
 
         stored_token_hash = Config.get('token_hash')
         token = getattr(self, 'token', '')
-        if stored_token_hash and get_hash(token) != stored_token_hash:
+        if stored_token_hash and not hmac.compare_digest(
+            get_hash(token or ''), stored_token_hash
+        ):
             raise PermissionError()
 
         if _async:
@@ -12,6 +12,7 @@ from platypush.common import ExtensionWithManifest
 from platypush.event import EventGenerator
 from platypush.message.response import Response
 from platypush.utils import get_decorators, get_plugin_name_by_class
+from platypush.utils.metrics import get_metrics
 
 from ._actions import register_action, unregister_action
 
@@ -32,40 +33,48 @@ def action(f: Callable[..., Any]) -> Callable[..., Response]:
     def _execute_action(*args, **kwargs) -> Response:
         response = Response()
         action_id = None
+        action_name = '.'.join(
+            [get_plugin_name_by_class(args[0].__class__), f.__name__]
+        )
+        metrics = get_metrics()
+        started_at = metrics.start('action', action_name) if metrics else 0
 
         try:
-            action_id = register_action(
-                {
-                    'action': '.'.join(
-                        [get_plugin_name_by_class(args[0].__class__), f.__name__]
-                    ),
-                    'args': kwargs,
-                }
-            )
-            result = f(*args, **kwargs)
-        except Exception as e:
-            if isinstance(e, KeyboardInterrupt):
-                return response
-
-            _logger.exception(e)
-            result = Response(errors=[str(e)])
-
-        if result and isinstance(result, Response):
-            result.errors = (
-                result.errors if isinstance(result.errors, list) else [result.errors]
-            )
-            response = result
-        elif isinstance(result, tuple) and len(result) == 2:
-            response.errors = result[1] if isinstance(result[1], list) else [result[1]]
-
-            if len(response.errors) == 1 and response.errors[0] is None:
-                response.errors = []
-            response.output = result[0]
-        else:
-            response = Response(output=result, errors=[])
+            try:
+                action_id = register_action({'action': action_name, 'args': kwargs})
+                result = f(*args, **kwargs)
+            except Exception as e:
+                if isinstance(e, KeyboardInterrupt):
+                    return response
+
+                _logger.exception(e)
+                result = Response(errors=[str(e)])
+
+            if result and isinstance(result, Response):
+                result.errors = (
+                    result.errors
+                    if isinstance(result.errors, list)
+                    else [result.errors]
+                )
+                response = result
+            elif isinstance(result, tuple) and len(result) == 2:
+                response.errors = (
+                    result[1] if isinstance(result[1], list) else [result[1]]
+                )
+
+                if len(response.errors) == 1 and response.errors[0] is None:
+                    response.errors = []
+                response.output = result[0]
+            else:
+                response = Response(output=result, errors=[])
 
-        unregister_action(action_id, response=response)
-        return response
+            unregister_action(action_id, response=response)
+            return response
+        finally:
+            if metrics:
+                metrics.stop(
+                    'action', action_name, started_at, error=bool(response.errors)
+                )
 
     # Propagate the docstring
     _execute_action.__doc__ = f.__doc__
@@ -118,6 +127,16 @@ class Plugin(EventGenerator, ExtensionWithManifest):  # lgtm [py/missing-call-to
             raise AssertionError('db plugin not initialized')
         return redis
 
+    @property
+    def _http(self):
+        """
+        :return: The shared :class:`platypush.common.http_client.HttpClient`
+            of the plugin.
+        """
+        from platypush.common.http_client import get_http_client
+
+        return get_http_client(self._plugin_name)
+
     @property
     def _bus(self):
         """
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from enum import Enum
-from random import randint
+from random import getrandbits
 from threading import RLock
 from time import time
 from typing import Any, Optional
@@ -10,7 +10,7 @@ from platypush.message.response import Response
 
 
 def _generate_id() -> str:
-    return ''.join(f'{i:02x}' for i in (randint(0, 255) for _ in range(16)))
+    return f'{getrandbits(128):032x}'
 
 
 class LoggedActionStatus(Enum):
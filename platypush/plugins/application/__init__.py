@@ -5,11 +5,17 @@ from functools import lru_cache
 from typing import List, Optional
 
 from platypush.commands import CommandStream, RestartCommand, StopCommand
+from platypush.common.cache import get_cache, get_cache_metrics
 from platypush.common.db import override_definitions
 from platypush.config import Config
 from platypush.plugins import Plugin, action
-from platypush.utils import get_backend_class_by_name, get_plugin_class_by_name
+from platypush.utils import (
+    get_backend_class_by_name,
+    get_plugin_class_by_name,
+    profiler,
+)
 from platypush.utils.manifest import Manifest
+from platypush.utils.metrics import get_metrics
 from platypush.utils.mock import auto_mocks
 
 
@@ -98,6 +104,135 @@ class ApplicationPlugin(Plugin):
 
         return pending_actions.dump()
 
+    @action
+    def metrics(self, reset: bool = False) -> dict:
+        """
+        Get the execution metrics of the actions, event hooks and cronjobs,
+        and of the messages processed by the bus.
+
+        Metrics are collected only if enabled in the configuration:
+
+            .. code-block:: yaml
+
+                metrics:
+                    enabled: true
+
+        They are also exposed in Prometheus format by the HTTP backend on
+        the ``/metrics`` endpoint.
+
+        :param reset: Reset the metrics after reading them (default: False).
+        :return: .. code-block:: python
+
+            {
+                "started_at": 1700000000.0,
+                # Same format for "hook" and "cronjob"
+                "action": {
+                    "light.hue.on": {
+                        "calls": 10,
+                        "errors": 1,
+                        "error_rate": 0.1,
+                        "in_flight": 0,
+                        "latency": {
+                            "count": 10,
+                            "sum": 1.5,
+                            "avg": 0.15,
+                            # Cumulative counts by upper bound, in seconds
+                            "buckets": {"0.005": 0, "0.01": 0, ..., "+Inf": 10}
+                        }
+                    }
+                },
+                "bus": {
+                    "messages": {"request": 10, "response": 10, "event": 5},
+                    # Time spent by the messages on the bus
+                    "lag": {"count": 25, "sum": 0.05, ...}
+                }
+            }
+
+        """
+        metrics = get_metrics()
+        if not metrics:
+            raise AssertionError(
+                'Metrics are not enabled. Set `metrics.enabled: true` in the configuration'
+            )
+
+        ret = metrics.dump()
+        if reset:
+            metrics.reset()
+        return ret
+
+    @action
+    def start_profiler(
+        self,
+        interval: float = 0.01,
+        duration: Optional[float] = None,
+        output_file: Optional[str] = None,
+    ) -> dict:
+        """
+        Start a sampling profiler on all the threads of the application.
+
+        The collected samples are written, in the "folded stacks" format, to
+        ``output_file`` when the profiler is stopped, either through
+        :meth:`.stop_profiler` or after ``duration`` seconds. The output can
+        be rendered as a flame graph by tools like ``flamegraph.pl``,
+        `speedscope <https://speedscope.app>`_ or ``inferno``.
+
+        :param interval: Sampling interval, in seconds (default: 0.01).
+        :param duration: Stop the profiler after this many seconds (default:
+            run until :meth:`.stop_profiler` is called).
+        :param output_file: Output file (default:
+            ``<workdir>/profiles/<timestamp>.folded``).
+        :return: The status of the profiler.
+        """
+        return profiler.start_profiler(
+            interval=interval, duration=duration, output_file=output_file
+        ).info()
+
+    @action
+    def stop_profiler(self) -> dict:
+        """
+        Stop the sampling profiler started by :meth:`.start_profiler` and
+        write the samples to its output file.
+
+        :return: The status of the profiler, including the path of the
+            output file.
+        """
+        return profiler.stop_profiler().info()
+
+    @action
+    def cache_metrics(self) -> dict:
+        """
+        Get the metrics of the shared caches used by the plugins in this
+        process (see :class:`platypush.common.cache.SharedCache`).
+
+        :return: .. code-block:: json
+
+                {
+                    "youtube.piped.channels": {
+                        "hits": 12,
+                        "shared_hits": 3,
+                        "misses": 2,
+                        "loads": 2,
+                        "coalesced_loads": 1,
+                        "evictions": 0,
+                        "invalidations": 1,
+                        "redis_errors": 0,
+                        "size": 5
+                    }
+                }
+
+        """
+        return get_cache_metrics()
+
+    @action
+    def clear_cache(self, namespace: str):
+        """
+        Clear a shared cache in all the processes.
+
+        :param namespace: Namespace of the cache (e.g.
+            ``youtube.piped.channels``).
+        """
+        get_cache(namespace).clear()
+
     @lru_cache(maxsize=256)  # noqa
     def _get_install_cmds(self, extension: str) -> List[str]:
         getter = get_plugin_class_by_name
@@ -61,6 +61,15 @@ class BluetoothPlugin(RunnablePlugin, EnumSwitchEntityManager):
     _default_scan_duration: Final[float] = 10.0
     """ Default duration of a discovery session (in seconds) """
 
+    _publish_batch_interval: Final[float] = 0.5
+    """
+    How long to wait for more device updates before publishing them as a
+    single batch (in seconds)
+    """
+
+    _max_publish_batch_size: Final[int] = 100
+    """ Maximum number of devices published in a single batch """
+
     def __init__(
         self,
         interface: Optional[str] = None,
@@ -597,16 +606,45 @@ class BluetoothPlugin(RunnablePlugin, EnumSwitchEntityManager):
 
         try:
             while not self.should_stop():
-                try:
-                    device = self._device_queue.get(timeout=1)
-                except Empty:
+                devices = self._get_device_updates()
+                if not devices:
                     continue
 
-                device = self._device_cache.add(device)
-                self.publish_entities([device], callback=self._device_cache.add)
+                self.publish_entities(
+                    [self._device_cache.add(device) for device in devices],
+                    callback=self._device_cache.add,
+                )
         finally:
             self.stop()
 
+    def _get_device_updates(self) -> List[BluetoothDevice]:
+        """
+        Wait for updated devices on the queue, and collect the updates
+        received within ``_publish_batch_interval`` seconds after the first
+        one, so they can be published in a single batch. Only the latest
+        update of each device is returned.
+        """
+        try:
+            device = self._device_queue.get(timeout=1)
+        except Empty:
+            return []
+
+        devices = {device.address: device}
+        deadline = time.time() + self._publish_batch_interval
+        while len(devices) < self._max_publish_batch_size:
+            timeout = deadline - time.time()
+            if timeout <= 0 or self.should_stop():
+                break
+
+            try:
+                device = self._device_queue.get(timeout=timeout)
+            except Empty:
+                break
+
+            devices[device.address] = device
+
+        return list(devices.values())
+
     def stop(self):
         """
         Upon stop request, it stops any pending scans and closes all active
@@ -23,6 +23,7 @@ from .._model import ServiceClass
 from .._plugins import BaseBluetoothPlugin
 from .._types import DevicesBlacklist
 from ._cache import DeviceCache
+from ._filter import AdvertisementFilter
 from ._mappers import device_to_entity
 
 _rssi_update_interval: Final[float] = 30.0
@@ -60,7 +61,7 @@ def _has_changed(
     old_value = getattr(old, attr)
     new_value = getattr(new, attr)
     if tolerance and (old_value is not None and new_value is not None):
-        return abs(new_value - old_value) < tolerance
+        return abs(new_value - old_value) >= tolerance
     return old_value != new_value
 
 
@@ -135,6 +136,7 @@ class EventHandler:
         self._plugins = plugins
         self._exclude_known_noisy_beacons = exclude_known_noisy_beacons
         self._blacklist = blacklist
+        self._filter = AdvertisementFilter(rssi_update_interval=_rssi_update_interval)
 
     def __call__(self, device: BLEDevice, data: AdvertisementData):
         """
@@ -155,16 +157,30 @@ class EventHandler:
         :param data: The advertised data.
         """
 
+        # Skip the packets whose payload hasn't changed since the last one
+        # processed for the same device, unless the device went offline
+        last_state = self._filter.check(device, data)
+        if last_state is not None:
+            if last_state.ignored:
+                return
+
+            existing_entity = self._entity_cache.get(device.address)
+            if existing_entity is not None and existing_entity.reachable:
+                self._device_cache.add(device)
+                return
+
         new_entity = device_to_entity(device, data)
         if self._exclude_known_noisy_beacons and self._is_noisy_beacon(new_entity):
             logger.debug(
                 'exclude_known_noisy_beacons is set to True: skipping beacon from device %s',
                 device.address,
             )
+            self._filter.processed(device, data, ignored=True)
             return
 
         if self._blacklist.matches(new_entity):
             logger.debug('Ignoring blacklisted device: %s', device.address)
+            self._filter.processed(device, data, ignored=True)
             return
 
         # Extend the new entity with children entities added by the plugins
@@ -180,6 +196,7 @@ class EventHandler:
         ]
 
         self._device_cache.add(device)
+        self._filter.processed(device, data)
         for event in events:
             get_bus().post(event)
 
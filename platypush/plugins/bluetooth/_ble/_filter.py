@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import RLock
+from typing import Optional
+
+from bleak.backends.device import BLEDevice
+from bleak.backends.scanner import AdvertisementData
+
+
+@dataclass
+class _AdvertisementState:
+    """
+    Last advertisement processed for a device.
+    """
+
+    fingerprint: int
+    """ Hash of the advertised payload. """
+    rssi: Optional[int]
+    """ RSSI of the advertisement. """
+    processed_at: float
+    """ Monotonic timestamp of when the advertisement was processed. """
+    ignored: bool = False
+    """ Whether the device was discarded (e.g. blacklisted or noisy beacon). """
+
+
+class AdvertisementFilter:
+    """
+    Pre-filter for BLE advertisement packets.
+
+    Most of the advertisements received in a busy environment come from
+    beacons that keep broadcasting the same payload. Mapping each of them to
+    an entity is expensive, so this filter keeps a fingerprint of the last
+    processed payload of each device (name, connection state, TX power,
+    manufacturer data, service data and service UUIDs), and it only lets
+    through the advertisements that either have a new payload, or whose RSSI
+    has changed by at least ``rssi_tolerance`` after at least
+    ``rssi_update_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        rssi_tolerance: float = 5,
+        rssi_update_interval: float = 30,
+        max_devices: int = 10000,
+    ):
+        """
+        :param rssi_tolerance: Minimum RSSI variation that triggers an update.
+        :param rssi_update_interval: Minimum interval between two RSSI-only
+            updates of a device, in seconds.
+        :param max_devices: Maximum number of devices to keep track of. The
+            least recently seen devices are forgotten first (BLE beacons often
+            rotate their addresses).
+        """
+        self._rssi_tolerance = rssi_tolerance
+        self._rssi_update_interval = rssi_update_interval
+        self._max_devices = max_devices
+        self._states: 'OrderedDict[str, _AdvertisementState]' = OrderedDict()
+        self._lock = RLock()
+
+    @staticmethod
+    def fingerprint(device: BLEDevice, data: AdvertisementData) -> int:
+        """
+        :return: A hash of the payload of an advertisement, excluding the
+            RSSI.
+        """
+        details = device.details if isinstance(device.details, dict) else {}
+        props = details.get('props', {}) or {}
+        return hash(
+            (
+                device.name,
+                data.local_name,
+                props.get('Connected'),
+                data.tx_power,
+                tuple(sorted((data.manufacturer_data or {}).items())),
+                tuple(sorted((data.service_data or {}).items())),
+                tuple(sorted(data.service_uuids or [])),
+            )
+        )
+
+    def check(
+        self, device: BLEDevice, data: AdvertisementData
+    ) -> Optional[_AdvertisementState]:
+        """
+        Check an advertisement against the last processed one for the same
+        device.
+
+        :return: None if the advertisement should be processed, otherwise
+            the state of the last processed advertisement.
+        """
+        fingerprint = self.fingerprint(device, data)
+        with self._lock:
+            state = self._states.get(device.address)
+            if state is None or state.fingerprint != fingerprint:
+                return None
+
+            self._states.move_to_end(device.address)
+            if (
+                not state.ignored
+                and data.rssi is not None
+                and state.rssi is not None
+                and abs(data.rssi - state.rssi) >= self._rssi_tolerance
+                and time.monotonic() - state.processed_at >= self._rssi_update_interval
+            ):
+                return None
+
+            return state
+
+    def processed(
+        self, device: BLEDevice, data: AdvertisementData, ignored: bool = False
+    ):
+        """
+        Record an advertisement that has been processed.
+
+        :param ignored: Set if the device has been discarded.
+        """
+        with self._lock:
+            self._states[device.address] = _AdvertisementState(
+                fingerprint=self.fingerprint(device, data),
+                rssi=data.rssi,
+                processed_at=time.monotonic(),
+                ignored=ignored,
+            )
+            self._states.move_to_end(device.address)
+            while len(self._states) > self._max_devices:
+                self._states.popitem(last=False)
+
+    def forget(self, address: str):
+        """
+        Forget the last advertisement of a device, so the next one is
+        processed.
+        """
+        with self._lock:
+            self._states.pop(address, None)
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Collection
 
 import dateutil.parser
@@ -106,16 +107,26 @@ class CalendarPlugin(Plugin, CalendarInterface):
             ]
         """
 
-        events = []
-
-        for calendar in self.calendars:
+        def _get_events(calendar) -> list:
             try:
-                cal_events = calendar.get_upcoming_events().output or []
-                events.extend(cal_events)
+                return (
+                    calendar.get_upcoming_events(max_results=max_results).output or []
+                )
             except Exception as e:
                 self.logger.warning(
                     'Could not retrieve events from calendar %s: %s', calendar, e
                 )
+                return []
+
+        events = []
+        if self.calendars:
+            # Query the calendars concurrently
+            with ThreadPoolExecutor(
+                max_workers=min(len(self.calendars), 8),
+                thread_name_prefix='calendar',
+            ) as executor:
+                for cal_events in executor.map(_get_events, self.calendars):
+                    events.extend(cal_events)
 
         events = sorted(
             events,
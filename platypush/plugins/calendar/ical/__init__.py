@@ -1,43 +1,84 @@
 import datetime
-from typing import Optional
-
-import requests
-from dateutil.tz import gettz
+import hashlib
+import time
+from threading import RLock
+from typing import Dict, List, Optional, Set
 
 from platypush.plugins import Plugin, action
 from platypush.plugins.calendar import CalendarInterface
 from platypush.utils import utcnow
 
+from ._index import EventIntervalIndex, ParsedEvent, expand_occurrences, to_aware
+
 
 class CalendarIcalPlugin(Plugin, CalendarInterface):
     """
     iCal calendars plugin. Interact with remote calendars in iCal format.
+
+    The calendar is downloaded through conditional requests and parsed only
+    when it changes. Recurring events are expanded within a time window, and
+    the occurrences are indexed in memory, so upcoming events can be queried
+    without walking the whole calendar.
     """
 
-    def __init__(self, url, *args, **kwargs):
+    def __init__(
+        self,
+        url,
+        *args,
+        refresh_interval: float = 300,
+        expansion_days: int = 365,
+        **kwargs,
+    ):
         """
         :param url: iCal URL to parse
         :type url: str
+        :param refresh_interval: How long the calendar is served from memory
+            before checking the URL for updates, in seconds (default: 300).
+        :param expansion_days: Recurring events are expanded up to this number
+            of days in the future (default: 365).
         """
         super().__init__(*args, **kwargs)
         self.url = url
+        self.refresh_interval = refresh_interval
+        self.expansion_days = expansion_days
+        self._lock = RLock()
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._digest: Optional[str] = None
+        self._events: Optional[List[ParsedEvent]] = None
+        self._last_refresh = 0.0
+        self._index: Optional[EventIntervalIndex[dict]] = None
+        self._index_end: Optional[datetime.datetime] = None
 
     @staticmethod
-    def _convert_timestamp(event: dict, attribute: str) -> Optional[str]:
+    def _to_datetime(value) -> datetime.datetime:
+        """
+        Convert an iCal date/datetime to a datetime. All-day and floating
+        times are returned as naive datetimes.
+        """
+        if isinstance(value, datetime.date) and not isinstance(
+            value, datetime.datetime
+        ):
+            return datetime.datetime(value.year, value.month, value.day)
+        return value
+
+    @staticmethod
+    def _format_timestamp(dt: Optional[datetime.datetime], all_day=False):
+        if dt is None:
+            return None
+        if all_day:
+            return to_aware(dt).isoformat()
+        return to_aware(dt).astimezone(datetime.timezone.utc).isoformat()
+
+    @classmethod
+    def _convert_timestamp(cls, event: dict, attribute: str) -> Optional[str]:
         t = event.get(attribute)
         if not t:
             return None
 
-        if isinstance(t.dt, datetime.date) and not isinstance(t.dt, datetime.datetime):
-            return datetime.datetime(
-                t.dt.year, t.dt.month, t.dt.day, tzinfo=gettz()
-            ).isoformat()
-
-        return (
-            datetime.datetime.fromtimestamp(t.dt.timestamp())
-            .replace(tzinfo=t.dt.tzinfo or gettz())
-            .astimezone(datetime.timezone.utc)
-            .isoformat()
+        return cls._format_timestamp(
+            cls._to_datetime(t.dt),
+            all_day=not isinstance(t.dt, datetime.datetime),
         )
 
     @classmethod
@@ -75,44 +116,232 @@ class CalendarIcalPlugin(Plugin, CalendarInterface):
             },
         }
 
-    @action
-    def get_upcoming_events(self, *_, only_participating=True, **__):
-        """
-        Get the upcoming events. See
-        :meth:`platypush.plugins.calendar.CalendarPlugin.get_upcoming_events`.
-        """
+    @classmethod
+    def _get_dates(cls, event, attribute: str) -> List[datetime.datetime]:
+        values = event.get(attribute)
+        if not values:
+            return []
+        if not isinstance(values, list):
+            values = [values]
 
+        return [cls._to_datetime(d.dt) for value in values for d in value.dts]
+
+    @classmethod
+    def _parse_event(cls, event) -> Optional[ParsedEvent]:
+        if not event.get('dtstart'):
+            return None
+
+        start_value = event.get('dtstart').dt
+        all_day = not isinstance(start_value, datetime.datetime)
+        start = cls._to_datetime(start_value)
+
+        if event.get('dtend'):
+            end = cls._to_datetime(event.get('dtend').dt)
+        elif event.get('duration'):
+            end = start + event.get('duration').dt
+        else:
+            # RFC 5545: all-day events without an end last one day
+            end = start + datetime.timedelta(days=1 if all_day else 0)
+
+        data = cls._translate_event(event)
+        data['end']['dateTime'] = cls._format_timestamp(end, all_day=all_day)
+        rrule = event.get('rrule')
+        recurrence_id = event.get('recurrence-id')
+
+        return ParsedEvent(
+            uid=data['id'],
+            data=data,
+            start=start,
+            end=end,
+            all_day=all_day,
+            rrule=rrule.to_ical().decode() if rrule else None,
+            rdates=cls._get_dates(event, 'rdate'),
+            exdates=cls._get_dates(event, 'exdate'),
+            recurrence_id=(
+                cls._to_datetime(recurrence_id.dt) if recurrence_id else None
+            ),
+        )
+
+    def _parse_calendar(self, ics: str) -> List[ParsedEvent]:
         from icalendar import Calendar
 
         events = []
-        response = requests.get(self.url, timeout=20)
+        calendar = Calendar.from_ical(ics)
+        for event in calendar.walk('VEVENT'):
+            try:
+                parsed = self._parse_event(event)
+            except Exception as e:
+                self.logger.warning(
+                    'Could not parse event %s from %s: %s',
+                    event.get('uid'),
+                    self.url,
+                    e,
+                )
+                continue
+
+            if parsed:
+                events.append(parsed)
+
+        return events
+
+    def _refresh(self) -> bool:
+        """
+        Check the calendar URL for updates.
+
+        :return: True if the calendar has changed.
+        """
+        headers = {}
+        if self._events is not None:
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+
+        response = self._http.get(self.url, headers=headers, timeout=20)
+        if response.status_code == 304 and self._events is not None:
+            return False
+
         if not (response.ok):
             raise AssertionError(
                 f"HTTP error while getting events from {self.url}: {response.text}"
             )
 
-        calendar = Calendar.from_ical(response.text)
-        for event in calendar.walk():
-            if event.name != 'VEVENT':
-                continue  # Not an event
+        self._etag = response.headers.get('ETag')
+        self._last_modified = response.headers.get('Last-Modified')
+        digest = hashlib.sha256(response.content).hexdigest()
+        if digest == self._digest and self._events is not None:
+            return False
 
-            event = self._translate_event(event)
+        self._events = self._parse_calendar(response.text)
+        self._digest = digest
+        self.logger.debug('Parsed %d events from %s', len(self._events), self.url)
+        return True
 
-            if (
-                event['status'] != 'cancelled'
-                and event['end'].get('dateTime')
-                and datetime.datetime.fromisoformat(event['end']['dateTime'])
-                >= utcnow()
-                and (
+    def _build_index(self, now: datetime.datetime) -> EventIntervalIndex[dict]:
+        window_start = now - datetime.timedelta(days=1)
+        window_end = now + datetime.timedelta(days=self.expansion_days)
+        events = self._events or []
+
+        # Occurrences of recurring events that have been modified or moved
+        overrides: Dict[Optional[str], Set[float]] = {}
+        for event in events:
+            if event.recurrence_id:
+                overrides.setdefault(event.uid, set()).add(
+                    to_aware(event.recurrence_id).timestamp()
+                )
+
+        intervals = []
+        for event in events:
+            if event.recurrence_id or not event.is_recurring:
+                start, end = to_aware(event.start), to_aware(event.end)
+                if end >= window_start:
+                    intervals.append((start.timestamp(), end.timestamp(), event.data))
+                continue
+
+            try:
+                occurrences = expand_occurrences(event, window_start, window_end)
+            except Exception as e:
+                self.logger.warning(
+                    'Could not expand the recurring event %s: %s', event.uid, e
+                )
+                occurrences = [(event.start, event.end)]
+
+            skip = overrides.get(event.uid, set())
+            for start, end in occurrences:
+                start, end = to_aware(start), to_aware(end)
+                if start.timestamp() in skip:
+                    continue
+
+                intervals.append(
                     (
-                        only_participating
-                        and event.get('responseStatus')
-                        in [None, 'accepted', 'tentative']
+                        start.timestamp(),
+                        end.timestamp(),
+                        {
+                            **event.data,
+                            'id': f'{event.uid}_{start.astimezone(datetime.timezone.utc):%Y%m%dT%H%M%SZ}',
+                            'recurringEventId': event.uid,
+                            'start': {
+                                **event.data['start'],
+                                'dateTime': self._format_timestamp(
+                                    start, all_day=event.all_day
+                                ),
+                            },
+                            'end': {
+                                **event.data['end'],
+                                'dateTime': self._format_timestamp(
+                                    end, all_day=event.all_day
+                                ),
+                            },
+                        },
                     )
-                    or not only_participating
                 )
+
+        self._index_end = window_end
+        return EventIntervalIndex(intervals)
+
+    def _get_index(self) -> EventIntervalIndex[dict]:
+        with self._lock:
+            now = utcnow()
+            if (
+                self._events is None
+                or time.time() - self._last_refresh >= self.refresh_interval
+            ):
+                try:
+                    if self._refresh():
+                        self._index = None
+                except Exception as e:
+                    if self._events is None:
+                        raise e
+                    self.logger.warning(
+                        'Could not refresh the calendar %s, using the cached '
+                        'events: %s',
+                        self.url,
+                        e,
+                    )
+
+                self._last_refresh = time.time()
+
+            # Re-expand the recurring events once half of the window has elapsed
+            if (
+                self._index is None
+                or self._index_end is None
+                or self._index_end - now
+                < datetime.timedelta(days=self.expansion_days / 2)
+            ):
+                self._index = self._build_index(now)
+
+            return self._index
+
+    @action
+    def get_upcoming_events(
+        self,
+        *_,
+        max_results: Optional[int] = None,
+        only_participating=True,
+        **__,
+    ):
+        """
+        Get the upcoming events. See
+        :meth:`platypush.plugins.calendar.CalendarPlugin.get_upcoming_events`.
+
+        :param max_results: Maximum number of events to be returned (default:
+            all the upcoming events within the expansion window).
+        :param only_participating: Only return the events that the user has
+            accepted or tentatively accepted (default: True).
+        """
+
+        events = []
+        index = self._get_index()
+        for event in index.overlapping(utcnow().timestamp()):
+            if event['status'] == 'cancelled' or (
+                only_participating
+                and event.get('responseStatus') not in [None, 'accepted', 'tentative']
             ):
-                events.append(event)
+                continue
+
+            events.append(dict(event))
+            if max_results is not None and len(events) >= max_results:
+                break
 
         return events
 
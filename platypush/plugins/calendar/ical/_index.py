@@ -0,0 +1,142 @@
+import datetime
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from dateutil.rrule import rruleset, rrulestr
+from dateutil.tz import gettz
+
+T = TypeVar('T')
+
+
+@dataclass
+class ParsedEvent:
+    """
+    A ``VEVENT`` parsed from an iCal calendar, with its recurrence rules.
+
+    ``start`` and ``end`` are naive datetimes for all-day and floating events,
+    and timezone-aware datetimes otherwise.
+    """
+
+    uid: Optional[str]
+    data: dict
+    start: datetime.datetime
+    end: datetime.datetime
+    all_day: bool = False
+    rrule: Optional[str] = None
+    rdates: List[datetime.datetime] = field(default_factory=list)
+    exdates: List[datetime.datetime] = field(default_factory=list)
+    recurrence_id: Optional[datetime.datetime] = None
+
+    @property
+    def is_recurring(self) -> bool:
+        return bool(self.rrule or self.rdates)
+
+
+def to_aware(dt: datetime.datetime) -> datetime.datetime:
+    """
+    Naive (all-day or floating) times are interpreted in the local timezone.
+    """
+    return dt if dt.tzinfo else dt.replace(tzinfo=gettz())
+
+
+def _match_tz(dt: datetime.datetime, ref: datetime.datetime) -> datetime.datetime:
+    """
+    Convert ``dt`` to the same kind (naive/aware) of datetime as ``ref``.
+    """
+    if ref.tzinfo:
+        return to_aware(dt)
+    if dt.tzinfo:
+        return dt.astimezone(gettz()).replace(tzinfo=None)
+    return dt
+
+
+def expand_occurrences(
+    event: ParsedEvent,
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    max_occurrences: int = 5000,
+) -> List[Tuple[datetime.datetime, datetime.datetime]]:
+    """
+    Expand the occurrences of a recurring event that overlap a time window.
+
+    :param event: The recurring event.
+    :param window_start: Start of the window (timezone-aware).
+    :param window_end: End of the window (timezone-aware).
+    :param max_occurrences: Maximum number of expanded occurrences.
+    :return: A list of ``(start, end)`` tuples.
+    """
+    duration = event.end - event.start
+    dtstart = event.start
+    rules = rruleset()
+    if event.rrule:
+        try:
+            rule = rrulestr(event.rrule, dtstart=dtstart)
+        except ValueError:
+            # UNTIL expressed in UTC for a floating event
+            dtstart = to_aware(dtstart)
+            rule = rrulestr(event.rrule, dtstart=dtstart)
+
+        rules.rrule(rule)  # type: ignore
+    else:
+        rules.rdate(dtstart)
+
+    for rdate in event.rdates:
+        rules.rdate(_match_tz(rdate, dtstart))
+    for exdate in event.exdates:
+        rules.exdate(_match_tz(exdate, dtstart))
+
+    # Include the occurrences that started before the window but haven't
+    # ended yet
+    occurrences = []
+    for start in rules.xafter(_match_tz(window_start, dtstart) - duration, inc=True):
+        if start > _match_tz(window_end, dtstart):
+            break
+
+        occurrences.append((start, start + duration))
+        if len(occurrences) >= max_occurrences:
+            break
+
+    return occurrences
+
+
+class EventIntervalIndex(Generic[T]):
+    """
+    Static index of time intervals, sorted by start time.
+
+    An interval overlaps ``[t0, t1]`` if it starts before ``t1`` and ends after
+    ``t0``. Since no interval lasts longer than the longest one in the index,
+    only the intervals that start after ``t0 - max_duration`` need to be
+    checked, and that position is found through a binary search.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[float, float, T]]):
+        """
+        :param intervals: ``(start, end, item)`` tuples, with start and end
+            expressed as UNIX timestamps.
+        """
+        entries = sorted(intervals, key=lambda interval: interval[:2])
+        self._starts = [entry[0] for entry in entries]
+        self._ends = [entry[1] for entry in entries]
+        self._items = [entry[2] for entry in entries]
+        self._max_duration = max(
+            (end - start for start, end, _ in entries), default=0.0
+        )
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def overlapping(self, t0: float, t1: float = float('inf')) -> Iterator[T]:
+        """
+        Iterate, in order of start time, over the items whose interval
+        overlaps ``[t0, t1]``.
+        """
+        i = bisect_left(self._starts, t0 - self._max_duration)
+        n = len(self._starts)
+        while i < n and self._starts[i] <= t1:
+            if self._ends[i] >= t0:
+                yield self._items[i]
+            i += 1
+
+
+# vim:sw=4:ts=4:et:
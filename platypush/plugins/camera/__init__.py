@@ -20,6 +20,7 @@ from platypush.message.event.camera import (
     CameraVideoRenderedEvent,
 )
 from platypush.plugins import RunnablePlugin, action
+from platypush.plugins.camera.model.broadcaster import FrameConsumer
 from platypush.plugins.camera.model.camera import CameraInfo, Camera
 from platypush.plugins.camera.model.exceptions import (
     CameraException,
@@ -39,6 +40,7 @@ __all__ = [
     'CameraException',
     'CameraPlugin',
     'CaptureAlreadyRunningException',
+    'FrameConsumer',
     'VideoWriter',
     'StreamWriter',
     'PreviewWriter',
@@ -187,6 +189,7 @@ class CameraPlugin(RunnablePlugin, ABC):
 
         self._devices: Dict[Union[int, str], Camera] = {}
         self._streams: Dict[Union[int, str], Camera] = {}
+        self._streams_lock = threading.RLock()
 
     def _merge_info(self, **info) -> CameraInfo:
         merged_info = self.camera_info.clone()
@@ -726,7 +729,7 @@ class CameraPlugin(RunnablePlugin, ABC):
                     camera.info.listen_port,
                 )
             )
-            srv_sock.listen(1)
+            srv_sock.listen(socket.SOMAXCONN)
             srv_sock.settimeout(1)
             yield srv_sock
 
@@ -743,9 +746,10 @@ class CameraPlugin(RunnablePlugin, ABC):
     def streaming_thread(
         self, camera: Camera, stream_format: str, duration: Optional[float] = None
     ):
+        clients = []
+
         with self._prepare_server_socket(camera) as srv_sock:
             streaming_started_time = time.time()
-            sock, fp = None, None
             self.logger.info('Starting streaming on port %s', camera.info.listen_port)
 
             try:
@@ -757,18 +761,27 @@ class CameraPlugin(RunnablePlugin, ABC):
                     if duration and time.time() - streaming_started_time >= duration:
                         break
 
+                    clients = [client for client in clients if client.is_alive()]
                     sock, fp = self._accept_client(srv_sock)
                     if not (sock and fp):
                         continue
 
                     if duration and time.time() - streaming_started_time >= duration:
+                        sock.close()
                         break
 
-                    self._streaming_loop(
-                        camera, stream_format, sock=fp, duration=duration
+                    client = threading.Thread(
+                        target=self._streaming_loop,
+                        args=(camera, stream_format),
+                        kwargs={'sock': fp, 'duration': duration},
+                        daemon=True,
                     )
+                    client.start()
+                    clients.append(client)
             finally:
-                self._cleanup_stream(camera, srv_sock, fp)
+                self._cleanup_stream(camera, srv_sock)
+                for client in clients:
+                    client.join(timeout=5.0)
 
         self.logger.info('Stopped camera stream')
 
@@ -785,39 +798,125 @@ class CameraPlugin(RunnablePlugin, ABC):
         sock: IO,
         duration: Optional[float] = None,
     ):
-        if camera.info.device not in self._devices:
-            info = asdict(camera.info)
-            info['stream_format'] = stream_format
-            camera = self.open_device(stream=True, **info)
-
-        if not (camera.stream):
-            raise AssertionError('No camera stream available')
-        camera.stream.sock = sock
-        self.start_camera(camera, duration=duration, frames_dir=None, image_file=None)
-        self._wait_stream_stop(camera)
-
-    def _cleanup_stream(
-        self, camera: Camera, server_socket: socket.socket, client: Optional[IO]
-    ):
-        camera.stream_event.clear()
-        camera.stop_stream_event.set()
+        info = asdict(camera.info)
+        info['stream_format'] = stream_format
 
-        if client:
+        try:
+            with self.subscribe_stream(
+                name=str(getattr(sock, 'name', sock)), duration=duration, **info
+            ) as consumer:
+                for frame in consumer:
+                    if camera.stop_stream_event.is_set() or self.should_stop():
+                        break
+
+                    sock.write(frame)
+        except (ConnectionError, OSError, ValueError):
+            self.logger.info('Client connection closed')
+        finally:
             try:
-                client.close()
+                sock.close()
             except Exception as e:
-                self.logger.warning('Error on client socket close: %s', e)
+                self.logger.debug('Error on client socket close: %s', e)
+
+    def subscribe_stream(
+        self,
+        device: Optional[Union[int, str]] = None,
+        stream_format: Optional[str] = None,
+        name: Optional[str] = None,
+        duration: Optional[float] = None,
+        **info,
+    ) -> FrameConsumer:
+        """
+        Subscribe to the encoded frames of a camera stream.
+
+        If a capture session with the same stream format is already running
+        on the device then the new consumer is attached to it, so frames are
+        captured and encoded only once regardless of the number of consumers.
+        Otherwise a new capture session is started. The capture session is
+        stopped when the last consumer is closed.
+
+        :param device: Capture device by name, path or ID.
+        :param stream_format: Stream format (default: configured
+            ``stream_format``).
+        :param name: Consumer name, for logging purposes.
+        :param duration: Duration of the capture session, if a new session is
+            started.
+        :param info: Camera parameters override - see constructors parameters.
+        :return: A :class:`platypush.plugins.camera.model.broadcaster.FrameConsumer`.
+        """
+        if device is None:
+            device = self.camera_info.device
+        stream_format = stream_format or self.camera_info.stream_format
+        info.pop('frames_dir', None)
+
+        with self._streams_lock:
+            camera = self._devices.get(device)
+            if (
+                camera
+                and not camera.start_event.is_set()
+                and camera.capture_thread
+                and camera.capture_thread.is_alive()
+            ):
+                # A capture session is being stopped
+                self.wait_capture(camera)
+                camera = self._devices.get(device)
+
+            if not (
+                camera
+                and camera.stream
+                and not camera.stream.closed
+                and not camera.stream.broadcaster.closed
+                and camera.info.stream_format == stream_format
+            ):
+                camera = self.open_device(
+                    device,
+                    stream=True,
+                    stream_format=stream_format,
+                    frames_dir=None,
+                    **info,
+                )
+
+            if not camera.stream:
+                raise AssertionError('No camera stream available')
+
+            broadcaster = camera.stream.broadcaster
+            broadcaster.on_idle = lambda *_: self._on_stream_idle(camera)
+            consumer = broadcaster.subscribe(name)
+
+            if not (camera.capture_thread and camera.capture_thread.is_alive()):
+                self.start_camera(
+                    camera, duration=duration, frames_dir=None, image_file=None
+                )
+
+        return consumer
+
+    def _on_stream_idle(self, camera: Camera):
+        self.logger.info(
+            'No more consumers on the stream of %s, stopping the capture',
+            camera.info.device,
+        )
+        camera.start_event.clear()
+
+    def _cleanup_stream(self, camera: Camera, server_socket: socket.socket):
+        camera.stream_event.clear()
+        camera.stop_stream_event.set()
 
         try:
             server_socket.close()
         except Exception as e:
             self.logger.warning('Error on server socket close: %s', e)
 
-        if camera.stream:
-            try:
-                camera.stream.close()
-            except Exception as e:
-                self.logger.warning('Error while closing the encoding stream: %s', e)
+        # The capture session may have been re-opened by a new client
+        active_camera = self._devices.get(camera.info.device)
+        streams = {camera.stream, active_camera.stream if active_camera else None}
+        for stream in streams:
+            if stream:
+                try:
+                    stream.close()
+                except Exception as e:
+                    self.logger.warning(
+                        'Error while closing the encoding stream: %s', e
+                    )
 
     @action
     def start_streaming(
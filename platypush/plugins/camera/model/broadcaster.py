@@ -0,0 +1,189 @@
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Iterator, Optional, Set, Tuple
+
+
+class FrameConsumer:
+    """
+    A consumer of the frames published by a :class:`FrameBroadcaster`.
+
+    Each consumer keeps track of the sequence number of the last frame it has
+    read. If it falls behind the ring buffer of the broadcaster (i.e. it's
+    slower than the capture) then the frames that have been overwritten in
+    the meantime are skipped.
+    """
+
+    def __init__(self, broadcaster: 'FrameBroadcaster', name: Optional[str] = None):
+        self.broadcaster = broadcaster
+        self.name = name
+        self.seq = broadcaster.last_seq
+        self.dropped_frames = 0
+        self.closed = False
+
+    def get(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Wait for the next frame.
+
+        :param timeout: Maximum time to wait, in seconds (default: no limit).
+        :return: The encoded frame, or None if the timeout expired or the
+            consumer/broadcaster has been closed.
+        """
+        return self.broadcaster.next_frame(self, timeout=timeout)
+
+    def __iter__(self) -> Iterator[bytes]:
+        while not (self.closed or self.broadcaster.closed):
+            frame = self.get(timeout=1)
+            if frame:
+                yield frame
+
+    def close(self):
+        """
+        Unsubscribe the consumer from the broadcaster.
+        """
+        if not self.closed:
+            self.closed = True
+            self.broadcaster.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_, **__):
+        self.close()
+
+
+class FrameBroadcaster:
+    """
+    Distributes the encoded frames of a camera stream to multiple consumers.
+
+    Frames are captured and encoded once, and they are stored in a ring buffer
+    shared by all the consumers. When the last consumer unsubscribes the
+    ``on_idle`` callback is invoked - usually to stop the capture session.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = 30,
+        on_idle: Optional[Callable[['FrameBroadcaster'], None]] = None,
+    ):
+        """
+        :param buffer_size: Maximum number of frames kept in the ring buffer.
+        :param on_idle: Callback invoked when the last consumer unsubscribes.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.on_idle = on_idle
+        self.closed = False
+        self._frames: Deque[Tuple[int, bytes]] = deque(maxlen=max(1, buffer_size))
+        self._seq = 0
+        self._consumers: Set[FrameConsumer] = set()
+        self._ready = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        """
+        Sequence number of the last published frame.
+        """
+        return self._seq
+
+    @property
+    def consumers(self) -> int:
+        """
+        Number of active consumers.
+        """
+        with self._ready:
+            return len(self._consumers)
+
+    def publish(self, frame: bytes):
+        """
+        Publish a new encoded frame to all the consumers.
+        """
+        if not frame:
+            return
+
+        with self._ready:
+            if self.closed:
+                return
+
+            self._seq += 1
+            self._frames.append((self._seq, frame))
+            self._ready.notify_all()
+
+    def subscribe(self, name: Optional[str] = None) -> FrameConsumer:
+        """
+        Register a new consumer. The consumer will receive the frames
+        published after the subscription.
+        """
+        with self._ready:
+            if self.closed:
+                raise AssertionError('The camera stream has been closed')
+
+            consumer = FrameConsumer(self, name=name)
+            self._consumers.add(consumer)
+
+        self.logger.debug('New stream consumer: %s', name)
+        return consumer
+
+    def unsubscribe(self, consumer: FrameConsumer):
+        """
+        Unregister a consumer, and invoke ``on_idle`` if it was the last one.
+        """
+        with self._ready:
+            if consumer not in self._consumers:
+                return
+
+            self._consumers.remove(consumer)
+            consumer.closed = True
+            idle = not self._consumers and not self.closed
+            self._ready.notify_all()
+
+        if consumer.dropped_frames:
+            self.logger.debug(
+                'Stream consumer %s disconnected, %d dropped frames',
+                consumer.name,
+                consumer.dropped_frames,
+            )
+
+        if idle and self.on_idle:
+            try:
+                self.on_idle(self)
+            except Exception as e:
+                self.logger.warning('Error on stream idle callback: %s', e)
+
+    def next_frame(
+        self, consumer: FrameConsumer, timeout: Optional[float] = None
+    ) -> Optional[bytes]:
+        """
+        Wait for the next frame for a consumer.
+        """
+        with self._ready:
+            if not self._ready.wait_for(
+                lambda: self._seq > consumer.seq or self.closed or consumer.closed,
+                timeout=timeout,
+            ):
+                return None
+
+            if self.closed or consumer.closed or not self._frames:
+                return None
+
+            oldest_seq = self._frames[0][0]
+            seq = consumer.seq + 1
+            if seq < oldest_seq:
+                # The consumer is lagging behind the ring buffer
+                consumer.dropped_frames += oldest_seq - seq
+                seq = oldest_seq
+
+            consumer.seq = seq
+            return self._frames[seq - oldest_seq][1]
+
+    def close(self):
+        """
+        Close the broadcaster and wake up all the consumers.
+        """
+        with self._ready:
+            self.closed = True
+            self._consumers.clear()
+            self._frames.clear()
+            self._ready.notify_all()
+
+
+# vim:sw=4:ts=4:et:
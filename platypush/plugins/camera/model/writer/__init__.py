@@ -6,6 +6,7 @@ import time
 from abc import ABC, abstractmethod
 from typing import Optional, IO
 
+from platypush.plugins.camera.model.broadcaster import FrameBroadcaster
 from platypush.utils import get_redis
 
 
@@ -71,6 +72,9 @@ class FileVideoWriter(VideoWriter, ABC):
 class StreamWriter(VideoWriter, ABC):
     """
     Abstract class for camera streaming operations.
+
+    Each frame is encoded once and published to :attr:`.broadcaster`, which
+    distributes it to all the consumers of the stream.
     """
 
     def __init__(
@@ -87,6 +91,7 @@ class StreamWriter(VideoWriter, ABC):
         self.ready = multiprocessing.Condition()
         self.redis_queue = redis_queue
         self.sock = sock
+        self.broadcaster = FrameBroadcaster()
 
     def write(self, image):
         data = self.encode(image)
@@ -105,6 +110,7 @@ class StreamWriter(VideoWriter, ABC):
             return self.buffer.write(data)
 
     def _sock_send(self, data):
+        self.broadcaster.publish(data)
         if self.sock and data:
             try:
                 self.sock.write(data)
@@ -127,6 +133,7 @@ class StreamWriter(VideoWriter, ABC):
 
     def close(self):
         self.buffer.close()
+        self.broadcaster.close()
         if self.sock:
             try:
                 self.sock.close()
@@ -1,25 +1,107 @@
-from typing import Optional, Dict
+import os
+import re
+from threading import RLock
+from typing import Dict, List, Optional, Tuple, Union
 
-from platypush.plugins import Plugin, action
+from platypush.config import Config
+from platypush.plugins import RunnablePlugin, action
 
+from ._sender import GraphiteSender
 
-class GraphitePlugin(Plugin):
+
+class GraphitePlugin(RunnablePlugin):
     """
     Plugin for sending data to a Graphite instance.
+
+    Metrics are sent through a long-lived sender for each combination of
+    host, port, protocol and prefix. The senders keep their connections open
+    and send the metrics in batches from a background thread, so the
+    ``send`` and ``send_many`` actions return as soon as the metrics are
+    queued. The queued metrics are flushed (or spilled to disk, if
+    configured) when the plugin is stopped.
     """
 
     def __init__(
-        self, host: str = 'localhost', port: int = 2003, timeout: int = 5, **kwargs
+        self,
+        host: str = 'localhost',
+        port: int = 2003,
+        timeout: int = 5,
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        buffer_size: int = 100000,
+        spill_to_disk: bool = False,
+        spill_max_size: int = 16 * 1024 * 1024,
+        **kwargs,
     ):
         """
         :param host: Default Graphite host (default: 'localhost').
         :param port: Default Graphite port (default: 2003).
         :param timeout: Communication timeout in seconds (default: 5).
+        :param flush_interval: How often the queued metrics are sent, in
+            seconds (default: 1).
+        :param batch_size: Maximum number of metrics sent in a single payload
+            (default: 1000).
+        :param buffer_size: Maximum number of metrics kept in memory while
+            Graphite is unreachable. Once the buffer is full, the oldest
+            metrics are dropped (default: 100000).
+        :param spill_to_disk: If True, the metrics that don't fit in the
+            buffer are stored under ``<WORKDIR>/graphite`` instead of being
+            dropped, and they are sent once Graphite is reachable again
+            (default: False).
+        :param spill_max_size: Maximum size of the metrics stored on disk for
+            each sender, in bytes (default: 16 MB).
         """
         super().__init__(**kwargs)
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.spill_to_disk = spill_to_disk
+        self.spill_max_size = spill_max_size
+        self._senders: Dict[Tuple[str, int, str, str], GraphiteSender] = {}
+        self._senders_lock = RLock()
+
+    def _get_spill_file(self, host: str, port: int, protocol: str, prefix: str):
+        name = re.sub(r'[^\w.-]', '_', f'{host}_{port}_{protocol}_{prefix}')
+        return os.path.join(Config.get_workdir(), 'graphite', f'{name}.spill')
+
+    def _get_sender(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        prefix: str = '',
+        protocol: str = 'tcp',
+        timeout: Optional[float] = None,
+    ) -> GraphiteSender:
+        host = host or self.host
+        port = port or self.port
+        protocol = protocol.lower()
+        key = (host, port, protocol, prefix)
+
+        with self._senders_lock:
+            sender = self._senders.get(key)
+            if sender is None or not sender.is_alive():
+                sender = self._senders[key] = GraphiteSender(
+                    host,
+                    port=port,
+                    protocol=protocol,
+                    prefix=prefix,
+                    timeout=timeout or self.timeout,
+                    flush_interval=self.flush_interval,
+                    batch_size=self.batch_size,
+                    buffer_size=self.buffer_size,
+                    spill_file=(
+                        self._get_spill_file(host, port, protocol, prefix)
+                        if self.spill_to_disk
+                        else None
+                    ),
+                    spill_max_size=self.spill_max_size,
+                )
+                sender.start()
+
+        return sender
 
     @action
     def send(
@@ -32,6 +114,7 @@ class GraphitePlugin(Plugin):
         tags: Optional[Dict[str, str]] = None,
         prefix: str = '',
         protocol: str = 'tcp',
+        timestamp: Optional[float] = None,
     ):
         """
         Send data to a Graphite instance.
@@ -44,22 +127,124 @@ class GraphitePlugin(Plugin):
         :param tags: Map of tags for the metric.
         :param prefix: Metric prefix name (default: empty string).
         :param protocol: Communication protocol - possible values: 'tcp', 'udp' (default: 'tcp').
+        :param timestamp: UNIX timestamp of the value (default: now).
         """
-        import graphyte
+        self._get_sender(
+            host=host, port=port, prefix=prefix, protocol=protocol, timeout=timeout
+        ).send(metric, value, timestamp=timestamp, tags=tags)
 
-        host = host or self.host
-        port = port or self.port
-        tags = tags or {}
-        protocol = protocol.lower()
+    @action
+    def send_many(
+        self,
+        metrics: Union[List[dict], Dict[str, float]],
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        timeout: Optional[int] = None,
+        tags: Optional[Dict[str, str]] = None,
+        prefix: str = '',
+        protocol: str = 'tcp',
+        timestamp: Optional[float] = None,
+    ):
+        """
+        Send multiple metrics to a Graphite instance in one go.
+
+        :param metrics: Either a ``{metric: value}`` map, or a list of
+            metrics in the format:
 
-        graphyte.init(
-            host,
-            port=port,
-            prefix=prefix,
-            protocol=protocol,
-            timeout=timeout or self.timeout,
+            .. code-block:: json
+
+                [
+                    {
+                        "metric": "system.cpu.percent",
+                        "value": 12.5,
+                        "timestamp": 1700000000,
+                        "tags": {"host": "rpi"}
+                    }
+                ]
+
+            ``timestamp`` and ``tags`` are optional, and the tags of each
+            metric are merged with the common ``tags``.
+
+        :param host: Graphite host (default: default configured ``host``).
+        :param port: Graphite port (default: default configured ``port``).
+        :param timeout: Timeout in seconds.
+        :param tags: Tags applied to all the metrics.
+        :param prefix: Metric prefix name (default: empty string).
+        :param protocol: Communication protocol - possible values: 'tcp', 'udp' (default: 'tcp').
+        :param timestamp: Default UNIX timestamp of the values (default: now).
+        """
+        if isinstance(metrics, dict):
+            metrics = [
+                {'metric': metric, 'value': value} for metric, value in metrics.items()
+            ]
+
+        sender = self._get_sender(
+            host=host, port=port, prefix=prefix, protocol=protocol, timeout=timeout
+        )
+
+        sender.send_lines(
+            [
+                sender.format(
+                    m['metric'],
+                    m['value'],
+                    timestamp=m.get('timestamp', timestamp),
+                    tags={**(tags or {}), **(m.get('tags') or {})},
+                )
+                for m in metrics
+            ]
         )
-        graphyte.send(metric, value, tags=tags)
+
+    @action
+    def flush(self):
+        """
+        Send the queued metrics immediately.
+        """
+        with self._senders_lock:
+            senders = list(self._senders.values())
+
+        for sender in senders:
+            sender.flush()
+
+    @action
+    def get_stats(self) -> List[dict]:
+        """
+        Get the statistics of the Graphite senders.
+
+        :return: Example:
+
+            .. code-block:: json
+
+                [
+                    {
+                        "host": "localhost",
+                        "port": 2003,
+                        "protocol": "tcp",
+                        "prefix": "",
+                        "buffered": 0,
+                        "sent": 12410,
+                        "dropped": 0,
+                        "spilled": 0,
+                        "errors": 1
+                    }
+                ]
+
+        """
+        with self._senders_lock:
+            return [sender.stats for sender in self._senders.values()]
+
+    def main(self):
+        # The metrics are sent by the senders' threads
+        self.wait_stop()
+
+    def stop(self):
+        with self._senders_lock:
+            senders = list(self._senders.values())
+            self._senders.clear()
+
+        for sender in senders:
+            sender.stop(timeout=self._stop_timeout)
+
+        super().stop()
 
 
 # vim:sw=4:ts=4:et:
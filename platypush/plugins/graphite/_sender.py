@@ -0,0 +1,339 @@
+import os
+import socket
+import time
+from collections import deque
+from logging import getLogger
+from threading import Condition, Thread
+from typing import Any, Deque, Dict, Iterable, List, Optional, Union
+
+
+class GraphiteSender(Thread):
+    """
+    Long-lived, batched sender for the Graphite plaintext protocol.
+
+    Metrics are formatted and queued in a bounded in-memory buffer, and a
+    background thread sends them in multi-line payloads, either every
+    ``flush_interval`` seconds or as soon as ``batch_size`` metrics are
+    queued. TCP connections are kept open across flushes.
+
+    When Graphite is unreachable, the metrics stay in the buffer and the
+    sender retries with an exponential backoff. Once the buffer is full, the
+    oldest metrics are either dropped or, if ``spill_file`` is set, moved to
+    a file on disk that is replayed when the connection is restored.
+    """
+
+    _max_udp_payload = 8192
+    _max_backoff = 60.0
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 2003,
+        protocol: str = 'tcp',
+        prefix: str = '',
+        timeout: float = 5,
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        buffer_size: int = 100000,
+        spill_file: Optional[str] = None,
+        spill_max_size: int = 16 * 1024 * 1024,
+    ):
+        """
+        :param host: Graphite host.
+        :param port: Graphite port.
+        :param protocol: ``tcp`` or ``udp``.
+        :param prefix: Prefix prepended to the metric names.
+        :param timeout: Connection and send timeout, in seconds.
+        :param flush_interval: How often the buffered metrics are sent, in
+            seconds.
+        :param batch_size: Maximum number of metrics sent in a single payload.
+        :param buffer_size: Maximum number of metrics kept in memory.
+        :param spill_file: If set, the metrics that don't fit in the buffer
+            are appended to this file instead of being dropped.
+        :param spill_max_size: Maximum size of the spill file, in bytes.
+        """
+        protocol = protocol.lower()
+        if protocol not in ('tcp', 'udp'):
+            raise AssertionError(f'Unsupported protocol: {protocol}')
+
+        super().__init__(name=f'GraphiteSender:{host}:{port}', daemon=True)
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.prefix = prefix.rstrip('.') + '.' if prefix else ''
+        self.timeout = timeout
+        self.flush_interval = flush_interval
+        self.batch_size = max(1, batch_size)
+        self.buffer_size = max(self.batch_size, buffer_size)
+        self.spill_file = spill_file
+        self.spill_max_size = spill_max_size
+        self.logger = getLogger(__name__)
+
+        self._buffer: Deque[bytes] = deque()
+        self._cond = Condition()
+        self._socket: Optional[socket.socket] = None
+        self._udp_addr: Any = None
+        self._stopped = False
+        self._flush_requested = False
+        self._backoff = 0.0
+        self._sent = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._errors = 0
+
+    def format(
+        self,
+        metric: str,
+        value: Union[int, float],
+        timestamp: Optional[float] = None,
+        tags: Optional[Dict[str, str]] = None,
+    ) -> bytes:
+        """
+        Format a metric as a plaintext protocol line.
+        """
+        name = self.prefix + metric
+        if tags:
+            name += ''.join(f';{k}={v}' for k, v in sorted(tags.items()))
+        if any(c.isspace() for c in name):
+            raise AssertionError(f'Invalid metric name: {name!r}')
+
+        timestamp = int(round(timestamp if timestamp is not None else time.time()))
+        return f'{name} {float(value)!r} {timestamp}\n'.encode()
+
+    def send(
+        self,
+        metric: str,
+        value: Union[int, float],
+        timestamp: Optional[float] = None,
+        tags: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Queue a metric.
+        """
+        self.send_lines([self.format(metric, value, timestamp=timestamp, tags=tags)])
+
+    def send_lines(self, lines: Iterable[bytes]):
+        """
+        Queue formatted metrics.
+        """
+        with self._cond:
+            if self._stopped:
+                raise AssertionError('The Graphite sender has been stopped')
+
+            self._buffer.extend(lines)
+            self._enforce_buffer_size()
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+    def _enforce_buffer_size(self):
+        overflow = len(self._buffer) - self.buffer_size
+        if overflow <= 0:
+            return
+
+        oldest = [self._buffer.popleft() for _ in range(overflow)]
+        if self.spill_file and self._spill(oldest):
+            return
+
+        self._dropped += overflow
+        self.logger.warning(
+            'Graphite buffer full for %s:%s, dropped %d metrics',
+            self.host,
+            self.port,
+            overflow,
+        )
+
+    def _spill(self, lines: List[bytes]) -> bool:
+        assert self.spill_file
+        try:
+            size = os.path.getsize(self.spill_file)
+        except OSError:
+            size = 0
+
+        data = b''.join(lines)
+        if size + len(data) > self.spill_max_size:
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(self.spill_file), exist_ok=True)
+            with open(self.spill_file, 'ab') as f:
+                f.write(data)
+        except OSError as e:
+            self.logger.warning('Could not write to %s: %s', self.spill_file, e)
+            return False
+
+        self._spilled += len(lines)
+        return True
+
+    def _read_spill(self) -> List[bytes]:
+        if not (self.spill_file and os.path.isfile(self.spill_file)):
+            return []
+
+        try:
+            # Lines spilled between the read and the unlink would be lost
+            with self._cond:
+                with open(self.spill_file, 'rb') as f:
+                    lines = f.read().splitlines(keepends=True)
+                os.unlink(self.spill_file)
+        except OSError as e:
+            self.logger.warning('Could not read %s: %s', self.spill_file, e)
+            return []
+
+        return [line for line in lines if line.endswith(b'\n')]
+
+    def _connect(self) -> socket.socket:
+        if self._socket:
+            return self._socket
+
+        if self.protocol == 'udp':
+            family, _, _, _, self._udp_addr = socket.getaddrinfo(
+                self.host, self.port, type=socket.SOCK_DGRAM
+            )[0]
+            sock = socket.socket(family, socket.SOCK_DGRAM)
+            sock.settimeout(self.timeout)
+        else:
+            sock = socket.create_connection((self.host, self.port), self.timeout)
+
+        self._socket = sock
+        return sock
+
+    def _disconnect(self):
+        if self._socket:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+
+        self._socket = None
+
+    def _write(self, lines: List[bytes]):
+        sock = self._connect()
+        if self.protocol == 'tcp':
+            sock.sendall(b''.join(lines))
+            return
+
+        payload = b''
+        for line in lines:
+            if payload and len(payload) + len(line) > self._max_udp_payload:
+                sock.sendto(payload, self._udp_addr)
+                payload = b''
+            payload += line
+
+        if payload:
+            sock.sendto(payload, self._udp_addr)
+
+    def _send_batches(self, lines: List[bytes]) -> List[bytes]:
+        """
+        Send lines in batches.
+
+        :return: The lines that could not be sent.
+        """
+        for i in range(0, len(lines), self.batch_size):
+            batch = lines[i : i + self.batch_size]
+            try:
+                self._write(batch)
+            except OSError as e:
+                self._errors += 1
+                self._disconnect()
+                self.logger.warning(
+                    'Could not send metrics to %s:%s: %s', self.host, self.port, e
+                )
+                return lines[i:]
+
+            self._sent += len(batch)
+
+        return []
+
+    def _flush(self) -> bool:
+        """
+        Send the buffered (and spilled) metrics.
+
+        :return: True if all the metrics have been sent.
+        """
+        with self._cond:
+            lines = list(self._buffer)
+            self._buffer.clear()
+            self._flush_requested = False
+
+        if not lines and not (self.spill_file and os.path.isfile(self.spill_file)):
+            return True
+
+        unsent = self._send_batches(lines)
+        if not unsent:
+            unsent = self._send_batches(self._read_spill())
+
+        if not unsent:
+            return True
+
+        # Put the unsent metrics back in front of the new ones
+        with self._cond:
+            self._buffer.extendleft(reversed(unsent))
+            self._enforce_buffer_size()
+
+        return False
+
+    def flush(self):
+        """
+        Request an immediate flush of the buffered metrics.
+        """
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+
+    def run(self):
+        while True:
+            with self._cond:
+                timeout = max(self.flush_interval, self._backoff)
+                self._cond.wait_for(
+                    lambda: self._stopped
+                    or self._flush_requested
+                    or (not self._backoff and len(self._buffer) >= self.batch_size),
+                    timeout=timeout,
+                )
+                stopped = self._stopped
+
+            if self._flush():
+                self._backoff = 0
+            else:
+                self._backoff = min(
+                    self._max_backoff, max(self.flush_interval, self._backoff * 2)
+                )
+
+            if stopped:
+                break
+
+        self._disconnect()
+
+    @property
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'host': self.host,
+                'port': self.port,
+                'protocol': self.protocol,
+                'prefix': self.prefix.rstrip('.'),
+                'buffered': len(self._buffer),
+                'sent': self._sent,
+                'dropped': self._dropped,
+                'spilled': self._spilled,
+                'errors': self._errors,
+            }
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the sender, after a last attempt to flush the buffered metrics.
+        Metrics that can't be sent are spilled to disk, if configured.
+        """
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+        if self.is_alive():
+            self.join(timeout=timeout)
+
+        with self._cond:
+            if self._buffer and self.spill_file:
+                if self._spill(list(self._buffer)):
+                    self._buffer.clear()
+
+
+# vim:sw=4:ts=4:et:
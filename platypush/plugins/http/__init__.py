@@ -1,7 +1,8 @@
 import logging
 import os
-import requests
+from typing import Collection, Optional
 
+from platypush.common.http_client import get_http_client, get_http_metrics
 from platypush.message import Message
 from platypush.plugins import Plugin, action
 
@@ -41,23 +42,55 @@ class HttpPlugin(Plugin):
         }
     """
 
-    def __init__(self, **kwargs):
+    def __init__(
+        self,
+        retries: int = 2,
+        backoff_factor: float = 0.5,
+        retry_on_status: Collection[int] = (429, 502, 503, 504),
+        timeout: Optional[float] = None,
+        cache: bool = False,
+        **kwargs,
+    ):
+        """
+        Requests are executed through a shared HTTP client, which reuses the
+        connections to the same hosts.
+
+        :param retries: How many times an idempotent request (GET, HEAD,
+            OPTIONS, PUT, DELETE) should be retried on connection errors or on
+            one of the ``retry_on_status`` responses (default: 2).
+        :param backoff_factor: The n-th retry waits ``backoff_factor * 2^n``
+            seconds, unless the server specifies a ``Retry-After`` (default:
+            0.5).
+        :param retry_on_status: HTTP statuses that should trigger a retry
+            (default: 429, 502, 503 and 504).
+        :param timeout: Default request timeout, in seconds (default: none).
+        :param cache: If True, the responses to GET and HEAD requests are
+            cached in memory according to their ``Cache-Control``,
+            ``Expires``, ``ETag`` and ``Last-Modified`` headers (default:
+            False).
+        """
         super().__init__(**kwargs)
-
-    @staticmethod
-    def _exec(method, url, output='text', **kwargs):
+        self._client = get_http_client(
+            self._plugin_name,
+            retries=retries,
+            backoff_factor=backoff_factor,
+            retry_on_status=retry_on_status,
+            timeout=timeout,
+            cache=cache,
+        )
+
+    def _exec(self, method, url, output='text', **kwargs):
         """Available output types: text (default), json, binary"""
 
         if 'username' in kwargs and 'password' in kwargs:
             kwargs['auth'] = (kwargs.pop('username'), kwargs.pop('password'))
 
-        method = getattr(requests, method)
-        response = method(url, **kwargs)
+        response = self._client.request(method, url, **kwargs)
         response.raise_for_status()
 
         if output == 'json':
             output = response.json()
-        if output == 'binary':
+        elif output == 'binary':
             output = response.content
         else:
             output = response.text
@@ -175,10 +208,38 @@ class HttpPlugin(Plugin):
         :param path: Path where the content will be downloaded on the local filesystem - must be a file name.
         """
         path = os.path.abspath(os.path.expanduser(path))
-        content = self._exec(method='get', url=url, output='binary', **kwargs)
+        if 'username' in kwargs and 'password' in kwargs:
+            kwargs['auth'] = (kwargs.pop('username'), kwargs.pop('password'))
+
+        with self._client.get(url, stream=True, **kwargs) as response:
+            response.raise_for_status()
+            with open(path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
 
-        with open(path, 'wb') as f:
-            f.write(content)
+    @action
+    def get_metrics(self) -> dict:
+        """
+        Get the metrics of the shared HTTP clients used by the plugins.
+
+        :return: Metrics by client name. Example:
+
+            .. code-block:: json
+
+                {
+                    "http": {
+                        "requests": 12,
+                        "errors": 1,
+                        "retries": 1,
+                        "cache_hits": 4,
+                        "cache_revalidations": 2,
+                        "bytes_received": 32104,
+                        "total_time": 1.82
+                    }
+                }
+
+        """
+        return get_http_metrics()
 
 
 # vim:sw=4:ts=4:et:
@@ -5,13 +5,16 @@ import shutil
 import statistics
 import time
 
+from concurrent.futures import Future, wait
+from copy import deepcopy
 from enum import Enum
-from threading import Thread, Event
+from threading import Thread, Event, RLock
 from typing import (
     Any,
     Collection,
     Dict,
     Iterable,
+    List,
     Mapping,
     Optional,
     Set,
@@ -28,6 +31,9 @@ from platypush.message.event.light import (
 )
 from platypush.plugins import RunnablePlugin, action
 
+from ._events import iter_sse, parse_light_updates
+from ._writer import HueLightWriter
+
 
 class LightHuePlugin(RunnablePlugin, LightEntityManager):
     """
@@ -42,6 +48,9 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
     ANIMATION_CTRL_QUEUE_NAME = 'platypush/light/hue/AnimationCtrl'
     _MAX_RECONNECT_SECS = 60
     _UNINITIALIZED_BRIDGE_ERR = 'The Hue bridge is not initialized'
+    _STATE_ATTRS = ('on', 'bri', 'sat', 'hue', 'ct', 'xy')
+    _EVENT_STREAM_READ_TIMEOUT = 300
+    _WRITE_TIMEOUT = 10
 
     class Animation(Enum):
         """
@@ -68,6 +77,8 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
         groups: Optional[Iterable[str]] = None,
         poll_interval: Optional[float] = 20.0,
         config_file: Optional[str] = None,
+        event_stream: bool = True,
+        rate_limit: float = 10.0,
         **kwargs,
     ):
         """
@@ -75,10 +86,18 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
         :param lights: Default lights to be controlled (default: all)
         :param groups: Default groups to be controlled (default: all)
         :param poll_interval: How often the plugin should check the bridge for light
-            updates (default: 20 seconds).
+            updates when the event stream is not available (default: 20 seconds).
         :param config_file: Path to the phue configuration file containing the
             access token to authenticate to the Hue bridge and the bridge
             configuration (default: ``<WORKDIR>/light.hue/config.json``).
+        :param event_stream: If True (default), the plugin will listen for
+            light updates on the event stream of the bridge (Hue API v2,
+            bridge firmware >= 1948086000) instead of polling it. It falls
+            back to polling if the event stream is not available.
+        :param rate_limit: Maximum number of light commands sent to the bridge
+            per second (default: 10, as recommended by the Hue API
+            documentation). Writes to the same light within the same
+            rate-limit window are merged into a single command.
         """
 
         poll_seconds = kwargs.pop('poll_seconds', None)
@@ -101,7 +120,13 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
         self.lights = set()
         self.groups = set()
         self.poll_interval = poll_interval
+        self.event_stream = event_stream
+        self.rate_limit = rate_limit
         self._cached_lights: Dict[str, dict] = {}
+        self._cached_groups: Dict[str, dict] = {}
+        self._state_lock = RLock()
+        self._writer: Optional[HueLightWriter] = None
+        self._event_stream_response = None
 
         if lights:
             self.lights = set(lights)
@@ -451,22 +476,43 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
         if not self.bridge:
             self.connect()
 
-        try:
-            if attr == 'scene':
+        if attr == 'scene':
+            try:
                 if not (groups):
                     raise AssertionError('No groups specified')
                 self.bridge.run_scene(list(groups)[0], kwargs.pop('name'))
-            else:
-                if groups:
-                    self.bridge.set_group(list(groups), attr, *args, **kwargs)
-                if lights:
-                    self.bridge.set_light(list(lights), attr, *args, **kwargs)
+            except Exception as e:
+                # Reset bridge connection
+                self.bridge = None
+                raise e
+
+            return self._get_lights(publish_entities=True)
+
+        state = {attr: args[0] if args else None, **kwargs}
+        futures = []
+
+        try:
+            if groups:
+                self.bridge.set_group(list(groups), attr, *args, **kwargs)
+                # Group commands are applied by the bridge, just update the
+                # cached state of the member lights
+                self._apply_light_states(
+                    {
+                        light_id: self._to_light_state(state)
+                        for light_id in self._get_group_light_ids(groups)
+                    }
+                )
+            if lights:
+                futures = self._set_light_states(
+                    self._resolve_light_ids(lights), state, wait=False
+                )
         except Exception as e:
             # Reset bridge connection
             self.bridge = None
             raise e
 
-        return self._get_lights(publish_entities=True)
+        self._wait_writes(futures)
+        return self._get_cached_lights()
 
     @action
     def set_lights(self, lights, *_, **kwargs):  # pylint: disable=arguments-differ
@@ -493,11 +539,10 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
         self.connect()
         if not (self.bridge):
             raise AssertionError(self._UNINITIALIZED_BRIDGE_ERR)
-        all_lights = self._get_lights()
+        if isinstance(lights, (str, int)):
+            lights = [lights]
 
-        for i, l in enumerate(lights):
-            if str(l) in all_lights:
-                lights[i] = all_lights[str(l)]['name']
+        light_ids = self._resolve_light_ids(lights)
 
         # Convert entity attributes to local attributes
         if kwargs.get('saturation') is not None:
@@ -507,17 +552,12 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
         if kwargs.get('temperature') is not None:
             kwargs['ct'] = kwargs.pop('temperature')
 
-        # "Unroll" the map
-        args = []
-        for arg, value in kwargs.items():
-            args += [arg, value]
-
-        if not (len(args) > 1):
+        kwargs = {attr: value for attr, value in kwargs.items() if value is not None}
+        if not kwargs:
             raise AssertionError('Not enough parameters passed to set_lights')
-        param = args.pop(0)
-        value = args.pop(0)
-        self.bridge.set_light(lights, param, value, *args)
-        return self._get_lights(publish_entities=True)
+
+        self._set_light_states(light_ids, kwargs)
+        return self._get_cached_lights()
 
     @action
     def set_group(self, group, **kwargs):
@@ -619,7 +659,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             lights = self.lights
 
         if lights:
-            all_lights = self._get_lights()
+            all_lights = self._get_cached_lights()
 
             lights_on = [
                 light['name']
@@ -758,7 +798,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             bri = statistics.mean(
                 [
                     light['state']['bri']
-                    for light in self._get_lights().values()
+                    for light in self._get_cached_lights().values()
                     if light['name'] in lights
                 ]
             )
@@ -774,7 +814,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             bri = statistics.mean(
                 [
                     light['state']['bri']
-                    for light in self._get_lights().values()
+                    for light in self._get_cached_lights().values()
                     if light['name'] in self.lights
                 ]
             )
@@ -808,7 +848,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             sat = statistics.mean(
                 [
                     light['state']['sat']
-                    for light in self._get_lights().values()
+                    for light in self._get_cached_lights().values()
                     if light['name'] in lights
                 ]
             )
@@ -824,7 +864,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             sat = statistics.mean(
                 [
                     light['state']['sat']
-                    for light in self._get_lights().values()
+                    for light in self._get_cached_lights().values()
                     if light['name'] in self.lights
                 ]
             )
@@ -858,7 +898,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             hue = statistics.mean(
                 [
                     light['state']['hue']
-                    for light in self._get_lights().values()
+                    for light in self._get_cached_lights().values()
                     if light['name'] in lights
                 ]
             )
@@ -874,7 +914,7 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             hue = statistics.mean(
                 [
                     light['state']['hue']
-                    for light in self._get_lights().values()
+                    for light in self._get_cached_lights().values()
                     if light['name'] in self.lights
                 ]
             )
@@ -1124,10 +1164,17 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
                     raise AssertionError(self._UNINITIALIZED_BRIDGE_ERR)
 
                 try:
+                    # Light commands go through the rate-limited writer, so
+                    # short transitions don't flood the bridge
                     if animation == self.Animation.COLOR_TRANSITION:
                         for light, attrs in lights.items():
-                            self.logger.debug('Setting %s to %s', lights, attrs)
-                            self.bridge.set_light(light, attrs)
+                            self.logger.debug('Setting %s to %s', light, attrs)
+                            self._set_light_states(
+                                self._resolve_light_ids([light]),
+                                attrs,
+                                wait=False,
+                                optimistic=False,
+                            )
                     elif animation == self.Animation.BLINK:
                         conf = lights[list(lights.keys())[0]]
                         self.logger.debug('Setting lights to %s', conf)
@@ -1137,15 +1184,20 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
                                 [g['name'] for g in groups.values()], conf
                             )
                         else:
-                            self.bridge.set_light(lights.keys(), conf)
+                            self._set_light_states(
+                                self._resolve_light_ids(lights.keys()),
+                                conf,
+                                wait=False,
+                                optimistic=False,
+                            )
 
                     if transition_seconds:
-                        time.sleep(transition_seconds)
+                        self._animation_stop.wait(transition_seconds)
 
                     stop_animation = _should_stop()
                 except Exception as e:
                     self.logger.warning(e)
-                    time.sleep(2)
+                    self._animation_stop.wait(2)
 
                 lights = _next_light_attrs(lights)
 
@@ -1246,16 +1298,253 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
             raise AssertionError(self._UNINITIALIZED_BRIDGE_ERR)
         lights = self.bridge.get_light()
         lights = {id: light for id, light in lights.items() if not light.get('recycle')}
-        self._cached_lights = lights
+
+        with self._state_lock:
+            # Reconcile the cached state (which may include optimistic
+            # updates) with the state reported by the bridge
+            changes = self._merge_light_states(
+                {light_id: light.get('state', {}) for light_id, light in lights.items()}
+            )
+            self._cached_lights = lights
+
+        self._notify_light_changes(changes, publish_entities=not publish_entities)
         if publish_entities:
             self.publish_entities(lights)  # type: ignore
         return lights
 
+    def _get_cached_lights(self) -> dict:
+        with self._state_lock:
+            return deepcopy(self._cached_lights)
+
     def _get_groups(self) -> dict:
         if not (self.bridge):
             raise AssertionError(self._UNINITIALIZED_BRIDGE_ERR)
         groups = self.bridge.get_group() or {}
-        return {id: group for id, group in groups.items() if not group.get('recycle')}
+        groups = {id: group for id, group in groups.items() if not group.get('recycle')}
+        self._cached_groups = groups
+        return groups
+
+    def _get_group_light_ids(self, groups: Iterable) -> Set[str]:
+        groups = {str(group) for group in groups}
+        all_groups = self._cached_groups or self._get_groups()
+        if not all(
+            any(
+                group in (group_id, g.get('name')) for group_id, g in all_groups.items()
+            )
+            for group in groups
+        ):
+            all_groups = self._get_groups()
+
+        return {
+            str(light_id)
+            for group_id, group in all_groups.items()
+            if group_id in groups or group.get('name') in groups
+            for light_id in group.get('lights', [])
+        }
+
+    def _resolve_light_ids(self, lights: Iterable) -> List[str]:
+        """
+        Map a list of light names or IDs to light IDs, using the cached lights
+        if possible.
+        """
+        lights = [str(light) for light in lights]
+        light_ids: List[Optional[str]] = []
+        for refresh in (False, True):
+            if refresh:
+                self._get_lights()
+
+            with self._state_lock:
+                ids = set(self._cached_lights)
+                names = {
+                    light.get('name'): light_id
+                    for light_id, light in self._cached_lights.items()
+                }
+
+            light_ids = [
+                light if light in ids else names.get(light) for light in lights
+            ]
+            if all(light_ids):
+                return light_ids  # type: ignore
+
+        missing = [light for light, light_id in zip(lights, light_ids) if not light_id]
+        raise AssertionError(f'No such lights: {missing}')
+
+    @classmethod
+    def _to_light_state(cls, state: Mapping[str, Any]) -> dict:
+        """
+        Extract the light state attributes from the parameters of a command.
+        """
+        light_state = {
+            attr: value
+            for attr, value in state.items()
+            if attr in cls._STATE_ATTRS and value is not None
+        }
+
+        if 'xy' in light_state:
+            light_state['xy'] = list(light_state['xy'])
+            light_state['colormode'] = 'xy'
+        elif 'ct' in light_state:
+            light_state['colormode'] = 'ct'
+        elif 'hue' in light_state or 'sat' in light_state:
+            light_state['colormode'] = 'hs'
+
+        return light_state
+
+    def _merge_light_states(self, updates: Mapping[str, dict]) -> Dict[str, dict]:
+        """
+        Merge state deltas into the cached lights.
+
+        :return: ``light_id -> changed attributes`` for the cached lights whose
+            state has changed.
+        """
+        changes = {}
+        with self._state_lock:
+            for light_id, delta in updates.items():
+                light = self._cached_lights.get(light_id)
+                if light is None:
+                    continue
+
+                state = light.setdefault('state', {})
+                changed = {
+                    attr: value
+                    for attr, value in delta.items()
+                    if state.get(attr) != value
+                }
+
+                if changed:
+                    state.update(changed)
+                    changes[light_id] = changed
+
+        return changes
+
+    def _notify_light_changes(
+        self, changes: Mapping[str, dict], publish_entities: bool = True
+    ):
+        if not changes:
+            return
+
+        with self._state_lock:
+            lights = {
+                light_id: deepcopy(self._cached_lights[light_id])
+                for light_id in changes
+                if light_id in self._cached_lights
+            }
+
+        for light_id, changed in changes.items():
+            event_args = {
+                attr: changed[attr] for attr in self._STATE_ATTRS if attr in changed
+            }
+
+            if event_args:
+                get_bus().post(
+                    LightStatusChangeEvent(
+                        plugin_name='light.hue',
+                        light_id=light_id,
+                        light_name=lights.get(light_id, {}).get('name'),
+                        **event_args,
+                    )
+                )
+
+        if publish_entities and lights:
+            self.publish_entities(
+                [{'id': light_id, **light} for light_id, light in lights.items()]
+            )  # type: ignore
+
+    def _apply_light_states(self, updates: Mapping[str, dict]) -> Dict[str, dict]:
+        """
+        Apply state deltas (from the event stream or from optimistic writes)
+        to the cached lights, and notify the changes.
+        """
+        changes = self._merge_light_states(updates)
+        self._notify_light_changes(changes)
+        return changes
+
+    def _send_light_state(self, light_id: str, state: dict):
+        if not self.bridge:
+            self.connect()
+        if not (self.bridge):
+            raise AssertionError(self._UNINITIALIZED_BRIDGE_ERR)
+
+        response = self.bridge.set_light(int(light_id), state)
+        err = self._parse_error(response)
+        if err:
+            self.logger.warning('Error while updating light %s: %s', light_id, err)
+        return response
+
+    def _on_write_error(self, _: Exception):
+        # Reset the bridge connection
+        self.bridge = None
+
+    def _get_writer(self) -> HueLightWriter:
+        with self._state_lock:
+            if not (self._writer and self._writer.is_alive()):
+                self._writer = HueLightWriter(
+                    send=self._send_light_state,
+                    rate_limit=self.rate_limit,
+                    on_error=self._on_write_error,
+                )
+                self._writer.start()
+
+            return self._writer
+
+    def _set_light_states(
+        self,
+        light_ids: Iterable[str],
+        state: Mapping[str, Any],
+        wait: bool = True,
+        optimistic: bool = True,
+    ) -> List[Future]:
+        """
+        Queue a state change for a list of lights.
+
+        :param light_ids: Light IDs.
+        :param state: Parameters of the command.
+        :param wait: If True, wait for the commands to be sent to the bridge.
+        :param optimistic: If True, the cached state of the lights is updated
+            (and the changes published) right away, without waiting for the
+            bridge to report the new state.
+        :return: The futures of the queued commands.
+        """
+        light_ids = list(light_ids)
+        writer = self._get_writer()
+        futures = list(
+            {
+                id(future): future
+                for future in (
+                    writer.put(light_id, dict(state)) for light_id in light_ids
+                )
+            }.values()
+        )
+
+        if optimistic:
+            light_state = self._to_light_state(state)
+            if light_state:
+                self._apply_light_states(
+                    {light_id: light_state for light_id in light_ids}
+                )
+
+        if wait:
+            self._wait_writes(futures)
+        return futures
+
+    def _wait_writes(self, futures: Collection[Future]):
+        if not futures:
+            return
+
+        timeout = self._WRITE_TIMEOUT + (
+            len(futures) / self.rate_limit if self.rate_limit else 0
+        )
+        done, not_done = wait(futures, timeout=timeout)
+        for future in done:
+            if not future.cancelled() and future.exception():
+                raise future.exception()  # type: ignore
+
+        if not_done:
+            self.logger.debug(
+                '%d light commands are still queued after %.1f seconds',
+                len(not_done),
+                timeout,
+            )
 
     def _get_scenes(self) -> dict:
         if not (self.bridge):
@@ -1278,33 +1567,104 @@ class LightHuePlugin(RunnablePlugin, LightEntityManager):
 
         return lights
 
+    def _listen_events(self):
+        """
+        Listen for light updates on the event stream of the bridge, until the
+        stream is closed or the plugin is stopped.
+        """
+        import requests
+        import urllib3
+
+        if not (self.bridge):
+            raise AssertionError(self._UNINITIALIZED_BRIDGE_ERR)
+
+        # The bridge uses a self-signed certificate
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        with requests.get(
+            f'https://{self.bridge.ip}/eventstream/clip/v2',
+            headers={
+                'hue-application-key': self.bridge.username,
+                'Accept': 'text/event-stream',
+            },
+            stream=True,
+            verify=False,
+            timeout=(10, self._EVENT_STREAM_READ_TIMEOUT),
+        ) as response:
+            if response.status_code in (401, 403, 404):
+                self.logger.info(
+                    'The Hue bridge does not support the event stream API '
+                    '(HTTP %d), falling back to polling',
+                    response.status_code,
+                )
+                self.event_stream = False
+                return
+
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            self._event_stream_response = response
+            self.logger.info('Connected to the Hue bridge event stream')
+
+            try:
+                # Catch up with any changes missed while disconnected
+                self._get_lights()
+
+                for payload in iter_sse(
+                    response.iter_lines(chunk_size=None, decode_unicode=True)
+                ):
+                    if self.should_stop():
+                        break
+
+                    updates = parse_light_updates(payload)
+                    if updates:
+                        self._apply_light_states(updates)
+            finally:
+                self._event_stream_response = None
+
     def main(self):
-        lights_prev = self._get_lights(publish_entities=True)  # Initialize the lights
+        self._get_lights(publish_entities=True)  # Initialize the lights
 
         while not self.should_stop():
+            wait_secs = self.poll_interval
             try:
-                lights_new = self._get_lights()
-                for light_id, light in lights_new.items():
-                    event_args = {}
-                    new_state = light.get('state', {})
-                    prev_state = lights_prev.get(light_id, {}).get('state', {})
-
-                    for attr in ['on', 'bri', 'sat', 'hue', 'ct', 'xy']:
-                        if attr in new_state and new_state.get(attr) != prev_state.get(
-                            attr
-                        ):
-                            event_args[attr] = new_state.get(attr)
-
-                    if event_args:
-                        event_args['plugin_name'] = 'light.hue'
-                        event_args['light_id'] = light_id
-                        event_args['light_name'] = light.get('name')
-                        get_bus().post(LightStatusChangeEvent(**event_args))
-                        self.publish_entities([{'id': light_id, **light}])  # type: ignore
-
-                lights_prev = lights_new
+                if self.event_stream:
+                    self._listen_events()
+                    wait_secs = 1
+                else:
+                    self._get_lights()
+            except Exception as e:
+                if self.should_stop():
+                    break
+
+                if self.event_stream:
+                    self.logger.warning(
+                        'Hue event stream error: %s. Polling until the next attempt',
+                        e,
+                    )
+                    self._poll_lights()
+                else:
+                    self.logger.warning('Could not poll the Hue lights: %s', e)
             finally:
-                self.wait_stop(self.poll_interval)
+                self.wait_stop(wait_secs)
+
+    def _poll_lights(self):
+        try:
+            self._get_lights()
+        except Exception as e:
+            self.logger.warning('Could not poll the Hue lights: %s', e)
+
+    def stop(self):
+        response = self._event_stream_response
+        if response is not None:
+            try:
+                response.close()
+            except Exception as e:
+                self.logger.debug('Error while closing the event stream: %s', e)
+
+        if self._writer:
+            self._writer.stop()
+
+        super().stop()
 
 
 # vim:sw=4:ts=4:et:
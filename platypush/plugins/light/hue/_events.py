@@ -0,0 +1,104 @@
+import json
+from logging import getLogger
+from typing import Dict, Iterable, Iterator, Optional
+
+logger = getLogger(__name__)
+
+
+def iter_sse(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Parse a stream of Server-Sent Events lines.
+
+    :param lines: Decoded lines of the stream, without line terminators.
+    :return: An iterator over the ``data`` payloads of the events.
+    """
+    data = []
+    for line in lines:
+        if not line:
+            if data:
+                yield '\n'.join(data)
+                data = []
+            continue
+
+        if line.startswith(':'):
+            # Comment / keep-alive
+            continue
+
+        field, _, value = line.partition(':')
+        if field == 'data':
+            data.append(value[1:] if value.startswith(' ') else value)
+
+    if data:
+        yield '\n'.join(data)
+
+
+def _light_state_delta(resource: dict) -> Dict[str, object]:
+    """
+    Convert the attributes of a v2 ``light`` resource update into the v1
+    light state attributes used by the plugin.
+    """
+    state: Dict[str, object] = {}
+    if isinstance(resource.get('on'), dict) and 'on' in resource['on']:
+        state['on'] = bool(resource['on']['on'])
+
+    brightness = (resource.get('dimming') or {}).get('brightness')
+    if brightness is not None:
+        # v2 brightness is a percentage, v1 brightness is in the [1, 254] range
+        state['bri'] = max(1, min(254, round(float(brightness) * 254 / 100)))
+
+    xy = (resource.get('color') or {}).get('xy')
+    if xy and xy.get('x') is not None and xy.get('y') is not None:
+        state['xy'] = [round(float(xy['x']), 4), round(float(xy['y']), 4)]
+
+    mirek = (resource.get('color_temperature') or {}).get('mirek')
+    if mirek is not None:
+        state['ct'] = int(mirek)
+
+    if isinstance(resource.get('status'), str):
+        # zigbee_connectivity updates
+        state['reachable'] = resource['status'] == 'connected'
+
+    return state
+
+
+def _light_id(resource: dict) -> Optional[str]:
+    id_v1 = resource.get('id_v1') or ''
+    prefix = '/lights/'
+    if not id_v1.startswith(prefix):
+        return None
+    return id_v1[len(prefix) :]
+
+
+def parse_light_updates(payload: str) -> Dict[str, Dict[str, object]]:
+    """
+    Parse the payload of a Hue event stream message into a map of
+    ``light_id -> state delta``. Multiple updates for the same light within
+    the same message are merged.
+    """
+    try:
+        events = json.loads(payload)
+    except ValueError:
+        logger.debug('Invalid Hue event payload: %s', payload)
+        return {}
+
+    updates: Dict[str, Dict[str, object]] = {}
+    for event in events if isinstance(events, list) else [events]:
+        if not isinstance(event, dict) or event.get('type') != 'update':
+            continue
+
+        for resource in event.get('data') or []:
+            if resource.get('type') not in ('light', 'zigbee_connectivity'):
+                continue
+
+            light_id = _light_id(resource)
+            if light_id is None:
+                continue
+
+            delta = _light_state_delta(resource)
+            if delta:
+                updates.setdefault(light_id, {}).update(delta)
+
+    return updates
+
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,130 @@
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from logging import getLogger
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class HueLightWriter(Thread):
+    """
+    Rate-limited, coalescing writer for light state changes.
+
+    The Hue bridge can process about 10 light commands per second. Writes are
+    queued per light, and a new write to a light that is still waiting to be
+    sent is merged into the pending one, so bursts of changes (e.g. an
+    automation setting many lights, or a slider being dragged) result in at
+    most one command per light per rate-limit window.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, dict], Any],
+        rate_limit: float = 10.0,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """
+        :param send: Callback invoked with ``(light_id, state)`` to send a
+            command to the bridge.
+        :param rate_limit: Maximum number of commands sent per second.
+        :param on_error: Callback invoked when a command fails.
+        """
+        super().__init__(name='HueLightWriter', daemon=True)
+        self._send = send
+        self._interval = 1.0 / rate_limit if rate_limit and rate_limit > 0 else 0
+        self._on_error = on_error
+        self._pending: 'OrderedDict[str, Tuple[dict, Future]]' = OrderedDict()
+        self._cond = Condition()
+        self._stopped = False
+        self._next_slot = 0.0
+        self.logger = getLogger(__name__)
+
+    def put(self, light_id: str, state: dict) -> Future:
+        """
+        Queue a state change for a light.
+
+        :return: A future that is resolved with the response of the bridge
+            once the (possibly merged) command has been sent.
+        """
+        with self._cond:
+            if self._stopped:
+                raise AssertionError('The Hue light writer has been stopped')
+
+            pending = self._pending.get(light_id)
+            if pending:
+                pending[0].update(state)
+                return pending[1]
+
+            future: Future = Future()
+            self._pending[light_id] = (dict(state), future)
+            self._cond.notify_all()
+            return future
+
+    def put_many(self, states: Dict[str, dict]) -> Dict[str, Future]:
+        """
+        Queue state changes for multiple lights.
+        """
+        return {
+            light_id: self.put(light_id, state) for light_id, state in states.items()
+        }
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _next(self) -> Optional[Tuple[str, dict, Future]]:
+        with self._cond:
+            self._cond.wait_for(lambda: self._stopped or self._pending)
+            if self._stopped:
+                return None
+
+            # Wait for the next slot in the rate-limit window. Writes received
+            # in the meantime are merged into the pending ones.
+            delay = self._next_slot - time.monotonic()
+            if delay > 0:
+                self._cond.wait_for(lambda: self._stopped, timeout=delay)
+                if self._stopped:
+                    return None
+
+            light_id, (state, future) = self._pending.popitem(last=False)
+            self._next_slot = time.monotonic() + self._interval
+            return light_id, state, future
+
+    def run(self):
+        while True:
+            item = self._next()
+            if not item:
+                break
+
+            light_id, state, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                future.set_result(self._send(light_id, state))
+            except Exception as e:
+                self.logger.warning(
+                    'Could not set the state of light %s to %s: %s', light_id, state, e
+                )
+                future.set_exception(e)
+                if self._on_error:
+                    self._on_error(e)
+
+        self._cancel_pending()
+
+    def _cancel_pending(self):
+        with self._cond:
+            for _, future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+        self._cancel_pending()
+
+
+# vim:sw=4:ts=4:et:
@@ -1,11 +1,11 @@
 import datetime
 import os
-import re
 
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, field
 from logging import getLogger
 from threading import RLock
-from typing import Optional, Iterable
+from typing import Dict, Iterable, List, Optional
 
 from platypush.plugins.file.monitor import (
     FileMonitorPlugin,
@@ -13,156 +13,195 @@ from platypush.plugins.file.monitor import (
     MonitoredResource,
 )
 from platypush.context import get_bus
-from platypush.message.event.log.http import HttpLogEvent
+from platypush.message.event.log.http import (
+    HttpLogBatchEvent,
+    HttpLogEvent,
+    HttpLogStatsEvent,
+)
+
+from ._parser import http_line_regex, parse_line
+from ._tailer import FileTailer
 
 logger = getLogger(__name__)
 
 
-class LogEventHandler(EventHandler):
-    http_line_regex = re.compile(
-        r'^([^\s]+)\s+([^\s]+)\s+([^\s]+)\s+\[([^]]+)]\s+"([^"]+)"\s+([\d]+)\s+'
-        r'([\d]+)\s*("([^"\s]+)")?\s*("([^"]+)")?$'
+@dataclass
+class HttpLogStats:
+    """
+    Aggregated statistics of the entries of an HTTP log file.
+    """
+
+    start: datetime.datetime = field(
+        default_factory=lambda: datetime.datetime.now(datetime.timezone.utc)
     )
+    requests: int = 0
+    size: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    methods: Counter = field(default_factory=Counter)
+
+    def add(self, entry: dict):
+        self.requests += 1
+        self.size += entry.get('size') or 0
+        self.statuses[str(entry.get('status'))] += 1
+        self.methods[entry.get('method')] += 1
 
-    @dataclass
-    class FileResource:
-        path: str
-        pos: int = 0
-        lock: RLock = RLock()
-        last_timestamp: Optional[datetime.datetime] = None
+
+class LogEventHandler(EventHandler):
+    http_line_regex = http_line_regex
 
     def __init__(
         self, *args, monitored_files: Optional[Iterable[str]] = None, **kwargs
     ):
         super().__init__(*args, **kwargs)
-        self._monitored_files = {}
+        self._monitored_files: Dict[str, FileTailer] = {}
+        self._stats: Dict[str, HttpLogStats] = {}
+        self._stats_lock = RLock()
+        self.line_events = True
+        self.batch_events = False
+        self.max_batch_size = 1000
+        self.collect_stats = False
         self.monitor_files(monitored_files or [])
 
     def monitor_files(self, files: Iterable[str]):
-        self._monitored_files.update(
-            {f: self.FileResource(path=f, pos=self._get_size(f)) for f in files}
-        )
-
-    @staticmethod
-    def _get_size(file: str) -> int:
-        try:
-            return os.path.getsize(file)
-        except Exception as e:
-            logger.warning('Could not open {}: {}'.format(file, str(e)))
-            return 0
+        directory = os.path.abspath(self.resource.path)
+        for f in files:
+            if (
+                f not in self._monitored_files
+                and os.path.dirname(os.path.abspath(f)) == directory
+            ):
+                self._monitored_files[f] = FileTailer(f)
+                with self._stats_lock:
+                    self._stats[f] = HttpLogStats()
 
     def on_created(self, event):
-        self._reset_file(event.src_path)
+        self._read_file(event.src_path)
 
     def on_deleted(self, event):
-        self._reset_file(event.src_path)
+        self._read_file(event.src_path)
 
     def on_moved(self, event):
-        self._reset_file(event.src_path)
-
-    def _reset_file(self, path: str):
-        file_info = self._monitored_files.get(path)
-        if not file_info:
-            return
-
-        file_info.pos = 0
+        self._read_file(event.src_path)
+        self._read_file(event.dest_path)
 
     def on_modified(self, event):
-        file_info = self._monitored_files.get(event.src_path)
-        if not file_info:
-            return
+        self._read_file(event.src_path)
 
-        try:
-            file_size = os.path.getsize(event.src_path)
-        except OSError as e:
-            logger.warning(
-                'Could not get the size of {}: {}'.format(event.src_path, str(e))
-            )
+    def _read_file(self, path: str):
+        tailer = self._monitored_files.get(path)
+        if not tailer:
             return
 
-        if file_info.pos > file_size:
-            logger.warning(
-                'The size of {} been unexpectedly decreased from {} to {} bytes'.format(
-                    event.src_path, file_info.pos, file_size
-                )
-            )
-            file_info.pos = 0
-
-        try:
-            with file_info.lock, open(event.src_path, 'r') as f:
-                f.seek(file_info.pos)
-                for line in f.readlines():
-                    evt = self._build_event(file=event.src_path, line=line)
-                    if evt and (
-                        not file_info.last_timestamp
-                        or evt.args['time'] >= file_info.last_timestamp
-                    ):
-                        get_bus().post(evt)
-                        file_info.last_timestamp = evt.args['time']
-
-                file_info.pos = f.tell()
-        except OSError as e:
-            logger.warning(
-                'Error while reading from {}: {}'.format(self.resource.path, str(e))
-            )
+        with tailer.lock:
+            try:
+                lines = tailer.read_lines()
+            except OSError as e:
+                logger.warning('Error while reading from %s: %s', path, e)
+                return
 
-    @classmethod
-    def _build_event(cls, file: str, line: str) -> Optional[HttpLogEvent]:
-        line = line.strip()
-        if not line:
-            return
+            entries = [
+                entry
+                for entry in (parse_line(line, file=path) for line in lines)
+                if entry
+            ]
 
-        m = cls.http_line_regex.match(line.strip())
-        if not m:
-            logger.warning('Could not parse log line from {}: {}'.format(file, line))
-            return
+            self._process_entries(path, entries)
 
-        url = None
-        method = 'GET'
-        http_version = '1.0'
+    def _process_entries(self, path: str, entries: List[dict]):
+        if not entries:
+            return
 
-        try:
-            url = m.group(5).split(' ')[1]
-            method = m.group(5).split(' ')[0]
-            http_version = m.group(5).split(' ')[2].split('/')[1]
-        except Exception as e:
-            logger.debug(str(e))
+        if self.collect_stats:
+            with self._stats_lock:
+                stats = self._stats.setdefault(path, HttpLogStats())
+                for entry in entries:
+                    stats.add(entry)
 
-        if not url:
+        if not self.line_events:
             return
 
-        info = {
-            'address': m.group(1),
-            'user_identifier': m.group(2),
-            'user_id': m.group(3),
-            'time': datetime.datetime.strptime(m.group(4), '%d/%b/%Y:%H:%M:%S %z'),
-            'method': method,
-            'url': url,
-            'http_version': http_version,
-            'status': int(m.group(6)),
-            'size': int(m.group(7)),
-            'referrer': m.group(9),
-            'user_agent': m.group(11),
-        }
+        bus = get_bus()
+        if self.batch_events:
+            for i in range(0, len(entries), self.max_batch_size):
+                bus.post(
+                    HttpLogBatchEvent(
+                        logfile=path, entries=entries[i : i + self.max_batch_size]
+                    )
+                )
+        else:
+            for entry in entries:
+                bus.post(HttpLogEvent(logfile=path, **entry))
 
-        for attr, value in info.items():
-            if value == '-':
-                info[attr] = None
+    def flush_stats(self) -> List[HttpLogStatsEvent]:
+        """
+        Reset the aggregated statistics of the monitored files.
 
-        return HttpLogEvent(logfile=file, **info)
+        :return: The statistics collected since the previous flush.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._stats_lock:
+            stats = {
+                path: self._stats.pop(path, HttpLogStats(start=now))
+                for path in self._monitored_files
+            }
+            self._stats = {path: HttpLogStats(start=now) for path in stats}
+
+        return [
+            HttpLogStatsEvent(
+                logfile=path,
+                start=s.start,
+                end=now,
+                requests=s.requests,
+                size=s.size,
+                statuses=dict(s.statuses),
+                methods=dict(s.methods),
+            )
+            for path, s in stats.items()
+        ]
+
+    def close(self):
+        for tailer in self._monitored_files.values():
+            tailer.close()
+
+    @classmethod
+    def _build_event(cls, file: str, line: str) -> Optional[HttpLogEvent]:
+        entry = parse_line(line, file=file)
+        return HttpLogEvent(logfile=file, **entry) if entry else None
 
 
 class LogHttpPlugin(FileMonitorPlugin):
     """
     This plugin can be used to monitor one or more HTTP log files (tested on
     Apache and Nginx) and trigger events whenever a new log line is added.
+
+    The log files are kept open and followed across rotations. For busy
+    servers, the new lines can be delivered in batches (``batch_events``), or
+    summarized by periodic statistics events (``stats_interval``).
     """
 
     def __init__(
-        self, paths: Iterable[str], log_files: Optional[Iterable[str]] = None, **kwargs
+        self,
+        paths: Iterable[str],
+        log_files: Optional[Iterable[str]] = None,
+        line_events: bool = True,
+        batch_events: bool = False,
+        stats_interval: Optional[float] = None,
+        **kwargs,
     ):
         """
         :param paths: List of log files to be monitored.
+        :param line_events: If False, no events are triggered for the single
+            log lines. Useful together with ``stats_interval`` (default:
+            True).
+        :param batch_events: If True, a single
+            :class:`platypush.message.event.log.http.HttpLogBatchEvent` is
+            triggered with all the lines read from a file in one go, instead
+            of a :class:`platypush.message.event.log.http.HttpLogEvent` per
+            line (default: False).
+        :param stats_interval: If set, a
+            :class:`platypush.message.event.log.http.HttpLogStatsEvent` with
+            the number of requests, the response sizes and the counts by
+            status and method is triggered for each file every
+            ``stats_interval`` seconds (default: None).
         """
         if log_files:
             self.logger.warning(
@@ -172,12 +211,39 @@ class LogHttpPlugin(FileMonitorPlugin):
         paths = {os.path.expanduser(log) for log in {*paths, *(log_files or [])}}
         directories = {os.path.dirname(log) for log in paths}
         super().__init__(paths=directories, **kwargs)
+        self.stats_interval = stats_interval
 
+        for hndl in self._get_handlers():
+            hndl.line_events = line_events
+            hndl.batch_events = batch_events
+            hndl.collect_stats = bool(stats_interval)
+            hndl.monitor_files(paths)
+
+    def _get_handlers(self) -> List[LogEventHandler]:
         handlers = self._observer._handlers
-        for hndls in handlers.values():
-            for hndl in hndls:
-                hndl.monitor_files(paths)
+        return [
+            hndl
+            for hndls in handlers.values()
+            for hndl in hndls
+            if isinstance(hndl, LogEventHandler)
+        ]
 
     @staticmethod
     def event_handler_from_resource(resource: str) -> LogEventHandler:
         return LogEventHandler.from_resource(MonitoredResource(resource))
+
+    def main(self):
+        self._observer.start()
+        while not self.should_stop():
+            self.wait_stop(self.stats_interval)
+            if not self.stats_interval or self.should_stop():
+                continue
+
+            for hndl in self._get_handlers():
+                for evt in hndl.flush_stats():
+                    self._bus.post(evt)
+
+    def stop(self):
+        super().stop()
+        for hndl in self._get_handlers():
+            hndl.close()
@@ -0,0 +1,125 @@
+import datetime
+import re
+from functools import lru_cache
+from logging import getLogger
+from typing import Optional
+
+logger = getLogger(__name__)
+
+http_line_regex = re.compile(
+    r'^([^\s]+)\s+([^\s]+)\s+([^\s]+)\s+\[([^]]+)]\s+"([^"]+)"\s+([\d]+)\s+'
+    r'([\d]+)\s*("([^"\s]+)")?\s*("([^"]+)")?$'
+)
+
+_months = {
+    month: i + 1
+    for i, month in enumerate(
+        [
+            'Jan',
+            'Feb',
+            'Mar',
+            'Apr',
+            'May',
+            'Jun',
+            'Jul',
+            'Aug',
+            'Sep',
+            'Oct',
+            'Nov',
+            'Dec',
+        ]
+    )
+}
+
+
+@lru_cache(maxsize=64)
+def _parse_tz(tz: str) -> datetime.tzinfo:
+    sign = -1 if tz[0] == '-' else 1
+    return datetime.timezone(
+        sign * datetime.timedelta(hours=int(tz[1:3]), minutes=int(tz[3:5]))
+    )
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(timestamp: str) -> datetime.datetime:
+    """
+    Parse a Common Log Format timestamp (e.g. ``10/Oct/2000:13:55:36 -0700``).
+
+    The fields are sliced at fixed positions rather than parsed through
+    ``strptime``, and consecutive log lines usually share the same timestamp,
+    so the results are cached.
+    """
+    try:
+        return datetime.datetime(
+            int(timestamp[7:11]),
+            _months[timestamp[3:6]],
+            int(timestamp[0:2]),
+            int(timestamp[12:14]),
+            int(timestamp[15:17]),
+            int(timestamp[18:20]),
+            tzinfo=_parse_tz(timestamp[21:26]),
+        )
+    except (KeyError, ValueError, IndexError):
+        return datetime.datetime.strptime(timestamp, '%d/%b/%Y:%H:%M:%S %z')
+
+
+def parse_line(line: str, file: Optional[str] = None) -> Optional[dict]:
+    """
+    Parse an HTTP log line in Common/Combined Log Format.
+
+    :return: The attributes of the matching
+        :class:`platypush.message.event.log.http.HttpLogEvent`, or None if
+        the line could not be parsed.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    m = http_line_regex.match(line)
+    if not m:
+        logger.warning('Could not parse log line from %s: %s', file, line)
+        return None
+
+    url = None
+    method = 'GET'
+    http_version = '1.0'
+    request = m.group(5).split(' ')
+
+    try:
+        method = request[0]
+        url = request[1]
+        http_version = request[2].split('/')[1]
+    except IndexError as e:
+        logger.debug(str(e))
+
+    if not url:
+        return None
+
+    try:
+        time = parse_timestamp(m.group(4))
+    except ValueError as e:
+        logger.warning('Invalid timestamp in log line from %s: %s', file, e)
+        return None
+
+    info = {
+        'address': m.group(1),
+        'user_identifier': m.group(2),
+        'user_id': m.group(3),
+        'time': time,
+        'method': method,
+        'url': url,
+        'http_version': http_version,
+        'status': int(m.group(6)),
+        'size': int(m.group(7)),
+        'referrer': m.group(9),
+        'user_agent': m.group(11),
+    }
+
+    for attr, value in info.items():
+        if value == '-':
+            info[attr] = None
+
+    return info
+
+
+# vim:sw=4:ts=4:et:
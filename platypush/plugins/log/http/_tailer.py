@@ -0,0 +1,137 @@
+import os
+from logging import getLogger
+from threading import RLock
+from typing import BinaryIO, List, Optional, Tuple
+
+logger = getLogger(__name__)
+
+
+class FileTailer:
+    """
+    Follows the lines appended to a file.
+
+    The file descriptor is kept open between reads, the new content is read
+    in bounded chunks, and incomplete trailing lines are carried over to the
+    next read. Rotations are detected by tracking the device and inode of the
+    path: when the path points to a new file, the rest of the old file is
+    read before switching to the new one. Truncated files are read again from
+    the start.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        chunk_size: int = 64 * 1024,
+        max_line_size: int = 1024 * 1024,
+        from_end: bool = True,
+    ):
+        """
+        :param path: Path of the file.
+        :param chunk_size: Size of the read chunks, in bytes.
+        :param max_line_size: Maximum length of a line, in bytes. Longer lines
+            are split.
+        :param from_end: If True (default), only the lines appended after the
+            file is first opened are returned.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.max_line_size = max_line_size
+        self.lock = RLock()
+        self._file: Optional[BinaryIO] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._partial = b''
+        self._open(seek_end=from_end)
+
+    def _open(self, seek_end: bool = False) -> bool:
+        try:
+            f = open(self.path, 'rb')
+        except OSError as e:
+            logger.debug('Could not open %s: %s', self.path, e)
+            return False
+
+        st = os.fstat(f.fileno())
+        self._file = f
+        self._file_id = (st.st_dev, st.st_ino)
+        self._partial = b''
+        if seek_end:
+            f.seek(0, os.SEEK_END)
+        return True
+
+    def _close(self):
+        if self._file:
+            try:
+                self._file.close()
+            except OSError as e:
+                logger.debug('Could not close %s: %s', self.path, e)
+
+        self._file = None
+        self._file_id = None
+        self._partial = b''
+
+    def _is_rotated(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            # The file has been moved or removed, and not re-created yet
+            return False
+
+        return (st.st_dev, st.st_ino) != self._file_id
+
+    def _read_chunks(self) -> List[str]:
+        assert self._file
+        lines = []
+
+        # Truncated file
+        pos = self._file.tell()
+        if os.fstat(self._file.fileno()).st_size < pos:
+            logger.info('%s has been truncated, reading it from the start', self.path)
+            self._file.seek(0)
+            self._partial = b''
+
+        while True:
+            chunk = self._file.read(self.chunk_size)
+            if not chunk:
+                break
+
+            data = self._partial + chunk
+            end = data.rfind(b'\n')
+            if end < 0:
+                self._partial = data
+            else:
+                lines.extend(
+                    line.decode('utf-8', errors='replace')
+                    for line in data[:end].split(b'\n')
+                )
+                self._partial = data[end + 1 :]
+
+            if len(self._partial) >= self.max_line_size:
+                lines.append(self._partial.decode('utf-8', errors='replace'))
+                self._partial = b''
+
+        return lines
+
+    def read_lines(self) -> List[str]:
+        """
+        :return: The complete lines appended to the file since the last read.
+        """
+        with self.lock:
+            lines = []
+            if self._file and self._is_rotated():
+                # Read what's left of the rotated file, then follow the new one
+                lines.extend(self._read_chunks())
+                if self._partial:
+                    lines.append(self._partial.decode('utf-8', errors='replace'))
+                self._close()
+
+            if not self._file and not self._open():
+                return lines
+
+            lines.extend(self._read_chunks())
+            return lines
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+
+# vim:sw=4:ts=4:et:
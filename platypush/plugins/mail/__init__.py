@@ -1,8 +1,6 @@
 import os
 import pathlib
-import time
 
-from collections import defaultdict
 from threading import Thread, RLock
 from typing import Any, Dict, List, Optional, Union, Collection
 
@@ -41,6 +39,7 @@ class MailPlugin(RunnablePlugin):
         accounts: List[Dict[str, Any]],
         timeout: float = 20.0,
         poll_interval: float = 60.0,
+        idle_timeout: Optional[float] = 600.0,
         **kwargs,
     ):
         """
@@ -140,6 +139,12 @@ class MailPlugin(RunnablePlugin):
         :param accounts: List of available mailboxes/accounts.
         :param poll_interval: How often the plugin should poll for new messages
             (default: 60 seconds).
+        :param idle_timeout: If the server supports push notifications (e.g.
+            IMAP IDLE), changes to the monitored folders are notified as soon
+            as they happen, instead of being polled every ``poll_interval``
+            seconds. The folders are fully re-checked at least every
+            ``idle_timeout`` seconds (default: 600). Set it to null to always
+            poll the folders.
         :param timeout: Timeout for the mail server connection (default: 20
             seconds).
         """
@@ -148,6 +153,7 @@ class MailPlugin(RunnablePlugin):
 
         super().__init__(poll_interval=poll_interval, **kwargs)
         self.timeout = timeout
+        self.idle_timeout = idle_timeout
         self.accounts = self._parse_accounts(accounts)
         self._accounts_by_name = {acc.name: acc for acc in self.accounts}
         self._default_account = next(
@@ -255,52 +261,6 @@ class MailPlugin(RunnablePlugin):
     def _account_by_name(self) -> Dict[str, Account]:
         return {acc.name: acc for acc in self.accounts}
 
-    @staticmethod
-    def _check_thread(plugin: MailInPlugin, folder: str, results: FolderStatus):
-        results[MailFlagType.UNREAD] = {
-            msg.id: msg for msg in plugin.search_unseen_messages(folder=folder)
-        }
-
-        results[MailFlagType.FLAGGED] = {
-            msg.id: msg for msg in plugin.search_flagged_messages(folder=folder)
-        }
-
-    def _check_mailboxes(self) -> AccountsStatus:
-        # Workers indexed by (account_name, folder) -> thread
-        workers = {}
-        status = AccountsStatus()
-
-        for account in self._monitored_accounts:
-            for folder in account.monitor_folders or []:
-                worker = Thread(
-                    target=self._check_thread,
-                    name=f'check-mailbox-{account.name}-{folder}',
-                    kwargs={
-                        'plugin': account.incoming,
-                        'results': status[account.name][folder],
-                        'folder': folder,
-                    },
-                )
-
-                worker.start()
-                workers[account.name, folder] = worker
-
-        wait_start = time.time()
-        for worker_key, worker in workers.items():
-            account = self._account_by_name[worker_key[0]]
-            if not account.incoming:
-                continue
-
-            # The timeout should be the time elapsed since wait_start + the configured timeout
-            timeout = max(
-                0, account.incoming.server.timeout - (time.time() - wait_start)
-            )
-            worker.join(timeout=timeout)
-            if worker.is_alive():
-                self.logger.warning('Timeout while polling account %s', account.name)
-
-        return status
-
     @action
     def get_folders(
         self,
@@ -1014,29 +974,23 @@ class MailPlugin(RunnablePlugin):
         )
 
     @staticmethod
-    def _process_account_changes(
-        account: str, cur_status: AccountsStatus, new_status: AccountsStatus
-    ) -> AccountFolderChanges:
-        folders = new_status.get(account) or {}
-        mail_flag_changed: Dict[str, Dict[MailFlagType, Dict[int, bool]]] = defaultdict(
-            lambda: defaultdict(lambda: defaultdict(bool))
-        )
+    def _get_folder_changes(
+        cur_status: FolderStatus, new_status: FolderStatus
+    ) -> Dict[MailFlagType, Dict[int, bool]]:
+        changes: Dict[MailFlagType, Dict[int, bool]] = {}
+        for flag, new_mail in new_status.items():
+            cur_mail = cur_status.get(flag, {})
+            cur_mail_keys = set(map(int, cur_mail.keys()))
+            new_mail_keys = set(map(int, new_mail.keys()))
+            flag_changes = {
+                **dict.fromkeys(new_mail_keys - cur_mail_keys, True),
+                **dict.fromkeys(cur_mail_keys - new_mail_keys, False),
+            }
 
-        for folder, folder_status in folders.items():
-            for flag, new_mail in folder_status.items():
-                cur_mail = (cur_status.get(account) or {}).get(folder, {}).get(flag, {})
-                cur_mail_keys = set(map(int, cur_mail.keys()))
-                new_mail_keys = set(map(int, new_mail.keys()))
-                mail_flag_added_keys = new_mail_keys - cur_mail_keys
-                mail_flag_removed_keys = cur_mail_keys - new_mail_keys
-                mail_flag_changed[folder][flag].update(
-                    {
-                        **dict.fromkeys(mail_flag_added_keys, True),
-                        **dict.fromkeys(mail_flag_removed_keys, False),
-                    }
-                )
+            if flag_changes:
+                changes[flag] = flag_changes
 
-        return mail_flag_changed
+        return changes
 
     def _generate_account_events(
         self, account: str, msgs: Dict[int, Mail], folder_changes: AccountFolderChanges
@@ -1065,48 +1019,97 @@ class MailPlugin(RunnablePlugin):
                         )
                     )
 
-    def _generate_events(self, cur_status: AccountsStatus, new_status: AccountsStatus):
-        for account in new_status:
-            mail_flag_changed = self._process_account_changes(
-                account, cur_status, new_status
-            )
+    def _save_status(self):
+        with self._db_lock, open(self._status_file, 'w') as f:
+            self._status.write(f)
 
-            msg_ids = {
-                msg_id
-                for _, changes in mail_flag_changed.items()
-                for _, flag_changes in changes.items()
-                for msg_id, _ in flag_changes.items()
+    def _process_folder_status(
+        self, account: Account, folder: str, new_status: FolderStatus
+    ):
+        """
+        Update the status of a folder, and generate the events for the
+        messages that have been added, seen, flagged or unflagged.
+        """
+        with self._db_lock:
+            cur_status = (self._status.get(account.name) or {}).get(folder) or {
+                flag: {} for flag in MailFlagType
             }
+            changes = self._get_folder_changes(cur_status, new_status)
+            if not changes:
+                return
 
-            if not msg_ids:
-                continue
+            self._status[account.name][folder] = new_status
+            self._save_status()
+
+        msgs = {
+            msg_id: msg
+            for flag_msgs in new_status.values()
+            for msg_id, msg in flag_msgs.items()
+        }
 
-            acc = self._get_account(account)
-            if not acc.incoming:
-                continue
+        # Messages that have lost a flag are not in the new status
+        missing = {
+            msg_id
+            for flag_changes in changes.values()
+            for msg_id in flag_changes
+            if msg_id not in msgs
+        }
 
-            msgs = acc.incoming.get_messages(*msg_ids, with_body=False)
-            self._generate_account_events(account, msgs, mail_flag_changed)
+        if missing and account.incoming:
+            msgs.update(
+                account.incoming.get_messages(*missing, folder=folder, with_body=False)
+            )
 
-    def _update_status(self, status: AccountsStatus):
-        self._status = status
-        with open(self._status_file, 'w') as f:
-            status.write(f)
+        self._generate_account_events(account.name, msgs, {folder: changes})
 
-    def loop(self):
-        cur_status = self._status.copy()
-        new_status = self._check_mailboxes()
-        self._generate_events(cur_status, new_status)
-        self._update_status(new_status)
+    def _watch_folder(self, account: Account, folder: str):
+        plugin = account.incoming
+        assert plugin, f'No incoming configuration found for account "{account.name}"'
 
-    def main(self):
         while not self.should_stop():
             try:
-                self.loop()
+                self._process_folder_status(
+                    account, folder, plugin.sync_folder(folder=folder)
+                )
+
+                plugin.wait_for_changes(
+                    folder=folder,
+                    poll_interval=self.poll_interval,
+                    idle_timeout=self.idle_timeout,
+                    stop=self._should_stop,
+                )
             except Exception as e:
-                self.logger.exception(e)
-            finally:
+                self.logger.warning(
+                    'Error while checking folder %s of account %s: %s',
+                    folder,
+                    account.name,
+                    e,
+                )
+                self.logger.debug(e, exc_info=True)
                 self.wait_stop(self.poll_interval)
 
+    def main(self):
+        watchers = [
+            Thread(
+                target=self._watch_folder,
+                name=f'mail-watch-{account.name}-{folder}',
+                args=(account, folder),
+                daemon=True,
+            )
+            for account in self._monitored_accounts
+            for folder in account.monitor_folders or []
+        ]
+
+        for watcher in watchers:
+            watcher.start()
+
+        self.wait_stop()
+        for watcher in watchers:
+            watcher.join(timeout=10)
+
+        for account in self.accounts:
+            if account.incoming:
+                account.incoming.close()
+
 
 # vim:sw=4:ts=4:et:
@@ -152,9 +152,11 @@ class AccountsStatus:
     """
 
     def __init__(self):
-        self._dict: Dict[str, FoldersStatus] = defaultdict(
-            lambda: defaultdict(lambda: {evt: {} for evt in MailFlagType})
-        )
+        self._dict: Dict[str, FoldersStatus] = defaultdict(self._new_account_status)
+
+    @staticmethod
+    def _new_account_status() -> FoldersStatus:
+        return defaultdict(lambda: {evt: {} for evt in MailFlagType})
 
     class Serializer(json.JSONEncoder):
         def default(self, o):
@@ -222,15 +224,16 @@ class AccountsStatus:
     @classmethod
     def read(cls, f: IO) -> 'AccountsStatus':
         obj = cls()
-        obj._dict.update(
-            {
-                account: {
-                    folder: {MailFlagType(evt): msgs for evt, msgs in statuses.items()}
-                    for folder, statuses in folders.items()
+        for account, folders in json.load(f, cls=cls.Deserializer).items():
+            # Keep the default factories, so folders that aren't in the
+            # stored status start empty
+            account_status = obj._dict[account]
+            for folder, statuses in folders.items():
+                account_status[folder] = {
+                    **{evt: {} for evt in MailFlagType},
+                    **{MailFlagType(evt): msgs for evt, msgs in statuses.items()},
                 }
-                for account, folders in json.load(f, cls=cls.Deserializer).items()
-            }
-        )
+
         return obj
 
     def write(self, f: IO):
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Iterable, List, Union
+from threading import Event
+from typing import Dict, Iterable, List, Optional, Union
 
-from .._model import Mail
+from .._model import FolderStatus, Mail, MailFlagType
 from ._base import BaseMailPlugin
 
 
@@ -50,14 +51,54 @@ class MailInPlugin(BaseMailPlugin, ABC):
         raise NotImplementedError()
 
     def get_message(
-        self, id, with_body: bool = True, **_  # pylint: disable=redefined-builtin
+        self,
+        id,  # pylint: disable=redefined-builtin
+        folder: str = 'INBOX',
+        with_body: bool = True,
+        **_,
     ) -> Mail:
-        msgs = self.get_messages(id, with_body=with_body)
+        msgs = self.get_messages(id, folder=folder, with_body=with_body)
         msg = msgs.get(id)
         if not (msg):
             raise AssertionError(f"Message {id} not found")
         return msg
 
+    def sync_folder(self, folder: str = 'INBOX', **_) -> FolderStatus:
+        """
+        :return: The unread and flagged messages in a folder.
+        """
+        return {
+            MailFlagType.UNREAD: {
+                msg.id: msg for msg in self.search_unseen_messages(folder=folder)
+            },
+            MailFlagType.FLAGGED: {
+                msg.id: msg for msg in self.search_flagged_messages(folder=folder)
+            },
+        }
+
+    def wait_for_changes(
+        self,
+        folder: str = 'INBOX',  # pylint: disable=unused-argument
+        poll_interval: float = 60,
+        idle_timeout: Optional[float] = None,  # pylint: disable=unused-argument
+        stop: Optional[Event] = None,
+        **_,
+    ):
+        """
+        Block until a folder may have changed. Plugins that support push
+        notifications should return as soon as the server notifies a change,
+        or when ``idle_timeout`` expires, otherwise the default implementation
+        waits ``poll_interval`` seconds.
+
+        :param stop: If set, the wait is interrupted when the event is set.
+        """
+        (stop or Event()).wait(poll_interval)
+
+    def close(self):
+        """
+        Release the connections held by the plugin.
+        """
+
     @abstractmethod
     def create_folder(self, folder: str, **_):
         raise NotImplementedError()
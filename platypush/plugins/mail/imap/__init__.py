@@ -1,20 +1,59 @@
 import ssl
+import time
 
 from contextlib import contextmanager
-from typing import Generator, Iterable, Optional, List, Dict, Union, Any, Tuple
+from threading import Event, RLock
+from typing import (
+    Collection,
+    Generator,
+    Iterable,
+    Optional,
+    List,
+    Dict,
+    Union,
+    Any,
+    Tuple,
+)
 
 from imapclient import IMAPClient
 from imapclient.response_types import Address
 
-from .._model import Mail, TransportEncryption
+from .._model import FolderStatus, Mail, MailFlagType, TransportEncryption
 from .._plugin import MailInPlugin
+from ._cache import FolderState, HeaderCache, header_attributes
+from ._session import ImapSession
+
+# Untagged responses that signal a change in the selected folder
+_idle_changes = {b'EXISTS', b'EXPUNGE', b'FETCH', b'RECENT', b'VANISHED'}
 
 
 class MailImapPlugin(MailInPlugin):
     """
     Plugin to interact with a mail server over IMAP.
+
+    The plugin keeps an authenticated connection open and reuses it across
+    calls. Monitored folders are synchronized incrementally over dedicated
+    connections: the flags are tracked by UID, only the changes since the
+    last known ``HIGHESTMODSEQ`` are fetched if the server supports
+    CONDSTORE, and the headers of the messages are cached. If the server
+    supports IDLE, changes are pushed by the server instead of being polled.
     """
 
+    # RFC 2177: clients should re-issue IDLE at least every 29 minutes
+    max_idle_time = 25 * 60
+
+    def __init__(self, *args, header_cache_size: int = 10000, **kwargs):
+        """
+        :param header_cache_size: Maximum number of message headers to keep
+            in memory (default: 10000).
+        """
+        super().__init__(*args, **kwargs)
+        self._session = ImapSession(self._connect, name=self._session_name())
+        self._watch_sessions: Dict[str, ImapSession] = {}
+        self._folders: Dict[str, FolderState] = {}
+        self._headers = HeaderCache(max_size=header_cache_size)
+        self._lock = RLock()
+
     @classmethod
     def _matches_url_scheme(cls, scheme: str) -> bool:
         return scheme in ('imap', 'imaps')
@@ -26,8 +65,11 @@ class MailImapPlugin(MailInPlugin):
             TransportEncryption.SSL: 993,
         }
 
-    @contextmanager
-    def connect(self) -> Generator[IMAPClient, None, None]:
+    def _session_name(self, folder: Optional[str] = None) -> str:
+        name = f'{self.account.username}@{self.server.server}'
+        return f'{name}/{folder}' if folder else name
+
+    def _connect(self) -> IMAPClient:
         has_ssl = self.server.encryption == TransportEncryption.SSL
         context = None
         if has_ssl and self.server.certfile:
@@ -41,21 +83,55 @@ class MailImapPlugin(MailInPlugin):
             port=self.server.port,
             ssl=has_ssl,
             ssl_context=context,
+            timeout=self.server.timeout,
         )
 
-        if self.account.access_token:
-            client.oauth2_login(
-                self.account.username,
-                access_token=self.account.access_token,
-                mech=self.account.oauth_mechanism or 'XOAUTH2',
-                vendor=self.account.oauth_vendor,
-            )
-        else:
-            pwd = self.account.get_password()
-            client.login(self.account.username, pwd)
+        try:
+            if self.account.access_token:
+                client.oauth2_login(
+                    self.account.username,
+                    access_token=self.account.access_token,
+                    mech=self.account.oauth_mechanism or 'XOAUTH2',
+                    vendor=self.account.oauth_vendor,
+                )
+            else:
+                pwd = self.account.get_password()
+                client.login(self.account.username, pwd)
+
+            capabilities = client.capabilities()
+            if b'ENABLE' in capabilities and b'CONDSTORE' in capabilities:
+                client.enable('CONDSTORE')
+        except Exception:
+            client.shutdown()
+            raise
+
+        return client
 
-        yield client
-        client.logout()
+    @contextmanager
+    def connect(self) -> Generator[IMAPClient, None, None]:
+        """
+        Context manager that yields the shared, authenticated client.
+        """
+        with self._session.client() as client:
+            yield client
+
+    def _get_watch_session(self, folder: str) -> ImapSession:
+        with self._lock:
+            session = self._watch_sessions.get(folder)
+            if not session:
+                session = self._watch_sessions[folder] = ImapSession(
+                    self._connect, name=self._session_name(folder)
+                )
+
+            return session
+
+    def close(self):
+        with self._lock:
+            sessions = [self._session, *self._watch_sessions.values()]
+            self._watch_sessions.clear()
+
+        for session in sessions:
+            session.disconnect()
 
     @staticmethod
     def _get_folders(data: List[tuple]) -> List[Dict[str, str]]:
@@ -172,10 +248,10 @@ class MailImapPlugin(MailInPlugin):
         ]
 
     def search_unseen_messages(self, folder: str = 'INBOX') -> List[Mail]:
-        return self.search(criteria='UNSEEN', directory=folder)
+        return self.search(criteria='UNSEEN', folder=folder)
 
     def search_flagged_messages(self, folder: str = 'INBOX', **_) -> List[Mail]:
-        return self.search(criteria='Flagged', directory=folder)
+        return self.search(criteria='Flagged', folder=folder)
 
     def search_starred_messages(self, folder: str = 'INBOX', **_) -> List[Mail]:
         return self.search_flagged_messages(folder)
@@ -191,6 +267,50 @@ class MailImapPlugin(MailInPlugin):
             msg_ids = client.sort(sort_criteria=sort_criteria, criteria=criteria)  # type: ignore
             return msg_ids
 
+    def _get_cached_messages(
+        self,
+        client: IMAPClient,
+        folder: str,
+        uidvalidity,
+        ids: Collection[int],
+        flags: Optional[Dict[int, Iterable[bytes]]] = None,
+    ) -> Dict[int, Mail]:
+        """
+        Get the headers of the given messages, fetching from the server only
+        the ones that aren't cached. If ``flags`` isn't provided, the flags
+        of the cached messages are fetched too.
+        """
+        msgs: Dict[int, Dict[bytes, Any]] = {}
+        for msg_id in ids:
+            headers = self._headers.get(folder, uidvalidity, msg_id)
+            if headers is not None:
+                msgs[msg_id] = headers
+
+        missing = [msg_id for msg_id in ids if msg_id not in msgs]
+        if msgs and flags is None:
+            data = client.fetch(list(msgs), ['FLAGS'])
+            # Messages that aren't returned have been expunged in the meantime
+            msgs = {
+                msg_id: {**msgs[msg_id], **data[msg_id]}
+                for msg_id in msgs
+                if msg_id in data
+            }
+        elif flags is not None:
+            msgs = {
+                msg_id: {**msg, b'FLAGS': flags.get(msg_id, ())}
+                for msg_id, msg in msgs.items()
+            }
+
+        if missing:
+            data = client.fetch(missing, ['FLAGS', *header_attributes])
+            for msg_id, msg in data.items():
+                self._headers.put(folder, uidvalidity, msg_id, msg)
+                msgs[msg_id] = msg
+
+        return {
+            msg_id: self._parse_message(msg_id, msg) for msg_id, msg in msgs.items()
+        }
+
     def get_messages(
         self,
         *ids: int,
@@ -200,21 +320,116 @@ class MailImapPlugin(MailInPlugin):
     ) -> Dict[int, Mail]:
         ret = {}
         with self.connect() as client:
-            client.select_folder(folder, readonly=True)
-            attrs = ['FLAGS', 'RFC822.SIZE', 'INTERNALDATE', 'ENVELOPE']
-            if with_body:
-                attrs.append('BODY[]')
+            info = client.select_folder(folder, readonly=True)
+            uidvalidity = info.get(b'UIDVALIDITY')
+            if not with_body:
+                msgs = self._get_cached_messages(client, folder, uidvalidity, ids)
+                return {id: msgs[id] for id in ids if id in msgs}
 
+            attrs = ['FLAGS', *header_attributes, 'BODY[]']
             data = client.fetch(ids, attrs)
             for id in ids:  # pylint: disable=redefined-builtin
                 msg = data.get(id)
                 if not msg:
                     continue
 
+                self._headers.put(folder, uidvalidity, id, msg)
                 ret[id] = self._parse_message(id, msg)
 
         return ret
 
+    @staticmethod
+    def _get_int(info: Dict[bytes, Any], key: bytes) -> Optional[int]:
+        value = info.get(key)
+        if isinstance(value, (list, tuple)):
+            value = value[0] if value else None
+        return int(value) if value is not None else None
+
+    def _sync_flags(self, client: IMAPClient, folder: str) -> FolderState:
+        info = client.select_folder(folder, readonly=True)
+        uidvalidity = self._get_int(info, b'UIDVALIDITY')
+        modseq = self._get_int(info, b'HIGHESTMODSEQ')
+        exists = self._get_int(info, b'EXISTS') or 0
+
+        with self._lock:
+            state = self._folders.get(folder)
+            if state is None or state.uidvalidity != uidvalidity:
+                if state is not None:
+                    self.logger.info(
+                        'UIDVALIDITY of %s changed, resynchronizing it', folder
+                    )
+
+                state = self._folders[folder] = FolderState(uidvalidity=uidvalidity)
+
+        if not exists:
+            state.replace({})
+        elif modseq is None or state.modseq is None:
+            # No CONDSTORE support, or first synchronization: fetch all the flags
+            state.replace(client.fetch('1:*', ['FLAGS']))
+        else:
+            if modseq != state.modseq:
+                state.update(
+                    client.fetch(
+                        '1:*', ['FLAGS'], modifiers=[f'CHANGEDSINCE {state.modseq}']
+                    )
+                )
+
+            # New messages always bump the HIGHESTMODSEQ, so a mismatch in
+            # the number of messages means that some have been expunged
+            if exists != len(state.flags):
+                state.retain(client.search('ALL'))
+
+        state.modseq = modseq
+        return state
+
+    def sync_folder(self, folder: str = 'INBOX', **_) -> FolderStatus:
+        with self._get_watch_session(folder).client() as client:
+            state = self._sync_flags(client, folder)
+            unread, flagged = state.unread, state.flagged
+            msgs = self._get_cached_messages(
+                client,
+                folder,
+                state.uidvalidity,
+                {*unread, *flagged},
+                flags=state.flags,
+            )
+
+        return {
+            MailFlagType.UNREAD: {uid: msgs[uid] for uid in unread if uid in msgs},
+            MailFlagType.FLAGGED: {uid: msgs[uid] for uid in flagged if uid in msgs},
+        }
+
+    def wait_for_changes(
+        self,
+        folder: str = 'INBOX',
+        poll_interval: float = 60,
+        idle_timeout: Optional[float] = None,
+        stop: Optional[Event] = None,
+        **_,
+    ):
+        session = self._get_watch_session(folder)
+        stop = stop or Event()
+        if not (idle_timeout and session.has_capability('IDLE')):
+            stop.wait(poll_interval)
+            return
+
+        deadline = time.time() + min(idle_timeout, self.max_idle_time)
+        with session.client() as client:
+            client.select_folder(folder, readonly=True)
+            client.idle()
+            try:
+                while not stop.is_set():
+                    timeout = deadline - time.time()
+                    if timeout <= 0:
+                        break
+
+                    # Check the stop flag at least every few seconds
+                    responses = client.idle_check(timeout=min(timeout, 5))
+                    if any(len(rs) > 1 and rs[1] in _idle_changes for rs in responses):
+                        break
+            finally:
+                client.idle_done()
+
     def create_folder(self, folder: str, **_):
         with self.connect() as client:
             client.create_folder(folder)
@@ -0,0 +1,108 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+SEEN = b'\\Seen'
+FLAGGED = b'\\Flagged'
+
+# Message attributes that don't change for the lifetime of a UID
+header_attributes = ('ENVELOPE', 'INTERNALDATE', 'RFC822.SIZE')
+_volatile_attributes = {b'FLAGS', b'MODSEQ', b'BODY[]'}
+
+
+@dataclass
+class FolderState:
+    """
+    Last synchronized state of an IMAP folder: its ``UIDVALIDITY``, its
+    ``HIGHESTMODSEQ`` (if the server supports CONDSTORE) and the flags of
+    all of its messages, indexed by UID.
+    """
+
+    uidvalidity: Optional[int] = None
+    modseq: Optional[int] = None
+    flags: Dict[int, FrozenSet[bytes]] = field(default_factory=dict)
+    # Pool of the distinct flag sets, so identical sets share memory
+    _flag_sets: Dict[FrozenSet[bytes], FrozenSet[bytes]] = field(
+        default_factory=dict, repr=False
+    )
+
+    def _intern(self, flags: Iterable[bytes]) -> FrozenSet[bytes]:
+        flag_set = frozenset(flags)
+        return self._flag_sets.setdefault(flag_set, flag_set)
+
+    def update(self, data: Dict[int, Dict[bytes, Any]]):
+        """
+        Update the flags from the response of a ``FETCH FLAGS``.
+        """
+        for uid, msg in data.items():
+            if b'FLAGS' in msg:
+                self.flags[uid] = self._intern(msg[b'FLAGS'])
+
+    def replace(self, data: Dict[int, Dict[bytes, Any]]):
+        """
+        Replace the flags with the response of a full ``FETCH 1:* FLAGS``.
+        """
+        self.flags.clear()
+        self._flag_sets.clear()
+        self.update(data)
+
+    def retain(self, uids: Iterable[int]):
+        """
+        Drop the messages that are no longer in the folder.
+        """
+        uids = set(uids)
+        for uid in [uid for uid in self.flags if uid not in uids]:
+            del self.flags[uid]
+
+    @property
+    def unread(self):
+        return [uid for uid, flags in self.flags.items() if SEEN not in flags]
+
+    @property
+    def flagged(self):
+        return [uid for uid, flags in self.flags.items() if FLAGGED in flags]
+
+
+class HeaderCache:
+    """
+    Bounded LRU cache of the immutable attributes of the messages (envelope,
+    internal date and size), indexed by ``(folder, uidvalidity, uid)``.
+
+    The entries of a folder whose ``UIDVALIDITY`` changes are never matched
+    again, and they are eventually evicted.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data: 'OrderedDict[Tuple[str, Any, int], Dict[bytes, Any]]' = (
+            OrderedDict()
+        )
+        self._lock = RLock()
+
+    def get(self, folder: str, uidvalidity, uid: int) -> Optional[Dict[bytes, Any]]:
+        key = (folder, uidvalidity, uid)
+        with self._lock:
+            headers = self._data.get(key)
+            if headers is not None:
+                self._data.move_to_end(key)
+            return headers
+
+    def put(self, folder: str, uidvalidity, uid: int, msg: Dict[bytes, Any]):
+        headers = {k: v for k, v in msg.items() if k not in _volatile_attributes}
+        if not all(attr.encode() in headers for attr in header_attributes):
+            return
+
+        key = (folder, uidvalidity, uid)
+        with self._lock:
+            self._data[key] = headers
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,111 @@
+import logging
+import time
+
+from contextlib import contextmanager
+from threading import RLock
+from typing import Callable, Generator, Optional, Set
+
+from imapclient import IMAPClient
+from imapclient.exceptions import IMAPClientAbortError
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection can't be reused
+connection_errors = (IMAPClientAbortError, OSError, EOFError)
+
+
+class ImapSession:
+    """
+    A persistent, authenticated IMAP connection shared by multiple callers.
+
+    The connection is created lazily and reused across calls. Access is
+    serialized through a lock, connections that have been idle for longer than
+    ``keepalive`` seconds are checked with a ``NOOP`` before being reused, and
+    connections that fail with a network or protocol error are discarded and
+    re-created on the next use.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], IMAPClient],
+        name: str = '',
+        keepalive: float = 60,
+    ):
+        """
+        :param connect: Function that returns a new, authenticated client.
+        :param name: Name of the session, used in the logs.
+        :param keepalive: Number of seconds after which an idle connection is
+            checked before being reused.
+        """
+        self.name = name
+        self.keepalive = keepalive
+        self.lock = RLock()
+        self._connect = connect
+        self._client: Optional[IMAPClient] = None
+        self._capabilities: Set[str] = set()
+        self._last_used = 0.0
+
+    @property
+    def capabilities(self) -> Set[str]:
+        """
+        The capabilities advertised by the server after the login.
+        """
+        with self.lock:
+            if self._client is None:
+                self._get_client()
+            return self._capabilities
+
+    def has_capability(self, capability: str) -> bool:
+        return capability.upper() in self.capabilities
+
+    def _get_client(self) -> IMAPClient:
+        if self._client is not None and time.time() - self._last_used > self.keepalive:
+            try:
+                self._client.noop()
+            except connection_errors as e:
+                logger.info('IMAP session %s expired: %s', self.name, e)
+                self.disconnect()
+
+        if self._client is None:
+            logger.debug('Opening IMAP session %s', self.name)
+            self._client = self._connect()
+            self._capabilities = {
+                cap.decode().upper() if isinstance(cap, bytes) else cap.upper()
+                for cap in self._client.capabilities()
+            }
+
+        return self._client
+
+    @contextmanager
+    def client(self) -> Generator[IMAPClient, None, None]:
+        """
+        Context manager that yields the connected client, holding the session
+        lock until the block exits.
+        """
+        with self.lock:
+            client = self._get_client()
+            try:
+                yield client
+            except connection_errors:
+                self.disconnect()
+                raise
+            finally:
+                self._last_used = time.time()
+
+    def disconnect(self):
+        with self.lock:
+            client, self._client = self._client, None
+            if client is None:
+                return
+
+            try:
+                client.logout()
+            except Exception as e:
+                logger.debug('Error while closing IMAP session %s: %s', self.name, e)
+                try:
+                    client.shutdown()
+                except Exception:
+                    pass
+
+
+# vim:sw=4:ts=4:et:
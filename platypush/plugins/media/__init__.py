@@ -838,7 +838,11 @@ class MediaPlugin(RunnablePlugin, ABC):
 
     @action
     def start_streaming(
-        self, media: str, subtitles: Optional[str] = None, download: bool = False
+        self,
+        media: str,
+        subtitles: Optional[str] = None,
+        download: bool = False,
+        hls: bool = False,
     ):
         """
         Starts streaming local media over the specified HTTP port.
@@ -849,6 +853,11 @@ class MediaPlugin(RunnablePlugin, ABC):
         :param subtitles: Path or URL to the subtitles track to be used
         :param download: Set to True if you prefer to download the file from
             the streaming link instead of streaming it
+        :param hls: Set to True to also return the URL of an adaptive (HLS)
+            stream of the media (default: False). The HLS stream offers a
+            couple of lower-bitrate renditions that are transcoded on demand,
+            segment by segment, as the clients request them, and cached by
+            the HTTP backend. It requires ``ffmpeg`` and ``ffprobe``.
         :return: dict containing the streaming URL.Example:
 
         .. code-block:: json
@@ -857,14 +866,21 @@ class MediaPlugin(RunnablePlugin, ABC):
                 "id": "0123456abcdef.mp4",
                 "source": "file:///mnt/media/movies/movie.mp4",
                 "mime_type": "video/mp4",
-                "url": "http://192.168.1.2:8008/media/0123456abcdef.mp4"
+                "url": "http://192.168.1.2:8008/media/0123456abcdef.mp4",
+                "hls_url": "http://192.168.1.2:8008/media/hls/0123456abcdef/master.m3u8"
             }
 
         """
-        return self._start_streaming(media, subtitles=subtitles, download=download)
+        return self._start_streaming(
+            media, subtitles=subtitles, download=download, hls=hls
+        )
 
     def _start_streaming(
-        self, media: str, subtitles: Optional[str] = None, download: bool = False
+        self,
+        media: str,
+        subtitles: Optional[str] = None,
+        download: bool = False,
+        hls: bool = False,
     ):
         http = get_backend('http')
         if not http:
@@ -875,7 +891,7 @@ class MediaPlugin(RunnablePlugin, ABC):
         self.logger.info('Starting streaming %s', media)
         response = requests.put(
             f'{http.local_base_url}/media' + ('?download' if download else ''),
-            json={'source': media, 'subtitles': subtitles},
+            json={'source': media, 'subtitles': subtitles, 'hls': hls},
             timeout=300,
         )
 
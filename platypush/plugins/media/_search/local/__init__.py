@@ -3,10 +3,12 @@ import os
 import re
 import threading
 import time
+from typing import Dict, List
 
 from sqlalchemy import create_engine
 from sqlalchemy.sql.expression import func
 
+from platypush.common.fts import FtsIndex
 from platypush.config import Config
 from platypush.plugins.media._search import MediaSearcher
 
@@ -15,10 +17,12 @@ from .db import (
     MediaDirectory,
     MediaFile,
     MediaFileToken,
+    MediaSubdirectory,
     MediaToken,
     Session,
 )
 
+from .indexer import MediaIndexer
 from .metadata import get_metadata
 
 _db_lock = threading.RLock()
@@ -30,17 +34,40 @@ class LocalMediaSearcher(MediaSearcher):
     will index the media files for a faster search, it will detect which
     directories have been changed since the last scan and re-index their content
     if needed.
+
+    The queries run against the index. A directory is scanned before the
+    query only if it has never been indexed, otherwise it's rescanned in the
+    background when its last scan is older than ``scan_interval`` seconds.
     """
 
     _filename_separators = r'[.,_\-@()\[\]\{\}\s\'\"]+'
+    _default_scan_interval = 300
 
-    def __init__(self, dirs, *args, **kwargs):
+    def __init__(
+        self, dirs, *args, scan_interval: float = _default_scan_interval, **kwargs
+    ):
         super().__init__(*args, **kwargs)
         self.dirs = dirs
+        self.scan_interval = scan_interval
         db_dir = os.path.join(Config.get_workdir(), 'media')
         os.makedirs(db_dir, exist_ok=True)
         self.db_file = os.path.join(db_dir, 'media.db')
         self._db_engine = None
+        self._fts = FtsIndex('MediaFileFts', columns=['filename'])
+        self._indexer = MediaIndexer(
+            is_media_file=self._is_media_file, tokenize=self._tokenize, fts=self._fts
+        )
+        self._last_scans: Dict[str, float] = {}
+        self._scan_lock = threading.Lock()
+
+    @staticmethod
+    def _is_media_file(path: str) -> bool:
+        from platypush.plugins.media import MediaPlugin
+
+        filename = os.path.basename(path)
+        return MediaPlugin.is_video_file(filename) or MediaPlugin.is_audio_file(
+            filename
+        )
 
     def supports(self, type: str) -> bool:
         return type == 'file'
@@ -54,9 +81,39 @@ class LocalMediaSearcher(MediaSearcher):
 
             Base.metadata.create_all(self._db_engine)
             Session.configure(bind=self._db_engine)
+            self._init_fts(Session())
 
         return Session()
 
+    def _init_fts(self, session):
+        """
+        Initialize the full-text index, and migrate the existing token index
+        to it if it's been just created.
+        """
+        if not self._fts.is_available(session):
+            self.logger.info(
+                'SQLite FTS5 is not available, falling back to the token index'
+            )
+            return
+
+        with _db_lock:
+            if not self._fts.init(session):
+                session.commit()
+                return
+
+            self.logger.info('Migrating the media token index to full-text search')
+            self._fts.index(
+                session,
+                (
+                    (file_id, [' '.join(self._tokenize(os.path.basename(path)))])
+                    for file_id, path in session.query(MediaFile.id, MediaFile.path)
+                ),
+            )
+
+            session.query(MediaFileToken).delete(synchronize_session=False)
+            session.query(MediaToken).delete(synchronize_session=False)
+            session.commit()
+
     @staticmethod
     def _get_or_create_dir_entry(session, path):
         record = session.query(MediaDirectory).filter_by(path=path).first()
@@ -68,22 +125,12 @@ class LocalMediaSearcher(MediaSearcher):
         return record
 
     @classmethod
-    def _get_last_modify_time(cls, path, recursive=False):
-        return (
-            max([os.path.getmtime(p) for p, _, _ in os.walk(path)])
-            if recursive
-            else os.path.getmtime(path)
-        )
-
-    @classmethod
-    def _has_directory_changed_since_last_indexing(cls, dir_record):
-        if not dir_record.last_indexed_at:
-            return True
-
-        return (
-            datetime.datetime.fromtimestamp(cls._get_last_modify_time(dir_record.path))
-            > dir_record.last_indexed_at
-        )
+    def _tokenize(cls, filename: str):
+        return [
+            token.lower()
+            for token in re.split(cls._filename_separators, filename.strip())
+            if token
+        ]
 
     @classmethod
     def _matches_query(cls, filename, query):
@@ -94,210 +141,246 @@ class LocalMediaSearcher(MediaSearcher):
 
         return all(token in filename for token in query_tokens)
 
-    @classmethod
-    def _sync_token_records(cls, session, *tokens):
-        tokens = list(tokens)
-        if not tokens:
-            return []
-
-        records = {
-            record.token: record
-            for record in session.query(MediaToken)
-            .filter(MediaToken.token.in_(tokens))
-            .all()
-        }
-
-        for token in tokens:
-            if token in records:
-                continue
-            record = MediaToken.build(token=token)
-            session.add(record)
-            records[token] = record
-
-        session.commit()
-        return session.query(MediaToken).filter(MediaToken.token.in_(tokens)).all()
-
-    @classmethod
-    def _get_file_records(cls, dir_record, session):
-        return session.query(MediaFile).filter_by(directory_id=dir_record.id).all()
-
     def scan(self, media_dir, session=None, dir_record=None):
         """
         Scans a media directory and stores the search results in the internal
-        SQLite index
-        """
-        from platypush.plugins.media import MediaPlugin
+        SQLite index.
+
+        Only the subdirectories that have changed since the last scan are
+        re-indexed.
 
+        :return: The :class:`.ScanStats` of the scan.
+        """
         if not session:
             session = self._get_db_session()
 
-        self.logger.info('Indexing directory {}'.format(media_dir))
-        index_start_time = time.time()
-
         if not dir_record:
-            dir_record = self._get_or_create_dir_entry(session, media_dir)
+            with _db_lock:
+                dir_record = self._get_or_create_dir_entry(session, media_dir)
 
         if not os.path.isdir(media_dir):
             self.logger.info(
                 'Directory {} is no longer accessible, removing it'.format(media_dir)
             )
-            session.query(MediaDirectory).filter(
-                MediaDirectory.path == media_dir
-            ).delete(synchronize_session='fetch')
-            return
-
-        media_files = []
-        stored_file_records = {
-            f.path: f for f in self._get_file_records(dir_record, session)
-        }
+            with _db_lock:
+                session.query(MediaSubdirectory).filter(
+                    MediaSubdirectory.directory_id == dir_record.id
+                ).delete(synchronize_session='fetch')
+                session.query(MediaDirectory).filter(
+                    MediaDirectory.path == media_dir
+                ).delete(synchronize_session='fetch')
+                session.commit()
+            return None
 
-        for path, _, files in os.walk(media_dir):
-            for filename in files:
-                filepath = os.path.join(path, filename)
+        # The directory tree is walked without holding the database lock, so
+        # the queries can run against the current index in the meantime
+        changes = self._indexer.diff(session, dir_record.id, media_dir)
 
-                if filepath in stored_file_records:
-                    # stored_file_records will be used to keep track of the
-                    # files that have been removed from media_dir. If the file
-                    # is still there, don't index it again
-                    del stored_file_records[filepath]
-                    continue
+        with _db_lock:
+            try:
+                stats, media_files = self._indexer.apply(
+                    session, dir_record.id, changes
+                )
+                dir_record.last_indexed_at = datetime.datetime.now()  # type: ignore
+                session.commit()
+            except Exception:
+                session.rollback()
+                self._indexer.reset()
+                raise
 
-                if not MediaPlugin.is_video_file(
-                    filename
-                ) and not MediaPlugin.is_audio_file(filename):
-                    continue
+        if stats.changed_dirs:
+            self.logger.info(
+                'Scanned %s: %d/%d directories changed, %d files processed, '
+                '%d added, %d removed in %.2f seconds (%.1f files/sec)',
+                media_dir,
+                stats.changed_dirs,
+                stats.dirs,
+                stats.files,
+                stats.added,
+                stats.removed,
+                stats.elapsed,
+                stats.files_per_sec,
+            )
 
-                self.logger.info('Scanning item %s', filepath)
-                tokens = [
-                    _.lower()
-                    for _ in re.split(self._filename_separators, filename.strip())
-                ]
+        if media_files:
+            # Start the metadata scan in a separate thread
+            threading.Thread(
+                target=self._metadata_scan_thread, args=(media_files,), daemon=True
+            ).start()
 
-                token_records = self._sync_token_records(session, *tokens)
-                file_record = MediaFile.build(directory_id=dir_record.id, path=filepath)
-                session.add(file_record)
-                session.commit()
+        return stats
 
-                file_record = (
-                    session.query(MediaFile)
-                    .filter_by(directory_id=dir_record.id, path=filepath)
-                    .one()
-                )
+    def _scan_dirs(self, dirs: List[str], requested_at: float):
+        """
+        Scan some media directories, skipping those that another thread has
+        scanned since ``requested_at``.
+        """
+        with self._scan_lock:
+            session = self._get_db_session()
+            for media_dir in dirs:
+                last_scan = self._last_scans.get(media_dir)
+                if last_scan is not None and last_scan >= requested_at:
+                    continue
 
-                for token_record in token_records:
-                    file_token = MediaFileToken.build(
-                        file_id=file_record.id, token_id=token_record.id
-                    )
-                    session.add(file_token)
+                try:
+                    self.scan(media_dir, session=session)
+                finally:
+                    self._last_scans[media_dir] = time.monotonic()
 
-                media_files.append(file_record)
+    def _background_scan(self, dirs: List[str], requested_at: float):
+        try:
+            self._scan_dirs(dirs, requested_at)
+        except Exception as e:
+            self.logger.warning('Could not scan the media directories: %s', e)
+            self.logger.exception(e)
 
-        # stored_file_records should now only contain the records of the files
-        # that have been removed from the directory
-        if stored_file_records:
-            self.logger.info(
-                'Removing references to {} deleted media items from {}'.format(
-                    len(stored_file_records), media_dir
-                )
-            )
+    def _refresh_index(self, session):
+        """
+        Scan the directories that have never been indexed, and start a
+        background rescan of those whose last scan is older than
+        ``scan_interval``.
+        """
+        now = time.monotonic()
+        stale_dirs = [
+            media_dir
+            for media_dir in self.dirs
+            if media_dir not in self._last_scans
+            or now - self._last_scans[media_dir] >= self.scan_interval
+        ]
 
-            session.query(MediaFile).filter(
-                MediaFile.id.in_([record.id for record in stored_file_records.values()])
-            ).delete(synchronize_session='fetch')
+        if not stale_dirs:
+            return
 
-        dir_record.last_indexed_at = datetime.datetime.now()  # type: ignore
-        self.logger.info(
-            'Scanned {} in {} seconds'.format(
-                media_dir, int(time.time() - index_start_time)
-            )
-        )
+        with _db_lock:
+            indexed_dirs = {
+                path
+                for (path,) in session.query(MediaDirectory.path).filter(
+                    MediaDirectory.last_indexed_at.isnot(None)
+                )
+            }
 
-        session.commit()
+        new_dirs = [d for d in stale_dirs if d not in indexed_dirs]
+        if new_dirs:
+            self._scan_dirs(new_dirs, now)
 
-        # Start the metadata scan in a separate thread
-        threading.Thread(
-            target=self._metadata_scan_thread, args=(media_files,), daemon=True
-        ).start()
+        indexed_stale_dirs = [d for d in stale_dirs if d in indexed_dirs]
+        if indexed_stale_dirs:
+            threading.Thread(
+                target=self._background_scan,
+                args=(indexed_stale_dirs, now),
+                name='media-indexer',
+                daemon=True,
+            ).start()
 
     def _metadata_scan_thread(self, records):
         """
-        Thread that will scan the media files in the given paths and update
-        their metadata.
+        Thread that will scan the media files in the given ``(id, path)``
+        records and update their metadata.
         """
-        paths = [record.path for record in records]
+        paths = [path for _, path in records]
         metadata = get_metadata(*paths)
         session = self._get_db_session()
 
-        for record, data in zip(records, metadata):
-            record = session.merge(record)
-            record.duration = data.get('duration')  # type: ignore
-            record.width = data.get('width')  # type: ignore
-            record.height = data.get('height')  # type: ignore
-            record.image = data.get('image')  # type: ignore
-            record.created_at = data.get('created_at')  # type: ignore
-            session.add(record)
+        with _db_lock:
+            session.bulk_update_mappings(
+                MediaFile,
+                [
+                    {
+                        'id': file_id,
+                        'duration': data.get('duration'),
+                        'width': data.get('width'),
+                        'height': data.get('height'),
+                        'image': data.get('image'),
+                        'created_at': data.get('created_at'),
+                    }
+                    for (file_id, _), data in zip(records, metadata)
+                    if data
+                ],
+            )
 
-        session.commit()
+            session.commit()
+
+    def _fts_search(self, session, query_tokens, limit, offset):
+        """
+        Search the full-text index, sorting the results by relevance.
+        """
+        file_ids = [
+            int(doc_id)
+            for doc_id, _ in self._fts.search(
+                session, query_tokens, prefix=True, limit=limit, offset=offset
+            )
+        ]
+
+        if not file_ids:
+            return []
+
+        records = {
+            record.id: record
+            for record in session.query(MediaFile).filter(MediaFile.id.in_(file_ids))
+        }
+
+        return [records[file_id] for file_id in file_ids if file_id in records]
+
+    @staticmethod
+    def _token_search(session, query_tokens, limit, offset):
+        """
+        Search the token index.
+        """
+        return (
+            session.query(MediaFile)
+            .where(
+                MediaFile.id.in_(
+                    session.query(MediaFile.id)
+                    .join(MediaFileToken)
+                    .join(MediaToken)
+                    .filter(MediaToken.token.in_(query_tokens))
+                    .group_by(MediaFile.id)
+                    .having(func.count(MediaFileToken.token_id) >= len(query_tokens))
+                )
+            )
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
 
     def search(self, query, *_, limit=None, page_state=None, **__):
         """
         Searches in the configured media directories given a query. It uses the
-        built-in SQLite index if available. If any directory has changed since
-        the last scan then it will be indexed again and the up-to-date results
-        will be returned.
+        built-in SQLite index if available. The directories that have never
+        been indexed are scanned before running the query, the others are
+        periodically re-indexed in the background.
         """
 
         limit = limit or self._default_limit
         offset = (page_state or {}).get('offset', 0)
         session = self._get_db_session()
         results = {}
+        self._refresh_index(session)
 
         with _db_lock:
-            for media_dir in self.dirs:
-                self.logger.info('Searching {} for "{}"'.format(media_dir, query))
-                dir_record = self._get_or_create_dir_entry(session, media_dir)
+            self.logger.info('Searching {} for "{}"'.format(self.dirs, query))
+            query_tokens = self._tokenize(query)
+            if self._indexer.use_fts(session):
+                file_records = self._fts_search(
+                    session, query_tokens, limit=limit, offset=offset
+                )
+            else:
+                file_records = self._token_search(
+                    session, query_tokens, limit=limit, offset=offset
+                )
 
-                if self._has_directory_changed_since_last_indexing(dir_record):
-                    self.logger.info(
-                        '{} has changed since last indexing, '.format(media_dir)
-                        + 're-indexing'
-                    )
-
-                    self.scan(media_dir, session=session, dir_record=dir_record)
-
-                query_tokens = [
-                    _.lower()
-                    for _ in re.split(self._filename_separators, query.strip())
-                ]
-
-                for file_record in (
-                    session.query(MediaFile)
-                    .where(
-                        MediaFile.id.in_(
-                            session.query(MediaFile.id)
-                            .join(MediaFileToken)
-                            .join(MediaToken)
-                            .filter(MediaToken.token.in_(query_tokens))
-                            .group_by(MediaFile.id)
-                            .having(
-                                func.count(MediaFileToken.token_id) >= len(query_tokens)
-                            )
-                        )
-                    )
-                    .offset(offset)
-                    .limit(limit)
-                ):
-                    if os.path.isfile(file_record.path):
-                        results[file_record.path] = {
-                            'url': 'file://' + file_record.path,
-                            'title': os.path.basename(file_record.path),
-                            'size': os.path.getsize(file_record.path),
-                            'duration': file_record.duration,
-                            'width': file_record.width,
-                            'height': file_record.height,
-                            'image': file_record.image,
-                            'created_at': file_record.created_at,
-                        }
+            for file_record in file_records:
+                if os.path.isfile(file_record.path):
+                    results[file_record.path] = {
+                        'url': 'file://' + file_record.path,
+                        'title': os.path.basename(file_record.path),
+                        'size': os.path.getsize(file_record.path),
+                        'duration': file_record.duration,
+                        'width': file_record.width,
+                        'height': file_record.height,
+                        'image': file_record.image,
+                        'created_at': file_record.created_at,
+                    }
 
         result_list = list(results.values())
         next_state = {'offset': offset + limit} if len(result_list) >= limit else None
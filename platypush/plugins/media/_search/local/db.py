@@ -8,6 +8,7 @@ from sqlalchemy import (
     DateTime,
     PrimaryKeyConstraint,
     ForeignKey,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import sessionmaker, scoped_session
 
@@ -36,6 +37,34 @@ class MediaDirectory(Base):
         return record
 
 
+class MediaSubdirectory(Base):
+    """Models the MediaSubdirectory table"""
+
+    __tablename__ = 'MediaSubdirectory'
+
+    id = Column(Integer, primary_key=True)
+    directory_id = Column(
+        Integer, ForeignKey('MediaDirectory.id', ondelete='CASCADE'), nullable=False
+    )
+    path = Column(String, nullable=False)
+    mtime = Column(Float)
+
+    # The subdirectories are indexed per media directory
+    __table_args__ = (
+        UniqueConstraint(directory_id, path),
+        {'sqlite_autoincrement': True},
+    )
+
+    @classmethod
+    def build(cls, directory_id, path, mtime=None, id=None):
+        record = cls()
+        record.id = id
+        record.directory_id = directory_id
+        record.path = path
+        record.mtime = mtime
+        return record
+
+
 class MediaFile(Base):
     """Models the MediaFile table"""
 
@@ -0,0 +1,400 @@
+import datetime
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.sql.expression import func
+
+from platypush.common.fts import FtsIndex
+
+from .db import (
+    MediaFile,
+    MediaFileToken,
+    MediaSubdirectory,
+    MediaToken,
+)
+
+logger = logging.getLogger(__name__)
+
+_DirScan = Tuple[str, float, List[str], Optional[List[str]]]
+"""
+The result of the scan of a directory: ``(path, mtime, subdirs, files)``.
+``files`` is None if the directory hasn't changed since the last scan.
+"""
+
+
+@dataclass
+class ScanStats:
+    """
+    Statistics about a scan of a media directory.
+    """
+
+    dirs: int = 0
+    changed_dirs: int = 0
+    files: int = 0
+    """ Number of files processed in the changed directories. """
+    added: int = 0
+    removed: int = 0
+    elapsed: float = 0
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0
+
+
+@dataclass
+class ScanChanges:
+    """
+    Changes detected by :meth:`MediaIndexer.diff` on a media directory.
+    """
+
+    stats: ScanStats
+    stored_subdirs: Dict[str, Tuple[int, float]]
+    """ ``path -> (id, mtime)`` of the stored subdirectories. """
+    scanned: Dict[str, Tuple[float, Optional[List[str]]]]
+    """ ``path -> (mtime, files)`` of the scanned subdirectories. """
+    new_files: List[str]
+    removed_files: List[int]
+    started_at: float
+
+
+def _chunks(items: Sequence, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class MediaIndexer:
+    """
+    Incremental indexer for a local media directory.
+
+    - The directory tree is walked with ``os.scandir`` on a pool of
+      directory workers.
+    - The mtime of each subdirectory is stored: if it hasn't changed since
+      the last scan, then its list of entries hasn't changed either, and the
+      directory is only ``stat``-ed rather than listed.
+    - New files are bulk-inserted in a single transaction with pre-assigned
+      primary keys. If a full-text index is available, the filenames are
+      indexed there, otherwise tokens and file-token associations are
+      bulk-inserted using an in-memory ``token -> id`` map.
+    """
+
+    batch_size = 10000
+    """ Maximum number of rows per bulk insert/update. """
+    max_query_params = 500
+    """ Maximum number of parameters in an ``IN`` clause. """
+
+    def __init__(
+        self,
+        is_media_file: Callable[[str], bool],
+        tokenize: Callable[[str], Iterable[str]],
+        workers: Optional[int] = None,
+        fts: Optional[FtsIndex] = None,
+    ):
+        self.is_media_file = is_media_file
+        self.tokenize = tokenize
+        self.fts = fts
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self._token_ids: Optional[Dict[str, int]] = None
+
+    def reset(self):
+        """
+        Invalidate the in-memory token map, e.g. after a rolled back
+        transaction.
+        """
+        self._token_ids = None
+
+    @staticmethod
+    def _scan_dir(
+        path: str, stored_mtime: Optional[float], stored_subdirs: List[str]
+    ) -> _DirScan:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError as e:
+            logger.warning('Could not access %s: %s', path, e)
+            return path, 0, [], []
+
+        # The list of entries of a directory can only change if its mtime
+        # changes
+        if stored_mtime is not None and mtime == stored_mtime:
+            return path, mtime, stored_subdirs, None
+
+        subdirs, files = [], []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry.path)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning('Could not scan %s: %s', path, e)
+
+        return path, mtime, subdirs, files
+
+    def walk(
+        self, root: str, stored_mtimes: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Tuple[float, Optional[List[str]]]]:
+        """
+        Walk a directory tree in parallel.
+
+        :param root: Root directory.
+        :param stored_mtimes: ``path -> mtime`` map of the directories
+            indexed on the previous scan.
+        :return: A ``path -> (mtime, files)`` map, where ``files`` is None
+            for the directories that haven't changed.
+        """
+        stored_mtimes = stored_mtimes or {}
+        stored_subdirs = defaultdict(list)
+        for path in stored_mtimes:
+            if path != root:
+                stored_subdirs[os.path.dirname(path)].append(path)
+
+        results = {}
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix='media-indexer'
+        ) as pool:
+
+            def submit(path: str):
+                return pool.submit(
+                    self._scan_dir,
+                    path,
+                    stored_mtimes.get(path),
+                    stored_subdirs.get(path, []),
+                )
+
+            pending = {submit(root)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path, mtime, subdirs, files = future.result()
+                    results[path] = (mtime, files)
+                    pending.update(submit(subdir) for subdir in subdirs)
+
+        return results
+
+    def _get_token_ids(self, session) -> Dict[str, int]:
+        if self._token_ids is None:
+            self._token_ids = {
+                token: token_id
+                for token_id, token in session.query(MediaToken.id, MediaToken.token)
+            }
+
+        return self._token_ids
+
+    def use_fts(self, session) -> bool:
+        """
+        :return: True if the full-text index should be used on this session.
+        """
+        return self.fts is not None and self.fts.is_available(session)
+
+    @staticmethod
+    def _next_id(session, model) -> int:
+        return (session.query(func.max(model.id)).scalar() or 0) + 1
+
+    def _insert_files(
+        self, session, directory_id: int, paths: List[str]
+    ) -> List[Tuple[int, str]]:
+        if not paths:
+            return []
+
+        use_fts = self.use_fts(session)
+        token_ids = {} if use_fts else self._get_token_ids(session)
+        next_file_id = self._next_id(session, MediaFile)
+        next_token_id = self._next_id(session, MediaToken)
+        now = datetime.datetime.now()
+        files, new_tokens, file_tokens, fts_docs = [], [], [], []
+
+        for file_id, path in enumerate(paths, start=next_file_id):
+            files.append(
+                {
+                    'id': file_id,
+                    'directory_id': directory_id,
+                    'path': path,
+                    'indexed_at': now,
+                }
+            )
+
+            tokens = self.tokenize(os.path.basename(path))
+            if use_fts:
+                fts_docs.append((file_id, [' '.join(tokens)]))
+                continue
+
+            for token in set(tokens):
+                token_id = token_ids.get(token)
+                if token_id is None:
+                    token_id = token_ids[token] = next_token_id
+                    next_token_id += 1
+                    new_tokens.append({'id': token_id, 'token': token})
+
+                file_tokens.append({'file_id': file_id, 'token_id': token_id})
+
+        for model, rows in (
+            (MediaToken, new_tokens),
+            (MediaFile, files),
+            (MediaFileToken, file_tokens),
+        ):
+            for chunk in _chunks(rows, self.batch_size):
+                session.bulk_insert_mappings(model, chunk)
+
+        if use_fts and self.fts:
+            for chunk in _chunks(fts_docs, self.batch_size):
+                self.fts.index(session, chunk)
+
+        return [(f['id'], f['path']) for f in files]
+
+    def _delete_files(self, session, file_ids: List[int]):
+        if self.fts and self.use_fts(session):
+            self.fts.delete(session, file_ids)
+
+        for chunk in _chunks(file_ids, self.max_query_params):
+            session.query(MediaFileToken).filter(
+                MediaFileToken.file_id.in_(chunk)
+            ).delete(synchronize_session=False)
+            session.query(MediaFile).filter(MediaFile.id.in_(chunk)).delete(
+                synchronize_session=False
+            )
+
+    def _sync_subdirs(
+        self,
+        session,
+        directory_id: int,
+        stored: Dict[str, Tuple[int, float]],
+        scanned: Dict[str, Tuple[float, Optional[List[str]]]],
+    ):
+        removed = [
+            subdir_id for path, (subdir_id, _) in stored.items() if path not in scanned
+        ]
+        updated = [
+            {'id': stored[path][0], 'mtime': mtime}
+            for path, (mtime, files) in scanned.items()
+            if path in stored and files is not None
+        ]
+        added = [
+            {'directory_id': directory_id, 'path': path, 'mtime': mtime}
+            for path, (mtime, _) in scanned.items()
+            if path not in stored
+        ]
+
+        for chunk in _chunks(removed, self.max_query_params):
+            session.query(MediaSubdirectory).filter(
+                MediaSubdirectory.id.in_(chunk)
+            ).delete(synchronize_session=False)
+        for chunk in _chunks(updated, self.batch_size):
+            session.bulk_update_mappings(MediaSubdirectory, chunk)
+        for chunk in _chunks(added, self.batch_size):
+            session.bulk_insert_mappings(MediaSubdirectory, chunk)
+
+    def diff(self, session, directory_id: int, media_dir: str) -> ScanChanges:
+        """
+        Walk a media directory and compare it with the index. It only reads
+        from the database.
+
+        :param session: Database session.
+        :param directory_id: ID of the ``MediaDirectory`` record.
+        :param media_dir: Path of the media directory.
+        """
+        start_time = time.time()
+        stats = ScanStats()
+        stored_subdirs = {
+            path: (subdir_id, mtime)
+            for subdir_id, path, mtime in session.query(
+                MediaSubdirectory.id, MediaSubdirectory.path, MediaSubdirectory.mtime
+            ).filter_by(directory_id=directory_id)
+        }
+
+        scanned = self.walk(
+            media_dir, {path: mtime for path, (_, mtime) in stored_subdirs.items()}
+        )
+
+        changed_dirs = {
+            path for path, (_, files) in scanned.items() if files is not None
+        }
+        stats.dirs = len(scanned)
+        stats.changed_dirs = len(changed_dirs)
+
+        # Only the files in the changed or removed directories need to be
+        # checked against the index
+        stored_files = defaultdict(dict)
+        if changed_dirs or len(scanned) != len(stored_subdirs):
+            for file_id, path in session.query(MediaFile.id, MediaFile.path).filter_by(
+                directory_id=directory_id
+            ):
+                dirname = os.path.dirname(path)
+                if dirname in changed_dirs or dirname not in scanned:
+                    stored_files[dirname][path] = file_id
+
+        new_files, removed_files = [], []
+        for path in changed_dirs:
+            dir_files = stored_files.pop(path, {})
+            files = scanned[path][1] or []
+            stats.files += len(files)
+
+            for filepath in files:
+                if filepath in dir_files:
+                    del dir_files[filepath]
+                    continue
+
+                if self.is_media_file(filepath):
+                    new_files.append(filepath)
+
+            removed_files.extend(dir_files.values())
+
+        # What's left in stored_files belongs to directories that no longer
+        # exist
+        for dir_files in stored_files.values():
+            removed_files.extend(dir_files.values())
+
+        return ScanChanges(
+            stats=stats,
+            stored_subdirs=stored_subdirs,
+            scanned=scanned,
+            new_files=new_files,
+            removed_files=removed_files,
+            started_at=start_time,
+        )
+
+    def apply(
+        self, session, directory_id: int, changes: ScanChanges
+    ) -> Tuple[ScanStats, List[Tuple[int, str]]]:
+        """
+        Apply the changes detected by :meth:`.diff` to the index. The changes
+        aren't committed.
+
+        :return: A tuple with the scan statistics and the ``(id, path)`` of
+            the newly indexed files.
+        """
+        stats = changes.stats
+        self._delete_files(session, changes.removed_files)
+        inserted = self._insert_files(session, directory_id, changes.new_files)
+        self._sync_subdirs(
+            session, directory_id, changes.stored_subdirs, changes.scanned
+        )
+
+        stats.added = len(inserted)
+        stats.removed = len(changes.removed_files)
+        stats.elapsed = time.time() - changes.started_at
+        return stats, inserted
+
+    def scan(
+        self, session, directory_id: int, media_dir: str
+    ) -> Tuple[ScanStats, List[Tuple[int, str]]]:
+        """
+        Incrementally (re-)index a media directory.
+
+        :param session: Database session.
+        :param directory_id: ID of the ``MediaDirectory`` record.
+        :param media_dir: Path of the media directory.
+        :return: A tuple with the scan statistics and the ``(id, path)`` of
+            the newly indexed files.
+        """
+        return self.apply(
+            session, directory_id, self.diff(session, directory_id, media_dir)
+        )
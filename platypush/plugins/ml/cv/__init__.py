@@ -1,5 +1,13 @@
 import os
-
+import threading
+from typing import Dict, List, Optional
+
+from platypush.common.inference import (
+    ModelCache,
+    get_batcher,
+    get_batcher_metrics,
+    stop_batchers,
+)
 from platypush.plugins import Plugin, action
 
 
@@ -10,10 +18,19 @@ class MlModel:
         self.model_file = os.path.abspath(os.path.expanduser(model_file))
         self.classes = classes or []
         self.model = cv2.dnn.readNet(model_file)
+        # cv2.dnn networks can't run concurrent forward passes
+        self._lock = threading.Lock()
 
-    def predict(self, img, resize=None, color_convert=None):
+    @property
+    def size(self) -> int:
+        """
+        Estimated memory footprint of the model, in bytes.
+        """
+        return os.path.getsize(self.model_file)
+
+    @staticmethod
+    def preprocess(img, color_convert=None):
         import cv2
-        import numpy as np
 
         if isinstance(img, str):
             img = cv2.imread(os.path.abspath(os.path.expanduser(img)))
@@ -24,14 +41,51 @@ class MlModel:
 
             img = cv2.cvtColor(img, color_convert)
 
+        return img
+
+    def _forward(self, images: list, resize=None) -> List[int]:
+        import cv2
+        import numpy as np
+
         if resize:
-            img = cv2.dnn.blobFromImage(img, size=tuple(resize), mean=0.5)
+            blob = cv2.dnn.blobFromImages(images, size=tuple(resize), mean=0.5)
         else:
-            img = cv2.dnn.blobFromImage(img, mean=0.5)
+            blob = cv2.dnn.blobFromImages(images, mean=0.5)
+
+        with self._lock:
+            self.model.setInput(blob)
+            output = self.model.forward()
+
+        output = np.reshape(output, (len(images), -1))
+        return [int(i) for i in np.argmax(output, axis=1)]
+
+    def predict_batch(self, images: list, resize=None) -> List[int]:
+        """
+        Run the predictions for a batch of preprocessed images. If no resize
+        is specified, then the images are grouped by shape, and each group is
+        processed through a single forward pass.
+
+        :return: The index of the predicted class for each image.
+        """
+        if resize:
+            return self._forward(images, resize=resize)
+
+        groups: Dict[tuple, List[int]] = {}
+        for i, img in enumerate(images):
+            groups.setdefault(img.shape, []).append(i)
+
+        predictions = [0] * len(images)
+        for indices in groups.values():
+            outputs = self._forward([images[i] for i in indices])
+            for i, prediction in zip(indices, outputs):
+                predictions[i] = prediction
 
-        self.model.setInput(img)
-        output = self.model.forward()
-        prediction = int(np.argmax(output))
+        return predictions
+
+    def predict(self, img, resize=None, color_convert=None):
+        prediction = self.predict_batch(
+            [self.preprocess(img, color_convert=color_convert)], resize=resize
+        )[0]
 
         if self.classes:
             prediction = self.classes[prediction]
@@ -47,11 +101,45 @@ class MlCvPlugin(Plugin):
 
         >>> import cv2.dnn
 
+    Models are kept in an LRU cache with a memory budget, and concurrent
+    predictions on the same model are grouped into batches that are processed
+    through a single forward pass.
     """
 
-    def __init__(self, **kwargs):
+    def __init__(
+        self,
+        model_cache_size: float = 512,
+        max_batch_size: int = 16,
+        max_batch_latency: float = 0.01,
+        workers: int = 1,
+        **kwargs,
+    ):
+        """
+        :param model_cache_size: Maximum amount of memory, in MB, used by the
+            models kept in memory. The least recently used models are unloaded
+            when the budget is exceeded (default: 512).
+        :param max_batch_size: Maximum number of concurrent predictions that
+            are processed in a single forward pass (default: 16).
+        :param max_batch_latency: How long a prediction may wait for other
+            requests to be batched with, in seconds (default: 0.01).
+        :param workers: Number of threads that process the batches (default:
+            1).
+        """
         super().__init__(**kwargs)
-        self.models = {}
+        self.models = ModelCache(
+            max_size=int(model_cache_size * 1024 * 1024),
+            on_evict=lambda model_file, _: stop_batchers(
+                lambda key: key[:2] == (self._plugin_name, model_file)
+            ),
+        )
+        self.max_batch_size = max_batch_size
+        self.max_batch_latency = max_batch_latency
+        self.workers = workers
+
+    def _get_model(self, model_file: str) -> MlModel:
+        return self.models.get(
+            model_file, lambda: MlModel(model_file), size=lambda model: model.size
+        )
 
     @action
     def predict(self, img, model_file, classes=None, resize=None, color_convert=None):
@@ -71,12 +159,58 @@ class MlCvPlugin(Plugin):
         """
 
         model_file = os.path.abspath(os.path.expanduser(model_file))
+        model = self._get_model(model_file)
+        img = MlModel.preprocess(img, color_convert=color_convert)
+        resize = tuple(resize) if resize else None
+
+        batcher = get_batcher(
+            (self._plugin_name, model_file, resize),
+            lambda images: self._get_model(model_file).predict_batch(
+                images, resize=resize
+            ),
+            name=f'{self._plugin_name}:{os.path.basename(model_file)}'
+            + (f'@{resize[0]}x{resize[1]}' if resize else ''),
+            max_batch_size=self.max_batch_size,
+            max_latency=self.max_batch_latency,
+            workers=self.workers,
+        )
+
+        prediction = batcher(img)
+        classes = classes or model.classes
+        if classes:
+            prediction = classes[prediction]
 
-        if model_file not in self.models:
-            self.models[model_file] = MlModel(model_file, classes=classes)
+        return prediction
+
+    @action
+    def get_metrics(self, model_file: Optional[str] = None) -> dict:
+        """
+        Get the throughput metrics of the prediction batches.
+
+        :param model_file: Only return the metrics for this model (default:
+            all the models).
+        :return: Metrics by batch queue. Example:
+
+            .. code-block:: json
+
+                {
+                    "ml.cv:model.pb": {
+                        "requests": 120,
+                        "batches": 31,
+                        "errors": 0,
+                        "avg_batch_size": 3.87,
+                        "avg_latency": 0.024,
+                        "throughput": 8.2
+                    }
+                }
+
+        """
+        if model_file:
+            model_file = os.path.abspath(os.path.expanduser(model_file))
 
-        return self.models[model_file].predict(
-            img, resize=resize, color_convert=color_convert
+        return get_batcher_metrics(
+            lambda key: key[0] == self._plugin_name
+            and (not model_file or key[1] == model_file)
         )
 
 
@@ -62,6 +62,9 @@ class BaseNotePlugin(  # pylint: disable=too-many-ancestors
             alphanumeric characters (including underscores). The longer the number,
             the more tokens will be indexed and longer exact phrases will be stored,
             but more disk space will be used for the search index (default: 4).
+            If the database is SQLite with FTS5 support (the default
+            configuration), then a ranked full-text index is used instead
+            and this parameter is ignored.
         """
         RunnablePlugin.__init__(self, *args, poll_interval=poll_interval, **kwargs)
         DbMixin.__init__(self, *args, max_tokens_length=max_tokens_length, **kwargs)
@@ -281,6 +281,12 @@ class DbMixin(NotesIndexMixin, ABC):  # pylint: disable=too-few-public-methods
                     session.merge(db_note)
 
             # Delete removed notes
+            self._delete_from_content_index(
+                # pylint:disable=protected-access
+                [note._db_id for note in state.notes.deleted.values()],
+                session=session,
+            )
+
             session.query(DbNote).filter(
                 and_(
                     DbNote.plugin == self._plugin_name,
@@ -303,6 +309,15 @@ class DbMixin(NotesIndexMixin, ABC):  # pylint: disable=too-few-public-methods
         Clear the database by removing all notes and collections.
         """
         with self._get_db_session() as session:
+            self._delete_from_content_index(
+                [
+                    note_id
+                    for (note_id,) in session.query(DbNote.id).filter_by(
+                        plugin=self._plugin_name
+                    )
+                ],
+                session=session,
+            )
             session.query(DbNote).filter_by(plugin=self._plugin_name).delete()
             session.query(DbNoteCollection).filter_by(plugin=self._plugin_name).delete()
 
@@ -1,11 +1,15 @@
+import logging
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Collection, Dict, Generator, List, Optional, Type, Union
+from uuid import UUID
 
 from sqlalchemy import and_, exists, or_, func, literal, case
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
+from platypush.common.fts import FtsIndex
 from platypush.common.notes import Note, NoteCollection
 
 from .._model import ApiSettings, Item, ItemType, Results
@@ -16,6 +20,13 @@ from ..db._model import (
 )
 from .search import SearchMixin
 
+_fts_index = FtsIndex(
+    'notes_fts',
+    columns=['title', 'description', 'content'],
+    # Same boosts as the fallback scoring: title > description > content
+    weights=[20, 5, 1],
+)
+
 
 class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-methods
     """
@@ -24,6 +35,7 @@ class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-metho
     """
 
     _api_settings: ApiSettings
+    logger: logging.Logger
 
     @property
     @abstractmethod
@@ -44,6 +56,40 @@ class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-metho
         self, db_collection: DbNoteCollection
     ) -> NoteCollection: ...
 
+    @staticmethod
+    def _fts_doc_id(note_id: Any) -> str:
+        """
+        Notes are indexed by the same hex representation used by the UUID
+        columns on SQLite, so the full-text index can be joined with the
+        notes table.
+        """
+        return UUID(str(note_id)).hex
+
+    def _use_fts(self, session: Session) -> bool:
+        """
+        Check whether the SQLite FTS5 index can be used on the current
+        database, and initialize it if required.
+        """
+        if not _fts_index.is_available(session):
+            return False
+
+        if _fts_index.init(session):
+            # The index has just been created: populate it with the existing
+            # notes and drop the legacy token index
+            _fts_index.index(
+                session,
+                (
+                    (self._fts_doc_id(note_id), (title, description, content))
+                    for note_id, title, description, content in session.query(
+                        DbNote.id, DbNote.title, DbNote.description, DbNote.content
+                    )
+                ),
+            )
+
+            session.query(DbNoteContentIndex).delete(synchronize_session=False)
+
+        return True
+
     def _refresh_content_index(self, notes: Collection[Note], session: Session) -> None:
         """
         Refresh the content index for the given notes.
@@ -52,6 +98,21 @@ class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-metho
         if self._api_settings.supports_search:
             return
 
+        if self._use_fts(session):
+            _fts_index.index(
+                session,
+                (
+                    (
+                        self._fts_doc_id(
+                            note._db_id  # pylint:disable=protected-access
+                        ),
+                        (note.title, note.description, note.content),
+                    )
+                    for note in notes
+                ),
+            )
+            return
+
         for note in notes:
             if not note.content:
                 continue
@@ -73,6 +134,22 @@ class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-metho
 
             session.add_all(tokens)
 
+    def _delete_from_content_index(
+        self, note_ids: Collection[Any], session: Session
+    ) -> None:
+        """
+        Remove the given notes (by database ID) from the full-text index.
+
+        The legacy token index is cleaned up through foreign key cascades.
+        """
+        if self._api_settings.supports_search or not note_ids:
+            return
+
+        if self._use_fts(session):
+            _fts_index.delete(
+                session, [self._fts_doc_id(note_id) for note_id in note_ids]
+            )
+
     @staticmethod
     def _search_content_exact_score(session: Session, note_id: Any, term: str):
         """
@@ -292,6 +369,51 @@ class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-metho
 
         return total_score.label('total_score')
 
+    def _fts_search(
+        self,
+        session: Session,
+        search_terms: Collection[str],
+        filters: List,
+        limit: Optional[int] = None,
+        offset: Optional[int] = 0,
+    ) -> Results:
+        """
+        Search notes through the full-text index, ranked by BM25 score.
+
+        The index is shared by all the notes plugins: the filters, the
+        ranking and the pagination are applied in the same query, so only the
+        requested page of notes is loaded.
+        """
+        matches = _fts_index.match(search_terms)
+        if matches is None:
+            return Results()
+
+        query = (
+            session.query(DbNote)
+            .join(matches, matches.c.doc_id == DbNote.id)
+            .filter(and_(*filters))
+            .order_by(matches.c.score)
+            .offset(offset or 0)
+        )
+
+        if limit is not None:
+            query = query.limit(limit)
+
+        try:
+            notes = query.all()
+        except OperationalError as e:
+            self.logger.warning(
+                'Invalid full-text search query %r: %s', search_terms, e
+            )
+            return Results()
+
+        return Results(
+            items=[
+                Item(item=self._from_db_note(note), type=ItemType.NOTE)
+                for note in notes
+            ],
+        )
+
     def _db_search(
         self,
         query: str,
@@ -326,6 +448,29 @@ class NotesIndexMixin(SearchMixin, ABC):  # pylint: disable=too-few-public-metho
             else:
                 raise ValueError(f'Unsupported item type: {item_type}')
 
+            if item_type == ItemType.NOTE and search_terms and self._use_fts(session):
+                return self._fts_search(
+                    session,
+                    search_terms,
+                    filters=[
+                        DbNote.plugin == self._plugin_name,
+                        *self._search_get_include_exclude_filters(
+                            db_model=DbNote,
+                            include_terms=include_terms,
+                            exclude_terms=exclude_terms,
+                        ),
+                        *self._search_get_time_filters(
+                            db_model=DbNote,
+                            created_before=created_before,
+                            created_after=created_after,
+                            updated_before=updated_before,
+                            updated_after=updated_after,
+                        ),
+                    ],
+                    limit=limit,
+                    offset=offset,
+                )
+
             filters = [
                 db_model.plugin == self._plugin_name,
                 *self._search_get_include_exclude_filters(
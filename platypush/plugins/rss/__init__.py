@@ -4,12 +4,12 @@ import queue
 import re
 import threading
 import time
-from typing import Iterable, Optional, Collection, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Collection, Set
 from xml.etree import ElementTree
 
 import dateutil.parser
 from dateutil.tz import tzutc
-import requests
 
 from platypush.context import get_bus, get_plugin
 from platypush.message.event.rss import NewFeedEntryEvent
@@ -18,6 +18,8 @@ from platypush.plugins.variable import VariablePlugin
 from platypush.schemas.rss import RssFeedEntrySchema
 from platypush.utils import utcnow
 
+from ._fetcher import FeedFetcher
+
 
 def _variable() -> VariablePlugin:
     var = get_plugin(VariablePlugin)
@@ -43,6 +45,8 @@ class RssPlugin(RunnablePlugin):
         subscriptions: Optional[Collection[str]] = None,
         poll_seconds: int = 300,
         user_agent: str = user_agent,
+        max_poll_seconds: Optional[int] = None,
+        adaptive_polling: bool = True,
         **kwargs,
     ):
         """
@@ -50,6 +54,12 @@ class RssPlugin(RunnablePlugin):
             OPML URLs/local files are also supported.
         :param poll_seconds: How often we should check for updates (default: 300 seconds).
         :param user_agent: Custom user agent to use for the requests.
+        :param max_poll_seconds: If ``adaptive_polling`` is enabled, this is
+            the maximum interval between two polls of a feed that hasn't been
+            updated in a while (default: 12 times ``poll_seconds``).
+        :param adaptive_polling: If True (default), the poll interval of each
+            feed is adjusted between ``poll_seconds`` and ``max_poll_seconds``
+            according to how often the feed is updated.
         """
         super().__init__(**kwargs)
         self.poll_seconds = poll_seconds
@@ -58,7 +68,17 @@ class RssPlugin(RunnablePlugin):
         self._feed_worker_queues = [queue.Queue()] * 5
         self._feed_response_queue = queue.Queue()
         self._feed_workers = []
-        self._latest_entries = []
+        self._latest_entries: Dict[str, List[dict]] = {}
+        self._fetcher = FeedFetcher(
+            user_agent=user_agent,
+            timeout=self.timeout,
+            poll_seconds=poll_seconds,
+            max_poll_seconds=(
+                max_poll_seconds if max_poll_seconds else poll_seconds * 12
+            ),
+            adaptive=adaptive_polling,
+            pool_size=len(self._feed_worker_queues),
+        )
 
         self._latest_timestamps = {}
         self._subscriptions = subscriptions
@@ -92,6 +112,27 @@ class RssPlugin(RunnablePlugin):
             }
         )
 
+    @staticmethod
+    def _get_feed_validators_varname(url: str) -> str:
+        return f'FEED_VALIDATORS[{url}]'
+
+    def _load_feed_validators(self):
+        for url in self.subscriptions:
+            varname = self._get_feed_validators_varname(url)
+            var: dict = _variable().get(varname).output or {}  # type: ignore
+            self._fetcher.load_state(url, var.get(varname))
+
+    def _update_feed_validators(self, urls: Iterable[str]) -> None:
+        validators = {
+            self._get_feed_validators_varname(url): self._fetcher.get_state(
+                url
+            ).to_json()
+            for url in urls
+        }
+
+        if validators:
+            _variable().set(**validators)
+
     @staticmethod
     def _parse_content(entry) -> Optional[str]:
         content = getattr(entry, 'content', None)
@@ -103,21 +144,10 @@ class RssPlugin(RunnablePlugin):
 
         return content
 
-    @action
-    def parse_feed(self, url: str):
-        """
-        Parse a feed URL.
-
-        :param url: Feed URL.
-        :return: .. schema:: rss.RssFeedEntrySchema(many=True)
-        """
+    def _parse_feed_content(self, url: str, content: str) -> List[dict]:
         import feedparser
 
-        feed = feedparser.parse(
-            requests.get(
-                url, headers={'User-Agent': self.user_agent}, timeout=self.timeout
-            ).text,
-        )
+        feed = feedparser.parse(content)
         return RssFeedEntrySchema().dump(
             sorted(
                 [
@@ -147,6 +177,16 @@ class RssPlugin(RunnablePlugin):
             many=True,
         )
 
+    @action
+    def parse_feed(self, url: str):
+        """
+        Parse a feed URL.
+
+        :param url: Feed URL.
+        :return: .. schema:: rss.RssFeedEntrySchema(many=True)
+        """
+        return self._parse_feed_content(url, self._fetcher.download(url))
+
     @action
     def get_latest_entries(self, limit: int = 20):
         """
@@ -155,10 +195,60 @@ class RssPlugin(RunnablePlugin):
         :param limit: Maximum number of entries to return (default: 20).
         :return: .. schema:: rss.RssFeedEntrySchema(many=True)
         """
-        return sorted(self._latest_entries, key=lambda e: e['published'], reverse=True)[
-            :limit
+        self._parse_missing_feeds()
+        return sorted(
+            (entry for entries in self._latest_entries.values() for entry in entries),
+            key=lambda e: e['published'],
+            reverse=True,
+        )[:limit]
+
+    def _parse_missing_feeds(self):
+        """
+        Parse the subscribed feeds that haven't changed since the application
+        started, and therefore haven't been parsed yet.
+        """
+        missing_urls = [
+            url for url in self.subscriptions if url not in self._latest_entries
         ]
 
+        if not missing_urls:
+            return
+
+        def parse(url: str):
+            try:
+                return self._parse_feed_content(url, self._fetcher.download(url))
+            except Exception as e:
+                self.logger.warning('Could not parse feed %s: %s', url, e)
+                return None
+
+        with ThreadPoolExecutor(max_workers=len(self._feed_worker_queues)) as pool:
+            for url, entries in zip(missing_urls, pool.map(parse, missing_urls)):
+                if entries is not None:
+                    self._latest_entries.setdefault(url, entries)
+
+    def _poll_feed(self, url: str) -> dict:
+        """
+        Poll a feed. The stored validators are sent whenever available, also
+        on the first poll after a restart, and feeds that haven't changed
+        since the last poll are not parsed (``content`` is None).
+        """
+        try:
+            fetched = self._fetcher.fetch(url)
+            if fetched is None:
+                return {'url': url, 'content': None}
+
+            content, validators = fetched
+            entries = self._parse_feed_content(url, content)
+            # Store the new validators only once the feed has been parsed, or
+            # its new entries would be skipped by the next polls
+            self._fetcher.commit(url, validators)
+            return {'url': url, 'content': entries}
+        except Exception as e:
+            return {
+                'url': url,
+                'error': e,
+            }
+
     def _feed_worker(self, q: queue.Queue):
         while not self.should_stop():
             try:
@@ -166,20 +256,7 @@ class RssPlugin(RunnablePlugin):
             except queue.Empty:
                 continue
 
-            try:
-                self._feed_response_queue.put(
-                    {
-                        'url': url,
-                        'content': self.parse_feed(url).output,
-                    }
-                )
-            except Exception as e:
-                self._feed_response_queue.put(
-                    {
-                        'url': url,
-                        'error': e,
-                    }
-                )
+            self._feed_response_queue.put(self._poll_feed(url))
 
         self._feed_response_queue.put(None)
 
@@ -194,13 +271,7 @@ class RssPlugin(RunnablePlugin):
 
         for url in urls:
             try:
-                content_by_sub[url] = requests.get(
-                    url,
-                    headers={
-                        'User-Agent': self.user_agent,
-                    },
-                    timeout=self.timeout,
-                ).text
+                content_by_sub[url] = self._fetcher.download(url)
             except Exception as e:
                 self.logger.warning('Could not retrieve subscription %s: %s', url, e)
 
@@ -322,6 +393,7 @@ class RssPlugin(RunnablePlugin):
     def main(self):
         self.subscriptions = list(self._parse_subscriptions(self._subscriptions or []))
         self._latest_timestamps = self._get_latest_timestamps()
+        self._load_feed_validators()
         self._feed_workers = [
             threading.Thread(target=self._feed_worker, args=(q,))
             for q in self._feed_worker_queues
@@ -336,7 +408,8 @@ class RssPlugin(RunnablePlugin):
 
         while not self.should_stop():
             responses = {}
-            for i, url in enumerate(self.subscriptions):
+            due_feeds = self._fetcher.due_feeds()
+            for i, url in enumerate(due_feeds):
                 worker_queue = self._feed_worker_queues[
                     i % len(self._feed_worker_queues)
                 ]
@@ -345,11 +418,10 @@ class RssPlugin(RunnablePlugin):
             time_start = time.time()
             timeout = 60
             max_time = time_start + timeout
-            new_entries = []
 
             while (
                 not self.should_stop()
-                and len(responses) < len(self.subscriptions)
+                and len(responses) < len(due_feeds)
                 and time.time() - time_start <= timeout
             ):
                 try:
@@ -372,12 +444,14 @@ class RssPlugin(RunnablePlugin):
                     responses[url] = response['content']
 
             responses = {
-                k: v for k, v in responses.items() if v and not isinstance(v, Exception)
+                k: v
+                for k, v in responses.items()
+                if v is not None and not isinstance(v, Exception)
             }
 
             for url, response in responses.items():
                 latest_timestamp = self._latest_timestamps.get(url)
-                new_entries += response
+                self._latest_entries[url] = response
 
                 for entry in response:
                     published = datetime.datetime.fromisoformat(entry['published'])
@@ -387,15 +461,18 @@ class RssPlugin(RunnablePlugin):
 
                 self._latest_timestamps[url] = latest_timestamp
 
-            self._update_latest_timestamps()
-            self._latest_entries = new_entries
-            self.wait_stop(self.poll_seconds)
+            if responses:
+                self._update_latest_timestamps()
+                self._update_feed_validators(responses.keys())
+
+            self.wait_stop(max(1, self._fetcher.next_poll_time() - time.time()))
 
     def stop(self):
         super().stop()
         for worker in self._feed_workers:
             worker.join(timeout=60)
 
+        self._fetcher.close()
         self.logger.info('RSS integration stopped')
 
 
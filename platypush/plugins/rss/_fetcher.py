@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass
+class FeedValidators:
+    """
+    HTTP validators and content digest of a fetched feed.
+    """
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None
+
+
+@dataclass
+class FeedState:
+    """
+    Fetch state of a feed: HTTP validators, content digest and polling
+    schedule.
+    """
+
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    digest: Optional[str] = None
+    interval: float = 0
+    next_poll: float = 0
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                'etag': self.etag,
+                'last_modified': self.last_modified,
+                'digest': self.digest,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, url: str, data: Optional[str]) -> 'FeedState':
+        state = cls(url=url)
+        if not data:
+            return state
+
+        try:
+            validators = json.loads(data) if isinstance(data, str) else data
+        except (TypeError, ValueError):
+            return state
+
+        state.etag = validators.get('etag')
+        state.last_modified = validators.get('last_modified')
+        state.digest = validators.get('digest')
+        return state
+
+
+class FeedFetcher:
+    """
+    Fetches feeds over a shared, pooled HTTP session using conditional
+    requests (``If-None-Match``/``If-Modified-Since``), and schedules the
+    next poll of each feed according to how often it changes.
+
+    :meth:`.fetch` returns ``None`` if the feed hasn't changed since the last
+    fetch, so the caller can skip parsing it altogether. Otherwise it returns
+    the content together with its validators, which the caller should
+    :meth:`.commit` once the content has been processed - if the processing
+    fails, the next fetch will download the feed again.
+    """
+
+    def __init__(
+        self,
+        user_agent: str,
+        timeout: float,
+        poll_seconds: float,
+        max_poll_seconds: Optional[float] = None,
+        adaptive: bool = True,
+        pool_size: int = 10,
+    ):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.poll_seconds = poll_seconds
+        self.max_poll_seconds = max(max_poll_seconds or poll_seconds, poll_seconds)
+        self.adaptive = adaptive
+        self.logger = logging.getLogger(__name__)
+        self._states: Dict[str, FeedState] = {}
+        self._lock = threading.RLock()
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = user_agent
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def get_state(self, url: str) -> FeedState:
+        with self._lock:
+            state = self._states.get(url)
+            if not state:
+                state = self._states[url] = FeedState(
+                    url=url, interval=self.poll_seconds
+                )
+
+            return state
+
+    def load_state(self, url: str, data: Optional[str]):
+        """
+        Restore the persisted validators of a feed.
+        """
+        state = FeedState.from_json(url, data)
+        state.interval = self.poll_seconds
+        with self._lock:
+            self._states[url] = state
+
+    def due_feeds(self, now: Optional[float] = None):
+        """
+        :return: The URLs of the feeds whose next poll is due.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return [url for url, s in self._states.items() if s.next_poll <= now]
+
+    def next_poll_time(self) -> float:
+        """
+        :return: The timestamp of the earliest scheduled poll.
+        """
+        with self._lock:
+            return min(
+                (s.next_poll for s in self._states.values()),
+                default=time.time() + self.poll_seconds,
+            )
+
+    def _schedule(self, state: FeedState, changed: bool):
+        if self.adaptive:
+            # Feeds that change often are polled more often (down to
+            # poll_seconds), feeds that don't are gradually backed off (up to
+            # max_poll_seconds).
+            if changed:
+                state.interval = max(self.poll_seconds, state.interval / 2)
+            else:
+                state.interval = min(self.max_poll_seconds, state.interval * 1.5)
+        else:
+            state.interval = self.poll_seconds
+
+        state.next_poll = time.time() + state.interval
+
+    def download(self, url: str) -> str:
+        """
+        Download a resource over the shared session, without using or updating
+        the fetch state of the feed.
+        """
+        rs = self._session.get(url, timeout=self.timeout)
+        rs.raise_for_status()
+        return rs.text
+
+    def fetch(
+        self, url: str, conditional: bool = True
+    ) -> Optional[Tuple[str, FeedValidators]]:
+        """
+        Fetch a feed and schedule its next poll.
+
+        :param url: Feed URL.
+        :param conditional: If True (default), send the stored validators and
+            return None if the feed hasn't changed. If False, the feed is
+            always downloaded and returned.
+        :return: The feed content and the validators to :meth:`.commit` once
+            it has been processed, or None if it hasn't changed.
+        """
+        state = self.get_state(url)
+        headers = {}
+        if conditional and state.etag:
+            headers['If-None-Match'] = state.etag
+        if conditional and state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        try:
+            rs = self._session.get(url, headers=headers, timeout=self.timeout)
+            if rs.status_code == 304:
+                self._schedule(state, changed=False)
+                return None
+
+            rs.raise_for_status()
+        except Exception:
+            self._schedule(state, changed=False)
+            raise
+
+        # Some servers don't support conditional requests: use the digest of
+        # the content as a fallback validator.
+        validators = FeedValidators(
+            etag=rs.headers.get('ETag'),
+            last_modified=rs.headers.get('Last-Modified'),
+            digest=hashlib.sha1(rs.content).hexdigest(),
+        )
+
+        changed = validators.digest != state.digest
+        self._schedule(state, changed=changed)
+        if conditional and not changed:
+            # Same content as the last processed one: the new validators can
+            # be stored right away
+            self.commit(url, validators)
+            return None
+
+        return rs.text, validators
+
+    def commit(self, url: str, validators: FeedValidators):
+        """
+        Store the validators returned by :meth:`.fetch`, after the content of
+        the feed has been processed.
+        """
+        state = self.get_state(url)
+        with self._lock:
+            state.etag = validators.etag
+            state.last_modified = validators.last_modified
+            state.digest = validators.digest
+
+    def close(self):
+        self._session.close()
@@ -35,6 +35,8 @@ class SoundPlugin(RunnablePlugin):
         output_blocksize: int = _DEFAULT_BLOCKSIZE,
         queue_size: Optional[int] = _DEFAULT_QUEUE_SIZE,
         ffmpeg_bin: str = 'ffmpeg',
+        mixer: bool = False,
+        mixer_channels: int = 2,
         **kwargs,
     ):
         """
@@ -61,6 +63,17 @@ class SoundPlugin(RunnablePlugin):
             audio device processes them (default: 100).
         :param ffmpeg_bin: Path of the ``ffmpeg`` binary (default: search for
             the ``ffmpeg`` in the ``PATH``).
+        :param mixer: If True, audio files and URLs are played through an
+            in-process software mixer instead of a dedicated output stream
+            per playback. The mixer keeps one persistent output stream per
+            device, and it sums all the active sources, each with its own
+            volume. WAV and raw PCM (``.pcm``/``.raw``) files are decoded
+            natively, and ffmpeg is only spawned for compressed formats and
+            remote resources, so short sounds start almost immediately.
+            Synthetic sounds and playbacks with a ``format`` conversion still
+            use their own stream (default: False).
+        :param mixer_channels: Number of output channels of the mixer
+            (default: 2, or the maximum supported by the device if lower).
         """
 
         super().__init__(**kwargs)
@@ -77,6 +90,9 @@ class SoundPlugin(RunnablePlugin):
             input_device=input_device,
             output_device=output_device,
             queue_size=queue_size,
+            mixer=mixer,
+            mixer_channels=mixer_channels,
+            ffmpeg_bin=ffmpeg_bin,
         )
 
     @action
@@ -495,6 +511,7 @@ class SoundPlugin(RunnablePlugin):
             self.wait_stop()
         finally:
             self._manager.stop_audio()
+            self._manager.close_mixers()
 
 
 # vim:sw=4:ts=4:et:
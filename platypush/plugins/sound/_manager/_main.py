@@ -1,12 +1,13 @@
 from logging import getLogger
 import os
 import stat
-from threading import Event
+from threading import Event, RLock
 from time import time
-from typing import Iterable, List, Optional, Union
+from typing import Dict, Iterable, List, Optional, Union
 
+from .._mixer import DeviceMixer
 from .._model import AudioDevice, DeviceType, StreamType
-from .._streams import AudioPlayer, AudioRecorder, AudioThread
+from .._streams import AudioMixerPlayer, AudioPlayer, AudioRecorder, AudioThread
 from ._device import DeviceManager
 from ._stream import StreamManager
 
@@ -31,6 +32,9 @@ class AudioManager:
         input_device: Optional[DeviceType] = None,
         output_device: Optional[DeviceType] = None,
         queue_size: Optional[int] = None,
+        mixer: bool = False,
+        mixer_channels: int = 2,
+        ffmpeg_bin: str = 'ffmpeg',
     ):
         """
         :param should_stop: Event to synchronize the audio manager stop.
@@ -39,6 +43,10 @@ class AudioManager:
         :param input_device: Default device to use for the input stream.
         :param output_device: Default device to use for the output stream.
         :param queue_size: Maximum size of the audio queues.
+        :param mixer: If True, audio resources are played through a software
+            mixer with a single output stream per device.
+        :param mixer_channels: Number of output channels of the mixers.
+        :param ffmpeg_bin: Path of the ffmpeg binary.
         """
         self._should_stop = should_stop
         self._device_manager = DeviceManager(
@@ -50,6 +58,38 @@ class AudioManager:
         self.input_blocksize = input_blocksize
         self.output_blocksize = output_blocksize
         self.queue_size = queue_size
+        self.mixer = mixer
+        self.mixer_channels = mixer_channels
+        self.ffmpeg_bin = ffmpeg_bin
+        self._mixers: Dict[int, DeviceMixer] = {}
+        self._mixers_lock = RLock()
+
+    def get_mixer(self, device: AudioDevice) -> DeviceMixer:
+        """
+        :return: The software mixer of an output device, created on first use.
+        """
+        with self._mixers_lock:
+            mixer = self._mixers.get(device.index)
+            if not mixer:
+                mixer = self._mixers[device.index] = DeviceMixer(
+                    device=device.index,
+                    sample_rate=int(device.default_samplerate),
+                    channels=max(
+                        1, min(self.mixer_channels, device.max_output_channels)
+                    ),
+                    blocksize=self.output_blocksize,
+                )
+
+            return mixer
+
+    def close_mixers(self):
+        """
+        Close the output streams of the software mixers.
+        """
+        with self._mixers_lock:
+            for mixer in self._mixers.values():
+                mixer.close()
+            self._mixers.clear()
 
     def create_player(
         self,
@@ -90,23 +130,39 @@ class AudioManager:
             output stream.
         """
         dev = self._device_manager.get_device(device, type=StreamType.OUTPUT)
-        player = AudioPlayer.build(
-            device=device,
-            infile=infile,
-            sound=sound,
-            duration=duration,
-            volume=volume,
-            sample_rate=sample_rate or dev.default_samplerate,
-            dtype=dtype,
-            blocksize=blocksize or self.output_blocksize,
-            latency=latency,
-            channels=channels,
-            output_format=format,
-            start_padding=start_padding,
-            end_padding=end_padding,
-            queue_size=self.queue_size,
-            should_stop=self._should_stop,
-        )
+        player_args = {
+            'device': device,
+            'duration': duration,
+            'volume': volume,
+            'blocksize': blocksize or self.output_blocksize,
+            'latency': latency,
+            'channels': channels,
+            'start_padding': start_padding,
+            'end_padding': end_padding,
+            'queue_size': self.queue_size,
+            'should_stop': self._should_stop,
+        }
+
+        # Synthetic sounds and format conversions still get their own stream
+        if self.mixer and infile and not format:
+            player: AudioPlayer = AudioMixerPlayer(
+                infile=infile,
+                mixer=self.get_mixer(dev),
+                sample_rate=sample_rate or int(dev.default_samplerate),
+                dtype=dtype,
+                input_dtype=dtype,
+                ffmpeg_bin=self.ffmpeg_bin,
+                **player_args,
+            )
+        else:
+            player = AudioPlayer.build(
+                infile=infile,
+                sound=sound,
+                sample_rate=sample_rate or dev.default_samplerate,
+                dtype=dtype,
+                output_format=format,
+                **player_args,
+            )
 
         self._stream_manager.register(
             player, dev, StreamType.OUTPUT, stream_name=stream_name
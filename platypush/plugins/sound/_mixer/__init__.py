@@ -0,0 +1,5 @@
+from ._decoders import AudioDecoder
+from ._mixer import DeviceMixer
+from ._source import MixerSource
+
+__all__ = ['AudioDecoder', 'DeviceMixer', 'MixerSource']
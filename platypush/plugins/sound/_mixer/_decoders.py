@@ -0,0 +1,316 @@
+import os
+import stat
+import subprocess
+import wave
+from abc import ABC, abstractmethod
+from logging import getLogger
+from typing import IO, Callable, Iterator, Optional
+
+import numpy as np
+
+_raw_extensions = {'.pcm', '.raw'}
+
+
+def _is_local_file(infile: str) -> bool:
+    return '://' not in infile and os.path.exists(os.path.expanduser(infile))
+
+
+def _is_fifo(infile: str) -> bool:
+    try:
+        return stat.S_ISFIFO(os.stat(infile).st_mode)
+    except OSError:
+        return False
+
+
+def to_float32(data: bytes, sample_width: int, dtype: Optional[str] = None):
+    """
+    Convert raw PCM samples to float32 in the ``[-1, 1]`` range.
+
+    :param data: Raw PCM samples.
+    :param sample_width: Sample width, in bytes.
+    :param dtype: Sample type (default: inferred from the sample width, with
+        WAV conventions - unsigned 8-bit, signed 16/24/32-bit).
+    """
+    if dtype:
+        samples = np.frombuffer(data, dtype=dtype)
+        if samples.dtype.kind == 'f':
+            return samples.astype(np.float32)
+        info = np.iinfo(samples.dtype)
+        scale = (int(info.max) - int(info.min) + 1) / 2
+        offset = (int(info.max) + int(info.min) + 1) / 2
+        return ((samples.astype(np.float32) - offset) / scale).astype(np.float32)
+
+    if sample_width == 1:
+        return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if sample_width == 2:
+        return np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768
+    if sample_width == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+        return samples.astype(np.float32) / 8388608
+    if sample_width == 4:
+        return np.frombuffer(data, dtype='<i4').astype(np.float32) / 2147483648
+
+    raise AssertionError(f'Unsupported sample width: {sample_width}')
+
+
+def map_channels(data: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Map an array of shape ``(frames, source_channels)`` to ``channels``
+    channels, duplicating the last source channel or dropping the extra ones.
+    """
+    src_channels = data.shape[1]
+    if src_channels == channels:
+        return data
+
+    return data[:, np.minimum(np.arange(channels), src_channels - 1)]
+
+
+class LinearResampler:
+    """
+    Streaming linear-interpolation resampler. It keeps the last frame of each
+    chunk, so consecutive chunks are resampled seamlessly.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int):
+        self.ratio = src_rate / dst_rate
+        self._pos = 0.0
+        self._tail: Optional[np.ndarray] = None
+
+    def __call__(self, data: np.ndarray) -> np.ndarray:
+        if self.ratio == 1 or not len(data):
+            return data
+
+        if self._tail is not None:
+            data = np.concatenate((self._tail, data))
+
+        n = len(data)
+        positions = np.arange(self._pos, n - 1, self.ratio)
+        idx = positions.astype(np.int64)
+        frac = (positions - idx).astype(np.float32)[:, None]
+        out = data[idx] * (1 - frac) + data[idx + 1] * frac
+
+        next_pos = positions[-1] + self.ratio if len(positions) else self._pos
+        # The next chunk will start with the last frame of this one
+        self._pos = next_pos - (n - 1)
+        self._tail = data[-1:]
+        return out.astype(np.float32)
+
+
+class AudioDecoder(ABC):
+    """
+    Decodes an audio resource into float32 chunks with the sample rate and
+    number of channels of the mixer.
+    """
+
+    def __init__(self, infile: str, sample_rate: int, channels: int, blocksize: int):
+        self.infile = os.path.expanduser(infile)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.logger = getLogger(__name__)
+
+    @abstractmethod
+    def chunks(self) -> Iterator[np.ndarray]:
+        """
+        :return: An iterator over arrays of shape ``(frames, channels)``.
+        """
+        raise NotImplementedError()
+
+    def close(self):
+        """
+        Release the decoder resources.
+        """
+
+    @classmethod
+    def build(
+        cls,
+        infile: str,
+        sample_rate: int,
+        channels: int,
+        blocksize: int,
+        ffmpeg_bin: str = 'ffmpeg',
+        dtype: Optional[str] = None,
+        src_sample_rate: Optional[int] = None,
+        src_channels: Optional[int] = None,
+    ) -> 'AudioDecoder':
+        """
+        Get the decoder for a resource. WAV and raw PCM local files are
+        decoded natively, anything else goes through ffmpeg.
+        """
+        args = {
+            'infile': infile,
+            'sample_rate': sample_rate,
+            'channels': channels,
+            'blocksize': blocksize,
+        }
+
+        path = os.path.expanduser(infile)
+        ext = os.path.splitext(path)[1].lower()
+        if _is_local_file(path):
+            if ext in _raw_extensions and dtype:
+                return RawPcmDecoder(
+                    **args,
+                    dtype=dtype,
+                    src_sample_rate=src_sample_rate or sample_rate,
+                    src_channels=src_channels or channels,
+                )
+
+            # FIFOs can't be probed without consuming them, so rely on the
+            # extension
+            if (ext == '.wav' and _is_fifo(path)) or WavDecoder.is_pcm_wav(path):
+                return WavDecoder(**args)
+
+        return FFmpegDecoder(**args, ffmpeg_bin=ffmpeg_bin)
+
+
+class _PcmDecoder(AudioDecoder, ABC):
+    def _decode_stream(
+        self,
+        read: Callable[[int], bytes],
+        src_sample_rate: int,
+        src_channels: int,
+        sample_width: int,
+        dtype: Optional[str] = None,
+    ) -> Iterator[np.ndarray]:
+        resample = LinearResampler(src_sample_rate, self.sample_rate)
+        frame_size = sample_width * src_channels
+        leftover = b''
+
+        while True:
+            data = read(self.blocksize)
+            if not data:
+                break
+
+            data = leftover + data
+            usable = len(data) - len(data) % frame_size
+            data, leftover = data[:usable], data[usable:]
+            if not data:
+                continue
+
+            samples = to_float32(data, sample_width, dtype).reshape(-1, src_channels)
+            chunk = resample(map_channels(samples, self.channels))
+            if len(chunk):
+                yield chunk
+
+
+class WavDecoder(_PcmDecoder):
+    """
+    Native decoder for PCM WAV files.
+    """
+
+    @staticmethod
+    def is_pcm_wav(path: str) -> bool:
+        """
+        :return: True if the file is a WAV file with PCM samples.
+        """
+        if _is_fifo(path):
+            return False
+
+        try:
+            with open(path, 'rb') as f:
+                if f.read(12)[8:12] != b'WAVE':
+                    return False
+
+                f.seek(0)
+                with wave.open(f, 'rb'):
+                    return True
+        except (OSError, EOFError, wave.Error):
+            return False
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        with open(self.infile, 'rb') as f, wave.open(f, 'rb') as wav:
+            yield from self._decode_stream(
+                lambda n: wav.readframes(n),
+                src_sample_rate=wav.getframerate(),
+                src_channels=wav.getnchannels(),
+                sample_width=wav.getsampwidth(),
+            )
+
+
+class RawPcmDecoder(_PcmDecoder):
+    """
+    Native decoder for raw PCM files.
+    """
+
+    def __init__(
+        self, *args, dtype: str, src_sample_rate: int, src_channels: int, **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        self.dtype = dtype
+        self.src_sample_rate = src_sample_rate
+        self.src_channels = src_channels
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        sample_width = np.dtype(self.dtype).itemsize
+        with open(self.infile, 'rb') as f:
+            yield from self._decode_stream(
+                lambda n: f.read(n * sample_width * self.src_channels),
+                src_sample_rate=self.src_sample_rate,
+                src_channels=self.src_channels,
+                sample_width=sample_width,
+                dtype=self.dtype,
+            )
+
+
+class FFmpegDecoder(AudioDecoder):
+    """
+    Decoder for compressed formats and remote resources, through ffmpeg.
+    """
+
+    def __init__(self, *args, ffmpeg_bin: str = 'ffmpeg', **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ffmpeg_bin = ffmpeg_bin
+        self._proc: Optional[subprocess.Popen] = None
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        self._proc = subprocess.Popen(  # pylint: disable=consider-using-with
+            [
+                self.ffmpeg_bin,
+                '-loglevel',
+                'error',
+                '-i',
+                self.infile,
+                '-f',
+                'f32le',
+                '-ac',
+                str(self.channels),
+                '-ar',
+                str(self.sample_rate),
+                '-',
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+        )
+
+        stdout: IO[bytes] = self._proc.stdout  # type: ignore
+        frame_size = 4 * self.channels
+        leftover = b''
+
+        try:
+            while True:
+                data = stdout.read(self.blocksize * frame_size)
+                if not data:
+                    break
+
+                data = leftover + data
+                usable = len(data) - len(data) % frame_size
+                data, leftover = data[:usable], data[usable:]
+                if data:
+                    yield np.frombuffer(data, dtype='<f4').reshape(-1, self.channels)
+        finally:
+            self.close()
+
+    def close(self):
+        if self._proc and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+        self._proc = None
+
+
+# vim:sw=4:ts=4:et:
@@ -0,0 +1,158 @@
+from logging import getLogger
+from threading import RLock
+from typing import Callable, List, Union
+
+import numpy as np
+
+from ._source import MixerSource
+
+
+class DeviceMixer:
+    """
+    Software mixer for an output device.
+
+    It keeps a single, persistent float32 output stream open on the device,
+    and its callback sums the frames of all the active sources, each scaled by
+    its own gain. Sources can be added and removed at any time without
+    re-opening the device.
+    """
+
+    def __init__(
+        self,
+        device: int,
+        sample_rate: int,
+        channels: int,
+        blocksize: int,
+        latency: Union[float, str] = 'low',
+        buffer_seconds: float = 0.5,
+    ):
+        """
+        :param device: Output device index.
+        :param sample_rate: Output sample rate.
+        :param channels: Number of output channels.
+        :param blocksize: Number of frames processed by each callback.
+        :param latency: Output latency.
+        :param buffer_seconds: Maximum amount of audio buffered for each
+            source, in seconds.
+        """
+        self.device = device
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.latency = latency
+        self.buffer_frames = max(blocksize, int(sample_rate * buffer_seconds))
+        self.logger = getLogger(__name__)
+        self._sources: List[MixerSource] = []
+        self._lock = RLock()
+        self._stream = None
+
+    @property
+    def sources(self) -> List[MixerSource]:
+        with self._lock:
+            return list(self._sources)
+
+    def _open_stream(self):
+        import sounddevice as sd
+
+        self._stream = sd.OutputStream(
+            samplerate=self.sample_rate,
+            device=self.device,
+            channels=self.channels,
+            dtype='float32',
+            blocksize=self.blocksize,
+            latency=self.latency,
+            callback=self._callback,
+        )
+        self._stream.start()
+        self.logger.info(
+            'Opened mixer stream on device [%s]: %d Hz, %d channels',
+            self.device,
+            self.sample_rate,
+            self.channels,
+        )
+
+    def add_source(
+        self,
+        gain: Callable[[], float] = lambda: 1.0,
+        is_active: Callable[[], bool] = lambda: True,
+    ) -> MixerSource:
+        """
+        Attach a new source to the mixer, opening the output stream if needed.
+        """
+        source = MixerSource(
+            channels=self.channels,
+            max_frames=self.buffer_frames,
+            gain=gain,
+            is_active=is_active,
+        )
+
+        with self._lock:
+            if not (self._stream and self._stream.active):
+                self._open_stream()
+            self._sources.append(source)
+
+        return source
+
+    def remove_source(self, source: MixerSource):
+        """
+        Detach a source from the mixer.
+        """
+        source.close()
+        with self._lock:
+            if source in self._sources:
+                self._sources.remove(source)
+
+    def mix(self, out: np.ndarray):
+        """
+        Mix the next ``len(out)`` frames of the active sources into ``out``.
+        """
+        out.fill(0)
+        with self._lock:
+            sources = list(self._sources)
+
+        for source in sources:
+            if not source.is_active():
+                continue
+
+            data = source.read(len(out))
+            if data is None:
+                continue
+
+            gain = source.gain()
+            if gain == 1:
+                out[: len(data)] += data
+            elif gain:
+                out[: len(data)] += data * gain
+
+        np.clip(out, -1.0, 1.0, out=out)
+
+    def _callback(self, outdata: np.ndarray, _: int, __, status):
+        if status:
+            self.logger.debug('Mixer stream status: %s', status)
+
+        try:
+            self.mix(outdata)
+        except Exception as e:
+            outdata.fill(0)
+            self.logger.warning('Mixer callback error: %s', e)
+
+    def close(self):
+        """
+        Detach all the sources and close the output stream.
+        """
+        with self._lock:
+            for source in self._sources:
+                source.close()
+
+            self._sources.clear()
+            if self._stream:
+                try:
+                    self._stream.stop()
+                    self._stream.close()
+                except Exception as e:
+                    self.logger.warning('Could not close the mixer stream: %s', e)
+
+            self._stream = None
+
+
+# vim:sw=4:ts=4:et:
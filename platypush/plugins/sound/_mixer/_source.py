@@ -0,0 +1,133 @@
+from collections import deque
+from threading import Condition
+from typing import Callable, Deque, Optional
+
+import numpy as np
+
+
+class MixerSource:
+    """
+    An audio source attached to a :class:`DeviceMixer`.
+
+    The producer (usually a player thread) writes float32 frames with the
+    mixer's sample rate and number of channels, and the mixer callback pulls
+    them from the audio thread. ``write`` blocks when more than
+    ``max_frames`` are buffered, so the producer never runs too far ahead of
+    the playback.
+    """
+
+    def __init__(
+        self,
+        channels: int,
+        max_frames: int,
+        gain: Callable[[], float] = lambda: 1.0,
+        is_active: Callable[[], bool] = lambda: True,
+    ):
+        """
+        :param channels: Number of channels of the mixer.
+        :param max_frames: Maximum number of buffered frames.
+        :param gain: Returns the current gain of the source.
+        :param is_active: Returns False if the source is paused.
+        """
+        self.channels = channels
+        self.max_frames = max_frames
+        self.gain = gain
+        self.is_active = is_active
+        self.frames_played = 0
+        self._chunks: Deque[np.ndarray] = deque()
+        self._buffered_frames = 0
+        self._eof = False
+        self._closed = False
+        self._cond = Condition()
+
+    @property
+    def drained(self) -> bool:
+        """
+        True if the producer has finished and all the frames have been played.
+        """
+        with self._cond:
+            return self._closed or (self._eof and not self._buffered_frames)
+
+    def write(self, data: np.ndarray, timeout: Optional[float] = None) -> bool:
+        """
+        Queue some frames for playback.
+
+        :param data: Array of shape ``(frames, channels)``.
+        :param timeout: How long to wait for buffer space.
+        :return: False if the timeout expired or the source has been closed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._closed or self._buffered_frames < self.max_frames,
+                timeout=timeout,
+            ):
+                return False
+
+            if self._closed:
+                return False
+
+            self._chunks.append(data)
+            self._buffered_frames += len(data)
+            return True
+
+    def read(self, frames: int) -> Optional[np.ndarray]:
+        """
+        Pull up to ``frames`` frames. Invoked by the mixer callback, it never
+        blocks.
+
+        :return: An array with at most ``frames`` frames, or None if no frames
+            are available.
+        """
+        with self._cond:
+            if not self._chunks:
+                return None
+
+            chunks = []
+            needed = frames
+            while needed > 0 and self._chunks:
+                chunk = self._chunks[0]
+                if len(chunk) <= needed:
+                    chunks.append(self._chunks.popleft())
+                    needed -= len(chunk)
+                else:
+                    chunks.append(chunk[:needed])
+                    self._chunks[0] = chunk[needed:]
+                    needed = 0
+
+            read_frames = frames - needed
+            self._buffered_frames -= read_frames
+            self.frames_played += read_frames
+            self._cond.notify_all()
+
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+    def finish(self):
+        """
+        Signal that no more frames will be written.
+        """
+        with self._cond:
+            self._eof = True
+            self._cond.notify_all()
+
+    def wait_drained(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all the buffered frames have been played.
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self._closed or (self._eof and not self._buffered_frames),
+                timeout=timeout,
+            )
+
+    def close(self):
+        """
+        Discard the buffered frames and unblock the producer.
+        """
+        with self._cond:
+            self._closed = True
+            self._chunks.clear()
+            self._buffered_frames = 0
+            self._cond.notify_all()
+
+
+# vim:sw=4:ts=4:et:
@@ -1,6 +1,5 @@
 from ._base import AudioThread
-from ._player import AudioPlayer
+from ._player import AudioMixerPlayer, AudioPlayer
 from ._recorder import AudioRecorder
 
-
-__all__ = ['AudioPlayer', 'AudioRecorder', 'AudioThread']
+__all__ = ['AudioMixerPlayer', 'AudioPlayer', 'AudioRecorder', 'AudioThread']
@@ -1,3 +1,4 @@
 from ._base import AudioPlayer
+from ._mixer import AudioMixerPlayer
 
-__all__ = ['AudioPlayer']
+__all__ = ['AudioMixerPlayer', 'AudioPlayer']
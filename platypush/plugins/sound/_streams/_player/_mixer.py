@@ -0,0 +1,139 @@
+import time
+from math import ceil
+from threading import Thread
+from typing import Optional, Type
+
+import numpy as np
+
+from platypush.message.event.sound import SoundEvent
+
+from ..._converters import RawOutputAudioFromFileConverter
+from ..._mixer import AudioDecoder, DeviceMixer, MixerSource
+from ..._model import AudioState
+from ._base import AudioPlayer
+
+
+class AudioMixerPlayer(AudioPlayer):
+    """
+    An ``AudioMixerPlayer`` thread plays an audio resource through the
+    software mixer of the output device, rather than on its own output stream.
+
+    WAV and raw PCM files are decoded in-process, other formats are decoded
+    through ffmpeg.
+    """
+
+    _write_timeout = 0.5
+
+    def __init__(
+        self,
+        *args,
+        mixer: DeviceMixer,
+        input_dtype: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        :param mixer: The mixer of the output device.
+        :param input_dtype: Sample type of the resource, if it's a raw PCM file.
+        """
+        super().__init__(*args, **kwargs)
+        self.mixer = mixer
+        self.input_dtype = input_dtype
+        self._source: Optional[MixerSource] = None
+        self._decoder: Optional[AudioDecoder] = None
+
+    @property
+    def _audio_converter_type(self) -> Type[RawOutputAudioFromFileConverter]:
+        return RawOutputAudioFromFileConverter
+
+    def _notify(self, event_type: Type[SoundEvent], **kwargs):
+        return super()._notify(event_type, resource=self.infile, **kwargs)
+
+    def _silence(self, seconds: float) -> np.ndarray:
+        return np.zeros(
+            (ceil(self.mixer.sample_rate * seconds), self.mixer.channels),
+            dtype=np.float32,
+        )
+
+    def _write(self, source: MixerSource, data: np.ndarray) -> bool:
+        while not self.should_stop:
+            self._wait_running()
+            if source.write(data, timeout=self._write_timeout):
+                return True
+
+        return False
+
+    def main(self, *_, **__):
+        self._decoder = decoder = AudioDecoder.build(
+            self.infile,
+            sample_rate=self.mixer.sample_rate,
+            channels=self.mixer.channels,
+            blocksize=self.mixer.blocksize,
+            ffmpeg_bin=self.ffmpeg_bin,
+            dtype=self.input_dtype,
+            src_sample_rate=self.sample_rate,
+            src_channels=self.channels,
+        )
+
+        self._source = source = self.mixer.add_source(
+            gain=lambda: self.gain,
+            is_active=lambda: self.state == AudioState.RUNNING,
+        )
+
+        self.notify_start()
+        self.logger.info(
+            'Started %s on the mixer of device [%s]',
+            self.__class__.__name__,
+            self.device,
+        )
+        self._started_time = time.time()
+
+        if self.start_padding > 0:
+            self._write(source, self._silence(self.start_padding))
+
+        max_frames = (
+            int(self.duration * self.mixer.sample_rate)
+            if self.duration is not None
+            else None
+        )
+
+        queued_frames = 0
+        for chunk in decoder.chunks():
+            if max_frames is not None:
+                chunk = chunk[: max(0, max_frames - queued_frames)]
+
+            if not (len(chunk) and self._write(source, chunk)):
+                break
+
+            queued_frames += len(chunk)
+
+        if self.end_padding > 0 and not self.should_stop:
+            self._write(source, self._silence(self.end_padding))
+
+        source.finish()
+        while not (self.should_stop or source.wait_drained(timeout=0.5)):
+            pass
+
+    def run(self):
+        Thread.run(self)  # pylint: disable=bad-super-call
+        self.paused_changed.clear()
+
+        try:
+            self.main()
+        except Exception as e:
+            self.logger.warning('Unhandled sound on %s', self.__class__.__name__)
+            self.logger.exception(e)
+        finally:
+            if self._decoder:
+                self._decoder.close()
+            if self._source:
+                self.mixer.remove_source(self._source)
+            self.notify_stop()
+
+    def notify_stop(self):
+        super().notify_stop()
+        # Wake up the thread if it's paused
+        self.paused_changed.set()
+        self.paused_changed.clear()
+
+
+# vim:sw=4:ts=4:et:
@@ -10,6 +10,12 @@ from typing import List, Dict, Any, Union, Optional, Tuple, Iterable
 
 import numpy as np
 
+from platypush.common.inference import (
+    ModelCache,
+    get_batcher,
+    get_batcher_metrics,
+    stop_batchers,
+)
 from platypush.config import Config
 from platypush.context import get_bus
 from platypush.message.event.tensorflow import (
@@ -28,6 +34,9 @@ class TensorflowPlugin(Plugin):
     """
     This plugin can be used to create, train, load and make predictions with TensorFlow-compatible machine learning
     models.
+
+    The models loaded from the filesystem are kept in an LRU cache with a memory budget, and concurrent predictions
+    on single samples are grouped into batches that are processed through a single forward pass.
     """
 
     _image_extensions = ['jpg', 'jpeg', 'bmp', 'tiff', 'tif', 'png', 'gif']
@@ -39,15 +48,35 @@ class TensorflowPlugin(Plugin):
         *_image_extensions,
     ]
 
-    def __init__(self, workdir: Optional[str] = None, **kwargs):
+    def __init__(
+        self,
+        workdir: Optional[str] = None,
+        model_cache_size: float = 1024,
+        max_batch_size: int = 32,
+        max_batch_latency: float = 0.01,
+        **kwargs,
+    ):
         """
         :param workdir: Working directory for TensorFlow, where models will be stored and looked up by default
             (default: PLATYPUSH_WORKDIR/tensorflow).
+        :param model_cache_size: Maximum amount of memory, in MB, used by the models loaded from the filesystem. The
+            least recently used models are unloaded when the budget is exceeded. Models created through
+            :meth:`.create_network` or :meth:`.create_regression` are never unloaded automatically (default: 1024).
+        :param max_batch_size: Maximum number of concurrent single-sample predictions that are processed in a single
+            batch (default: 32).
+        :param max_batch_latency: How long a single-sample prediction may wait for other requests to be batched with,
+            in seconds (default: 0.01).
         """
         super().__init__(**kwargs)
         self.models = {}  # str -> Model
         self._models_lock = threading.RLock()
         self._model_locks: Dict[str, threading.RLock] = {}
+        self._model_cache = ModelCache(
+            max_size=int(model_cache_size * 1024 * 1024),
+            on_evict=self._on_model_evicted,
+        )
+        self.max_batch_size = max_batch_size
+        self.max_batch_latency = max_batch_latency
         self._work_dir = (
             os.path.abspath(os.path.expanduser(workdir))
             if workdir
@@ -74,10 +103,30 @@ class TensorflowPlugin(Plugin):
             except Exception as e:
                 self.logger.info(f'Model {model_name} lock release error: {e}')
 
+    @staticmethod
+    def _get_model_size(model) -> int:
+        # Rough estimate: 32-bit weights
+        return int(model.count_params()) * 4
+
+    def _on_model_evicted(self, model_name: str, model):
+        with self._models_lock:
+            if self.models.get(model_name) is model:
+                del self.models[model_name]
+
+        self._stop_batchers(model_name)
+
+    def _stop_batchers(self, model_name: str):
+        stop_batchers(lambda key: key[:2] == (self._plugin_name, model_name))
+
+    def _forget_model(self, model_name: str):
+        self._model_cache.pop(model_name)
+        self._stop_batchers(model_name)
+
     def _load_model(self, model_name: str, reload: bool = False):
         from tensorflow.keras.models import load_model
 
         if model_name in self.models and not reload:
+            self._model_cache.touch(model_name)
             return self.models[model_name]
 
         model = None
@@ -89,6 +138,7 @@ class TensorflowPlugin(Plugin):
         else:
             model_name = os.path.abspath(os.path.expanduser(model_name))
             if model_name in self.models and not reload:
+                self._model_cache.touch(model_name)
                 return self.models[model_name]
 
             if os.path.isfile(model_name):
@@ -120,6 +170,7 @@ class TensorflowPlugin(Plugin):
         with self._lock_model(model_name):
             self.models[model_name] = model
 
+        self._model_cache.put(model_name, model, self._get_model_size(model))
         return model
 
     def _generate_callbacks(self, model: str):
@@ -211,6 +262,8 @@ class TensorflowPlugin(Plugin):
                 raise AssertionError('The model {} is not loaded'.format(model))
             del self.models[model]
 
+        self._forget_model(model)
+
     @action
     def remove(self, model: str) -> None:
         """
@@ -223,6 +276,7 @@ class TensorflowPlugin(Plugin):
             if model in self.models:
                 del self.models[model]
 
+        self._forget_model(model)
         model_dir = os.path.join(self._models_dir, model)
         if os.path.isdir(model_dir):
             shutil.rmtree(model_dir)
@@ -1181,16 +1235,35 @@ class TensorflowPlugin(Plugin):
         ):
             inputs = np.asarray([inputs])
 
-        ret = model_obj.predict(
-            inputs,
-            batch_size=batch_size,
-            verbose=verbose,
-            steps=steps,
-            callbacks=self._generate_callbacks(name),
-            max_queue_size=max_queue_size,
-            workers=workers,
-            use_multiprocessing=use_multiprocessing,
-        )
+        if (
+            isinstance(inputs, np.ndarray)
+            and len(inputs) == 1
+            and len(model_obj.inputs) == 1
+            and batch_size is None
+            and steps is None
+        ):
+            # Single samples with the same shape are batched together
+            batcher = get_batcher(
+                (self._plugin_name, name, inputs.shape[1:], inputs.dtype.str),
+                lambda samples: self._predict_batch(name, samples),
+                name=f'{self._plugin_name}:{name}:'
+                + 'x'.join(str(d) for d in inputs.shape[1:]),
+                max_batch_size=self.max_batch_size,
+                max_latency=self.max_batch_latency,
+            )
+
+            ret = np.asarray([batcher(inputs[0])])
+        else:
+            ret = model_obj.predict(
+                inputs,
+                batch_size=batch_size,
+                verbose=verbose,
+                steps=steps,
+                callbacks=self._generate_callbacks(name),
+                max_queue_size=max_queue_size,
+                workers=workers,
+                use_multiprocessing=use_multiprocessing,
+            )
 
         if (
             model_obj.output_labels
@@ -1215,6 +1288,43 @@ class TensorflowPlugin(Plugin):
             'output_labels': model_obj.output_labels,
         }
 
+    def _predict_batch(self, model: str, samples: List[np.ndarray]) -> List[np.ndarray]:
+        model_obj = self._load_model(model)
+        outputs = model_obj.predict(
+            np.stack(samples),
+            batch_size=len(samples),
+            verbose=0,
+            callbacks=self._generate_callbacks(model),
+        )
+
+        return list(outputs)
+
+    @action
+    def get_metrics(self, model: Optional[str] = None) -> dict:
+        """
+        Get the throughput metrics of the batched single-sample predictions.
+
+        :param model: Only return the metrics for this model (default: all the models).
+        :return: Metrics by batch queue. Example:
+
+            .. code-block:: json
+
+                {
+                    "tensorflow:my-model:28x28": {
+                        "requests": 120,
+                        "batches": 31,
+                        "errors": 0,
+                        "avg_batch_size": 3.87,
+                        "avg_latency": 0.024,
+                        "throughput": 8.2
+                    }
+                }
+
+        """
+        return get_batcher_metrics(
+            lambda key: key[0] == self._plugin_name and (not model or key[1] == model)
+        )
+
     @action
     def save(self, model: str, overwrite: bool = True, **opts) -> None:
         """
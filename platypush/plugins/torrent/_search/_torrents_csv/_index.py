@@ -0,0 +1,365 @@
+import csv
+import logging
+import os
+import pathlib
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+_columns = (
+    'infohash',
+    'name',
+    'size_bytes',
+    'created_unix',
+    'seeders',
+    'leechers',
+    'completed',
+    'scraped_date',
+    'published',
+)
+
+_int_columns = _columns[2:]
+
+_schema = (
+    """
+    create table if not exists torrent (
+      id integer primary key,
+      infohash text not null unique,
+      name text not null,
+      size_bytes integer not null,
+      created_unix integer not null,
+      seeders integer not null,
+      leechers integer not null,
+      completed integer not null,
+      scraped_date integer not null,
+      published integer not null,
+      rank integer not null
+    )
+    """,
+    'create index if not exists idx_torrent_rank on torrent(rank)',
+)
+
+_fts_schema = """
+create virtual table if not exists torrent_fts using fts5(
+  name, content='torrent', content_rowid='id', tokenize='trigram'
+)
+"""
+
+_fts_triggers = (
+    """
+    create trigger if not exists torrent_fts_insert after insert on torrent begin
+      insert into torrent_fts(rowid, name) values (new.id, new.name);
+    end
+    """,
+    """
+    create trigger if not exists torrent_fts_delete after delete on torrent begin
+      insert into torrent_fts(torrent_fts, rowid, name)
+      values ('delete', old.id, old.name);
+    end
+    """,
+    """
+    create trigger if not exists torrent_fts_update after update of name on torrent
+    begin
+      insert into torrent_fts(torrent_fts, rowid, name)
+      values ('delete', old.id, old.name);
+      insert into torrent_fts(rowid, name) values (new.id, new.name);
+    end
+    """,
+)
+
+_rank_expr = '(({seeders} << 32) | ({created_unix} & 4294967295))'
+"""
+Precomputed sort key: torrents are sorted by seeders, then by creation time.
+"""
+
+_min_trigram_len = 3
+
+
+@dataclass
+class ImportStats:
+    """
+    Statistics about an import of the torrents CSV.
+    """
+
+    rows: int = 0
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    elapsed: float = 0
+
+
+class TorrentsCsvIndex:
+    """
+    SQLite index of the torrents.csv dataset.
+
+    - Names are indexed in a trigram FTS5 table (if supported by the SQLite
+      library), so substring searches don't need to scan the whole table.
+    - Each torrent has a precomputed ``rank`` sort key (seeders, then
+      creation time), so results can be sorted through an index.
+    - When the CSV is refreshed, it's loaded into a staging table and only
+      the new, changed or removed rows are applied to the index.
+    """
+
+    batch_size = 50000
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._schema: Optional[Dict[str, bool]] = None
+
+    @contextmanager
+    def connect(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def supports_trigram(conn: sqlite3.Connection) -> bool:
+        """
+        :return: True if the SQLite library supports the FTS5 trigram
+            tokenizer (SQLite >= 3.34).
+        """
+        try:
+            conn.execute(
+                "create virtual table temp._trigram_probe using fts5(x, tokenize='trigram')"
+            )
+            conn.execute('drop table temp._trigram_probe')
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    @staticmethod
+    def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+        return [row[1] for row in conn.execute(f'pragma table_info({table})')]
+
+    def _init_schema(self, conn: sqlite3.Connection) -> bool:
+        """
+        :return: True if the FTS index is available.
+        """
+        columns = self._table_columns(conn, 'torrent')
+        if columns and 'rank' not in columns:
+            # Database built by a previous version: rebuild it from scratch
+            self.logger.info('Migrating the torrents database to the new schema')
+            conn.execute('drop table if exists torrent_fts')
+            conn.execute('drop table if exists torrent')
+
+        conn.execute('drop table if exists torrent_tmp')
+        for statement in _schema:
+            conn.execute(statement)
+
+        has_fts = self.supports_trigram(conn)
+        if has_fts:
+            conn.execute(_fts_schema)
+        else:
+            self.logger.warning(
+                'The SQLite library (%s) does not support trigram indexes, '
+                'searches on the torrents database will be slower',
+                sqlite3.sqlite_version,
+            )
+
+        return has_fts
+
+    @staticmethod
+    def _read_csv(csv_path: str) -> Iterable[Tuple]:
+        csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+        with open(csv_path, newline='', encoding='utf-8', errors='replace') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return
+
+            idx = {col.strip(): i for i, col in enumerate(header)}
+            missing = [col for col in _columns if col not in idx]
+            if missing:
+                raise AssertionError(f'Missing columns in the torrents CSV: {missing}')
+
+            positions = [idx[col] for col in _columns]
+            for row in reader:
+                try:
+                    yield (
+                        row[positions[0]],
+                        row[positions[1]],
+                        *(int(row[pos] or 0) for pos in positions[2:]),
+                    )
+                except (IndexError, ValueError):
+                    continue
+
+    def import_csv(self, csv_path: str) -> ImportStats:
+        """
+        Synchronize the index with a torrents CSV file.
+        """
+        stats = ImportStats()
+        start_time = time.time()
+        pathlib.Path(os.path.dirname(os.path.abspath(self.db_path))).mkdir(
+            parents=True, exist_ok=True
+        )
+
+        with self.connect() as conn:
+            conn.execute('pragma journal_mode=wal')
+            conn.execute('pragma temp_store=memory')
+            with conn:
+                has_fts = self._init_schema(conn)
+                is_empty = not conn.execute('select 1 from torrent limit 1').fetchone()
+                if is_empty and has_fts:
+                    # Initial load: index the names in bulk at the end rather
+                    # than through the triggers
+                    for trigger in ('insert', 'delete', 'update'):
+                        conn.execute(f'drop trigger if exists torrent_fts_{trigger}')
+
+                stats.rows = self._load_staging(conn, csv_path)
+                stats.added, stats.updated, stats.removed = self._apply_diff(conn)
+                conn.execute('drop table temp.torrent_staging')
+
+                if has_fts:
+                    if is_empty:
+                        conn.execute(
+                            "insert into torrent_fts(torrent_fts) values ('rebuild')"
+                        )
+                    for trigger in _fts_triggers:
+                        conn.execute(trigger)
+
+            conn.execute('pragma optimize')
+
+        self._schema = None
+        stats.elapsed = time.time() - start_time
+        return stats
+
+    def _load_staging(self, conn: sqlite3.Connection, csv_path: str) -> int:
+        conn.execute('drop table if exists temp.torrent_staging')
+        conn.execute(
+            'create temp table torrent_staging ('
+            'infohash text primary key, name text, '
+            + ', '.join(f'{col} integer' for col in _int_columns)
+            + ')'
+        )
+
+        placeholders = ', '.join('?' for _ in _columns)
+        insert = (
+            f'insert or replace into torrent_staging ({", ".join(_columns)}) '
+            f'values ({placeholders})'
+        )
+
+        rows = 0
+        batch = []
+        for row in self._read_csv(csv_path):
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                conn.executemany(insert, batch)
+                rows += len(batch)
+                batch = []
+
+        if batch:
+            conn.executemany(insert, batch)
+            rows += len(batch)
+
+        return rows
+
+    @staticmethod
+    def _apply_diff(conn: sqlite3.Connection) -> Tuple[int, int, int]:
+        columns = ', '.join(_columns)
+        rank = _rank_expr.format(seeders='s.seeders', created_unix='s.created_unix')
+        changed = ' or '.join(
+            f'torrent.{col} != excluded.{col}' for col in _columns[1:]
+        )
+        updates = ', '.join(
+            f'{col} = excluded.{col}' for col in (*_columns[1:], 'rank')
+        )
+
+        removed = conn.execute(
+            'delete from torrent where not exists ('
+            'select 1 from temp.torrent_staging s where s.infohash = torrent.infohash)'
+        ).rowcount
+
+        select = (
+            f'insert into torrent ({columns}, rank) '
+            f'select {", ".join(f"s.{col}" for col in _columns)}, {rank} '
+            'from temp.torrent_staging s '
+        )
+
+        added = conn.execute(
+            select + 'where not exists ('
+            'select 1 from torrent t where t.infohash = s.infohash)'
+        ).rowcount
+
+        # Only the rows that actually changed are rewritten (and re-indexed)
+        updated = conn.execute(
+            select + 'where true '
+            f'on conflict(infohash) do update set {updates} where {changed}'
+        ).rowcount
+
+        return added, updated, removed
+
+    def _get_schema(self, conn: sqlite3.Connection) -> Dict[str, bool]:
+        if self._schema is None:
+            tables = {
+                row[0]
+                for row in conn.execute(
+                    "select name from sqlite_master where type = 'table'"
+                )
+            }
+            self._schema = {
+                'fts': 'torrent_fts' in tables,
+                'rank': 'rank' in self._table_columns(conn, 'torrent'),
+            }
+
+        return self._schema
+
+    @staticmethod
+    def tokenize(query: str) -> List[str]:
+        return [token for token in re.split(r'[^\w]+', query.lower()) if token]
+
+    def search(self, query: str, limit: int, offset: int) -> List[Tuple]:
+        """
+        Search torrents by name.
+
+        :return: A list of ``(infohash, name, size_bytes, seeders, leechers,
+            created_unix)`` tuples, sorted by seeders and creation time.
+        """
+        tokens = self.tokenize(query)
+        with self.connect() as conn:
+            schema = self._get_schema(conn)
+            params: Dict[str, object] = {
+                'limit': max(int(limit), 0),
+                'offset': max(int(offset), 0),
+            }
+
+            conditions = []
+            for i, token in enumerate(tokens):
+                conditions.append(f'lower(t.name) like :token{i}')
+                params[f'token{i}'] = f'%{token}%'
+
+            order_by = (
+                't.rank desc'
+                if schema['rank']
+                else 't.seeders desc, t.created_unix desc'
+            )
+            fts_tokens = [token for token in tokens if len(token) >= _min_trigram_len]
+            if schema['fts'] and fts_tokens:
+                params['match'] = ' AND '.join(
+                    '"' + token.replace('"', '""') + '"' for token in fts_tokens
+                )
+                source = (
+                    'torrent t join torrent_fts f on f.rowid = t.id '
+                    'where torrent_fts match :match'
+                    + ''.join(f' and {cond}' for cond in conditions)
+                )
+            else:
+                source = 'torrent t' + (
+                    ' where ' + ' and '.join(conditions) if conditions else ''
+                )
+
+            return conn.execute(
+                'select t.infohash, t.name, t.size_bytes, t.seeders, t.leechers, '
+                f't.created_unix from {source} order by {order_by} '
+                'limit :limit offset :offset',
+                params,
+            ).fetchall()
+
+
+# vim:sw=4:ts=4:et:
@@ -1,16 +1,12 @@
 import datetime as dt
 import os
 import pathlib
-import re
 import stat
-import subprocess
 import time
 from threading import RLock
 from typing import List, Optional
-from urllib.parse import quote_plus
 
 import requests
-from sqlalchemy import create_engine, text
 
 from platypush.config import Config
 from platypush.context import Variable
@@ -18,30 +14,7 @@ from platypush.context import Variable
 from .._model import TorrentSearchResult
 from ._base import TorrentsCsvBaseProvider
 from ._constants import TORRENTS_CSV_URL_LAST_CHECKED_VAR
-
-SQL_INIT_TEMPLATE = """
-create table torrent_tmp (
-  infohash text primary key,
-  name text not null,
-  size_bytes integer not null,
-  created_unix integer(4) not null,
-  seeders integer not null,
-  leechers integer not null,
-  completed integer not null,
-  scraped_date integer(4) not null,
-  published integer(4) not null
-);
-
-.separator ,
-.import --skip 1 '{csv_file}' torrent_tmp
-
-create index idx_name on torrent_tmp(lower(name));
-create index idx_seeders on torrent_tmp(seeders);
-create index idx_created_unix on torrent_tmp(created_unix);
-
-drop table if exists torrent;
-alter table torrent_tmp rename to torrent;
-"""
+from ._index import TorrentsCsvIndex
 
 
 class TorrentsCsvLocalProvider(TorrentsCsvBaseProvider):
@@ -110,11 +83,7 @@ class TorrentsCsvLocalProvider(TorrentsCsvBaseProvider):
         if not (os.path.isfile(db_path)):
             raise AssertionError(f'Invalid db_path: {db_path}')
         self.db_path = db_path
-
-    def _get_engine(self):
-        return create_engine(
-            'sqlite:///' + ('/'.join(map(quote_plus, self.db_path.split(os.path.sep))))
-        )
+        self._index = TorrentsCsvIndex(db_path)
 
     def _download_csv(self, csv_url: str, csv_path: str):
         if not self._should_download_csv(
@@ -156,18 +125,17 @@ class TorrentsCsvLocalProvider(TorrentsCsvBaseProvider):
             'Refreshing SQLite database %s from CSV file %s', db_path, csv_path
         )
 
-        db_dir = os.path.dirname(db_path)
-        pathlib.Path(db_dir).mkdir(parents=True, exist_ok=True)
-
-        with subprocess.Popen(
-            ['sqlite3', db_path], stdin=subprocess.PIPE, text=True
-        ) as proc:
-            proc.communicate(SQL_INIT_TEMPLATE.format(csv_file=csv_path))
-
+        stats = TorrentsCsvIndex(db_path).import_csv(csv_path)
         self.logger.info(
-            'Refreshed SQLite database %s from CSV file %s: ready to search',
+            'Refreshed SQLite database %s from CSV file %s in %.1f seconds: '
+            '%d torrents, %d added, %d updated, %d removed',
             db_path,
             csv_path,
+            stats.elapsed,
+            stats.rows,
+            stats.added,
+            stats.updated,
+            stats.removed,
         )
 
     @staticmethod
@@ -228,31 +196,7 @@ class TorrentsCsvLocalProvider(TorrentsCsvBaseProvider):
             page,
         )
 
-        tokens = re.split(r'[^\w]', query.lower())
-        where = ' and '.join(
-            f'lower(name) like :token{i}' for i, _ in enumerate(tokens)
-        )
-        tokens = {f'token{i}': f'%{token}%' for i, token in enumerate(tokens)}
-
-        with self._get_engine().connect() as conn:
-            self.logger.debug('Connected to the database: %s', conn.engine.url)
-            results = conn.execute(
-                text(
-                    f"""
-                    select infohash, name, size_bytes, seeders, leechers, created_unix
-                    from torrent
-                    where {where}
-                    order by seeders desc, created_unix desc
-                    limit :limit
-                    offset :offset
-                    """
-                ),
-                {
-                    **tokens,
-                    'limit': max(int(limit), 0),
-                    'offset': max(int(limit * (page - 1)), 0),
-                },
-            ).all()
+        results = self._index.search(query, limit=limit, offset=limit * (page - 1))
 
         self.logger.debug('Found %d results', len(results))
         return [
@@ -1,8 +1,24 @@
+import os
 import urllib.parse
-from typing import Optional, Union
+from contextlib import contextmanager
+from typing import Callable, Generator, Iterator, Optional, Union
 
+import requests
+
+from platypush.config import Config
 from platypush.context import get_plugin
 from platypush.plugins import Plugin, action
+from platypush.utils import get_plugin_name_by_class
+
+from ._cache import TtsCache
+from ._stream import AudioStreamWriter, PcmStreamWriter, audio_fifo, split_sentences
+
+
+class _StreamInterrupted(Exception):
+    """
+    Raised when the playback of an audio stream ends before the whole stream
+    has been received.
+    """
 
 
 class TtsPlugin(Plugin):
@@ -16,6 +32,9 @@ class TtsPlugin(Plugin):
         language='en-US',
         output_device: Optional[Union[int, str]] = None,
         output_volume: Optional[float] = None,
+        cache: bool = True,
+        cache_dir: Optional[str] = None,
+        cache_size: float = 100,
         **player_args,
     ):
         """
@@ -30,6 +49,12 @@ class TtsPlugin(Plugin):
             unchanged, values below ``100`` attenuate, and values above ``100``
             amplify with clipping in the playback path. It is passed as the
             ``volume`` argument to :meth:`platypush.plugins.sound.SoundPlugin.play`.
+        :param cache: If True (default), the synthesized audio is cached on
+            disk, keyed by engine, voice, parameters and text, so repeated
+            phrases are played without being synthesized or downloaded again.
+        :param cache_dir: Cache directory (default:
+            ``<CACHEDIR>/tts/<plugin>``).
+        :param cache_size: Maximum size of the cache, in MB (default: 100).
         :param player_args: Additional arguments to be passed to
             :meth:`platypush.plugins.sound.SoundPlugin.play` (like volume,
             duration, channels etc.).
@@ -47,6 +72,194 @@ class TtsPlugin(Plugin):
         if output_volume is not None:
             self.player_args.setdefault('volume', output_volume)
 
+        self._cache = (
+            TtsCache(
+                cache_dir
+                or os.path.join(Config.get_cachedir(), 'tts', self._engine_name),
+                max_size=int(cache_size * 1024 * 1024),
+            )
+            if cache
+            else None
+        )
+
+    @property
+    def _engine_name(self) -> str:
+        return get_plugin_name_by_class(self.__class__) or self.__class__.__name__
+
+    def _cached_resource(
+        self,
+        text: str,
+        ext: str,
+        fetch: Callable[[str], None],
+        voice: Optional[str] = None,
+        **params,
+    ) -> Optional[str]:
+        """
+        :param text: Synthesized text.
+        :param ext: Extension of the audio file.
+        :param fetch: Function that writes the audio to the path passed as
+            argument, invoked on cache misses.
+        :param voice: Voice/language/model identifier.
+        :param params: Other synthesis parameters that affect the output.
+        :return: The path of the cached audio file, or None if the cache is
+            disabled or the audio couldn't be fetched.
+        """
+        if not self._cache:
+            return None
+
+        key = self._cache.key(self._engine_name, text, voice=voice, **params)
+        path = self._cache.get(key, ext)
+        if path:
+            return path
+
+        try:
+            with self._cache.writer(key, ext) as tmp_path:
+                fetch(tmp_path)
+        except Exception as e:
+            self.logger.warning('Could not cache the audio for %r: %s', text, e)
+            return None
+
+        return self._cache.get(key, ext)
+
+    def _synthesize_sentences(
+        self,
+        text: str,
+        synthesize: Callable[[str], bytes],
+        voice: Optional[str] = None,
+        **params,
+    ) -> Iterator[bytes]:
+        """
+        Split a text into sentences and synthesize them one at the time,
+        looking them up in the cache first.
+
+        :param text: Text to synthesize.
+        :param synthesize: Function that returns the raw PCM audio of a
+            sentence.
+        :param voice: Voice/model identifier.
+        :param params: Other synthesis parameters that affect the output.
+        :return: An iterator over the PCM chunks of the sentences.
+        """
+        for sentence in split_sentences(text):
+            if not self._cache:
+                yield synthesize(sentence)
+                continue
+
+            key = self._cache.key(self._engine_name, sentence, voice=voice, **params)
+            path = self._cache.get(key, 'pcm')
+            if path:
+                try:
+                    with open(path, 'rb') as f:
+                        yield f.read()
+                    continue
+                except OSError:
+                    pass
+
+            audio = synthesize(sentence)
+            self._cache.put(key, 'pcm', audio)
+            yield audio
+
+    def _play_pcm_stream(
+        self,
+        chunks: Iterator[bytes],
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+        **player_args,
+    ):
+        """
+        Stream raw PCM chunks to the audio player as soon as they are
+        produced, and wait for the end of the playback.
+        """
+        with audio_fifo() as fifo_path:
+            writer = PcmStreamWriter(
+                fifo_path,
+                chunks,
+                sample_rate=sample_rate,
+                channels=channels,
+                sample_width=sample_width,
+            )
+            writer.start()
+
+            try:
+                self._playback(fifo_path, **{**player_args, 'join': True})
+            finally:
+                writer.stop()
+
+        if writer.error:
+            raise writer.error
+
+    @contextmanager
+    def _cache_writer(
+        self, key: Optional[str], ext: str
+    ) -> Generator[Optional[str], None, None]:
+        """
+        Yields the path where a new cache entry should be written, or None if
+        the cache is disabled.
+        """
+        if not (self._cache and key):
+            yield None
+            return
+
+        with self._cache.writer(key, ext) as path:
+            yield path
+
+    def _play_cached_stream(
+        self,
+        text: str,
+        ext: str,
+        stream: Callable[[], Iterator[bytes]],
+        voice: Optional[str] = None,
+        player_args: Optional[dict] = None,
+        **params,
+    ):
+        """
+        Play the cached audio of a text if available. Otherwise, play the
+        audio chunks returned by ``stream`` as soon as they are received, and
+        add them to the cache once the whole stream has been played.
+
+        :param text: Synthesized text.
+        :param ext: Extension of the audio file.
+        :param stream: Function that returns the audio chunks, invoked on
+            cache misses.
+        :param voice: Voice/language/model identifier.
+        :param player_args: Arguments passed to :meth:`._playback`.
+        :param params: Other synthesis parameters that affect the output.
+        """
+        player_args = player_args or {}
+        key = (
+            self._cache.key(self._engine_name, text, voice=voice, **params)
+            if self._cache
+            else None
+        )
+
+        path = self._cache.get(key, ext) if self._cache and key else None
+        if path:
+            self._playback(path, **player_args)
+            return
+
+        try:
+            with audio_fifo(f'platypush-tts-fifo.{ext}') as fifo_path:
+                with self._cache_writer(key, ext) as cache_path:
+                    writer = AudioStreamWriter(
+                        fifo_path, stream(), copy_file=cache_path
+                    )
+                    writer.start()
+
+                    try:
+                        self._playback(fifo_path, **{**player_args, 'join': True})
+                    finally:
+                        writer.stop()
+
+                    if writer.error:
+                        raise writer.error
+
+                    if not writer.completed:
+                        # Raising inside the block discards the partial audio
+                        # from the cache
+                        raise _StreamInterrupted()
+        except _StreamInterrupted:
+            self.logger.debug('The playback of %r has been interrupted', text)
+
     def _playback(
         self,
         resource: str,
@@ -95,7 +308,14 @@ class TtsPlugin(Plugin):
             }
         )
 
-        self._playback(url, **player_args)
+        def stream() -> Iterator[bytes]:
+            with requests.get(url, timeout=10, stream=True) as rs:
+                rs.raise_for_status()
+                yield from rs.iter_content(chunk_size=4096)
+
+        self._play_cached_stream(
+            text, 'mp3', stream, voice=language, player_args=player_args
+        )
 
     @action
     def stop(self):
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Generator, Optional
+
+
+class TtsCache:
+    """
+    A content-addressed, size-bounded on-disk cache for synthesized audio.
+
+    Entries are keyed by the SHA-256 digest of ``(engine, voice, params,
+    text)``. Each hit refreshes the modification time of the entry, and the
+    least recently used entries are evicted when the cache grows beyond
+    ``max_size``.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        """
+        :param cache_dir: Cache directory.
+        :param max_size: Maximum size of the cache, in bytes.
+        """
+        self.cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+        self.max_size = max_size
+        self.logger = logging.getLogger(__name__)
+        self._size: Optional[int] = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(engine: str, text: str, voice: Optional[str] = None, **params) -> str:
+        """
+        :return: The cache key of a synthesized text.
+        """
+        return hashlib.sha256(
+            json.dumps(
+                [
+                    engine,
+                    voice,
+                    {k: v for k, v in params.items() if v is not None},
+                    text,
+                ],
+                sort_keys=True,
+                default=str,
+            ).encode()
+        ).hexdigest()
+
+    def _path(self, key: str, ext: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.{ext.lstrip(".")}')
+
+    def get(self, key: str, ext: str) -> Optional[str]:
+        """
+        :return: The path of the cached entry, or None if it's not cached.
+        """
+        path = self._path(key, ext)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+
+        return path
+
+    @contextmanager
+    def writer(self, key: str, ext: str) -> Generator[str, None, None]:
+        """
+        Context manager that yields a temporary path where the entry should
+        be written. The entry is atomically added to the cache only if the
+        block completes without errors.
+        """
+        path = self._path(key, ext)
+        pathlib.Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(fd)
+
+        try:
+            yield tmp_path
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+
+        self._evict()
+
+    def put(self, key: str, ext: str, data: bytes) -> str:
+        """
+        Add an entry to the cache.
+
+        :return: The path of the cached entry.
+        """
+        with self.writer(key, ext) as tmp_path:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+
+        return self._path(key, ext)
+
+    def _entries(self):
+        try:
+            subdirs = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+
+        for subdir in subdirs:
+            if not subdir.is_dir():
+                continue
+
+            with os.scandir(subdir.path) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith('.tmp'):
+                        st = entry.stat()
+                        yield entry.path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        with self._lock:
+            if self._size is not None and self._size <= self.max_size:
+                return
+
+            entries = sorted(self._entries(), key=lambda e: e[2])
+            self._size = sum(size for _, size, _ in entries)
+
+            # Evict down to 90% of the maximum size, so the cache directory
+            # isn't scanned again on every new entry
+            for path, size, _ in entries:
+                if self._size <= self.max_size * 0.9:
+                    break
+
+                try:
+                    os.unlink(path)
+                    self._size -= size
+                except OSError as e:
+                    self.logger.debug('Could not remove %s: %s', path, e)
+
+
+# vim:sw=4:ts=4:et:
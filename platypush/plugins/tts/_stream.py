@@ -0,0 +1,186 @@
+import logging
+import os
+import re
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generator, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_sentence_end_regex = re.compile(r'(?<=[.!?;。！？])\s+|\n\s*\n+')
+_clause_end_regex = re.compile(r'(?<=[,:;])\s+')
+
+
+def split_sentences(text: str, max_length: int = 300) -> List[str]:
+    """
+    Split a text into sentences, so they can be synthesized incrementally.
+
+    Sentences longer than ``max_length`` characters are further split on
+    clause boundaries (commas, colons and semicolons) where possible.
+    """
+    sentences = []
+    for sentence in _sentence_end_regex.split(text):
+        sentence = ' '.join(sentence.split())
+        if not sentence:
+            continue
+
+        if len(sentence) <= max_length:
+            sentences.append(sentence)
+            continue
+
+        chunk = ''
+        for clause in _clause_end_regex.split(sentence):
+            if chunk and len(chunk) + len(clause) + 1 > max_length:
+                sentences.append(chunk)
+                chunk = clause
+            else:
+                chunk = f'{chunk} {clause}' if chunk else clause
+
+        if chunk:
+            sentences.append(chunk)
+
+    return sentences
+
+
+def wav_header(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    :return: The header of a WAV stream of unknown length.
+    """
+    data_size = 0xFFFFFFFF - 36
+    byte_rate = sample_rate * channels * sample_width
+    return (
+        b'RIFF'
+        + struct.pack('<I', 0xFFFFFFFF)
+        + b'WAVEfmt '
+        + struct.pack(
+            '<IHHIIHH',
+            16,
+            1,
+            channels,
+            sample_rate,
+            byte_rate,
+            channels * sample_width,
+            sample_width * 8,
+        )
+        + b'data'
+        + struct.pack('<I', data_size)
+    )
+
+
+@contextmanager
+def audio_fifo(name: str = 'platypush-tts-fifo.wav') -> Generator[str, None, None]:
+    """
+    Context manager that creates a temporary named pipe.
+    """
+    fifo_dir = tempfile.mkdtemp()
+    fifo_path = os.path.join(fifo_dir, name)
+    os.mkfifo(fifo_path)
+
+    try:
+        yield fifo_path
+    finally:
+        os.unlink(fifo_path)
+        os.rmdir(fifo_dir)
+
+
+class AudioStreamWriter(threading.Thread):
+    """
+    Thread that writes a stream of audio chunks to a named pipe as soon as
+    they are produced, optionally copying them to a file.
+    """
+
+    def __init__(
+        self,
+        fifo_path: str,
+        chunks: Iterable[bytes],
+        copy_file: Optional[str] = None,
+    ):
+        """
+        :param fifo_path: Path of the named pipe read by the audio player.
+        :param chunks: The audio chunks.
+        :param copy_file: If set, the chunks are also written to this file
+            (e.g. to populate the cache).
+        """
+        super().__init__(name='platypush:tts:audio-stream', daemon=True)
+        self.fifo_path = fifo_path
+        self.chunks = chunks
+        self.copy_file = copy_file
+        self.error: Optional[Exception] = None
+        self.completed = False
+        """ Whether all the chunks have been written. """
+        self._stop_event = threading.Event()
+
+    def _header(self) -> bytes:
+        return b''
+
+    def _write_chunks(self, f, copy):
+        f.write(self._header())
+        for chunk in self.chunks:
+            if self._stop_event.is_set():
+                return
+
+            f.write(chunk)
+            f.flush()
+            if copy:
+                copy.write(chunk)
+
+        self.completed = True
+
+    def run(self):
+        try:
+            with open(self.fifo_path, 'wb') as f:
+                if not self.copy_file:
+                    self._write_chunks(f, None)
+                    return
+
+                with open(self.copy_file, 'wb') as copy:
+                    self._write_chunks(f, copy)
+        except BrokenPipeError:
+            logger.debug('The audio player has closed the stream')
+        except Exception as e:
+            self.error = e
+
+    def stop(self):
+        """
+        Stop the writer, and unblock it if it's waiting for the reader to
+        open the pipe.
+        """
+        self._stop_event.set()
+        deadline = time.time() + 5
+        while self.is_alive() and time.time() < deadline:
+            try:
+                fd = os.open(self.fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+                os.close(fd)
+            except OSError:
+                pass
+
+            self.join(timeout=0.1)
+
+
+class PcmStreamWriter(AudioStreamWriter):
+    """
+    Thread that writes a stream of PCM chunks to a named pipe as a WAV
+    stream, as soon as the chunks are produced.
+    """
+
+    def __init__(
+        self,
+        fifo_path: str,
+        chunks: Iterable[bytes],
+        sample_rate: int,
+        channels: int = 1,
+        sample_width: int = 2,
+    ):
+        super().__init__(fifo_path, chunks)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.sample_width = sample_width
+
+    def _header(self) -> bytes:
+        return wav_header(self.sample_rate, self.channels, self.sample_width)
+
+
+# vim:sw=4:ts=4:et:
@@ -141,12 +141,6 @@ class TtsGooglePlugin(TtsPlugin):
             :meth:`platypush.plugins.sound.SoundPlugin.play` (like volume,
             duration, channels etc.).
         """
-
-        from google.cloud import texttospeech
-
-        client = texttospeech.TextToSpeechClient()
-        synthesis_input = self._synthesis_input(text=text)
-
         language = self._parse_language(language)
         voice = self._parse_voice(language, voice)
 
@@ -155,17 +149,37 @@ class TtsGooglePlugin(TtsPlugin):
         else:
             gender = getattr(self._gender, gender.upper())
 
-        voice = self._voice_selection_params(
-            language_code=language, ssml_gender=gender, name=voice
-        )
+        def synthesize() -> bytes:
+            from google.cloud import texttospeech
 
-        audio_config = self._audio_config(audio_encoding=self._audio_encoding.MP3)
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
+            client = texttospeech.TextToSpeechClient()
+            response = client.synthesize_speech(
+                input=self._synthesis_input(text=text),
+                voice=self._voice_selection_params(
+                    language_code=language, ssml_gender=gender, name=voice
+                ),
+                audio_config=self._audio_config(
+                    audio_encoding=self._audio_encoding.MP3
+                ),
+            )
+
+            return response.audio_content
+
+        def fetch(path: str):
+            with open(path, 'wb') as f:
+                f.write(synthesize())
+
+        cached_file = self._cached_resource(
+            text, 'mp3', fetch, voice=voice, language=language, gender=gender
         )
 
+        if cached_file:
+            self._playback(cached_file, **player_args)
+            return
+
         with tempfile.NamedTemporaryFile() as f:
-            f.write(response.audio_content)
+            f.write(synthesize())
+            f.flush()
             self._playback(f.name, **player_args)
 
 
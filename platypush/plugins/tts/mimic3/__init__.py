@@ -59,6 +59,29 @@ class TtsMimic3Plugin(TtsPlugin):
             }
         )
 
+    @staticmethod
+    def _get_audio(
+        text: str,
+        server_url: str,
+        voice: str,
+        timeout: Optional[float] = None,
+    ) -> bytes:
+        """
+        :return: The audio of a text synthesized by the Mimic3 server, as a
+            WAV file.
+        """
+        rs = requests.post(
+            urljoin(server_url, '/api/tts'),
+            data=text,
+            timeout=timeout,
+            params={
+                'voice': voice,
+            },
+        )
+
+        rs.raise_for_status()
+        return rs.content
+
     @staticmethod
     @contextmanager
     def _save_audio(
@@ -77,18 +100,10 @@ class TtsMimic3Plugin(TtsPlugin):
         :param timeout: Timeout for the audio stream retrieval.
         """
 
-        rs = requests.post(
-            urljoin(server_url, '/api/tts'),
-            data=text,
-            timeout=timeout,
-            params={
-                'voice': voice,
-            },
-        )
-
-        rs.raise_for_status()
         tmp_file = tempfile.NamedTemporaryFile(suffix='.wav', delete=False)
-        tmp_file.write(rs.content)
+        tmp_file.write(
+            TtsMimic3Plugin._get_audio(text, server_url, voice, timeout=timeout)
+        )
         yield tmp_file.name
 
         tmp_file.close()
@@ -117,6 +132,18 @@ class TtsMimic3Plugin(TtsPlugin):
         server_url = server_url or self.server_url
         voice = voice or self.voice
 
+        def fetch(path: str):
+            with open(path, 'wb') as f:
+                f.write(self._get_audio(text, server_url, voice))
+
+        cached_file = self._cached_resource(
+            text, 'wav', fetch, voice=voice, server_url=server_url
+        )
+
+        if cached_file:
+            self._playback(cached_file, join=True, **player_args)
+            return
+
         with self._save_audio(text, server_url, voice) as audio_file:
             self._playback(audio_file, join=True, **player_args)
 
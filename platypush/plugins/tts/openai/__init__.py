@@ -1,7 +1,9 @@
 import os
+import sys
 import tempfile
 from contextlib import contextmanager
 from multiprocessing import Process
+from threading import Event
 from typing import Generator, Optional
 
 import requests
@@ -12,6 +14,16 @@ from platypush.plugins.openai import OpenaiPlugin
 from platypush.plugins.tts import TtsPlugin
 
 
+class _ResponseInterrupted(Exception):
+    """
+    Raised when the response processor doesn't complete.
+    """
+
+    def __init__(self, exitcode: int):
+        super().__init__(exitcode)
+        self.exitcode = exitcode
+
+
 class TtsOpenaiPlugin(TtsPlugin):
     r"""
     This plugin provides an interface to the `OpenAI text-to-speech API
@@ -22,6 +34,11 @@ class TtsOpenaiPlugin(TtsPlugin):
     """
 
     _BUFSIZE = 1024
+    _INTERRUPTED = 3
+    """
+    Exit code of the response processor when the playback is stopped or the
+    player closes the audio pipe.
+    """
 
     def __init__(
         self,
@@ -68,21 +85,39 @@ class TtsOpenaiPlugin(TtsPlugin):
         self.player_args.setdefault('start_padding', start_padding)
         self.player_args.setdefault('end_padding', end_padding)
         self._audio_proc: Optional[Process] = None
+        self._stop_requested = Event()
 
     def _process_response(
         self,
         response: requests.Response,
         audio_file: str,
+        cache_file: Optional[str] = None,
     ) -> Process:
         def proc_fn():
+            # pylint: disable=consider-using-with
+            cache = open(cache_file, 'wb') if cache_file else None
             try:
-                with open(audio_file, 'wb') as file:
+                # Unbuffered, so the chunks are written to the pipe right away
+                # and nothing is left to flush if the player closes it
+                with open(audio_file, 'wb', buffering=0) as file:
                     for chunk in response.iter_content(chunk_size=self._BUFSIZE):
-                        if chunk:
+                        if not chunk:
+                            continue
+
+                        try:
                             file.write(chunk)
-                            file.flush()
+                        except OSError:
+                            # The player has closed the pipe (e.g. the
+                            # playback has been stopped)
+                            sys.exit(self._INTERRUPTED)
+
+                        if cache:
+                            cache.write(chunk)
             except KeyboardInterrupt:
-                pass
+                sys.exit(self._INTERRUPTED)
+            finally:
+                if cache:
+                    cache.close()
 
         self._audio_proc = Process(target=proc_fn, name='openai-tts-response-processor')
         self._audio_proc.start()
@@ -120,10 +155,11 @@ class TtsOpenaiPlugin(TtsPlugin):
         fifo_dir = tempfile.mkdtemp()
         fifo_path = os.path.join(fifo_dir, 'platypush-tts-openai-fifo')
         os.mkfifo(fifo_path)
-        yield fifo_path
-
-        os.unlink(fifo_path)
-        os.rmdir(fifo_dir)
+        try:
+            yield fifo_path
+        finally:
+            os.unlink(fifo_path)
+            os.rmdir(fifo_dir)
 
     @action
     def say(
@@ -147,23 +183,52 @@ class TtsOpenaiPlugin(TtsPlugin):
         response_processor: Optional[Process] = None
         # The language argument isn't required here
         player_args.pop('language', None)
+        model = model or self.model
+        voice = voice or self.voice
+
+        key = (
+            self._cache.key(self._engine_name, text, voice=voice, model=model)
+            if self._cache
+            else None
+        )
+
+        cached_file = self._cache.get(key, 'mp3') if self._cache and key else None
+        if cached_file:
+            self._playback(cached_file, **player_args)
+            return
+
+        self._stop_requested.clear()
 
         try:
             response = self._make_request(text, model=model, voice=voice)
 
-            with self._audio_fifo() as audio_file:
+            with self._audio_fifo() as audio_file, self._cache_writer(
+                key, 'mp3'
+            ) as cache_file:
                 response_processor = self._process_response(
-                    response=response, audio_file=audio_file
+                    response=response, audio_file=audio_file, cache_file=cache_file
                 )
                 self._playback(audio_file, **player_args)
                 response_processor.join()
+                exitcode = response_processor.exitcode
                 response_processor = None
+
+                if exitcode:
+                    # Raising inside the block also discards the partial
+                    # response from the cache
+                    raise _ResponseInterrupted(exitcode)
+        except _ResponseInterrupted as e:
+            if not (self._stop_requested.is_set() or e.exitcode == self._INTERRUPTED):
+                raise RuntimeError(
+                    f'The response processor exited with code {e.exitcode}'
+                ) from e
         finally:
             if response_processor:
                 response_processor.terminate()
 
     @action
     def stop(self):
+        self._stop_requested.set()
         super().stop()
         if self._audio_proc and self._audio_proc.is_alive():
             self._audio_proc.terminate()
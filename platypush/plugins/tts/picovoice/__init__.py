@@ -216,12 +216,25 @@ class TtsPicovoicePlugin(TtsPlugin):
             )
             return
 
+        def synthesize(sentence: str) -> bytes:
+            return np.array(
+                orca.synthesize(sentence, speech_rate=speech_rate)[0],
+                dtype='int16',
+            ).tobytes()
+
         self._play_audio(
             orca=orca,
             output_device=output_device,
             output_volume=output_volume,
-            pcm=np.array(
-                orca.synthesize(text, speech_rate=speech_rate)[0],
+            pcm=np.frombuffer(
+                b''.join(
+                    self._synthesize_sentences(
+                        text,
+                        synthesize,
+                        voice=model_path or self.model_path,
+                        speech_rate=speech_rate,
+                    )
+                ),
                 dtype='int16',
             ),
         )
@@ -1,6 +1,5 @@
 import os
 import pathlib
-import tempfile
 import wave
 from collections import defaultdict
 from threading import RLock
@@ -96,12 +95,8 @@ class TtsPiperPlugin(TtsPlugin):
         self._voices: Dict[str, Optional[PiperVoice]] = defaultdict(lambda: None)
         self._voices_locks = defaultdict(RLock)
 
-    def _get_voice(self, model: Optional[str] = None):
-        from piper import PiperVoice
-
-        is_default = not model
-        if is_default:
-            model = self._model
+    def _get_model_path(self, model: Optional[str] = None) -> str:
+        model = model or self._model
         if not model:
             raise ValueError('model must be specified')
 
@@ -113,6 +108,12 @@ class TtsPiperPlugin(TtsPlugin):
             if not model_path.endswith('.onnx'):
                 model_path += '.onnx'
 
+        return model_path
+
+    def _get_voice(self, model: Optional[str] = None):
+        from piper import PiperVoice
+
+        model_path = self._get_model_path(model)
         with self._voices_locks[model_path]:
             voice = self._voices[model_path]
             if voice:
@@ -173,23 +174,33 @@ class TtsPiperPlugin(TtsPlugin):
 
         syn_config = SynthesisConfig(**syn_kwargs)
 
+        def synthesize(sentence: str) -> bytes:
+            return b''.join(
+                chunk.audio_int16_bytes
+                for chunk in voice.synthesize(sentence, syn_config=syn_config)
+            )
+
+        # Sentences are synthesized (or read from the cache) one at the time,
+        # so playback can start as soon as the first one is ready
+        chunks = self._synthesize_sentences(
+            text,
+            synthesize,
+            voice=self._get_model_path(model),
+            **syn_kwargs,
+        )
+        sample_rate = voice.config.sample_rate
+
         if output_file:
             output_file = os.path.expanduser(output_file)
             with wave.open(output_file, 'wb') as wav_file:
-                voice.synthesize_wav(text, wav_file, syn_config=syn_config)
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(sample_rate)
+                for chunk in chunks:
+                    wav_file.writeframes(chunk)
             return
 
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
-            tmp_path = f.name
-
-        try:
-            with wave.open(tmp_path, 'wb') as wav_file:
-                voice.synthesize_wav(text, wav_file, syn_config=syn_config)
-            player_args["join"] = True
-            self._playback(tmp_path, **player_args)
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        self._play_pcm_stream(chunks, sample_rate=sample_rate, **player_args)
 
     @action
     def download_voice(self, voice: str, models_dir: Optional[str] = None):
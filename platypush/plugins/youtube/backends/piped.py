@@ -1,19 +1,18 @@
 import base64
 import re
 from dataclasses import dataclass
-from functools import lru_cache
 from typing import Collection, List, Optional
 from urllib.parse import urljoin
 
 from marshmallow import Schema
 import requests
 
+from platypush.common.cache import get_cache
 from platypush.schemas.piped import (
     PipedChannelSchema,
     PipedPlaylistSchema,
     PipedVideoSchema,
 )
-from platypush.utils import ignore_unhashable
 
 from ..model import YoutubeChannel, YoutubeEntity, YoutubePlaylist, YoutubeVideo
 from .base import BaseBackend
@@ -146,8 +145,6 @@ class PipedBackend(BaseBackend):
             raise AssertionError(f'Expected a playlist, got {item}')
         return item
 
-    @ignore_unhashable
-    @lru_cache(maxsize=10)  # noqa
     def _get_channel(self, id: str) -> dict:  # pylint: disable=redefined-builtin
         if (
             id.startswith('http')
@@ -156,8 +153,11 @@ class PipedBackend(BaseBackend):
         ):
             id = id.split('/')[-1]
 
-        return (
-            PipedChannelSchema().dump(self._request(f'channel/{id}')) or {}  # type: ignore
+        # Channel details are shared with the other processes and persisted
+        # across restarts
+        return get_cache('youtube.piped.channels', ttl=3600, max_size=100).get_or_load(
+            f'{self.instance_url}|{id}',
+            lambda: PipedChannelSchema().dump(self._request(f'channel/{id}')) or {},  # type: ignore
         )
 
     def search(
@@ -26,6 +26,7 @@ from platypush.exceptions.user import (
 )
 from platypush.utils import get_or_generate_stored_rsa_key_pair, utcnow
 
+from ._cache import CredentialsCache
 from ._model import (
     AuthenticationStatus,
     User,
@@ -35,6 +36,9 @@ from ._model import (
     UserToken,
 )
 
+_credentials_cache = CredentialsCache()
+""" Process-wide cache of the recently verified API/JWT tokens. """
+
 
 class UserManager:
     """
@@ -163,7 +167,9 @@ class UserManager:
                 new_password, salt, user.hmac_iterations
             )
             session.commit()
-            return True
+
+        _credentials_cache.invalidate_user(username)
+        return True
 
     def authenticate_user(
         self, username, password, code=None, skip_2fa=False, with_status=False
@@ -231,7 +237,9 @@ class UserManager:
 
             session.delete(user)
             session.commit()
-            return True
+
+        _credentials_cache.invalidate_user(username)
+        return True
 
     def delete_user_session(self, session_token):
         with self._get_session(locked=True) as session:
@@ -329,6 +337,9 @@ class UserManager:
                 session.add(encrypted_otp)
                 session.commit()
 
+        if not dry_run:
+            _credentials_cache.invalidate_user(username)
+
         return user_otp
 
     def get_otp_secret(self, username: str) -> Optional[str]:
@@ -487,6 +498,10 @@ class UserManager:
         :raises: :class:`platypush.exceptions.user.InvalidCredentialsException`
             in case of invalid credentials stored in the token.
         """
+        user = _credentials_cache.get(token)
+        if user:
+            return user
+
         _, priv_key = self._get_jwt_rsa_key_pair()
 
         try:
@@ -498,13 +513,16 @@ class UserManager:
         if expires_at and time.time() > expires_at:
             raise InvalidJWTTokenException('Expired JWT token')
 
+        username = payload.get('username', '')
+        generation = _credentials_cache.generation(username)
         user = self.authenticate_user(
-            payload.get('username', ''), payload.get('password', ''), skip_2fa=True
+            username, payload.get('password', ''), skip_2fa=True
         )
 
         if not user:
             raise InvalidCredentialsException()
 
+        _credentials_cache.put(token, user, generation, expires_at=expires_at)
         return user
 
     def _authenticate_user(
@@ -662,7 +680,9 @@ class UserManager:
             session.query(UserOtp).filter_by(user_id=user.user_id).delete()
             session.query(UserBackupCode).filter_by(user_id=user.user_id).delete()
             session.commit()
-            return True
+
+        _credentials_cache.invalidate_user(username)
+        return True
 
     def enable_otp(
         self,
@@ -772,6 +792,11 @@ class UserManager:
         :raises: :class:`platypush.exceptions.user.InvalidTokenException` in
             case of invalid token.
         """
+        user = _credentials_cache.get(token)
+        if user:
+            return user
+
+        generation = _credentials_cache.generation(token.split(':')[0])
         with self._get_session() as session:
             user = self._user_by_token(session, token)
             if not user:
@@ -799,6 +824,19 @@ class UserManager:
             if not user_token:
                 raise InvalidTokenException()
 
+            _credentials_cache.put(
+                token,
+                user,
+                generation,
+                expires_at=(
+                    user_token.expires_at.replace(
+                        tzinfo=datetime.timezone.utc
+                    ).timestamp()
+                    if user_token.expires_at
+                    else None
+                ),
+            )
+
             return user
 
     def delete_api_token(
@@ -853,6 +891,7 @@ class UserManager:
                 raise AssertionError('No such token')
             session.delete(user_token)
             session.commit()
+            _credentials_cache.invalidate_user(str(user.username))
 
     def get_api_tokens(self, username: str) -> List[UserToken]:
         """
@@ -0,0 +1,221 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    """
+    A verified credential.
+    """
+
+    username: str
+    user_id: int
+    created_at: object
+    expires_at: float
+
+
+class CredentialsCache:
+    """
+    A short-lived, bounded LRU cache of already-verified credentials (API and
+    JWT tokens), so that the expensive password/token hashing doesn't need to
+    run on every authenticated request.
+
+    Entries are keyed by the SHA-256 digest of the credential, never by the
+    credential itself.
+
+    Invalidations (password changes, token/user deletions, OTP changes) are
+    applied locally and broadcast over Redis to the other processes (e.g. the
+    HTTP workers). If the invalidation channel can't be subscribed, the cache
+    is bypassed in the current process.
+
+    Each invalidation also bumps a per-user generation counter. Callers
+    capture it through :meth:`generation` before looking up the credentials,
+    and :meth:`put` discards the entries verified against a generation that
+    has been invalidated in the meantime.
+    """
+
+    channel = '_platypush/user/credentials/invalidate'
+
+    def __init__(self, ttl: float = 60, max_size: int = 1024):
+        """
+        :param ttl: Time-to-live of the cached entries, in seconds.
+        :param max_size: Maximum number of cached entries.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, _CacheEntry]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._listener_pid: Optional[int] = None
+        self._listener_ready = threading.Event()
+        self._enabled = True
+
+    @staticmethod
+    def _key(credential: str) -> str:
+        return hashlib.sha256(credential.encode()).hexdigest()
+
+    def _ensure_listener(self) -> bool:
+        # The listener must run in each process - the cache may have been
+        # inherited by a forked HTTP worker.
+        pid = os.getpid()
+        if self._listener_pid != pid:
+            with self._lock:
+                if self._listener_pid != pid:
+                    self._entries.clear()
+                    self._listener_ready.clear()
+                    self._enabled = True
+                    self._listener_pid = pid
+                    threading.Thread(
+                        target=self._listener,
+                        name='platypush:user:credentials-cache',
+                        daemon=True,
+                    ).start()
+
+        self._listener_ready.wait(timeout=1)
+        return self._enabled and self._listener_ready.is_set()
+
+    def _listener(self):
+        from platypush.utils import get_redis
+
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+        except Exception as e:
+            logger.warning(
+                'Could not subscribe to the credentials invalidation channel, '
+                'the credentials cache will be disabled: %s',
+                e,
+            )
+            self._enabled = False
+            return
+        finally:
+            self._listener_ready.set()
+
+        try:
+            for msg in pubsub.listen():
+                username = msg.get('data')
+                if isinstance(username, bytes):
+                    username = username.decode()
+                if username:
+                    self._invalidate_local(username)
+        except Exception as e:
+            logger.warning('Credentials invalidation listener stopped: %s', e)
+        finally:
+            # Without invalidations the cached entries can't be trusted anymore
+            with self._lock:
+                self._enabled = False
+                self._entries.clear()
+
+    def get(self, credential: str):
+        """
+        :return: A transient :class:`platypush.user.User` object if the
+            credential has been verified recently, None otherwise.
+        """
+        from ._model import User
+
+        if not self._ensure_listener():
+            return None
+
+        key = self._key(credential)
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+
+            if entry.expires_at < time.time():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        return User(
+            user_id=entry.user_id,
+            username=entry.username,
+            created_at=entry.created_at,
+        )
+
+    def generation(self, username: str) -> int:
+        """
+        :return: The current invalidation generation of a user. It should be
+            captured before the credentials are verified and passed to
+            :meth:`put`.
+        """
+        with self._lock:
+            return self._generations.get(username, 0)
+
+    def put(
+        self,
+        credential: str,
+        user,
+        generation: int,
+        expires_at: Optional[float] = None,
+    ):
+        """
+        Cache a verified credential.
+
+        :param credential: The verified token.
+        :param user: The :class:`platypush.user.User` associated to the token.
+        :param generation: The :meth:`generation` of the user captured before
+            the credential was verified. The credential isn't cached if the
+            user has been invalidated since then.
+        :param expires_at: Expiration timestamp of the credential, if any.
+        """
+        if not self._ensure_listener():
+            return
+
+        ttl_expiry = time.time() + self.ttl
+        entry = _CacheEntry(
+            username=str(user.username),
+            user_id=int(user.user_id),
+            created_at=user.created_at,
+            expires_at=min(ttl_expiry, expires_at) if expires_at else ttl_expiry,
+        )
+
+        with self._lock:
+            if self._generations.get(entry.username, 0) != generation:
+                return
+
+            self._entries[self._key(credential)] = entry
+            self._entries.move_to_end(self._key(credential))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _invalidate_local(self, username: str):
+        with self._lock:
+            self._generations[username] = self._generations.get(username, 0) + 1
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry.username == username
+            ]:
+                del self._entries[key]
+
+    def invalidate_user(self, username: str):
+        """
+        Invalidate all the cached credentials of a user, in this and in the
+        other processes.
+        """
+        from platypush.utils import get_redis
+
+        self._invalidate_local(username)
+
+        try:
+            get_redis().publish(self.channel, username)
+        except Exception as e:
+            logger.warning(
+                'Could not broadcast the credentials invalidation for %s: %s',
+                username,
+                e,
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
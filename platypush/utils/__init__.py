@@ -1,4 +1,5 @@
 import ast
+import asyncio
 import contextlib
 import datetime
 import functools
@@ -21,9 +22,11 @@ from multiprocessing import Lock as PLock
 from tempfile import gettempdir
 from threading import Event, Lock as TLock
 from typing import Generator, Optional, Tuple, Type, Union
+from weakref import WeakKeyDictionary
 
 from dateutil import parser, tz
 from redis import ConnectionPool, Redis
+from redis.asyncio import Redis as AsyncRedis
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
 from rsa.key import PublicKey, PrivateKey, newkeys
@@ -32,6 +35,9 @@ logger = logging.getLogger('utils')
 Lock = Union[PLock, TLock]  # type: ignore
 
 redis_pools: dict[Tuple[str, int], ConnectionPool] = {}
+async_redis_clients: 'WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRedis]' = (
+    WeakKeyDictionary()
+)
 key_locks: dict[str, Lock] = defaultdict(PLock)
 
 
@@ -122,6 +128,11 @@ def get_plugin_name_by_class(plugin) -> str:
     if isinstance(plugin, Plugin):
         plugin = plugin.__class__
 
+    return _get_plugin_name_by_class(plugin)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_plugin_name_by_class(plugin: type) -> str:
     class_name = plugin.__name__
     class_tokens = [
         token.lower()
@@ -511,7 +522,7 @@ def run(action, *args, **kwargs):
 
         return procedure(*args, **kwargs)
 
-    (module_name, method_name) = get_module_and_method_from_action(action)
+    module_name, method_name = get_module_and_method_from_action(action)
     plugin = get_plugin(module_name)
     method = getattr(plugin, method_name)
     response = method(*args, **kwargs)
@@ -772,22 +783,49 @@ def is_root() -> bool:
     return os.getuid() == 0
 
 
-def get_message_response(msg):
+def get_async_redis() -> AsyncRedis:
+    """
+    Get an asyncio Redis client bound to the running event loop, on the basis
+    of the Redis configuration (see :func:`get_redis`).
+
+    Blocking commands (e.g. ``BLPOP``) are expected on these clients, so they
+    have no socket read timeout.
+    """
+    loop = asyncio.get_running_loop()
+    client = async_redis_clients.get(loop)
+    if client is None:
+        kwargs = {**get_redis_conf()}
+        kwargs['socket_timeout'] = None
+        kwargs.setdefault('socket_connect_timeout', 5)
+        kwargs.setdefault('health_check_interval', 15)
+        client = async_redis_clients[loop] = AsyncRedis(**kwargs)
+
+    return client
+
+
+def _parse_message_response(response):
+    from platypush.message import Message
+
+    if response and len(response) > 1:
+        return Message.build(response[1])
+    return None
+
+
+def get_message_response(msg, timeout: float = 60):
     """
     Get the response to the given message.
 
     :param msg: The message to get the response for.
+    :param timeout: How long to wait for the response, in seconds.
     :return: The response to the given message.
     """
-    from platypush.message import Message
-
     redis = get_redis()
     redis_queue = get_redis_queue_name_by_message(msg)
     if not redis_queue:
         return None
 
     try:
-        response = redis.blpop(redis_queue, timeout=60)
+        response = redis.blpop(redis_queue, timeout=max(timeout, 0.01))
     except (RedisConnectionError, RedisTimeoutError) as e:
         logger.warning(
             'Redis connection error while waiting for response to %s: %s',
@@ -796,12 +834,34 @@ def get_message_response(msg):
         )
         return None
 
-    if response and len(response) > 1:
-        response = Message.build(response[1])
-    else:
-        response = None
+    return _parse_message_response(response)
+
+
+async def get_message_response_async(msg, timeout: float = 60):
+    """
+    Asyncio version of :func:`get_message_response`.
+
+    :param msg: The message to get the response for.
+    :param timeout: How long to wait for the response, in seconds.
+    :return: The response to the given message.
+    """
+    redis_queue = get_redis_queue_name_by_message(msg)
+    if not redis_queue:
+        return None
+
+    try:
+        response = await get_async_redis().blpop(
+            [redis_queue], timeout=max(timeout, 0.01)
+        )
+    except (RedisConnectionError, RedisTimeoutError) as e:
+        logger.warning(
+            'Redis connection error while waiting for response to %s: %s',
+            msg.id if hasattr(msg, 'id') else msg,
+            e,
+        )
+        return None
 
-    return response
+    return _parse_message_response(response)
 
 
 def import_file(path: str, name: Optional[str] = None):
@@ -0,0 +1,291 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from threading import RLock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+)
+""" Upper bounds of the latency histogram buckets, in seconds. """
+
+
+class Histogram:
+    """
+    Histogram of observed values over a fixed set of buckets.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # Non-cumulative counts, the last one is the +Inf bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def dump(self) -> dict:
+        """
+        :return: The histogram as a dictionary. The buckets are mapped by
+            their upper bound, and their counts are cumulative.
+        """
+        buckets: Dict[str, int] = {}
+        total = 0
+        for le, count in zip((*map(str, self.buckets), '+Inf'), self.counts):
+            total += count
+            buckets[le] = total
+
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'avg': self.sum / self.count if self.count else None,
+            'buckets': buckets,
+        }
+
+
+class _Stats:
+    """
+    Execution statistics of an action, event hook or cronjob.
+    """
+
+    __slots__ = ('calls', 'errors', 'in_flight', 'latency')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency = Histogram()
+
+    def dump(self) -> dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'error_rate': self.errors / self.calls if self.calls else 0,
+            'in_flight': self.in_flight,
+            'latency': self.latency.dump(),
+        }
+
+
+class Metrics:
+    """
+    Collects the execution metrics of the actions, event hooks and cronjobs
+    (calls, errors, in-flight executions and latency histograms), and of the
+    messages processed by the bus.
+    """
+
+    kinds = ('action', 'hook', 'cronjob')
+    """ Types of the instrumented executions. """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._stats: Dict[str, Dict[str, _Stats]] = {
+            kind: defaultdict(_Stats) for kind in self.kinds
+        }
+        self._bus_messages: Dict[str, int] = defaultdict(int)
+        self._bus_lag = Histogram()
+        self._lock = RLock()
+
+    def start(self, kind: str, name: str) -> float:
+        """
+        Record the start of an execution.
+
+        :param kind: Type of execution (``action``, ``hook`` or ``cronjob``).
+        :param name: Name of the action, hook or cronjob.
+        :return: The start timestamp, to be passed to :meth:`.stop`.
+        """
+        with self._lock:
+            self._stats[kind][name].in_flight += 1
+        return time.perf_counter()
+
+    def stop(self, kind: str, name: str, started_at: float, error: bool = False):
+        """
+        Record the end of an execution.
+
+        :param kind: Type of execution (``action``, ``hook`` or ``cronjob``).
+        :param name: Name of the action, hook or cronjob.
+        :param started_at: Timestamp returned by :meth:`.start`.
+        :param error: Whether the execution failed.
+        """
+        elapsed = time.perf_counter() - started_at
+        with self._lock:
+            stats = self._stats[kind][name]
+            stats.in_flight -= 1
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency.observe(elapsed)
+
+    def observe_message(self, msg_type: str, timestamp: Optional[float] = None):
+        """
+        Record a message processed by the bus.
+
+        :param msg_type: Type of message (``request``, ``response`` or
+            ``event``).
+        :param timestamp: Creation timestamp of the message, used to measure
+            how long it waited on the bus.
+        """
+        with self._lock:
+            self._bus_messages[msg_type] += 1
+            if timestamp:
+                self._bus_lag.observe(max(0.0, time.time() - timestamp))
+
+    def reset(self):
+        """
+        Reset the metrics. The in-flight counters are preserved.
+        """
+        with self._lock:
+            for kind, stats in self._stats.items():
+                self._stats[kind] = defaultdict(_Stats)
+                for name, st in stats.items():
+                    if st.in_flight:
+                        self._stats[kind][name].in_flight = st.in_flight
+
+            self._bus_messages.clear()
+            self._bus_lag = Histogram()
+            self.started_at = time.time()
+
+    def dump(self) -> dict:
+        """
+        :return: A snapshot of the metrics.
+        """
+        with self._lock:
+            return {
+                'started_at': self.started_at,
+                **{
+                    kind: {name: st.dump() for name, st in sorted(stats.items())}
+                    for kind, stats in self._stats.items()
+                },
+                'bus': {
+                    'messages': dict(self._bus_messages),
+                    'lag': self._bus_lag.dump(),
+                },
+            }
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name: str, label: str, histogram: dict) -> List[str]:
+    """
+    :param label: Label of the histogram (e.g. ``name="foo"``), if any.
+    """
+    labels = f'{{{label}}}' if label else ''
+    prefix = f'{label},' if label else ''
+    return [
+        *(
+            f'{name}_bucket{{{prefix}le="{le}"}} {count}'
+            for le, count in histogram['buckets'].items()
+        ),
+        f'{name}_sum{labels} {histogram["sum"]}',
+        f'{name}_count{labels} {histogram["count"]}',
+    ]
+
+
+def to_prometheus(metrics: dict, prefix: str = 'platypush') -> str:
+    """
+    Render a snapshot of the metrics returned by :meth:`Metrics.dump` in the
+    Prometheus text exposition format.
+    """
+    lines: List[str] = []
+
+    def header(name: str, metric_type: str, description: str):
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {metric_type}')
+
+    for kind in Metrics.kinds:
+        stats = metrics.get(kind, {})
+        base = f'{prefix}_{kind}'
+        for suffix, metric_type, description, attr in (
+            ('calls_total', 'counter', f'Number of {kind} executions.', 'calls'),
+            (
+                'errors_total',
+                'counter',
+                f'Number of failed {kind} executions.',
+                'errors',
+            ),
+            (
+                'in_flight',
+                'gauge',
+                f'Number of running {kind} executions.',
+                'in_flight',
+            ),
+        ):
+            header(f'{base}_{suffix}', metric_type, description)
+            lines.extend(
+                f'{base}_{suffix}{{name="{_escape(name)}"}} {st[attr]}'
+                for name, st in stats.items()
+            )
+
+        header(
+            f'{base}_duration_seconds',
+            'histogram',
+            f'Duration of the {kind} executions, in seconds.',
+        )
+        for name, st in stats.items():
+            lines.extend(
+                _histogram_lines(
+                    f'{base}_duration_seconds', f'name="{_escape(name)}"', st['latency']
+                )
+            )
+
+    bus = metrics.get('bus', {})
+    header(
+        f'{prefix}_bus_messages_total',
+        'counter',
+        'Number of messages processed by the bus.',
+    )
+    lines.extend(
+        f'{prefix}_bus_messages_total{{type="{_escape(msg_type)}"}} {count}'
+        for msg_type, count in sorted(bus.get('messages', {}).items())
+    )
+
+    if bus.get('lag'):
+        header(
+            f'{prefix}_bus_lag_seconds',
+            'histogram',
+            'Time spent by the messages on the bus before being processed, in seconds.',
+        )
+        lines.extend(_histogram_lines(f'{prefix}_bus_lag_seconds', '', bus['lag']))
+
+    return '\n'.join(lines) + '\n'
+
+
+_metrics: Optional[Metrics] = None
+
+
+def enable_metrics() -> Metrics:
+    """
+    Enable the collection of metrics in the current process.
+    """
+    global _metrics
+
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def get_metrics() -> Optional[Metrics]:
+    """
+    :return: The metrics collector, if metrics are enabled.
+    """
+    return _metrics
+
+
+# vim:sw=4:ts=4:et:
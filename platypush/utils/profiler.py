@@ -0,0 +1,185 @@
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+from platypush.config import Config
+
+
+class SamplingProfiler(threading.Thread):
+    """
+    Sampling profiler for all the threads of the application.
+
+    Every ``interval`` seconds it takes a snapshot of the call stacks of all
+    the running threads, and it counts how many times each stack has been
+    sampled. The result can be dumped in the "folded stacks" format (one
+    ``thread;frame;frame;... count`` line per stack), which can be rendered
+    as a flame graph by tools like ``flamegraph.pl``, `speedscope
+    <https://speedscope.app>`_ or ``inferno``.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        duration: Optional[float] = None,
+        output_file: Optional[str] = None,
+    ):
+        """
+        :param interval: Sampling interval, in seconds.
+        :param duration: If set, stop the profiler and write the samples to
+            ``output_file`` after this many seconds.
+        :param output_file: Where the samples will be written when the
+            profiler is stopped (default: ``<workdir>/profiles/<timestamp>.folded``).
+        """
+        super().__init__(name='platypush:profiler', daemon=True)
+        self.interval = interval
+        self.duration = duration
+        self.output_file = os.path.abspath(
+            os.path.expanduser(
+                output_file
+                or os.path.join(
+                    Config.get_workdir(),
+                    'profiles',
+                    time.strftime('%Y%m%d-%H%M%S') + '.folded',
+                )
+            )
+        )
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stacks: Dict[str, int] = defaultdict(int)
+        self._stop_event = threading.Event()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _thread_name(thread: Optional[threading.Thread], thread_id: int) -> str:
+        # Strip the numeric suffixes of the thread names, so threads spawned
+        # by the same code are grouped together
+        name = thread.name if thread else f'thread-{thread_id}'
+        return re.sub(r'[-_:]?\d+$', '', name.replace(';', ':')) or name
+
+    def _sample(self):
+        threads = {t.ident: t for t in threading.enumerate()}
+        # pylint: disable=protected-access
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == self.ident:
+                continue
+
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f'{frame.f_globals.get("__name__", "?")}.'
+                    + getattr(code, 'co_qualname', code.co_name)
+                )
+                frame = frame.f_back
+
+            stack.append(self._thread_name(threads.get(thread_id), thread_id))
+            with self._lock:
+                self._stacks[';'.join(reversed(stack))] += 1
+
+        self.samples += 1
+
+    def run(self):
+        self.started_at = time.time()
+        deadline = self.started_at + self.duration if self.duration else None
+
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+            if deadline and time.time() >= deadline:
+                break
+
+        self.stopped_at = time.time()
+        self.dump()
+
+    def stop(self):
+        """
+        Stop the profiler and write the samples to the output file.
+        """
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+    def folded(self) -> str:
+        """
+        :return: The samples in the folded stacks format.
+        """
+        with self._lock:
+            return ''.join(
+                f'{stack} {count}\n' for stack, count in sorted(self._stacks.items())
+            )
+
+    def dump(self) -> str:
+        """
+        Write the samples to the output file.
+
+        :return: The path of the output file.
+        """
+        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
+        with open(self.output_file, 'w') as f:
+            f.write(self.folded())
+        return self.output_file
+
+    def info(self) -> dict:
+        """
+        :return: The status of the profiler.
+        """
+        return {
+            'running': self.is_alive(),
+            'interval': self.interval,
+            'samples': self.samples,
+            'started_at': self.started_at,
+            'stopped_at': self.stopped_at,
+            'output_file': self.output_file,
+        }
+
+
+_profiler: Optional[SamplingProfiler] = None
+_profiler_lock = threading.RLock()
+
+
+def start_profiler(
+    interval: float = 0.01,
+    duration: Optional[float] = None,
+    output_file: Optional[str] = None,
+) -> SamplingProfiler:
+    """
+    Start the sampling profiler. See :class:`SamplingProfiler`.
+    """
+    global _profiler
+
+    with _profiler_lock:
+        if _profiler and _profiler.is_alive():
+            raise AssertionError('The profiler is already running')
+
+        _profiler = SamplingProfiler(
+            interval=interval, duration=duration, output_file=output_file
+        )
+        _profiler.start()
+        return _profiler
+
+
+def stop_profiler() -> SamplingProfiler:
+    """
+    Stop the running sampling profiler and write its samples to its output
+    file.
+    """
+    with _profiler_lock:
+        if not (_profiler and _profiler.is_alive()):
+            raise AssertionError('The profiler is not running')
+
+        _profiler.stop()
+        return _profiler
+
+
+def get_profiler() -> Optional[SamplingProfiler]:
+    """
+    :return: The last started sampling profiler, if any.
+    """
+    return _profiler
+
+
+# vim:sw=4:ts=4:et:
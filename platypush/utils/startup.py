@@ -0,0 +1,137 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from threading import RLock
+from typing import ContextManager, Dict, List, Optional, Tuple
+
+
+class StartupProfiler:
+    """
+    Collects the time spent in each phase of the application startup, and
+    the time spent importing and initializing each plugin and backend.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        # List of (phase, depth, seconds), in order of completion
+        self.phases: List[Tuple[str, int, float]] = []
+        # Map: (integration type, name) -> step -> seconds
+        self.integrations: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(dict)
+        self._depth = 0
+        self._lock = RLock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Measure a startup phase. Phases can be nested.
+        """
+        with self._lock:
+            depth = self._depth
+            self._depth += 1
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._depth -= 1
+                self.phases.append((name, depth, elapsed))
+
+    @contextmanager
+    def step(self, integration_type: str, name: str, step: str):
+        """
+        Measure a step (e.g. ``import`` or ``init``) of the initialization of
+        an integration.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                steps = self.integrations[(integration_type, name)]
+                steps[step] = steps.get(step, 0) + elapsed
+
+    def report(self) -> str:
+        """
+        :return: A human-readable report of the startup times.
+        """
+        total = time.perf_counter() - self.started_at
+        lines = [f'Startup completed in {total * 1000:.1f} ms', '', 'Phases:']
+
+        # Phases are recorded when they end: list the nested phases after
+        # their parents
+        stack: List[List[Tuple[str, int, float]]] = [[]]
+        for name, depth, elapsed in self.phases:
+            while len(stack) <= depth + 1:
+                stack.append([])
+            children = stack[depth + 1]
+            stack[depth + 1] = []
+            stack[depth].append((name, depth, elapsed))
+            stack[depth].extend(children)
+
+        for name, depth, elapsed in stack[0]:
+            lines.append(
+                f'  {"  " * depth}{name:<{40 - 2 * depth}} {elapsed * 1000:>10.1f} ms'
+            )
+
+        if self.integrations:
+            lines += [
+                '',
+                'Integrations:',
+                f'  {"name":<40} {"import":>10} {"init":>10} {"total":>10}',
+            ]
+
+            for (integration_type, name), steps in sorted(
+                self.integrations.items(), key=lambda item: -sum(item[1].values())
+            ):
+                lines.append(
+                    f'  {integration_type + "." + name:<40}'
+                    + ''.join(
+                        f' {steps.get(step, 0) * 1000:>7.1f} ms'
+                        for step in ('import', 'init')
+                    )
+                    + f' {sum(steps.values()) * 1000:>7.1f} ms'
+                )
+
+        return '\n'.join(lines)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def enable_startup_profiler() -> StartupProfiler:
+    """
+    Enable the startup profiler for the current process.
+    """
+    global _profiler
+
+    _profiler = StartupProfiler()
+    return _profiler
+
+
+def get_startup_profiler() -> Optional[StartupProfiler]:
+    """
+    :return: The startup profiler, if it's enabled.
+    """
+    return _profiler
+
+
+def startup_phase(name: str) -> ContextManager:
+    """
+    Measure a startup phase if the startup profiler is enabled, otherwise do
+    nothing.
+    """
+    return _profiler.phase(name) if _profiler else nullcontext()
+
+
+def startup_step(integration_type: str, name: str, step: str) -> ContextManager:
+    """
+    Measure a step of the initialization of an integration if the startup
+    profiler is enabled, otherwise do nothing.
+    """
+    return _profiler.step(integration_type, name, step) if _profiler else nullcontext()
+
+
+# vim:sw=4:ts=4:et:
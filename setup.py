@@ -1,10 +1,12 @@
 #!/usr/bin/env python
 
+import importlib.util
 import json
 import os
 import re
 
 from setuptools import setup, find_namespace_packages
+from setuptools.command.build_py import build_py
 
 
 def path(fname=''):
@@ -57,8 +59,31 @@ def parse_manifests():
     return ret
 
 
+class BuildPy(build_py):
+    """
+    Also generate the index of the integration manifests in the build folder,
+    so the application doesn't have to scan the whole tree on startup.
+    """
+
+    def run(self):
+        super().run()
+        if self.dry_run:
+            return
+
+        spec = importlib.util.spec_from_file_location(
+            'manifests', path(os.path.join('platypush', 'config', '_manifests.py'))
+        )
+        manifests = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(manifests)
+        manifests.build_manifests_index(
+            os.path.join(self.build_lib, 'platypush'),
+            version=self.distribution.get_version(),
+        )
+
+
 setup(
-    packages=find_namespace_packages(exclude=['tests']),
+    cmdclass={'build_py': BuildPy},
+    packages=find_namespace_packages(exclude=['tests', 'benchmarks']),
     include_package_data=True,
     exclude_package_data={
         'platypush': [
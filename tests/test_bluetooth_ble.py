@@ -0,0 +1,200 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('bleak')
+
+try:
+    from platypush.plugins.bluetooth import BluetoothPlugin
+except ImportError as e:
+    pytest.skip(f'The Bluetooth plugin is not available: {e}', allow_module_level=True)
+
+from bleak.backends.device import BLEDevice  # noqa: E402
+from bleak.backends.scanner import AdvertisementData  # noqa: E402
+
+from platypush.entities.bluetooth import BluetoothDevice  # noqa: E402
+from platypush.plugins.bluetooth._ble import _filter  # noqa: E402
+from platypush.plugins.bluetooth._ble._event_handler import _has_changed  # noqa: E402
+from platypush.plugins.bluetooth._ble._filter import AdvertisementFilter  # noqa: E402
+
+
+def _device(address='AA:BB:CC:DD:EE:01', name='Sensor', connected=False):
+    return BLEDevice(address, name, {'props': {'Connected': connected}})
+
+
+def _adv(rssi=-60, **kwargs):
+    args = {
+        'local_name': 'Sensor',
+        'manufacturer_data': {0x004C: b'\x02\x15'},
+        'service_data': {'0000181a-0000-1000-8000-00805f9b34fb': b'\x01\x02'},
+        'service_uuids': ['0000181a-0000-1000-8000-00805f9b34fb'],
+        'tx_power': -4,
+        'rssi': rssi,
+        'platform_data': (),
+        **kwargs,
+    }
+    return AdvertisementData(**args)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Controls the monotonic clock used by the advertisement filter.
+    """
+    now = {'value': 1000.0}
+    monkeypatch.setattr(
+        _filter, 'time', SimpleNamespace(monotonic=lambda: now['value'])
+    )
+    return now
+
+
+def test_filter_drops_unchanged_advertisements():
+    adv_filter = AdvertisementFilter()
+    device = _device()
+
+    # New devices are always let through
+    assert adv_filter.check(device, _adv()) is None
+    adv_filter.processed(device, _adv())
+
+    state = adv_filter.check(device, _adv())
+    assert state is not None
+    assert state.rssi == -60
+    assert not state.ignored
+
+
+@pytest.mark.parametrize(
+    'device,data',
+    [
+        (_device(name='Renamed'), _adv()),
+        (_device(connected=True), _adv()),
+        (_device(), _adv(local_name='Renamed')),
+        (_device(), _adv(tx_power=0)),
+        (_device(), _adv(manufacturer_data={0x004C: b'\x02\x16'})),
+        (
+            _device(),
+            _adv(service_data={'0000181a-0000-1000-8000-00805f9b34fb': b'\x01\x03'}),
+        ),
+        (_device(), _adv(service_uuids=[])),
+    ],
+)
+def test_filter_lets_changed_advertisements_through(device, data):
+    adv_filter = AdvertisementFilter()
+    adv_filter.processed(_device(), _adv())
+    assert adv_filter.check(device, data) is None
+
+
+def test_filter_rssi_updates(clock):
+    adv_filter = AdvertisementFilter(rssi_tolerance=5, rssi_update_interval=30)
+    device = _device()
+    adv_filter.processed(device, _adv(rssi=-60))
+
+    # RSSI changes are let through only if they reach the tolerance...
+    clock['value'] += 30
+    assert adv_filter.check(device, _adv(rssi=-64)) is not None
+    assert adv_filter.check(device, _adv(rssi=-65)) is None
+    assert adv_filter.check(device, _adv(rssi=-55)) is None
+
+    # ...and if the last update is older than the update interval
+    adv_filter.processed(device, _adv(rssi=-65))
+    clock['value'] += 29
+    assert adv_filter.check(device, _adv(rssi=-75)) is not None
+    clock['value'] += 1
+    assert adv_filter.check(device, _adv(rssi=-75)) is None
+
+
+def test_filter_ignored_devices(clock):
+    adv_filter = AdvertisementFilter(rssi_update_interval=0)
+    device = _device()
+    adv_filter.processed(device, _adv(rssi=-60), ignored=True)
+
+    # Ignored devices are dropped even if their RSSI changes...
+    state = adv_filter.check(device, _adv(rssi=-80))
+    assert state is not None and state.ignored
+    # ...but not if their payload changes
+    assert adv_filter.check(device, _adv(tx_power=0)) is None
+
+
+def test_filter_eviction():
+    adv_filter = AdvertisementFilter(max_devices=2)
+    devices = [_device(f'AA:BB:CC:DD:EE:0{i}') for i in range(3)]
+    adv_filter.processed(devices[0], _adv())
+    adv_filter.processed(devices[1], _adv())
+
+    # Checked devices are moved to the end of the LRU
+    assert adv_filter.check(devices[0], _adv()) is not None
+    adv_filter.processed(devices[2], _adv())
+
+    assert adv_filter.check(devices[1], _adv()) is None
+    assert adv_filter.check(devices[0], _adv()) is not None
+    assert adv_filter.check(devices[2], _adv()) is not None
+
+    adv_filter.forget(devices[2].address)
+    assert adv_filter.check(devices[2], _adv()) is None
+
+
+def _entity(address='AA:BB:CC:DD:EE:01', **kwargs):
+    return BluetoothDevice(id=address, address=address, **kwargs)
+
+
+def test_has_changed_tolerance():
+    old = _entity(rssi=-60, connected=False)
+
+    assert not _has_changed(None, _entity(rssi=-60), 'rssi', tolerance=5)
+    assert not _has_changed(old, _entity(rssi=-64), 'rssi', tolerance=5)
+    assert not _has_changed(old, _entity(rssi=-56), 'rssi', tolerance=5)
+    assert _has_changed(old, _entity(rssi=-65), 'rssi', tolerance=5)
+    assert _has_changed(old, _entity(rssi=-55), 'rssi', tolerance=5)
+    # Without a tolerance, any change counts
+    assert _has_changed(old, _entity(rssi=-61), 'rssi')
+    assert _has_changed(old, _entity(rssi=None), 'rssi', tolerance=5)
+    assert _has_changed(old, _entity(connected=True), 'connected')
+
+
+@pytest.fixture
+def plugin(monkeypatch):
+    plugin = BluetoothPlugin()
+    monkeypatch.setattr(plugin, '_publish_batch_interval', 0.2)
+    return plugin
+
+
+def test_device_updates_are_batched(plugin):
+    plugin._device_queue.put(_entity('AA:BB:CC:DD:EE:01', rssi=-60))
+    plugin._device_queue.put(_entity('AA:BB:CC:DD:EE:02', rssi=-70))
+    # Only the latest update of each device is returned
+    plugin._device_queue.put(_entity('AA:BB:CC:DD:EE:01', rssi=-50))
+
+    # Updates received within the batch interval are included
+    timer = threading.Timer(
+        0.1, lambda: plugin._device_queue.put(_entity('AA:BB:CC:DD:EE:03'))
+    )
+    timer.start()
+    t_start = time.time()
+    devices = plugin._get_device_updates()
+    timer.join()
+
+    assert [(d.address, d.rssi) for d in devices] == [
+        ('AA:BB:CC:DD:EE:01', -50),
+        ('AA:BB:CC:DD:EE:02', -70),
+        ('AA:BB:CC:DD:EE:03', None),
+    ]
+    assert time.time() - t_start < 1
+
+
+def test_device_updates_batch_limits(plugin, monkeypatch):
+    monkeypatch.setattr(plugin, '_max_publish_batch_size', 2)
+    for i in range(3):
+        plugin._device_queue.put(_entity(f'AA:BB:CC:DD:EE:0{i}'))
+
+    assert len(plugin._get_device_updates()) == 2
+    assert len(plugin._get_device_updates()) == 1
+    # Updates received after the batch interval go in the next batch
+    timer = threading.Timer(
+        0.5, lambda: plugin._device_queue.put(_entity('AA:BB:CC:DD:EE:04'))
+    )
+    plugin._device_queue.put(_entity('AA:BB:CC:DD:EE:05'))
+    timer.start()
+    assert [d.address for d in plugin._get_device_updates()] == ['AA:BB:CC:DD:EE:05']
+    assert [d.address for d in plugin._get_device_updates()] == ['AA:BB:CC:DD:EE:04']
+    timer.join()
@@ -0,0 +1,96 @@
+import datetime
+import time
+
+from platypush.plugins.calendar.ical import CalendarIcalPlugin
+from platypush.plugins.calendar.ical._index import (
+    EventIntervalIndex,
+    ParsedEvent,
+    expand_occurrences,
+)
+
+_utc = datetime.timezone.utc
+
+
+def _event(uid, start, end, **kwargs):
+    return ParsedEvent(
+        uid=uid,
+        data={
+            'id': uid,
+            'summary': uid,
+            'status': 'confirmed',
+            'start': {'dateTime': start.isoformat(), 'timeZone': 'UTC'},
+            'end': {'dateTime': end.isoformat(), 'timeZone': 'UTC'},
+        },
+        start=start,
+        end=end,
+        **kwargs,
+    )
+
+
+def test_interval_index_overlapping():
+    index = EventIntervalIndex(
+        [(0, 100, 'long'), (10, 20, 'a'), (30, 40, 'b'), (50, 60, 'c')]
+    )
+
+    assert list(index.overlapping(35)) == ['long', 'b', 'c']
+    assert list(index.overlapping(15, 35)) == ['long', 'a', 'b']
+    assert not list(index.overlapping(101))
+
+
+def test_expand_weekly_event_with_exdate():
+    start = datetime.datetime(2024, 1, 1, 9, tzinfo=_utc)
+    event = _event(
+        'weekly',
+        start,
+        start + datetime.timedelta(hours=1),
+        rrule='FREQ=WEEKLY;COUNT=10',
+        exdates=[datetime.datetime(2024, 1, 15, 9, tzinfo=_utc)],
+    )
+
+    occurrences = expand_occurrences(
+        event,
+        datetime.datetime(2024, 1, 8, 9, 30, tzinfo=_utc),
+        datetime.datetime(2024, 2, 1, tzinfo=_utc),
+    )
+
+    assert [s.day for s, _ in occurrences] == [8, 22, 29]
+
+
+def test_upcoming_events_expand_recurrences():
+    now = datetime.datetime.now(_utc).replace(microsecond=0)
+    start = now - datetime.timedelta(days=7, minutes=30)
+    plugin = CalendarIcalPlugin(url='http://localhost/calendar.ics')
+    plugin._events = [
+        _event(
+            'daily',
+            start,
+            start + datetime.timedelta(hours=1),
+            rrule='FREQ=DAILY',
+        ),
+        # Moved occurrence of the daily event
+        _event(
+            'daily',
+            start + datetime.timedelta(days=8, hours=2),
+            start + datetime.timedelta(days=8, hours=3),
+            recurrence_id=start + datetime.timedelta(days=8),
+        ),
+        _event(
+            'past',
+            now - datetime.timedelta(days=2),
+            now - datetime.timedelta(days=1),
+        ),
+    ]
+    plugin._last_refresh = time.time()
+
+    events = plugin.get_upcoming_events(max_results=3).output
+    assert len(events) == 3
+    # The occurrence started 30 minutes ago is still in progress
+    assert events[0]['recurringEventId'] == 'daily'
+    assert datetime.datetime.fromisoformat(events[0]['start']['dateTime']) == (
+        start + datetime.timedelta(days=7)
+    )
+    # The next occurrence has been moved
+    assert events[1]['id'] == 'daily'
+    assert datetime.datetime.fromisoformat(events[2]['start']['dateTime']) == (
+        start + datetime.timedelta(days=9)
+    )
@@ -0,0 +1,51 @@
+from platypush.plugins.camera.model.broadcaster import FrameBroadcaster
+
+
+def test_frames_are_shared_by_all_consumers():
+    """
+    All the consumers receive the same published frames.
+    """
+    broadcaster = FrameBroadcaster()
+    consumers = [broadcaster.subscribe(f'consumer-{i}') for i in range(3)]
+
+    broadcaster.publish(b'frame-1')
+    broadcaster.publish(b'frame-2')
+
+    for consumer in consumers:
+        assert consumer.get(timeout=1) == b'frame-1'
+        assert consumer.get(timeout=1) == b'frame-2'
+        assert consumer.get(timeout=0.01) is None
+
+
+def test_slow_consumers_drop_frames():
+    """
+    A consumer that falls behind the ring buffer skips the overwritten frames.
+    """
+    broadcaster = FrameBroadcaster(buffer_size=2)
+    consumer = broadcaster.subscribe()
+
+    for i in range(5):
+        broadcaster.publish(f'frame-{i}'.encode())
+
+    assert consumer.get(timeout=1) == b'frame-3'
+    assert consumer.get(timeout=1) == b'frame-4'
+    assert consumer.dropped_frames == 3
+
+
+def test_idle_callback_on_last_consumer():
+    """
+    The idle callback is invoked only when the last consumer leaves.
+    """
+    idle_calls = []
+    broadcaster = FrameBroadcaster(on_idle=idle_calls.append)
+    consumer_1 = broadcaster.subscribe()
+    consumer_2 = broadcaster.subscribe()
+
+    consumer_1.close()
+    assert not idle_calls
+
+    consumer_2.close()
+    assert idle_calls == [broadcaster]
+
+    broadcaster.close()
+    assert consumer_1.get(timeout=0.01) is None
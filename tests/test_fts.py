@@ -0,0 +1,85 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from platypush.common.fts import FtsIndex
+
+
+@pytest.fixture
+def session():
+    engine = create_engine('sqlite://')
+    db_session = sessionmaker(bind=engine)()
+    yield db_session
+    db_session.close()
+
+
+@pytest.fixture
+def index(session):
+    fts = FtsIndex('test_fts', columns=['title', 'content'], weights=[10, 1])
+    if not fts.is_available(session):
+        pytest.skip('SQLite FTS5 is not available')
+
+    fts.init(session)
+    return fts
+
+
+def test_fts_index_init(session, index):
+    """
+    The index should only be reported as created on its first initialization.
+    """
+    other = FtsIndex('test_fts', columns=['title', 'content'])
+    assert not other.init(session)
+
+
+def test_fts_search_ranking(session, index):
+    """
+    Matches on heavier columns should be ranked first.
+    """
+    title_match, content_match, no_match = uuid4(), uuid4(), uuid4()
+    index.index(
+        session,
+        [
+            (content_match, ('Groceries', 'milk, eggs and bread')),
+            (title_match, ('Bread recipe', 'flour, water, salt')),
+            (no_match, ('Todo', 'call the plumber')),
+        ],
+    )
+
+    results = [doc_id for doc_id, _ in index.search(session, ['bread'])]
+    assert results == [str(title_match), str(content_match)]
+
+
+def test_fts_search_prefix_and_phrase(session, index):
+    doc_id = uuid4()
+    index.index(session, [(doc_id, ('Bread recipe', 'flour, water, salt'))])
+
+    assert [d for d, _ in index.search(session, ['flo*'])] == [str(doc_id)]
+    assert [d for d, _ in index.search(session, ['sal'], prefix=True)] == [
+        str(doc_id)
+    ]
+    assert index.search(session, ['water flour']) == []
+    assert [d for d, _ in index.search(session, ['flour water'])] == [str(doc_id)]
+
+
+def test_fts_update_and_delete(session, index):
+    """
+    Re-indexing a document should replace it, and deleted documents should no
+    longer be returned.
+    """
+    doc_id = uuid4()
+    index.index(session, [(doc_id, ('Note', 'first version'))])
+    index.index(session, [(doc_id, ('Note', 'second version'))])
+
+    assert index.search(session, ['first']) == []
+    assert [d for d, _ in index.search(session, ['second'])] == [str(doc_id)]
+
+    index.delete(session, [doc_id])
+    assert index.search(session, ['second']) == []
+
+
+def test_fts_match_query_escaping():
+    assert FtsIndex.build_match_query(['foo"bar', 'baz*', '  ']) == (
+        '"foo""bar" AND "baz"*'
+    )
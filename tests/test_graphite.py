@@ -0,0 +1,142 @@
+import socket
+import threading
+import time
+
+from platypush.plugins.graphite._sender import GraphiteSender
+
+
+class _GraphiteServer(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen()
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        self.data = b''
+
+    def run(self):
+        while True:
+            conn, _ = self.sock.accept()
+            self.connections += 1
+            with conn:
+                while chunk := conn.recv(65536):
+                    self.data += chunk
+
+
+def test_sender_batches_metrics_over_a_persistent_connection():
+    """
+    Metrics are formatted in the plaintext protocol, and multiple flushes
+    reuse the same TCP connection.
+    """
+    server = _GraphiteServer()
+    server.start()
+    sender = GraphiteSender(
+        '127.0.0.1', port=server.port, prefix='home', flush_interval=0.05
+    )
+    sender.start()
+
+    try:
+        sender.send('temp', 21.5, timestamp=1700000000, tags={'room': 'living'})
+        time.sleep(0.2)
+        sender.send_lines(
+            [sender.format(f'm{i}', i, timestamp=1700000000) for i in range(100)]
+        )
+        time.sleep(0.2)
+    finally:
+        sender.stop(timeout=2)
+
+    lines = server.data.decode().splitlines()
+    assert lines[0] == 'home.temp;room=living 21.5 1700000000'
+    assert lines[-1] == 'home.m99 99.0 1700000000'
+    assert len(lines) == 101
+    assert server.connections == 1
+    assert sender.stats['sent'] == 101
+
+
+def test_sender_spills_to_disk_when_unreachable(tmp_path):
+    """
+    When Graphite is unreachable, the metrics that don't fit in the buffer
+    are spilled to disk, and they are sent once it becomes reachable.
+    """
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    spill_file = str(tmp_path / 'spill')
+    sender = GraphiteSender(
+        '127.0.0.1',
+        port=port,
+        batch_size=5,
+        buffer_size=5,
+        spill_file=spill_file,
+        flush_interval=60,
+    )
+
+    sender.send_lines([sender.format(f'm{i}', i, timestamp=0) for i in range(12)])
+    assert sender.stats['buffered'] == 5
+    assert sender.stats['spilled'] == 7
+    assert sender.stats['dropped'] == 0
+
+    server = _GraphiteServer()
+    server.sock.close()
+    server.sock = socket.socket()
+    server.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.sock.bind(('127.0.0.1', port))
+    server.sock.listen()
+    server.start()
+
+    assert sender._flush()
+    sender.stop()
+    time.sleep(0.2)
+    assert sorted(server.data.decode().splitlines()) == sorted(
+        f'm{i} {float(i)!r} 0' for i in range(12)
+    )
+
+
+def test_plugin_stop_flushes_buffered_metrics():
+    """
+    Stopping the plugin sends the metrics that are still queued.
+    """
+    from platypush.plugins.graphite import GraphitePlugin
+
+    server = _GraphiteServer()
+    server.start()
+    plugin = GraphitePlugin(host='127.0.0.1', port=server.port, flush_interval=60)
+    plugin.send_many({'a': 1, 'b': 2}, timestamp=1700000000)
+    assert plugin.get_stats().output[0]['buffered'] == 2
+
+    plugin.stop()
+    time.sleep(0.2)
+
+    assert server.data.decode().splitlines() == [
+        'a 1.0 1700000000',
+        'b 2.0 1700000000',
+    ]
+    assert not plugin.get_stats().output
+
+
+def test_plugin_stop_spills_unsent_metrics(tmp_path, monkeypatch):
+    """
+    Stopping the plugin while Graphite is unreachable spills the queued
+    metrics to disk.
+    """
+    from platypush.plugins.graphite import GraphitePlugin
+
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    plugin = GraphitePlugin(
+        host='127.0.0.1', port=port, flush_interval=60, spill_to_disk=True
+    )
+    spill_file = str(tmp_path / 'graphite.spill')
+    monkeypatch.setattr(plugin, '_get_spill_file', lambda *_: spill_file)
+    plugin.send('temp', 21.5, timestamp=1700000000)
+
+    plugin.stop()
+
+    with open(spill_file) as f:
+        assert f.read() == 'temp 21.5 1700000000\n'
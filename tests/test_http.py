@@ -1,6 +1,8 @@
 import pytest
 import requests
 
+from platypush.backend.http.app.utils import parse_batch
+
 from .utils import (
     register_user,
     send_request as _send_request,
@@ -229,6 +231,54 @@ def test_request_with_wrong_credentials(base_url, expected_login_redirect):
         )
 
 
+def test_batch_request(base_url):
+    """
+    A batch returns one response per request, in order, with errors for the
+    invalid requests and for the requests that time out.
+    """
+    response = requests.post(
+        f'{base_url}/execute/batch',
+        auth=(test_user, test_pass),
+        json={
+            'timeout': 10,
+            'requests': [
+                {
+                    'type': 'request',
+                    'action': 'shell.exec',
+                    'args': {'cmd': 'echo ping'},
+                },
+                {
+                    'type': 'request',
+                    'action': 'shell.exec',
+                    'args': {'cmd': 'sleep 1'},
+                    'timeout': 0.2,
+                },
+                {'type': 'request'},
+            ],
+        },
+    )
+    response.raise_for_status()
+
+    ping, timeout, invalid = [rs['response'] for rs in response.json()]
+    if not (ping['output'].strip() == 'ping' and not ping['errors']):
+        raise AssertionError(f'Unexpected response: {ping}')
+    if not timeout['errors'][0].startswith('Timeout'):
+        raise AssertionError(f'Expected a timeout, got {timeout}')
+    if not invalid['errors'][0].startswith('Invalid request'):
+        raise AssertionError(f'Expected an invalid request error, got {invalid}')
+
+
+def test_batch_invalid_timeout():
+    """
+    A batch with an invalid timeout is rejected as a bad request by both the
+    Flask and the native ``/execute/batch`` routes.
+    """
+    with pytest.raises(AssertionError):
+        parse_batch({'timeout': 'abc', 'requests': []})
+    with pytest.raises(AssertionError):
+        parse_batch({'timeout': None, 'requests': []})
+
+
 if __name__ == '__main__':
     pytest.main()
 
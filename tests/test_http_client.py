@@ -0,0 +1,80 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from platypush.common.http_client import HttpClient
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    hits = {}
+
+    def log_message(self, *_, **__):
+        pass
+
+    def _reply(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for header, value in (headers or {}).items():
+            self.send_header(header, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        hits = self.hits[self.path] = self.hits.get(self.path, 0) + 1
+        if self.path == '/fresh':
+            self._reply(200, b'fresh', {'Cache-Control': 'max-age=60'})
+        elif self.path == '/etag':
+            if self.headers.get('If-None-Match') == '"v1"':
+                self._reply(304, headers={'ETag': '"v1"'})
+            else:
+                self._reply(200, b'etag', {'ETag': '"v1"', 'Cache-Control': 'no-cache'})
+        elif self.path == '/flaky':
+            if hits < 3:
+                self._reply(503, headers={'Retry-After': '0'})
+            else:
+                self._reply(200, b'ok')
+        else:
+            self._reply(404)
+
+
+@pytest.fixture
+def server_url():
+    _Handler.hits = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_cache_honours_max_age_and_etag(server_url):
+    client = HttpClient(name='test-cache', cache=True, timeout=5)
+
+    assert client.get(f'{server_url}/fresh').text == 'fresh'
+    assert client.get(f'{server_url}/fresh').text == 'fresh'
+    assert _Handler.hits['/fresh'] == 1
+
+    assert client.get(f'{server_url}/etag').text == 'etag'
+    response = client.get(f'{server_url}/etag')
+    assert response.status_code == 200
+    assert response.text == 'etag'
+    assert _Handler.hits['/etag'] == 2
+
+    metrics = client.metrics
+    assert metrics['requests'] == 4
+    assert metrics['cache_hits'] == 1
+    assert metrics['cache_revalidations'] == 1
+
+
+def test_retries_on_unavailable(server_url):
+    client = HttpClient(name='test-retries', retries=2, backoff_factor=0, timeout=5)
+    response = client.get(f'{server_url}/flaky')
+    assert response.status_code == 200
+    assert client.metrics['retries'] == 2
+
+    client = HttpClient(name='test-no-retries', retries=0, timeout=5)
+    assert client.get(f'{server_url}/missing').status_code == 404
+    assert client.metrics['errors'] == 1
@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+
+import pytest
+import requests
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application
+
+from platypush.backend.http.app.streaming import StreamingRoute
+from platypush.backend.http.app.streaming.plugins.file import FileRoute
+from platypush.backend.http.app.streaming.plugins.media import _hls
+from platypush.backend.http.app.streaming.plugins.media._hls import (
+    MediaInfo,
+    build_master_playlist,
+    build_media_playlist,
+    probe_media,
+)
+from platypush.backend.http.app.streaming.plugins.media._registry import (
+    get_media,
+    load_media_map,
+    remove_media,
+    save_media,
+)
+from platypush.backend.http.app.streaming.plugins.media._segments import SegmentCache
+from platypush.backend.http.media.handlers import MediaHandler
+
+
+class UnauthenticatedFileRoute(FileRoute):
+    @property
+    def auth_required(self) -> bool:
+        return False
+
+
+@pytest.fixture(scope='module')
+def file_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    ready = threading.Event()
+
+    async def serve():
+        server = HTTPServer(Application([(r'^/file$', UnauthenticatedFileRoute)]))
+        server.add_sockets(bind_sockets(port, address='127.0.0.1'))
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    yield f'http://127.0.0.1:{port}/file'
+
+
+def test_parse_range():
+    assert StreamingRoute.parse_range(None, 100) is None
+    assert StreamingRoute.parse_range('bytes=10-19', 100) == (10, 19)
+    assert StreamingRoute.parse_range('bytes=90-', 100) == (90, 99)
+    assert StreamingRoute.parse_range('bytes=90-200', 100) == (90, 99)
+    assert StreamingRoute.parse_range('bytes=-10', 100) == (90, 99)
+    with pytest.raises(ValueError):
+        StreamingRoute.parse_range('bytes=100-', 100)
+
+
+def test_file_ranges(file_url, tmp_path):
+    """
+    Files are streamed in full or by range, with the right headers.
+    """
+    data = bytes(range(256)) * 1024
+    path = tmp_path / 'data.bin'
+    path.write_bytes(data)
+
+    response = requests.get(file_url, params={'path': str(path)}, timeout=10)
+    assert response.status_code == 200
+    assert response.content == data
+
+    response = requests.get(
+        file_url,
+        params={'path': str(path)},
+        headers={'Range': 'bytes=100000-200000'},
+        timeout=10,
+    )
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100000-200000/{len(data)}'
+    assert response.content == data[100000:200001]
+
+    response = requests.get(
+        file_url,
+        params={'path': str(path)},
+        headers={'Range': f'bytes={len(data)}-'},
+        timeout=10,
+    )
+    assert response.status_code == 416
+
+
+def test_media_registry(tmp_path):
+    """
+    Media handlers are stored and removed by ID.
+    """
+    path = tmp_path / 'media.bin'
+    path.write_bytes(b'\0' * 1024)
+    media = MediaHandler.build(str(path), url='/media/test')
+    save_media(media)
+
+    assert get_media(media.media_id).path == str(path)  # type: ignore
+    assert media.media_id in load_media_map()
+    assert remove_media(media.media_id).source == media.source  # type: ignore
+    assert get_media(media.media_id) is None
+    assert remove_media(media.media_id) is None
+
+
+def test_hls_playlists():
+    """
+    The HLS playlists list the renditions suitable for the media and all of
+    its segments.
+    """
+    info = MediaInfo(duration=20, width=1920, height=1080)
+    master = build_master_playlist(info)
+    assert '360p/index.m3u8' in master
+    assert '720p/index.m3u8' in master
+    assert 'RESOLUTION=1280x720' in master
+
+    master = build_master_playlist(MediaInfo(duration=20, width=640, height=480))
+    assert '360p/index.m3u8' in master
+    assert '720p/index.m3u8' not in master
+
+    master = build_master_playlist(MediaInfo(duration=20))
+    assert master.split('\n')[-2] == 'audio/index.m3u8'
+
+    playlist = build_media_playlist(info)
+    assert [line for line in playlist.split('\n') if line.endswith('.ts')] == [
+        '0.ts',
+        '1.ts',
+        '2.ts',
+        '3.ts',
+    ]
+    assert '#EXTINF:2.000,' in playlist
+    assert playlist.endswith('#EXT-X-ENDLIST\n')
+
+
+def test_probe_media(tmp_path, monkeypatch):
+    """
+    Only media with a valid duration are cached, and the cache is bounded.
+    """
+    probe_output = tmp_path / 'probe.json'
+    ffprobe = tmp_path / 'ffprobe'
+    ffprobe.write_text(
+        f'#!{sys.executable}\n'
+        'import shutil, sys\n'
+        f'with open({str(probe_output)!r}, "rb") as f:\n'
+        '    shutil.copyfileobj(f, sys.stdout.buffer)\n'
+    )
+    ffprobe.chmod(ffprobe.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(_hls, 'get_ffmpeg_cmds', lambda: ('ffmpeg', str(ffprobe)))
+    monkeypatch.setattr(_hls, '_media_info', _hls.OrderedDict())
+    monkeypatch.setattr(_hls, 'HLS_MAX_PROBED_MEDIA', 2)
+
+    def set_duration(duration):
+        probe_output.write_text(json.dumps({'format': {'duration': duration}}))
+
+    media = [str(tmp_path / f'{i}.mp3') for i in range(3)]
+    for path in media:
+        open(path, 'w').close()
+
+    set_duration(0)
+    with pytest.raises(NotImplementedError):
+        asyncio.run(probe_media(media[0]))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(probe_media(media[0]))
+
+    set_duration(20)
+    assert asyncio.run(probe_media(media[0])).duration == 20
+    set_duration(30)
+    assert asyncio.run(probe_media(media[0])).duration == 20
+    assert asyncio.run(probe_media(media[1])).duration == 30
+    assert asyncio.run(probe_media(media[0])).duration == 20
+
+    # The least recently used media is evicted
+    asyncio.run(probe_media(media[2]))
+    assert [path for path, _ in _hls._media_info] == [media[0], media[2]]
+
+
+def test_segment_cache(tmp_path):
+    """
+    Concurrent requests for a segment share the same transcoding, and the
+    least recently used segments are evicted when the cache is full.
+    """
+    cache = SegmentCache(str(tmp_path), max_size=2500)
+    created = []
+
+    async def create(output: str):
+        created.append(output)
+        await asyncio.sleep(0.05)
+        with open(output, 'wb') as f:
+            f.write(b'\0' * 1000)
+
+    async def run():
+        results = await asyncio.gather(*[cache.get('a/0.ts', create)] * 3)
+        assert len({path for path, _ in results}) == 1
+        assert len(created) == 1
+
+        await cache.get('a/1.ts', create)
+        # Mark the first segment as the most recently used
+        os.utime(cache.path('a/1.ts'), (0, 0))
+        await cache.get('a/0.ts', create)
+        await cache.get('b/0.ts', create)
+
+    asyncio.run(run())
+    assert len(created) == 3
+    assert cache.lookup('a/0.ts')
+    assert cache.lookup('b/0.ts')
+    assert not cache.lookup('a/1.ts')
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+from platypush.common.inference import MicroBatcher, ModelCache
+
+
+def test_model_cache_evicts_least_recently_used():
+    """
+    The least recently used models are evicted when the memory budget is
+    exceeded, and each model is loaded only once.
+    """
+    evicted = []
+    loads = []
+    cache = ModelCache(max_size=100, on_evict=lambda key, _: evicted.append(key))
+
+    def loader(key):
+        loads.append(key)
+        return key
+
+    cache.get('a', lambda: loader('a'), size=lambda _: 40)
+    cache.get('b', lambda: loader('b'), size=lambda _: 40)
+    cache.get('a', lambda: loader('a'), size=lambda _: 40)
+    cache.get('c', lambda: loader('c'), size=lambda _: 40)
+
+    assert loads == ['a', 'b', 'c']
+    assert evicted == ['b']
+    assert 'a' in cache and 'c' in cache and 'b' not in cache
+    assert cache.size == 80
+
+
+def test_micro_batcher_groups_concurrent_requests():
+    """
+    Concurrent requests are processed in batches, and each request gets the
+    result of its own item.
+    """
+    weights = np.arange(12, dtype=float).reshape(3, 4)
+    batch_sizes = []
+
+    def process(samples):
+        batch_sizes.append(len(samples))
+        return list(np.stack(samples) @ weights)
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_latency=0.2)
+    samples = [np.random.rand(3) for _ in range(8)]
+    results = [None] * len(samples)
+
+    def run(i):
+        results[i] = batcher(samples[i], timeout=5)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(samples))]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        batcher.stop()
+
+    for sample, result in zip(samples, results):
+        assert np.allclose(result, sample @ weights)
+
+    metrics = batcher.metrics
+    assert metrics['requests'] == len(samples)
+    assert metrics['batches'] == len(batch_sizes) < len(samples)
+    assert metrics['avg_batch_size'] > 1
@@ -0,0 +1,96 @@
+import json
+import threading
+import time
+
+from platypush.plugins.light.hue._events import iter_sse, parse_light_updates
+from platypush.plugins.light.hue._writer import HueLightWriter
+
+
+class MockHueBridge:
+    """
+    Records the light commands received, with their timestamps.
+    """
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.commands = []
+        self.lights = {}
+        self._lock = threading.Lock()
+
+    def set_light(self, light_id, state):
+        time.sleep(self.latency)
+        with self._lock:
+            self.commands.append((time.monotonic(), str(light_id), dict(state)))
+            self.lights.setdefault(str(light_id), {}).update(state)
+        return [
+            {'success': {f'/lights/{light_id}/state/{k}': v}} for k, v in state.items()
+        ]
+
+
+def test_writer_coalesces_writes_per_light():
+    bridge = MockHueBridge(latency=0.05)
+    writer = HueLightWriter(send=bridge.set_light, rate_limit=100)
+    writer.start()
+
+    try:
+        futures = [writer.put('1', {'bri': bri}) for bri in range(50)]
+        futures.append(writer.put('1', {'on': True}))
+        futures.append(writer.put('2', {'on': False}))
+        for future in futures:
+            future.result(timeout=5)
+    finally:
+        writer.stop()
+
+    # The first write may be sent right away, the others are merged
+    assert len([c for c in bridge.commands if c[1] == '1']) <= 2
+    assert bridge.lights == {'1': {'bri': 49, 'on': True}, '2': {'on': False}}
+
+
+def test_writer_rate_limit():
+    bridge = MockHueBridge()
+    writer = HueLightWriter(send=bridge.set_light, rate_limit=20)
+    writer.start()
+
+    try:
+        futures = writer.put_many({str(i): {'on': True} for i in range(5)})
+        for future in futures.values():
+            future.result(timeout=5)
+    finally:
+        writer.stop()
+
+    timestamps = [c[0] for c in bridge.commands]
+    assert len(timestamps) == 5
+    assert all(t2 - t1 >= 0.045 for t1, t2 in zip(timestamps, timestamps[1:]))
+
+
+def test_event_stream_parsing():
+    payload = json.dumps(
+        [
+            {
+                'type': 'update',
+                'data': [
+                    {'type': 'light', 'id_v1': '/lights/3', 'on': {'on': True}},
+                    {
+                        'type': 'light',
+                        'id_v1': '/lights/3',
+                        'dimming': {'brightness': 50.0},
+                        'color': {'xy': {'x': 0.31271, 'y': 0.32902}},
+                    },
+                    {'type': 'grouped_light', 'id_v1': '/groups/1', 'on': {'on': True}},
+                    {
+                        'type': 'light',
+                        'id_v1': '/lights/4',
+                        'color_temperature': {'mirek': 366},
+                    },
+                ],
+            }
+        ]
+    )
+
+    lines = [': hi', '', 'id: 1:0', f'data: {payload}', '']
+    payloads = list(iter_sse(lines))
+    assert payloads == [payload]
+    assert parse_light_updates(payloads[0]) == {
+        '3': {'on': True, 'bri': 127, 'xy': [0.3127, 0.329]},
+        '4': {'ct': 366},
+    }
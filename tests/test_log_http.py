@@ -0,0 +1,66 @@
+import datetime
+import os
+
+from platypush.plugins.log.http._parser import parse_line, parse_timestamp
+from platypush.plugins.log.http._tailer import FileTailer
+
+line_template = (
+    '127.0.0.1 - frank [10/Oct/2000:13:55:{:02d} -0700] "GET /page/{} HTTP/1.1" '
+    '200 2326 "http://example.com/" "Mozilla/5.0"\n'
+)
+
+
+def test_parse_line():
+    """
+    Log lines are parsed into the attributes of an ``HttpLogEvent``, and
+    timestamps match ``strptime``.
+    """
+    entry = parse_line(line_template.format(36, 1))
+    assert entry
+    assert entry['time'] == datetime.datetime.strptime(
+        '10/Oct/2000:13:55:36 -0700', '%d/%b/%Y:%H:%M:%S %z'
+    )
+    assert entry['user_identifier'] is None
+    assert entry['user_id'] == 'frank'
+    assert entry['url'] == '/page/1'
+    assert entry['http_version'] == '1.1'
+    assert entry['status'] == 200
+    assert entry['size'] == 2326
+    assert entry['user_agent'] == 'Mozilla/5.0'
+    assert parse_timestamp('01/Jan/2024:00:00:00 +0530').utcoffset() == (
+        datetime.timedelta(hours=5, minutes=30)
+    )
+    assert parse_line('not a log line') is None
+
+
+def test_tailer_follows_partial_lines_and_rotations(tmp_path):
+    """
+    Incomplete lines are carried over, and the rest of a rotated file is read
+    before following the new file.
+    """
+    path = str(tmp_path / 'access.log')
+    with open(path, 'w') as f:
+        f.write(line_template.format(0, 0))
+
+    tailer = FileTailer(path, chunk_size=16)
+    assert tailer.read_lines() == []
+
+    line1, line2, line3 = (line_template.format(i, i) for i in range(1, 4))
+    with open(path, 'a') as f:
+        f.write(line1 + line2[:20])
+        f.flush()
+        assert tailer.read_lines() == [line1.rstrip('\n')]
+        f.write(line2[20:])
+
+    os.rename(path, path + '.1')
+    with open(path, 'w') as f:
+        f.write(line3)
+
+    assert tailer.read_lines() == [line2.rstrip('\n'), line3.rstrip('\n')]
+
+    # Truncated file
+    with open(path, 'w') as f:
+        f.write('truncated\n')
+
+    assert tailer.read_lines() == ['truncated']
+    tailer.close()
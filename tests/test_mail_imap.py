@@ -0,0 +1,374 @@
+import io
+import json
+import threading
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('dns')
+pytest.importorskip('imapclient')
+
+from imapclient.exceptions import IMAPClientAbortError  # noqa: E402
+from imapclient.response_types import Envelope  # noqa: E402
+
+from platypush.plugins.mail import MailPlugin  # noqa: E402
+from platypush.plugins.mail._model import AccountConfig, AccountsStatus  # noqa: E402
+from platypush.plugins.mail._model import MailFlagType  # noqa: E402
+from platypush.plugins.mail.imap import MailImapPlugin  # noqa: E402
+from platypush.plugins.mail.imap._cache import FLAGGED, SEEN  # noqa: E402
+from platypush.plugins.mail.imap._cache import FolderState, HeaderCache  # noqa: E402
+from platypush.plugins.mail.imap._session import ImapSession  # noqa: E402
+
+
+class FakeImapClient:
+    """
+    In-memory IMAP server with a single folder, exposing the subset of the
+    ``IMAPClient`` API used by the plugin.
+    """
+
+    def __init__(self, condstore: bool = True, idle: bool = True):
+        self.condstore = condstore
+        self.capabilities_list = [b'IMAP4REV1']
+        if condstore:
+            self.capabilities_list += [b'ENABLE', b'CONDSTORE']
+        if idle:
+            self.capabilities_list.append(b'IDLE')
+
+        self.uidvalidity = 1
+        self.modseq = 1
+        self.messages = {}
+        self.fetches = []
+        self.searches = 0
+        self.noops = 0
+        self.idle_responses = []
+        self.idling = False
+        self.logged_out = False
+
+    def add(self, uid, flags=()):
+        self.modseq += 1
+        self.messages[uid] = {'flags': tuple(flags), 'modseq': self.modseq}
+
+    def set_flags_(self, uid, flags):
+        self.modseq += 1
+        self.messages[uid] = {'flags': tuple(flags), 'modseq': self.modseq}
+
+    def expunge_(self, uid):
+        del self.messages[uid]
+
+    def capabilities(self):
+        return self.capabilities_list
+
+    def noop(self):
+        self.noops += 1
+
+    def logout(self):
+        self.logged_out = True
+
+    def shutdown(self):
+        pass
+
+    def select_folder(self, _, readonly=False):
+        info = {
+            b'UIDVALIDITY': self.uidvalidity,
+            b'EXISTS': len(self.messages),
+        }
+        if self.condstore:
+            info[b'HIGHESTMODSEQ'] = self.modseq
+        return info
+
+    def search(self, _='ALL'):
+        self.searches += 1
+        return sorted(self.messages)
+
+    def fetch(self, ids, attrs, modifiers=None):
+        self.fetches.append((ids, tuple(attrs), tuple(modifiers or ())))
+        uids = sorted(self.messages) if ids == '1:*' else ids
+        changed_since = None
+        for modifier in modifiers or []:
+            if modifier.startswith('CHANGEDSINCE '):
+                changed_since = int(modifier.split(' ')[1])
+
+        ret = {}
+        for seq, uid in enumerate(sorted(self.messages), start=1):
+            msg = self.messages[uid]
+            if uid not in uids:
+                continue
+            if changed_since is not None and msg['modseq'] <= changed_since:
+                continue
+
+            data = {b'SEQ': seq, b'FLAGS': msg['flags'], b'MODSEQ': (msg['modseq'],)}
+            if 'ENVELOPE' in attrs:
+                data[b'ENVELOPE'] = Envelope(
+                    datetime(2024, 1, 1),
+                    f'Message {uid}'.encode(),
+                    None,
+                    None,
+                    None,
+                    None,
+                    None,
+                    None,
+                    None,
+                    f'<{uid}@test>'.encode(),
+                )
+                data[b'INTERNALDATE'] = datetime(2024, 1, 1)
+                data[b'RFC822.SIZE'] = 100
+            ret[uid] = data
+
+        return ret
+
+    def idle(self):
+        self.idling = True
+
+    def idle_check(self, timeout=None):
+        if self.idle_responses:
+            return [self.idle_responses.pop(0)]
+        return []
+
+    def idle_done(self):
+        self.idling = False
+
+
+@pytest.fixture
+def server():
+    return FakeImapClient()
+
+
+@pytest.fixture
+def plugin(server, monkeypatch):
+    monkeypatch.setattr(MailImapPlugin, '_connect', lambda _: server)
+    return MailImapPlugin(
+        server='imaps://imap.example.com',
+        account=AccountConfig(username='user', password='pass'),
+        timeout=10,
+    )
+
+
+def _fetched_attrs(server):
+    return [attrs for _, attrs, _ in server.fetches]
+
+
+def test_folder_state_flags():
+    state = FolderState(uidvalidity=1)
+    state.replace(
+        {
+            1: {b'FLAGS': (SEEN,)},
+            2: {b'FLAGS': ()},
+            3: {b'FLAGS': (FLAGGED,)},
+            5: {b'FLAGS': [SEEN]},
+        }
+    )
+    assert sorted(state.unread) == [2, 3]
+    assert state.flagged == [3]
+    # Identical flag sets are shared
+    assert state.flags[1] is state.flags[5]
+
+    state.update({2: {b'FLAGS': (SEEN, FLAGGED)}, 4: {b'MODSEQ': (5,)}})
+    assert sorted(state.unread) == [3]
+    assert sorted(state.flagged) == [2, 3]
+    assert 4 not in state.flags
+
+    state.retain([1, 3])
+    assert sorted(state.flags) == [1, 3]
+
+
+def test_header_cache_lru():
+    cache = HeaderCache(max_size=2)
+    msg = {b'ENVELOPE': 'env', b'INTERNALDATE': 'date', b'RFC822.SIZE': 1}
+
+    cache.put('INBOX', 1, 1, {**msg, b'FLAGS': (SEEN,), b'BODY[]': b'body'})
+    # Messages without all the header attributes aren't cached
+    cache.put('INBOX', 1, 2, {b'FLAGS': ()})
+    assert cache.get('INBOX', 1, 1) == msg
+    assert cache.get('INBOX', 1, 2) is None
+    # A different UIDVALIDITY doesn't match
+    assert cache.get('INBOX', 2, 1) is None
+
+    cache.put('INBOX', 1, 2, msg)
+    cache.get('INBOX', 1, 1)
+    cache.put('INBOX', 1, 3, msg)
+    assert len(cache) == 2
+    assert cache.get('INBOX', 1, 2) is None
+    assert cache.get('INBOX', 1, 1) == msg
+
+
+def test_session_reuses_and_recreates_connections():
+    clients = []
+
+    def connect():
+        clients.append(FakeImapClient())
+        return clients[-1]
+
+    session = ImapSession(connect, keepalive=0)
+    assert session.has_capability('idle')
+
+    with session.client():
+        pass
+    assert len(clients) == 1
+    # Idle connections are checked before being reused
+    assert clients[0].noops == 1
+
+    with pytest.raises(IMAPClientAbortError):
+        with session.client():
+            raise IMAPClientAbortError('Connection lost')
+
+    assert clients[0].logged_out
+    with session.client() as client:
+        assert client is clients[1]
+
+
+def test_sync_changedsince_delta(plugin, server):
+    server.add(1, [SEEN])
+    server.add(2)
+    status = plugin.sync_folder('INBOX')
+    assert list(status[MailFlagType.UNREAD]) == [2]
+    assert status[MailFlagType.UNREAD][2].subject == 'Message 2'
+
+    server.fetches.clear()
+    server.set_flags_(1, [SEEN, FLAGGED])
+    status = plugin.sync_folder('INBOX')
+
+    assert list(status[MailFlagType.FLAGGED]) == [1]
+    assert server.fetches[0][2] == ('CHANGEDSINCE 3',)
+    # Only the flags of the changed message are fetched, and the headers of
+    # message 2 come from the cache
+    assert server.fetches[0][1] == ('FLAGS',)
+    assert [ids for ids, *_ in server.fetches[1:]] == [[1]]
+
+    server.fetches.clear()
+    status = plugin.sync_folder('INBOX')
+    assert {flag: list(msgs) for flag, msgs in status.items()} == {
+        MailFlagType.UNREAD: [2],
+        MailFlagType.FLAGGED: [1],
+    }
+    assert not server.fetches
+
+
+def test_sync_uidvalidity_reset(plugin, server):
+    server.add(1)
+    server.add(2)
+    plugin.sync_folder('INBOX')
+
+    server.uidvalidity = 2
+    server.messages.clear()
+    server.add(5)
+    server.fetches.clear()
+    status = plugin.sync_folder('INBOX')
+
+    assert list(status[MailFlagType.UNREAD]) == [5]
+    # Full resync, without CHANGEDSINCE
+    assert server.fetches[0] == ('1:*', ('FLAGS',), ())
+    assert plugin._folders['INBOX'].uidvalidity == 2
+
+
+def test_sync_expunged_uids(plugin, server):
+    server.add(1)
+    server.add(2)
+    plugin.sync_folder('INBOX')
+
+    server.expunge_(1)
+    status = plugin.sync_folder('INBOX')
+
+    assert list(status[MailFlagType.UNREAD]) == [2]
+    assert server.searches == 1
+
+
+def test_sync_without_condstore(monkeypatch):
+    server = FakeImapClient(condstore=False)
+    monkeypatch.setattr(MailImapPlugin, '_connect', lambda _: server)
+    plugin = MailImapPlugin(
+        server='imaps://imap.example.com',
+        account=AccountConfig(username='user', password='pass'),
+        timeout=10,
+    )
+
+    server.add(1)
+    plugin.sync_folder('INBOX')
+    server.set_flags_(1, [SEEN])
+    server.add(2)
+    server.fetches.clear()
+    status = plugin.sync_folder('INBOX')
+
+    assert list(status[MailFlagType.UNREAD]) == [2]
+    assert server.fetches[0] == ('1:*', ('FLAGS',), ())
+
+
+def test_get_cached_messages(plugin, server):
+    server.add(1, [SEEN])
+    server.add(2)
+    msgs = plugin.get_messages(1, 2, with_body=False)
+    assert sorted(msgs) == [1, 2]
+
+    server.fetches.clear()
+    server.set_flags_(2, [SEEN])
+    server.expunge_(1)
+    msgs = plugin.get_messages(1, 2, with_body=False)
+
+    # Only the flags of the cached messages are fetched, and expunged
+    # messages are skipped
+    assert _fetched_attrs(server) == [('FLAGS',)]
+    assert list(msgs) == [2]
+    assert msgs[2].args['flags'] == ['\\Seen']
+
+
+def test_wait_for_changes_idle(plugin, server):
+    server.idle_responses = [(1, b'EXISTS')]
+    plugin.wait_for_changes('INBOX', idle_timeout=60)
+    assert not server.idling
+    assert not server.idle_responses
+
+
+def test_wait_for_changes_stop(plugin, server):
+    stop = threading.Event()
+    stop.set()
+    plugin.wait_for_changes('INBOX', idle_timeout=60, stop=stop)
+    assert not server.idling
+
+
+def test_wait_for_changes_polls_without_idle(monkeypatch):
+    server = FakeImapClient(idle=False)
+    monkeypatch.setattr(MailImapPlugin, '_connect', lambda _: server)
+    plugin = MailImapPlugin(
+        server='imaps://imap.example.com',
+        account=AccountConfig(username='user', password='pass'),
+        timeout=10,
+    )
+
+    stop = threading.Event()
+    stop.set()
+    plugin.wait_for_changes('INBOX', poll_interval=60, idle_timeout=60, stop=stop)
+    assert not server.fetches
+    assert not server.idling
+
+
+def test_new_folders_in_stored_status(tmp_path, monkeypatch):
+    """
+    Folders that aren't in the persisted status should start empty.
+    """
+    status = AccountsStatus.read(
+        io.StringIO(json.dumps({'account': {'INBOX': {'unread': {'1': {}}}}}))
+    )
+    assert status['account']['Archive'] == {flag: {} for flag in MailFlagType}
+    assert status['account']['INBOX'][MailFlagType.FLAGGED] == {}
+
+    plugin = MailPlugin.__new__(MailPlugin)
+    plugin._status = status
+    plugin._db_lock = threading.RLock()
+    plugin._status_file = str(tmp_path / 'status.json')
+    events = []
+    monkeypatch.setattr(
+        plugin, '_generate_account_events', lambda *args: events.append(args)
+    )
+
+    class Account:
+        name = 'account'
+        incoming = None
+
+    plugin._process_folder_status(
+        Account(),
+        'Archive',
+        {MailFlagType.UNREAD: {2: 'msg'}, MailFlagType.FLAGGED: {}},
+    )
+
+    assert events == [
+        ('account', {2: 'msg'}, {'Archive': {MailFlagType.UNREAD: {2: True}}})
+    ]
@@ -0,0 +1,218 @@
+import os
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from platypush.plugins.media import MediaPlugin
+from platypush.plugins.media._search.local import LocalMediaSearcher
+from platypush.plugins.media._search.local.db import (
+    MediaDirectory,
+    MediaFile,
+    MediaSubdirectory,
+    Session,
+)
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write('x')
+
+
+def _age_dirs(root, seconds=100):
+    """
+    Move the mtimes of the directories back, so changes made right after a
+    scan are detected on filesystems with coarse timestamps.
+    """
+    t = time.time() - seconds
+    for path, _, _ in os.walk(root):
+        os.utime(path, (t, t))
+
+
+def _build_searcher(db_file, dirs):
+    searcher = LocalMediaSearcher(dirs, media_plugin=Mock(spec=MediaPlugin))
+    searcher.db_file = db_file
+    return searcher
+
+
+@pytest.fixture
+def media_dir(tmp_path):
+    root = tmp_path / 'media'
+    for path in (
+        'movies/The Matrix (1999).mkv',
+        'movies/Matrix Reloaded.mp4',
+        'movies/notes.txt',
+        'music/Album/01 - Song.mp3',
+    ):
+        _touch(str(root / path))
+
+    _age_dirs(str(root))
+    return str(root)
+
+
+@pytest.fixture
+def searcher(tmp_path, media_dir, monkeypatch):
+    monkeypatch.setattr(LocalMediaSearcher, '_metadata_scan_thread', lambda *_: None)
+    searcher = _build_searcher(str(tmp_path / 'media.db'), [media_dir])
+    yield searcher
+    _wait_background_scans()
+    Session.remove()
+    if searcher._db_engine:
+        searcher._db_engine.dispose()
+
+
+def _wait_background_scans():
+    for thread in threading.enumerate():
+        if thread.name == 'media-indexer':
+            thread.join()
+
+
+def _titles(searcher, query):
+    results, _ = searcher.search(query)
+    return sorted(result['title'] for result in results)
+
+
+def _indexed_files(searcher):
+    return sorted(
+        os.path.basename(path)
+        for (path,) in searcher._get_db_session().query(MediaFile.path)
+    )
+
+
+def test_search_results(searcher, media_dir):
+    results, next_state = searcher.search('matrix')
+
+    assert sorted(result['title'] for result in results) == [
+        'Matrix Reloaded.mp4',
+        'The Matrix (1999).mkv',
+    ]
+    assert next_state is None
+    assert {result['url'] for result in results} == {
+        'file://' + os.path.join(media_dir, 'movies', 'Matrix Reloaded.mp4'),
+        'file://' + os.path.join(media_dir, 'movies', 'The Matrix (1999).mkv'),
+    }
+
+    assert _titles(searcher, 'song') == ['01 - Song.mp3']
+    assert _titles(searcher, 'matrix 1999') == ['The Matrix (1999).mkv']
+    # Non-media files aren't indexed
+    assert _titles(searcher, 'notes') == []
+
+
+def test_search_pagination(searcher):
+    results, next_state = searcher.search('matrix', limit=1)
+    assert len(results) == 1
+    assert next_state == {'offset': 1}
+
+    next_results, _ = searcher.search('matrix', limit=1, page_state=next_state)
+    assert len(next_results) == 1
+    assert next_results[0]['title'] != results[0]['title']
+
+
+def test_incremental_rescan(searcher, media_dir):
+    stats = searcher.scan(media_dir)
+    assert (stats.dirs, stats.changed_dirs) == (4, 4)
+    assert (stats.added, stats.removed) == (3, 0)
+
+    # Rescans of unchanged trees don't list any directory
+    stats = searcher.scan(media_dir)
+    assert stats.changed_dirs == stats.files == stats.added == stats.removed == 0
+
+    movies = os.path.join(media_dir, 'movies')
+    _touch(os.path.join(movies, 'The Matrix Revolutions.avi'))
+    os.rename(
+        os.path.join(movies, 'Matrix Reloaded.mp4'),
+        os.path.join(movies, 'The Matrix Reloaded.mp4'),
+    )
+    os.remove(os.path.join(media_dir, 'music', 'Album', '01 - Song.mp3'))
+    _touch(os.path.join(media_dir, 'series', 'S01', 'S01E01.mkv'))
+
+    stats = searcher.scan(media_dir)
+    # movies, music/Album, the root, and the new series and series/S01
+    assert (stats.dirs, stats.changed_dirs) == (6, 5)
+    assert (stats.added, stats.removed) == (3, 2)
+    assert _indexed_files(searcher) == [
+        'S01E01.mkv',
+        'The Matrix (1999).mkv',
+        'The Matrix Reloaded.mp4',
+        'The Matrix Revolutions.avi',
+    ]
+
+    # Removed subdirectories drop their files from the index
+    _age_dirs(media_dir)
+    os.remove(os.path.join(media_dir, 'series', 'S01', 'S01E01.mkv'))
+    os.rmdir(os.path.join(media_dir, 'series', 'S01'))
+    os.rmdir(os.path.join(media_dir, 'series'))
+
+    stats = searcher.scan(media_dir)
+    assert (stats.dirs, stats.removed) == (4, 1)
+    assert 'S01E01.mkv' not in _indexed_files(searcher)
+    assert _titles(searcher, 'revolutions') == ['The Matrix Revolutions.avi']
+
+
+def test_search_does_not_scan_on_every_query(searcher, media_dir, monkeypatch):
+    scans = []
+    scan = searcher.scan
+
+    def counting_scan(*args, **kwargs):
+        scans.append(threading.current_thread().name)
+        return scan(*args, **kwargs)
+
+    monkeypatch.setattr(searcher, 'scan', counting_scan)
+
+    # Directories that have never been indexed are scanned before the query
+    assert _titles(searcher, 'revolutions') == []
+    assert scans == [threading.current_thread().name]
+
+    _touch(os.path.join(media_dir, 'movies', 'The Matrix Revolutions.avi'))
+    for _ in range(3):
+        assert _titles(searcher, 'revolutions') == []
+    assert len(scans) == 1
+
+    # Stale directories are rescanned in the background
+    searcher.scan_interval = 0
+    searcher.search('revolutions')
+    _wait_background_scans()
+    assert scans[1:] == ['media-indexer']
+
+    searcher.scan_interval = 300
+    assert _titles(searcher, 'revolutions') == ['The Matrix Revolutions.avi']
+    assert len(scans) == 2
+
+
+def test_restart_searches_the_existing_index(searcher, media_dir):
+    searcher.search('matrix')
+    Session.remove()
+
+    restarted = _build_searcher(searcher.db_file, [media_dir])
+    scans = []
+    scan = restarted.scan
+
+    def counting_scan(*args, **kwargs):
+        scans.append(threading.current_thread().name)
+        return scan(*args, **kwargs)
+
+    restarted.scan = counting_scan
+    assert _titles(restarted, 'song') == ['01 - Song.mp3']
+
+    # The first search after a restart doesn't wait for the rescan
+    _wait_background_scans()
+    assert scans == ['media-indexer']
+
+
+def test_subdirectory_paths_are_unique_per_media_directory(searcher):
+    session = searcher._get_db_session()
+    dirs = [MediaDirectory.build(path=path) for path in ('/media', '/media/music')]
+    session.add_all(dirs)
+    session.commit()
+
+    for record in dirs:
+        session.add(MediaSubdirectory.build(record.id, '/media/music/Album'))
+    session.commit()
+
+    session.add(MediaSubdirectory.build(dirs[0].id, '/media/music/Album'))
+    with pytest.raises(IntegrityError):
+        session.commit()
+    session.rollback()
@@ -0,0 +1,81 @@
+import time
+
+import pytest
+import requests
+
+from platypush.utils import metrics as _metrics_module
+from platypush.utils.metrics import Metrics, enable_metrics, to_prometheus
+from platypush.utils.profiler import SamplingProfiler
+
+from .utils import register_user, send_request, test_pass, test_user
+
+
+def test_metrics_histogram():
+    metrics = Metrics()
+    for latency, error in ((0.002, False), (0.2, True), (100, False)):
+        metrics.stop(
+            'action',
+            'foo.bar',
+            metrics.start('action', 'foo.bar') - latency,
+            error=error,
+        )
+
+    stats = metrics.dump()['action']['foo.bar']
+    assert (stats['calls'], stats['errors'], stats['in_flight']) == (3, 1, 0)
+    assert stats['latency']['buckets']['0.005'] == 1
+    assert stats['latency']['buckets']['0.25'] == 2
+    assert stats['latency']['buckets']['60'] == 2
+    assert stats['latency']['buckets']['+Inf'] == 3
+
+    text = to_prometheus(metrics.dump())
+    assert 'platypush_action_calls_total{name="foo.bar"} 3' in text
+    assert (
+        'platypush_action_duration_seconds_bucket{name="foo.bar",le="+Inf"} 3' in text
+    )
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch):
+    """
+    Enables the metrics on the running test application, and disables them
+    again after the test.
+    """
+    monkeypatch.setattr(_metrics_module, '_metrics', None)
+    yield enable_metrics()
+
+
+def test_metrics_endpoint(base_url, metrics_enabled):
+    """
+    The executed actions are counted in the ``application.metrics`` output and
+    on the ``/metrics`` endpoint.
+    """
+    register_user()
+    for _ in range(2):
+        send_request('shell.exec', args={'cmd': 'echo ping'})
+
+    metrics = send_request('application.metrics').output
+    assert metrics['action']['shell.exec']['calls'] >= 2
+    assert metrics['bus']['messages']['request'] >= 3
+
+    response = requests.get(
+        f'{base_url}/metrics', auth=(test_user, test_pass), timeout=10
+    )
+    response.raise_for_status()
+    assert response.headers['Content-Type'].startswith('text/plain')
+    assert 'platypush_action_calls_total{name="shell.exec"}' in response.text
+    assert requests.get(f'{base_url}/metrics', timeout=10).status_code == 401
+
+
+def test_sampling_profiler(tmp_path):
+    output_file = tmp_path / 'profile.folded'
+    profiler = SamplingProfiler(interval=0.001, output_file=str(output_file))
+    profiler.start()
+    deadline = time.time() + 0.2
+    while time.time() < deadline:
+        sum(range(1000))
+
+    profiler.stop()
+    stacks = output_file.read_text().splitlines()
+    assert profiler.samples > 0
+    assert any('test_sampling_profiler' in stack for stack in stacks)
+    assert all(stack.rsplit(' ', 1)[1].isdigit() for stack in stacks)
@@ -0,0 +1,144 @@
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from platypush.common.db import Base
+from platypush.common.notes import Note
+from platypush.plugins.notes._model import ApiSettings, ItemType
+from platypush.plugins.notes.db._model import Note as DbNote
+from platypush.plugins.notes.mixins.index import NotesIndexMixin, _fts_index
+
+
+class LocalNotes(NotesIndexMixin):
+    """
+    Minimal notes backend that only uses the internal search index.
+    """
+
+    def __init__(self, name: str, session_factory):
+        super().__init__(max_tokens_length=3)
+        self._name = name
+        self._session_factory = session_factory
+        self._api_settings = ApiSettings()
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def _plugin_name(self) -> str:
+        return self._name
+
+    @contextmanager
+    def _get_db_session(self, *_, **__):
+        session = self._session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def _from_db_note(self, db_note: DbNote) -> Note:
+        return Note(
+            id=db_note.external_id,
+            plugin=self._plugin_name,
+            title=db_note.title,  # type: ignore[arg-type]
+            content=db_note.content,  # type: ignore[arg-type]
+        )
+
+    def _from_db_collection(self, db_collection):
+        raise NotImplementedError()
+
+    def add_notes(self, *notes: Note):
+        with self._get_db_session() as session:
+            for note in notes:
+                session.add(
+                    DbNote(
+                        id=note._db_id,
+                        external_id=note.id,
+                        plugin=note.plugin,
+                        title=note.title,
+                        content=note.content,
+                        created_at=datetime.now(),
+                        updated_at=datetime.now(),
+                    )
+                )
+
+            self._refresh_content_index(notes, session=session)
+            session.commit()
+
+    def search(self, query: str, **kwargs):
+        return [
+            item.item.id
+            for item in self._db_search(query, item_type=ItemType.NOTE, **kwargs).items
+        ]
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f'sqlite:///{tmp_path / "notes.db"}')
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        if not _fts_index.is_available(session):
+            pytest.skip('SQLite FTS5 is not available')
+
+    yield factory
+    engine.dispose()
+
+
+def test_fts_search_is_ranked_filtered_and_paginated(session_factory):
+    notes = LocalNotes('notes.test', session_factory)
+    other = LocalNotes('notes.other', session_factory)
+    notes.add_notes(
+        Note(id='content', plugin='notes.test', title='Groceries', content='bread'),
+        Note(id='title', plugin='notes.test', title='Bread recipe', content='flour'),
+        Note(id='none', plugin='notes.test', title='Todo', content='plumber'),
+    )
+    other.add_notes(
+        Note(id='other', plugin='notes.other', title='Bread', content='bread'),
+    )
+
+    # Notes of the other plugins sharing the same index aren't returned
+    assert notes.search('bread') == ['title', 'content']
+    assert other.search('bread') == ['other']
+
+    assert notes.search('bread', limit=1) == ['title']
+    assert notes.search('bread', limit=1, offset=1) == ['content']
+    assert notes.search('bread', limit=1, offset=2) == []
+    assert notes.search('bread', offset=1) == ['content']
+    assert notes.search('bread', include_terms={'title': 'Groceries'}) == ['content']
+    assert notes.search('plumb*') == ['none']
+
+
+def test_fts_search_runs_a_single_paginated_query(session_factory):
+    notes = LocalNotes('notes.test', session_factory)
+    notes.add_notes(
+        *[
+            Note(id=str(i), plugin='notes.test', title=f'Note {i}', content='bread')
+            for i in range(10)
+        ]
+    )
+
+    statements = []
+    event.listen(
+        session_factory.kw['bind'],
+        'before_cursor_execute',
+        lambda _, __, statement, *___: statements.append(statement),
+    )
+
+    assert len(notes.search('bread', limit=2, offset=4)) == 2
+    queries = [stmt for stmt in statements if 'MATCH' in stmt]
+    assert len(queries) == 1
+    assert 'LIMIT' in queries[0] and 'notes_note.plugin' in queries[0]
+
+
+def test_fts_search_deleted_notes(session_factory):
+    notes = LocalNotes('notes.test', session_factory)
+    note = Note(id='note', plugin='notes.test', title='Bread', content='flour')
+    notes.add_notes(note)
+
+    with notes._get_db_session() as session:
+        notes._delete_from_content_index([note._db_id], session=session)
+        session.commit()
+
+    assert notes.search('bread') == []
@@ -0,0 +1,22 @@
+import pytest
+
+from platypush.context import get_action, get_plugin
+
+
+def test_action_dispatch_table():
+    """
+    Actions are resolved to the bound methods of the current plugin
+    instances, and the table is refreshed when a plugin is reloaded.
+    """
+    action = get_action('logger.info')
+    plugin = get_plugin('logger')
+    assert action.plugin is plugin
+    assert action.method == plugin.info
+    assert get_action('logger.info') is action
+
+    reloaded = get_plugin('logger', reload=True)
+    assert reloaded is not plugin
+    assert get_action('logger.info').plugin is reloaded
+
+    with pytest.raises(AssertionError):
+        get_action('logger.not_an_action')
@@ -0,0 +1,220 @@
+import json
+from email.utils import formatdate
+from uuid import uuid4
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+pytest.importorskip('feedparser')
+
+from platypush.plugins.rss import RssPlugin, _variable  # noqa: E402
+from platypush.plugins.rss._fetcher import FeedFetcher  # noqa: E402
+
+feed_template = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0">
+<channel>
+  <title>Test feed</title>
+  {items}
+</channel>
+</rss>'''
+
+item_template = '''<item>
+  <title>Entry {i}</title>
+  <link>https://example.com/{i}</link>
+  <guid>https://example.com/{i}</guid>
+  <pubDate>{date}</pubDate>
+</item>'''
+
+
+class FakeFeedServer:
+    """
+    Serves a feed, honouring the ``If-None-Match`` and ``If-Modified-Since``
+    headers if ``validators`` is True.
+    """
+
+    def __init__(self, validators: bool = True):
+        self.validators = validators
+        self.entries = 0
+        self.version = 0
+        self.requests = []
+        self.add_entry()
+
+    def add_entry(self):
+        self.entries += 1
+        self.version += 1
+
+    @property
+    def etag(self):
+        return f'"v{self.version}"'
+
+    @property
+    def last_modified(self):
+        return formatdate(1700000000 + self.version, usegmt=True)
+
+    @property
+    def content(self):
+        return feed_template.format(
+            items='\n'.join(
+                item_template.format(
+                    i=i, date=formatdate(1700000000 + i * 3600, usegmt=True)
+                )
+                for i in range(self.entries)
+            )
+        ).encode()
+
+    def get(self, url, headers=None, **_):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        rs = requests.Response()
+        rs.url = url
+        rs.headers = CaseInsensitiveDict()
+
+        if self.validators:
+            if (
+                headers.get('If-None-Match') == self.etag
+                or headers.get('If-Modified-Since') == self.last_modified
+            ):
+                rs.status_code = 304
+                rs._content = b''
+                return rs
+
+            rs.headers['ETag'] = self.etag
+            rs.headers['Last-Modified'] = self.last_modified
+
+        rs.status_code = 200
+        rs._content = self.content
+        return rs
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def server():
+    return FakeFeedServer()
+
+
+@pytest.fixture
+def url():
+    url = f'https://example.com/{uuid4()}/feed.xml'
+    yield url
+    _variable().delete(RssPlugin._get_feed_validators_varname(url))
+
+
+def _build_plugin(url, server):
+    plugin = RssPlugin(subscriptions=[url])
+    plugin.subscriptions = [url]
+    plugin._fetcher._session = server
+    return plugin
+
+
+def test_fetch_sends_validators_and_skips_unchanged_feeds(server, url):
+    fetcher = FeedFetcher(
+        user_agent='test', timeout=5, poll_seconds=60, max_poll_seconds=600
+    )
+    fetcher._session = server
+
+    _, validators = fetcher.fetch(url)
+    state = fetcher.get_state(url)
+    # The validators are stored only once they are committed
+    assert state.etag is None
+    fetcher.commit(url, validators)
+    assert (state.etag, state.last_modified) == (server.etag, server.last_modified)
+    interval = state.interval
+
+    assert fetcher.fetch(url) is None
+    assert server.requests[-1][1] == {
+        'If-None-Match': server.etag,
+        'If-Modified-Since': server.last_modified,
+    }
+    # Unchanged feeds are polled less often
+    assert state.interval > interval
+
+    server.add_entry()
+    content, validators = fetcher.fetch(url)
+    assert 'Entry 1' in content
+    fetcher.commit(url, validators)
+    assert state.etag == server.etag
+
+
+def test_fetch_without_server_validators(url):
+    server = FakeFeedServer(validators=False)
+    fetcher = FeedFetcher(user_agent='test', timeout=5, poll_seconds=60)
+    fetcher._session = server
+
+    fetcher.commit(url, fetcher.fetch(url)[1])
+    # The digest of the content is used to detect changes
+    assert fetcher.fetch(url) is None
+    assert fetcher.fetch(url, conditional=False)
+
+    server.add_entry()
+    assert fetcher.fetch(url)
+
+
+def test_validators_are_saved(server, url):
+    plugin = _build_plugin(url, server)
+    response = plugin._poll_feed(url)
+    assert [entry['title'] for entry in response['content']] == ['Entry 0']
+
+    plugin._update_feed_validators([url])
+    varname = plugin._get_feed_validators_varname(url)
+    stored = json.loads(_variable().get(varname).output[varname])
+    assert stored['etag'] == server.etag
+    assert stored['last_modified'] == server.last_modified
+    assert stored['digest']
+
+
+def test_first_poll_after_restart_is_conditional(server, url):
+    plugin = _build_plugin(url, server)
+    plugin._poll_feed(url)
+    plugin._update_feed_validators([url])
+
+    restarted = _build_plugin(url, server)
+    restarted._load_feed_validators()
+    response = restarted._poll_feed(url)
+
+    assert response == {'url': url, 'content': None}
+    assert server.requests[-1][1]['If-None-Match'] == server.etag
+
+    # The entries of the unchanged feeds are still available
+    entries = restarted.get_latest_entries().output
+    assert [entry['title'] for entry in entries] == ['Entry 0']
+    # ...without affecting the fetch state
+    assert restarted._poll_feed(url)['content'] is None
+
+    server.add_entry()
+    response = restarted._poll_feed(url)
+    assert [entry['title'] for entry in response['content']] == [
+        'Entry 0',
+        'Entry 1',
+    ]
+
+
+def test_poll_errors(server, url):
+    plugin = _build_plugin(url, server)
+
+    def get(*_, **__):
+        raise requests.exceptions.ConnectionError('Connection refused')
+
+    server.get = get
+    response = plugin._poll_feed(url)
+    assert isinstance(response['error'], requests.exceptions.ConnectionError)
+
+
+def test_feeds_that_fail_to_parse_are_polled_again(server, url, monkeypatch):
+    plugin = _build_plugin(url, server)
+    parse_feed_content = plugin._parse_feed_content
+
+    def failing_parse_feed_content(*_, **__):
+        raise AttributeError('link')
+
+    monkeypatch.setattr(plugin, '_parse_feed_content', failing_parse_feed_content)
+    assert isinstance(plugin._poll_feed(url)['error'], AttributeError)
+
+    # The validators of the feed that couldn't be parsed aren't stored
+    monkeypatch.setattr(plugin, '_parse_feed_content', parse_feed_content)
+    response = plugin._poll_feed(url)
+    assert [entry['title'] for entry in response['content']] == ['Entry 0']
+    assert 'If-None-Match' not in server.requests[-1][1]
+    assert plugin._poll_feed(url)['content'] is None
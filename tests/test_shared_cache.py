@@ -0,0 +1,101 @@
+import json
+import threading
+import time
+
+import pytest
+
+from platypush.common.cache import SharedCache, get_cache
+from platypush.utils import get_redis
+
+
+@pytest.fixture
+def cache():
+    cache = get_cache('tests.shared_cache', ttl=60)
+    cache.clear()
+    yield cache
+    cache.clear()
+
+
+def test_values_are_shared_through_redis(cache):
+    """
+    A value cached by a process should be readable by the other processes.
+    """
+    cache.set('key', {'value': 1})
+    other_process = SharedCache(cache.namespace)
+
+    assert other_process.get('key') == {'value': 1}
+    assert other_process.metrics.shared_hits == 1
+    assert 0 < get_redis().pttl('platypush/cache/tests.shared_cache/key') <= 60000
+
+
+def test_invalidation_from_other_processes(cache):
+    """
+    A change notified by another process should drop the in-process entry.
+    """
+    cache.set('key', 'old')
+    get_redis().set('platypush/cache/tests.shared_cache/key', json.dumps('new'))
+    assert cache.get('key') == 'old'
+
+    get_redis().publish(
+        'platypush/cache/invalidate',
+        json.dumps({'origin': 'other', 'namespace': cache.namespace, 'key': 'key'}),
+    )
+
+    deadline = time.time() + 5
+    while cache.get('key') == 'old' and time.time() < deadline:
+        time.sleep(0.05)
+
+    assert cache.get('key') == 'new'
+
+
+def test_lru_eviction_and_ttl():
+    cache = SharedCache('tests.local_cache', max_size=2, shared=False)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.metrics.evictions == 1
+
+    cache.set('d', 4, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get('d') is None
+
+
+def test_concurrent_loads_are_coalesced(cache):
+    calls = []
+    results = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'loaded'
+
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_load('slow', loader))
+        )
+        for _ in range(10)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ['loaded'] * 10
+    assert cache.get_or_load('slow', loader) == 'loaded'
+    assert len(calls) == 1
+
+
+def test_loader_errors_are_not_cached(cache):
+    def failing_loader():
+        raise RuntimeError('Load error')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load('key', failing_loader)
+
+    assert cache.get_or_load('key', lambda: 'ok') == 'ok'
@@ -0,0 +1,296 @@
+import os
+import stat
+import sys
+import wave
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+try:
+    import platypush.plugins.sound  # noqa: F401
+except (ImportError, OSError) as e:
+    # sounddevice raises OSError if PortAudio isn't available
+    pytest.skip(f'The sound plugin is not available: {e}', allow_module_level=True)
+
+from platypush.plugins.sound._mixer import (  # noqa: E402
+    AudioDecoder,
+    DeviceMixer,
+    MixerSource,
+)
+from platypush.plugins.sound._mixer._decoders import (  # noqa: E402
+    FFmpegDecoder,
+    LinearResampler,
+    RawPcmDecoder,
+    WavDecoder,
+    map_channels,
+    to_float32,
+)
+
+
+class FakeStream:
+    """
+    Stand-in for ``sounddevice.OutputStream``.
+    """
+
+    def __init__(self):
+        self.active = True
+        self.closed = False
+
+    def stop(self):
+        self.active = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def mixer(monkeypatch):
+    def open_stream(self):
+        self._stream = FakeStream()
+
+    monkeypatch.setattr(DeviceMixer, '_open_stream', open_stream)
+    mixer = DeviceMixer(device=0, sample_rate=100, channels=2, blocksize=10)
+    yield mixer
+    mixer.close()
+
+
+def _frames(value: float, frames: int = 10, channels: int = 2):
+    return np.full((frames, channels), value, dtype=np.float32)
+
+
+def _mix(mixer: DeviceMixer, frames: int = 10):
+    out = np.ones((frames, mixer.channels), dtype=np.float32)
+    mixer.mix(out)
+    return out
+
+
+def _write_wav(path, samples, sample_rate: int, sample_width: int = 2):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(samples.shape[1])
+        wav.setsampwidth(sample_width)
+        wav.setframerate(sample_rate)
+        wav.writeframes(samples.astype('<i2').tobytes())
+
+
+def _decode(decoder: AudioDecoder):
+    return np.concatenate(list(decoder.chunks()))
+
+
+def test_mix_sums_and_clips_sources(mixer):
+    s1 = mixer.add_source()
+    s2 = mixer.add_source()
+    s1.write(_frames(0.25))
+    s2.write(_frames(0.5, frames=5))
+
+    out = _mix(mixer)
+    assert np.allclose(out[:5], 0.75)
+    # Shorter sources are padded with silence
+    assert np.allclose(out[5:], 0.25)
+
+    s1.write(_frames(0.75))
+    s2.write(_frames(0.75))
+    s1.write(_frames(-0.75))
+    s2.write(_frames(-0.75))
+    assert np.allclose(_mix(mixer), 1.0)
+    assert np.allclose(_mix(mixer), -1.0)
+
+
+def test_mix_gain_and_inactive_sources(mixer):
+    gain = {'value': 0.5}
+    active = {'value': True}
+    source = mixer.add_source(
+        gain=lambda: gain['value'], is_active=lambda: active['value']
+    )
+
+    source.write(_frames(0.8, frames=30))
+    assert np.allclose(_mix(mixer), 0.4)
+
+    gain['value'] = 0
+    assert np.allclose(_mix(mixer), 0)
+    assert source.frames_played == 20
+
+    # Paused sources are silent, and their frames aren't consumed
+    gain['value'] = 1
+    active['value'] = False
+    assert np.allclose(_mix(mixer), 0)
+    assert source.frames_played == 20
+
+    active['value'] = True
+    assert np.allclose(_mix(mixer), 0.8)
+
+
+def test_source_is_removed_at_eof(mixer):
+    source = mixer.add_source()
+    other = mixer.add_source()
+    source.write(_frames(0.5, frames=15))
+    source.finish()
+    assert not source.drained
+
+    _mix(mixer)
+    assert not source.wait_drained(timeout=0)
+    out = _mix(mixer)
+    assert np.allclose(out[:5], 0.5) and np.allclose(out[5:], 0)
+    assert source.wait_drained(timeout=0)
+
+    mixer.remove_source(source)
+    assert mixer.sources == [other]
+    # Writes to removed sources are rejected without blocking
+    assert not source.write(_frames(0.5), timeout=0)
+
+    other.write(_frames(0.1))
+    assert np.allclose(_mix(mixer), 0.1)
+
+
+def test_source_write_blocks_when_full():
+    source = MixerSource(channels=2, max_frames=10)
+    assert source.write(_frames(0.1))
+    assert not source.write(_frames(0.1), timeout=0.01)
+
+    # Partial reads split the buffered chunks
+    assert len(source.read(4)) == 4
+    assert source.write(_frames(0.2), timeout=0)
+    data = source.read(100)
+    assert len(data) == 16
+    assert np.allclose(data[:6], 0.1) and np.allclose(data[6:], 0.2)
+    assert source.read(10) is None
+
+
+def test_mixer_close_stops_stream(mixer):
+    source = mixer.add_source()
+    stream = mixer._stream
+    mixer.close()
+
+    assert stream.closed and not stream.active
+    assert source.drained
+    assert not mixer.sources
+
+
+def test_to_float32():
+    assert np.allclose(
+        to_float32(np.array([-32768, 0, 16384], dtype='<i2').tobytes(), 2),
+        [-1, 0, 0.5],
+    )
+    assert np.allclose(to_float32(bytes([0, 128, 192]), 1), [-1, 0, 0.5])
+    assert np.allclose(
+        to_float32(bytes([0x00, 0x00, 0x80, 0xFF, 0xFF, 0x7F]), 3),
+        [-1, 8388607 / 8388608],
+    )
+    assert np.allclose(
+        to_float32(np.array([0, 32768], dtype='<u2').tobytes(), 2, dtype='<u2'),
+        [-1, 0],
+    )
+
+    with pytest.raises(AssertionError):
+        to_float32(b'\x00' * 5, 5)
+
+
+def test_map_channels():
+    mono = np.array([[0.1], [0.2]], dtype=np.float32)
+    assert np.allclose(map_channels(mono, 2), [[0.1, 0.1], [0.2, 0.2]])
+
+    surround = np.array([[0.1, 0.2, 0.3]], dtype=np.float32)
+    assert np.allclose(map_channels(surround, 2), [[0.1, 0.2]])
+    assert map_channels(surround, 3) is surround
+
+
+@pytest.mark.parametrize('src_rate,dst_rate', [(100, 200), (200, 100), (44100, 48000)])
+def test_resampler_is_seamless_across_chunks(src_rate, dst_rate):
+    ramp = np.arange(1000, dtype=np.float32)[:, None]
+    whole = LinearResampler(src_rate, dst_rate)(ramp)
+
+    resample = LinearResampler(src_rate, dst_rate)
+    chunked = np.concatenate([resample(chunk) for chunk in np.array_split(ramp, 7)])
+
+    assert np.allclose(chunked, whole)
+    # A ramp stays a ramp, with the step scaled by the rate ratio
+    assert np.allclose(np.diff(whole[:, 0]), src_rate / dst_rate, atol=1e-3)
+    # The frames after the last source frame are held back for the next chunk
+    expected_frames = len(ramp) * dst_rate / src_rate
+    assert expected_frames - dst_rate / src_rate - 1 <= len(whole) <= expected_frames
+
+
+def test_wav_decoder_resamples_and_maps_channels(tmp_path):
+    samples = np.full((100, 1), 16384)
+    path = tmp_path / 'test.wav'
+    _write_wav(path, samples, sample_rate=50)
+
+    decoder = AudioDecoder.build(str(path), sample_rate=100, channels=2, blocksize=7)
+    assert isinstance(decoder, WavDecoder)
+
+    data = _decode(decoder)
+    assert data.dtype == np.float32
+    assert data.shape[1] == 2
+    assert abs(len(data) - 200) <= 2
+    assert np.allclose(data, 0.5)
+
+
+def test_raw_pcm_decoder(tmp_path):
+    path = tmp_path / 'test.raw'
+    path.write_bytes(np.full((30, 2), -16384, dtype='<i2').tobytes())
+
+    decoder = AudioDecoder.build(
+        str(path),
+        sample_rate=100,
+        channels=1,
+        blocksize=4,
+        dtype='int16',
+        src_sample_rate=100,
+        src_channels=2,
+    )
+
+    assert isinstance(decoder, RawPcmDecoder)
+    data = _decode(decoder)
+    assert data.shape == (30, 1)
+    assert np.allclose(data, -0.5)
+
+
+def test_decoder_fallback_to_ffmpeg(tmp_path):
+    args = {'sample_rate': 100, 'channels': 2, 'blocksize': 10}
+
+    # Remote resources
+    assert isinstance(
+        AudioDecoder.build('https://example.com/test.wav', **args), FFmpegDecoder
+    )
+    # Compressed formats
+    mp3 = tmp_path / 'test.mp3'
+    mp3.write_bytes(b'ID3' + b'\x00' * 100)
+    assert isinstance(AudioDecoder.build(str(mp3), **args), FFmpegDecoder)
+    # Files with a .wav extension that aren't PCM WAV files
+    fake_wav = tmp_path / 'fake.wav'
+    fake_wav.write_bytes(b'RIFF\x00\x00\x00\x00WAVEjunk')
+    assert isinstance(AudioDecoder.build(str(fake_wav), **args), FFmpegDecoder)
+    # Raw files without a sample type
+    raw = tmp_path / 'test.raw'
+    raw.write_bytes(b'\x00' * 100)
+    assert isinstance(AudioDecoder.build(str(raw), **args), FFmpegDecoder)
+    # FIFOs with a .wav extension can't be probed
+    fifo = tmp_path / 'fifo.wav'
+    os.mkfifo(fifo)
+    assert isinstance(AudioDecoder.build(str(fifo), **args), WavDecoder)
+
+
+def test_ffmpeg_decoder_output(tmp_path):
+    output = tmp_path / 'output.f32'
+    output.write_bytes(np.full((25, 2), 0.25, dtype='<f4').tobytes())
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text(
+        f'#!{sys.executable}\n'
+        'import shutil, sys\n'
+        f'with open({str(output)!r}, "rb") as f:\n'
+        '    shutil.copyfileobj(f, sys.stdout.buffer)\n'
+    )
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IEXEC)
+
+    decoder = AudioDecoder.build(
+        'https://example.com/test.mp3',
+        sample_rate=100,
+        channels=2,
+        blocksize=10,
+        ffmpeg_bin=str(ffmpeg),
+    )
+
+    chunks = list(decoder.chunks())
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert np.allclose(np.concatenate(chunks), 0.25)
+    assert decoder._proc is None
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+
+from platypush import __version__
+from platypush.config._manifests import (
+    build_manifests_index,
+    load_manifests,
+    scan_manifests,
+)
+from platypush.utils import get_src_root
+from platypush.utils.startup import StartupProfiler
+
+
+def test_lazy_imports():
+    """
+    Importing the package or a message class doesn't import the application.
+    """
+    out = subprocess.check_output(
+        [
+            sys.executable,
+            '-c',
+            'import sys; from platypush import Request, when; '
+            'print("platypush.app._app" in sys.modules, when.__name__)',
+        ],
+        text=True,
+    )
+
+    assert out.split() == ['False', 'hook']
+
+
+def test_manifests_index(tmp_path):
+    """
+    The manifests index is used if it matches the current version, otherwise
+    the source tree is scanned.
+    """
+    src_root = tmp_path / 'platypush'
+    manifest_dir = src_root / 'plugins' / 'foo'
+    manifest_dir.mkdir(parents=True)
+    (manifest_dir / 'manifest.json').write_text(
+        '{"manifest": {"package": "platypush.plugins.foo"}}'
+    )
+
+    build_manifests_index(str(src_root), __version__)
+    (manifest_dir / 'manifest.json').unlink()
+    assert list(load_manifests(str(src_root), __version__)['plugins']) == ['foo']
+    assert load_manifests(str(src_root), '0.0.0')['plugins'] == {}
+
+    manifests = scan_manifests(get_src_root())
+    assert 'http' in manifests['backends']
+    assert 'variable' in manifests['plugins']
+
+
+def test_startup_profiler():
+    profiler = StartupProfiler()
+    with profiler.phase('config'):
+        with profiler.phase('config.manifests'):
+            pass
+    with profiler.phase('plugins'):
+        with profiler.step('plugin', 'foo', 'import'):
+            pass
+        with profiler.step('plugin', 'foo', 'init'):
+            pass
+
+    report = profiler.report().splitlines()
+    phases = [line.strip().split()[0] for line in report[3:6]]
+    assert phases == ['config', 'config.manifests', 'plugins']
+    assert report[-1].strip().startswith('plugin.foo')
@@ -0,0 +1,74 @@
+import csv
+
+import pytest
+
+from platypush.plugins.torrent._search._torrents_csv._index import TorrentsCsvIndex
+
+_header = [
+    'infohash',
+    'name',
+    'size_bytes',
+    'created_unix',
+    'seeders',
+    'leechers',
+    'completed',
+    'scraped_date',
+    'published',
+]
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(_header)
+        for infohash, name, seeders, created in rows:
+            writer.writerow([infohash, name, 1024, created, seeders, 1, 0, 0, 0])
+
+
+@pytest.fixture
+def index(tmp_path):
+    return TorrentsCsvIndex(str(tmp_path / 'torrents.db'))
+
+
+def test_search_is_sorted_by_seeders_and_recency(tmp_path, index):
+    csv_path = tmp_path / 'torrents.csv'
+    _write_csv(
+        csv_path,
+        [
+            ('a', 'Ubuntu 22.04 Desktop', 10, 100),
+            ('b', 'Ubuntu 24.04 Desktop', 50, 200),
+            ('c', 'Ubuntu 24.04 Server', 50, 300),
+            ('d', 'Debian 12', 100, 400),
+        ],
+    )
+
+    stats = index.import_csv(str(csv_path))
+    assert (stats.rows, stats.added, stats.updated, stats.removed) == (4, 4, 0, 0)
+
+    results = index.search('ubuntu', limit=10, offset=0)
+    assert [r[0] for r in results] == ['c', 'b', 'a']
+    assert [r[0] for r in index.search('buntu 24', limit=10, offset=0)] == ['c', 'b']
+    assert [r[0] for r in index.search('ubuntu', limit=1, offset=1)] == ['b']
+
+
+def test_import_only_applies_changes(tmp_path, index):
+    csv_path = tmp_path / 'torrents.csv'
+    _write_csv(csv_path, [('a', 'Foo', 1, 100), ('b', 'Bar', 2, 200)])
+    index.import_csv(str(csv_path))
+
+    _write_csv(
+        csv_path,
+        [('a', 'Foo', 1, 100), ('b', 'Bar renamed', 2, 200), ('c', 'Baz', 3, 300)],
+    )
+    stats = index.import_csv(str(csv_path))
+    assert (stats.added, stats.updated, stats.removed) == (1, 1, 0)
+    assert [r[0] for r in index.search('renamed', limit=10, offset=0)] == ['b']
+
+    _write_csv(csv_path, [('c', 'Baz', 3, 300)])
+    stats = index.import_csv(str(csv_path))
+    assert (stats.added, stats.updated, stats.removed) == (0, 0, 2)
+    assert not index.search('foo', limit=10, offset=0)
+    assert [r[0] for r in index.search('baz', limit=10, offset=0)] == ['c']
+
+
+# vim:sw=4:ts=4:et:
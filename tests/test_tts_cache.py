@@ -0,0 +1,174 @@
+import logging
+import os
+import time
+
+import pytest
+
+from platypush.plugins import tts
+from platypush.plugins.tts import TtsPlugin
+from platypush.plugins.tts._cache import TtsCache
+from platypush.plugins.tts._stream import split_sentences
+from platypush.plugins.tts.mimic3 import TtsMimic3Plugin
+
+
+def test_cache_key_depends_on_all_the_synthesis_parameters():
+    """
+    Different engines, voices, parameters or texts map to different keys.
+    """
+    key = TtsCache.key('tts.piper', 'Front door open', voice='en_US', length_scale=1)
+    assert key == TtsCache.key(
+        'tts.piper', 'Front door open', voice='en_US', length_scale=1
+    )
+    assert key != TtsCache.key('tts.piper', 'Front door open', voice='en_GB')
+    assert key != TtsCache.key(
+        'tts.piper', 'Front door open', voice='en_US', length_scale=2
+    )
+    assert key != TtsCache.key('tts', 'Front door open', voice='en_US')
+    assert key != TtsCache.key('tts.piper', 'Back door open', voice='en_US')
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    """
+    When the cache grows beyond its size, the least recently used entries are
+    evicted first.
+    """
+    cache = TtsCache(str(tmp_path), max_size=250)
+    keys = [TtsCache.key('test', f'phrase {i}') for i in range(3)]
+
+    for i, key in enumerate(keys[:2]):
+        path = cache.put(key, 'pcm', b'x' * 100)
+        os.utime(path, (time.time() - 10 + i, time.time() - 10 + i))
+
+    # Hitting the first entry makes it the most recently used
+    assert cache.get(keys[0], 'pcm')
+    cache.put(keys[2], 'pcm', b'x' * 100)
+
+    assert cache.get(keys[0], 'pcm')
+    assert cache.get(keys[1], 'pcm') is None
+    assert cache.get(keys[2], 'pcm')
+
+
+def test_split_sentences():
+    """
+    Texts are split on sentence boundaries, and long sentences on clauses.
+    """
+    assert split_sentences('Hello there!  How are you?\nFine.') == [
+        'Hello there!',
+        'How are you?',
+        'Fine.',
+    ]
+    assert split_sentences('one, two, three', max_length=10) == [
+        'one, two,',
+        'three',
+    ]
+    assert not split_sentences('  \n ')
+
+
+class _FakeResponse:
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1024):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i : i + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+def _build_plugin(plugin_class, tmp_path, monkeypatch):
+    plugin = plugin_class.__new__(plugin_class)
+    plugin._cache = TtsCache(str(tmp_path / 'cache'), max_size=1024 * 1024)
+    plugin.logger = logging.getLogger(__name__)
+    plugin.language = 'en-US'
+    monkeypatch.setattr(plugin_class, '_engine_name', plugin_class.__name__.lower())
+    return plugin
+
+
+def _cached_files(plugin):
+    return [
+        name
+        for _, _, files in os.walk(plugin._cache.cache_dir)
+        for name in files
+        if not name.endswith('.tmp')
+    ]
+
+
+@pytest.fixture
+def played(monkeypatch):
+    """
+    Records the audio played through ``TtsPlugin._playback``.
+    """
+    audio = []
+
+    def playback(_, resource, size=None, **__):
+        with open(resource, 'rb') as f:
+            audio.append(f.read(size) if size else f.read())
+
+    monkeypatch.setattr(TtsPlugin, '_playback', playback)
+    return audio
+
+
+def test_streamed_audio_is_played_and_cached(tmp_path, monkeypatch, played):
+    plugin = _build_plugin(TtsPlugin, tmp_path, monkeypatch)
+    content = os.urandom(10000)
+    requests = []
+
+    def get(url, **kwargs):
+        requests.append(url)
+        # The audio is streamed to the player, not downloaded upfront
+        assert kwargs.get('stream')
+        return _FakeResponse(content)
+
+    monkeypatch.setattr(tts.requests, 'get', get)
+
+    assert not plugin.say('Hello').errors
+    assert played == [content]
+    assert len(_cached_files(plugin)) == 1
+
+    # Cached phrases are played without being downloaded again
+    assert not plugin.say('Hello').errors
+    assert played == [content, content]
+    assert len(requests) == 1
+
+
+def test_interrupted_streams_are_not_cached(tmp_path, monkeypatch, played):
+    plugin = _build_plugin(TtsPlugin, tmp_path, monkeypatch)
+    monkeypatch.setattr(
+        tts.requests, 'get', lambda *_, **__: _FakeResponse(os.urandom(1000000))
+    )
+    monkeypatch.setattr(
+        TtsPlugin,
+        '_playback',
+        lambda _, resource, **__: played.append(open(resource, 'rb').read(100)),
+    )
+
+    assert not plugin.say('Hello').errors
+    assert len(played[0]) == 100
+    assert not _cached_files(plugin)
+
+
+def test_mimic3_audio_is_cached(tmp_path, monkeypatch, played):
+    plugin = _build_plugin(TtsMimic3Plugin, tmp_path, monkeypatch)
+    plugin.server_url = 'http://localhost:59125'
+    plugin.voice = 'en_US/vctk_low'
+    requests = []
+
+    def get_audio(text, *_, **__):
+        requests.append(text)
+        return text.encode()
+
+    monkeypatch.setattr(TtsMimic3Plugin, '_get_audio', staticmethod(get_audio))
+
+    for _ in range(2):
+        assert not plugin.say('Hello').errors
+    assert not plugin.say('Hello', voice='en_UK/apope_low').errors
+
+    assert played == [b'Hello'] * 3
+    assert requests == ['Hello', 'Hello']
@@ -0,0 +1,96 @@
+import os
+import threading
+
+import pytest
+import requests
+
+from platypush.plugins.tts._cache import TtsCache
+from platypush.plugins.tts.openai import TtsOpenaiPlugin
+
+
+class _FakeResponse:
+    def __init__(self, chunks: int = 1000, error: bool = False):
+        self.chunks = chunks
+        self.error = error
+
+    def iter_content(self, chunk_size=1024):
+        for _ in range(self.chunks):
+            yield b'x' * chunk_size
+
+        if self.error:
+            raise requests.exceptions.ChunkedEncodingError('Connection broken')
+
+
+def _read(audio_file: str, size=None):
+    with open(audio_file, 'rb') as f:
+        return f.read(size) if size else f.read()
+
+
+@pytest.fixture
+def plugin(tmp_path, monkeypatch):
+    plugin = TtsOpenaiPlugin.__new__(TtsOpenaiPlugin)
+    plugin._audio_proc = None
+    plugin._stop_requested = threading.Event()
+    plugin._cache = TtsCache(str(tmp_path / 'cache'), max_size=1024 * 1024)
+    plugin.model = 'tts-1'
+    plugin.voice = 'nova'
+    monkeypatch.setattr(TtsOpenaiPlugin, '_engine_name', 'tts.openai')
+    return plugin
+
+
+def _cached_files(plugin):
+    return [
+        name
+        for _, _, files in os.walk(plugin._cache.cache_dir)
+        for name in files
+        if not name.endswith('.tmp')
+    ]
+
+
+def test_closed_player_pipe_is_not_an_error(plugin, monkeypatch):
+    """
+    If the player closes the pipe before the end of the response, the
+    playback ends without errors, and the partial response isn't cached.
+    """
+    monkeypatch.setattr(plugin, '_make_request', lambda *_, **__: _FakeResponse())
+    monkeypatch.setattr(plugin, '_playback', lambda f, **_: _read(f, 4096))
+
+    response = plugin.say('Hello')
+
+    assert not response.errors
+    assert not _cached_files(plugin)
+
+
+def test_stopped_playback_is_not_an_error(plugin, monkeypatch):
+    def playback(audio_file, **_):
+        # Simulate a stop() while the response is being processed
+        plugin._stop_requested.set()
+        plugin._audio_proc.terminate()
+        plugin._audio_proc.join()
+
+    monkeypatch.setattr(plugin, '_make_request', lambda *_, **__: _FakeResponse())
+    monkeypatch.setattr(plugin, '_playback', playback)
+
+    assert not plugin.say('Hello').errors
+    assert not _cached_files(plugin)
+
+
+def test_response_errors_are_reported(plugin, monkeypatch):
+    monkeypatch.setattr(
+        plugin, '_make_request', lambda *_, **__: _FakeResponse(10, error=True)
+    )
+    monkeypatch.setattr(plugin, '_playback', lambda f, **_: _read(f))
+
+    response = plugin.say('Hello')
+
+    assert response.errors
+    assert 'exited with code 1' in response.errors[0]
+    assert not _cached_files(plugin)
+
+
+def test_complete_responses_are_cached(plugin, monkeypatch):
+    monkeypatch.setattr(plugin, '_make_request', lambda *_, **__: _FakeResponse(10))
+    monkeypatch.setattr(plugin, '_playback', lambda f, **_: _read(f))
+
+    assert not plugin.say('Hello').errors
+    assert len(_cached_files(plugin)) == 1
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+import pytest
+
+from platypush.exceptions.user import InvalidTokenException
+from platypush.user import UserManager, _credentials_cache
+
+_username = 'credentials-cache-test-user'
+_password = 'test-password'
+
+
+@pytest.fixture(scope='module')
+def user_manager():
+    manager = UserManager()
+    manager.create_user(_username, _password)
+    yield manager
+
+    for token in manager.get_api_tokens(_username):
+        manager.delete_api_token(_username, token_id=token.id)
+    manager.delete_user(_username)
+
+
+def test_api_token_validation_is_cached(user_manager):
+    """
+    A validated API token should not be hashed again on the next validations.
+    """
+    token = user_manager.generate_api_token(_username)
+    assert user_manager.validate_api_token(token).username == _username
+
+    with patch.object(
+        UserManager, '_encrypt_password', side_effect=AssertionError('Not cached')
+    ):
+        user = user_manager.validate_api_token(token)
+
+    assert user.username == _username
+    assert user.password is None
+
+
+def test_api_token_cache_invalidation_on_delete(user_manager):
+    """
+    A deleted API token should no longer be accepted, even if it was cached.
+    """
+    token = user_manager.generate_api_token(_username)
+    user_manager.validate_api_token(token)
+    user_manager.delete_api_token(_username, token=token)
+
+    with pytest.raises(InvalidTokenException):
+        user_manager.validate_api_token(token)
+
+
+def test_jwt_token_cache_invalidation_on_password_change(user_manager):
+    """
+    A JWT token should no longer be accepted after a password change, even if
+    it was cached.
+    """
+    token = user_manager.generate_jwt_token(_username, _password)
+    assert user_manager.validate_jwt_token(token).username == _username
+
+    assert user_manager.update_password(_username, _password, 'new-password')
+    try:
+        with pytest.raises(Exception):
+            user_manager.validate_jwt_token(token)
+    finally:
+        user_manager.update_password(_username, 'new-password', _password)
+
+
+def test_credentials_invalidated_during_validation_are_not_cached(user_manager):
+    """
+    A token validated against data read before an invalidation should not be
+    cached, or it would stay valid until the cache entry expires.
+    """
+    token = user_manager.generate_api_token(_username)
+    encrypt_password = UserManager._encrypt_password
+
+    def invalidating_encrypt_password(*args, **kwargs):
+        _credentials_cache.invalidate_user(_username)
+        return encrypt_password(*args, **kwargs)
+
+    with patch.object(
+        UserManager, '_encrypt_password', side_effect=invalidating_encrypt_password
+    ):
+        assert user_manager.validate_api_token(token).username == _username
+
+    assert _credentials_cache.get(token) is None
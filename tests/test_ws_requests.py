@@ -0,0 +1,114 @@
+import asyncio
+import json
+import socket
+import threading
+
+import pytest
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+from tornado.web import Application
+from tornado.websocket import websocket_connect
+
+from platypush.backend.http.app.ws import requests as ws_requests
+from platypush.backend.http.app.ws.requests import WSRequestsProxy
+
+
+class UnauthenticatedWSRequestsProxy(WSRequestsProxy):
+    _max_concurrent_requests = 5
+
+    def open(self, *_, **__):
+        pass
+
+
+@pytest.fixture(scope='module')
+def ws_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    ready = threading.Event()
+
+    async def serve():
+        server = HTTPServer(
+            Application([(r'/ws/requests', UnauthenticatedWSRequestsProxy)])
+        )
+        server.add_sockets(bind_sockets(port, address='127.0.0.1'))
+        ready.set()
+        await asyncio.Event().wait()
+
+    threading.Thread(target=asyncio.run, args=(serve(),), daemon=True).start()
+    ready.wait()
+    yield f'ws://127.0.0.1:{port}/ws/requests'
+
+
+def _request(msg_id: str, i: int) -> str:
+    return json.dumps(
+        {
+            'type': 'request',
+            'id': msg_id,
+            'action': 'shell.exec',
+            'args': {'cmd': f'echo {i}'},
+            'timeout': 10,
+        }
+    )
+
+
+def test_pipelined_requests(ws_url):
+    """
+    Requests sent on the same socket without waiting for the responses are
+    all executed, including those beyond the concurrency limit, and each
+    response has the id of its request.
+    """
+    n_requests = 20
+
+    async def run():
+        conn = await websocket_connect(ws_url)
+        for i in range(n_requests):
+            await conn.write_message(_request(f'req-{i}', i))
+
+        await conn.write_message(json.dumps({'type': 'request', 'id': 'invalid'}))
+        responses = {}
+        while len(responses) < n_requests + 1:
+            msg = json.loads(await asyncio.wait_for(conn.read_message(), 15))
+            responses[msg['id']] = msg['response']
+
+        conn.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert responses.pop('invalid')['errors'][0].startswith('Invalid request')
+    for i in range(n_requests):
+        response = responses[f'req-{i}']
+        assert not response['errors'], response
+        assert str(response['output']).strip() == str(i)
+
+
+def test_failed_requests_get_a_response(ws_url, monkeypatch):
+    """
+    Requests that can't be sent to the bus get an error response, and they
+    don't affect the other requests on the connection.
+    """
+    send_message_async = ws_requests.send_message_async
+
+    async def failing_send_message_async(request, *args, **kwargs):
+        if request.id == 'fail':
+            raise ConnectionError('Connection refused')
+        return await send_message_async(request, *args, **kwargs)
+
+    monkeypatch.setattr(ws_requests, 'send_message_async', failing_send_message_async)
+
+    async def run():
+        conn = await websocket_connect(ws_url)
+        await conn.write_message(_request('fail', 0))
+        await conn.write_message(_request('ok', 1))
+        responses = {}
+        while len(responses) < 2:
+            msg = json.loads(await asyncio.wait_for(conn.read_message(), 15))
+            responses[msg['id']] = msg['response']
+
+        conn.close()
+        return responses
+
+    responses = asyncio.run(run())
+    assert responses['fail']['errors'] == ['Connection refused']
+    assert str(responses['ok']['output']).strip() == '1'